@@ -0,0 +1,269 @@
+"""
+Project access control: "can user U access project P, and as what?"
+
+One joined query (project, its team and the user's membership row) answers
+it. Answers are memoized on the SQLAlchemy session, which lives for one
+request, and kept in a small process-wide TTL cache so repeated requests
+from the same user skip the query. Membership and ownership changes made
+through the ORM invalidate both; bulk deletes must call invalidate().
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, event, select
+from sqlalchemy.orm import Session
+
+from .models import Project, Team, TeamMember
+
+OWNER = "owner"
+MEMBER = "member"
+
+_MEMO_KEY = "project_access"
+
+
+def cache_ttl() -> float:
+	return float(os.getenv("ACCESS_CACHE_TTL_SECONDS", "5"))
+
+
+def cache_size() -> int:
+	return int(os.getenv("ACCESS_CACHE_SIZE", "4096"))
+
+
+@dataclass(frozen=True)
+class ProjectAccess:
+	project_id: str
+	user_id: str
+	exists: bool
+	owner_id: Optional[str] = None
+	team_id: Optional[str] = None
+	# OWNER, MEMBER or None (no access).
+	role: Optional[str] = None
+	# The member's role within the team ("Frontend", ...), if any.
+	team_role: Optional[str] = None
+
+	@property
+	def allowed(self) -> bool:
+		return self.role is not None
+
+	@property
+	def is_owner(self) -> bool:
+		return self.role == OWNER
+
+
+class AccessCache:
+	"""Thread-safe LRU of ProjectAccess with a time-to-live."""
+
+	def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+		self.ttl = cache_ttl() if ttl is None else ttl
+		self.max_entries = cache_size() if max_entries is None else max_entries
+		self._entries: "OrderedDict[Tuple[str, str], Tuple[float, ProjectAccess]]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, project_id: str, user_id: str) -> Optional[ProjectAccess]:
+		if self.ttl <= 0:
+			return None
+		key = (project_id, user_id)
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return None
+			if entry[0] < time.monotonic():
+				del self._entries[key]
+				return None
+			self._entries.move_to_end(key)
+			return entry[1]
+
+	def put(self, access: ProjectAccess) -> None:
+		if self.ttl <= 0:
+			return
+		with self._lock:
+			self._entries[(access.project_id, access.user_id)] = (time.monotonic() + self.ttl, access)
+			self._entries.move_to_end((access.project_id, access.user_id))
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def invalidate(self, project_id: Optional[str] = None, team_id: Optional[str] = None) -> None:
+		with self._lock:
+			stale = [
+				key
+				for key, (_, access) in self._entries.items()
+				if (project_id and access.project_id == project_id) or (team_id and access.team_id == team_id)
+			]
+			for key in stale:
+				del self._entries[key]
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+
+access_cache = AccessCache()
+
+
+def _memo(db: Session) -> dict:
+	return db.info.setdefault(_MEMO_KEY, {})
+
+
+def _access_statement(project_id: str, user_id: str):
+	return (
+		select(Project, Team.id, TeamMember.id, TeamMember.role)
+		.outerjoin(Team, Team.id == Project.team_id)
+		.outerjoin(TeamMember, and_(TeamMember.team_id == Team.id, TeamMember.user_id == user_id))
+		.where(Project.id == project_id)
+		.limit(1)
+	)
+
+
+def _from_row(row, project_id: str, user_id: str) -> Tuple[ProjectAccess, Optional[Project]]:
+	if row is None:
+		return ProjectAccess(project_id, user_id, exists=False), None
+	project, team_id, member_id, team_role = row
+	role = OWNER if project.owner_id == user_id else (MEMBER if member_id is not None else None)
+	access = ProjectAccess(
+		project_id=project_id,
+		user_id=user_id,
+		exists=True,
+		owner_id=project.owner_id,
+		team_id=team_id,
+		role=role,
+		team_role=team_role,
+	)
+	return access, project
+
+
+def _load(db: Session, project_id: str, user_id: str) -> Tuple[ProjectAccess, Optional[Project]]:
+	row = db.execute(_access_statement(project_id, user_id)).first()
+	return _from_row(row, project_id, user_id)
+
+
+def _cached(db, project_id: str, user_id: str) -> Optional[ProjectAccess]:
+	memo = _memo(db)
+	access = memo.get((project_id, user_id)) or access_cache.get(project_id, user_id)
+	if access is not None:
+		memo[(project_id, user_id)] = access
+	return access
+
+
+def _remember(db, access: ProjectAccess) -> None:
+	_memo(db)[(access.project_id, access.user_id)] = access
+	access_cache.put(access)
+
+
+def _resolve(db: Session, project_id: str, user_id: str) -> Tuple[ProjectAccess, Optional[Project]]:
+	access = _cached(db, project_id, user_id)
+	if access is not None:
+		return access, None
+	access, project = _load(db, project_id, user_id)
+	_remember(db, access)
+	return access, project
+
+
+def resolve(db: Session, project_id: str, user_id: str) -> ProjectAccess:
+	"""Access of `user_id` to `project_id`; at most one query, none when cached."""
+	return _resolve(db, project_id, user_id)[0]
+
+
+def _check(access: ProjectAccess, owner_only: bool, detail: str) -> None:
+	if not access.exists:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+	if not access.allowed or (owner_only and not access.is_owner):
+		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+def require(
+	db: Session,
+	project_id: str,
+	user_id: str,
+	owner_only: bool = False,
+	detail: str = "Not authorized for this project",
+) -> ProjectAccess:
+	"""resolve() that raises 404 for a missing project and 403 without access."""
+	access = resolve(db, project_id, user_id)
+	_check(access, owner_only, detail)
+	return access
+
+
+def require_project(
+	db: Session,
+	project_id: str,
+	user_id: str,
+	owner_only: bool = False,
+	detail: str = "Not authorized for this project",
+) -> Tuple[Project, ProjectAccess]:
+	"""
+	The project together with the caller's access. A cache miss loads both in
+	the one joined query; a hit costs a primary-key lookup for the project.
+	"""
+	access, project = _resolve(db, project_id, user_id)
+	_check(access, owner_only, detail)
+	if project is None:
+		project = db.get(Project, project_id)
+		if project is None:
+			invalidate(db, project_id=project_id)
+			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+	return project, access
+
+
+async def require_async(
+	db,
+	project_id: str,
+	user_id: str,
+	owner_only: bool = False,
+	detail: str = "Not authorized for this project",
+) -> ProjectAccess:
+	"""require() for async routes; `db` is an AsyncSession (or ThreadedSession)."""
+	access = _cached(db, project_id, user_id)
+	if access is None:
+		row = (await db.execute(_access_statement(project_id, user_id))).first()
+		access, _ = _from_row(row, project_id, user_id)
+		_remember(db, access)
+	_check(access, owner_only, detail)
+	return access
+
+
+def invalidate(db: Optional[Session] = None, project_id: Optional[str] = None, team_id: Optional[str] = None) -> None:
+	"""Forget cached answers for a project or a team (both when given)."""
+	access_cache.invalidate(project_id=project_id, team_id=team_id)
+	if db is not None:
+		db.info.pop(_MEMO_KEY, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_membership_changes(session: Session, flush_context) -> None:
+	projects, teams = set(), set()
+	for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+		if isinstance(obj, TeamMember):
+			teams.add(obj.team_id)
+		elif isinstance(obj, Project) and obj not in session.new:
+			projects.add(obj.id)
+		elif isinstance(obj, Team):
+			teams.add(obj.id)
+			projects.add(obj.project_id)
+	if not projects and not teams:
+		return
+	session.info.pop(_MEMO_KEY, None)
+	pending = session.info.setdefault("project_access_pending", (set(), set()))
+	pending[0].update(projects)
+	pending[1].update(teams)
+	for project_id in projects:
+		access_cache.invalidate(project_id=project_id)
+	for team_id in teams:
+		access_cache.invalidate(team_id=team_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+	# Again at commit: another request may have cached the old answer between
+	# the flush and the commit.
+	projects, teams = session.info.pop("project_access_pending", (set(), set()))
+	for project_id in projects:
+		access_cache.invalidate(project_id=project_id)
+	for team_id in teams:
+		access_cache.invalidate(team_id=team_id)
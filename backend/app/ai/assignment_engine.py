@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import heapq
+import math
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# fit_score(member, task) = α * skill_match + β * availability + γ * past_performance
+ALPHA, BETA, GAMMA = 0.5, 0.3, 0.2
+# Up to 40h of assigned work counts as "full".
+MAX_HOURS = 40.0
+DEFAULT_TASK_HOURS = 2.0
+
+INF = float("inf")
+
+
+def capacity_slack() -> float:
+	return float(os.getenv("ASSIGNMENT_CAPACITY_SLACK", "1.5"))
+
+
+@dataclass
+class AssignmentTask:
+	id: str
+	title: str
+	description: Optional[str] = None
+	estimated_hours: Optional[float] = None
+
+	@property
+	def hours(self) -> float:
+		return float(self.estimated_hours or DEFAULT_TASK_HOURS)
+
+
+@dataclass
+class AssignmentMember:
+	user_id: str
+	skills: List[str] = field(default_factory=list)
+	load_hours: float = 0.0
+
+
+@dataclass
+class Assignment:
+	task_index: int
+	member_index: int
+	fit: float
+	skill_match: float
+	availability: float
+	workload_penalty: float
+
+
+def skill_match_matrix(texts: Sequence[str], member_skills: Sequence[Sequence[str]]) -> List[List[float]]:
+	"""
+	skill_match[t][m] in [0, 100]: the share of member m's skills that occur
+	as substrings of task text t.
+
+	Every distinct skill in the team is tested once per task (not once per
+	member), and hits are spread to members through an inverted index.
+	"""
+	members_by_skill: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+	for m, skills in enumerate(member_skills):
+		counts: Dict[str, int] = defaultdict(int)
+		for skill in skills:
+			if skill:
+				counts[skill] += 1
+		for skill, count in counts.items():
+			members_by_skill[skill].append((m, count))
+	skill_list = list(members_by_skill)
+	scale = [100.0 / len(skills) if skills else 0.0 for skills in member_skills]
+
+	matrix: List[List[float]] = []
+	for text in texts:
+		row = [0.0] * len(member_skills)
+		for skill in skill_list:
+			if skill in text:
+				for m, count in members_by_skill[skill]:
+					row[m] += count * scale[m]
+		matrix.append(row)
+	return matrix
+
+
+def fit_components(skill_match: float, load_hours: float) -> Tuple[float, float, float, float]:
+	"""(fit, skill_match, availability, workload_penalty) for a member at `load_hours`."""
+	availability = max(0.0, 1.0 - min(load_hours, MAX_HOURS) / MAX_HOURS)
+	# Past performance is proxied by the same low-workload signal.
+	past_performance = availability
+	fit = ALPHA * skill_match + BETA * availability * 100.0 + GAMMA * past_performance * 100.0
+	workload_penalty = (load_hours / MAX_HOURS) * 100.0
+	return fit, skill_match, availability, workload_penalty
+
+
+class _TopHeap:
+	"""Min-heap of (key, task); entries for tasks that moved are dropped lazily when they surface."""
+
+	__slots__ = ("items",)
+
+	def __init__(self, items: Optional[List[Tuple[float, int]]] = None) -> None:
+		self.items = items or []
+		heapq.heapify(self.items)
+
+	def push(self, key: float, task: int) -> None:
+		heapq.heappush(self.items, (key, task))
+
+
+def solve_assignment(costs: Sequence[Sequence[float]], slot_costs: Sequence[Sequence[float]]) -> List[int]:
+	"""
+	Assign every task to one member at minimum total cost.
+
+	`costs[t][m]` is the cost of giving task t to member m; `slot_costs[m][k]`
+	is the extra cost of member m taking a (k+1)-th task, and its length is
+	m's capacity. Slot costs must be non-decreasing in k (convex load cost),
+	which is what spreads work out.
+
+	This is min-cost flow source -> task -> member -> sink solved by
+	successive shortest paths with potentials. Paths are searched on a graph
+	over members only: moving from member a to b means handing one of a's
+	tasks to b, and the cheapest such task for each (a, b) is kept in a heap,
+	so each augmentation costs O(M^2) instead of O(T * M).
+
+	Returns the member index for each task.
+	"""
+	n_tasks = len(costs)
+	n_members = len(slot_costs)
+	if n_tasks == 0:
+		return []
+	if sum(len(s) for s in slot_costs) < n_tasks:
+		raise ValueError("Not enough member capacity for all tasks")
+
+	assigned = [-1] * n_tasks
+	load = [0] * n_members
+	# Start from exact shortest-path distances so reduced costs are >= 0.
+	potential = [min(costs[t][b] for t in range(n_tasks)) for b in range(n_members)]
+	potential_sink = min(potential[m] + slot_costs[m][0] for m in range(n_members) if slot_costs[m])
+
+	# Entry arcs: cheapest unassigned task for each member.
+	entry = [_TopHeap([(costs[t][b], t) for t in range(n_tasks)]) for b in range(n_members)]
+	# Transfer arcs: tasks held by a, keyed by the cost change of moving them to b.
+	transfer = [[_TopHeap() for _ in range(n_members)] for _ in range(n_members)]
+
+	def give(t: int, m: int) -> None:
+		assigned[t] = m
+		row = costs[t]
+		base = row[m]
+		heaps = transfer[m]
+		for b in range(n_members):
+			if b != m:
+				heaps[b].push(row[b] - base, t)
+
+	for _ in range(n_tasks):
+		dist = [INF] * n_members
+		prev: List[Tuple[int, int]] = [(-1, -1)] * n_members  # (from member or -1 for source, task)
+		for b in range(n_members):
+			items = entry[b].items
+			while items and assigned[items[0][1]] != -1:
+				heapq.heappop(items)
+			if items:
+				dist[b] = max(0.0, items[0][0] - potential[b])
+				prev[b] = (-1, items[0][1])
+		frontier = [(d, b) for b, d in enumerate(dist) if d < INF]
+		heapq.heapify(frontier)
+
+		# Dijkstra over members, stopping once nothing unsettled can beat the
+		# best way out to the sink found so far (slot arcs are >= 0 reduced).
+		done = [False] * n_members
+		end = -1
+		dist_sink = INF
+		while frontier:
+			d, a = heapq.heappop(frontier)
+			if done[a] or d > dist[a]:
+				continue
+			if d >= dist_sink:
+				break
+			done[a] = True
+			if load[a] < len(slot_costs[a]):
+				candidate = d + max(0.0, slot_costs[a][load[a]] + potential[a] - potential_sink)
+				if candidate < dist_sink:
+					dist_sink, end = candidate, a
+			heaps = transfer[a]
+			pa = potential[a]
+			for b in range(n_members):
+				if done[b] or b == a:
+					continue
+				items = heaps[b].items
+				while items and assigned[items[0][1]] != a:
+					heapq.heappop(items)
+				if not items:
+					continue
+				key, t = items[0]
+				reduced = key + pa - potential[b]
+				# Clamp float noise; reduced costs are >= 0 in exact arithmetic.
+				candidate = d + reduced if reduced > 0.0 else d
+				if candidate < dist[b]:
+					dist[b] = candidate
+					prev[b] = (a, t)
+					heapq.heappush(frontier, (candidate, b))
+		if end == -1:
+			raise ValueError("No feasible assignment")
+
+		# Augment: walk back from `end`, moving each task one step along the path.
+		load[end] += 1
+		b = end
+		while True:
+			a, t = prev[b]
+			give(t, b)
+			if a == -1:
+				break
+			b = a
+
+		for m in range(n_members):
+			potential[m] += min(dist[m], dist_sink)
+		potential_sink += dist_sink
+
+	return assigned
+
+
+def assign_tasks(
+	tasks: Sequence[AssignmentTask],
+	members: Sequence[AssignmentMember],
+	slack: Optional[float] = None,
+) -> List[Assignment]:
+	"""
+	Optimal load-balanced assignment of `tasks` to `members`.
+
+	The cost of a task for a member is -α * skill_match; the k-th task a member
+	takes adds (β + γ) * 100 * projected_load / MAX_HOURS, with the projected
+	load growing by the average task size per slot. Each member takes at most
+	ceil(slack * tasks / members) tasks.
+
+	The reported components follow the greedy scorer: availability and
+	workload are evaluated at each member's running load, in task order.
+	"""
+	if not tasks or not members:
+		return []
+	slack = capacity_slack() if slack is None else slack
+	texts = [f"{t.title} {t.description or ''}".lower() for t in tasks]
+	skills = [[s.lower() for s in m.skills] for m in members]
+	match = skill_match_matrix(texts, skills)
+
+	capacity = max(1, math.ceil(slack * len(tasks) / len(members)))
+	capacity = max(capacity, math.ceil(len(tasks) / len(members)))
+	avg_hours = sum(t.hours for t in tasks) / len(tasks)
+	load_weight = (BETA + GAMMA) * 100.0 / MAX_HOURS
+	costs = [[-ALPHA * s for s in row] for row in match]
+	slot_costs = [
+		[load_weight * (m.load_hours + k * avg_hours) for k in range(capacity)]
+		for m in members
+	]
+	chosen = solve_assignment(costs, slot_costs)
+
+	running = [float(m.load_hours) for m in members]
+	result: List[Assignment] = []
+	for t, m in enumerate(chosen):
+		fit, skill_match, availability, workload_penalty = fit_components(match[t][m], running[m])
+		result.append(Assignment(t, m, fit, skill_match, availability, workload_penalty))
+		running[m] += tasks[t].hours
+	return result
@@ -1,25 +1,22 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any
-import os
-from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional
 
-# Load environment variables from .env file
-load_dotenv()
+from . import context_builder, llm_gateway
 
-from openai import OpenAI
 
-
-def _build_system_prompt(project_context: Dict[str, Any]) -> str:
+def _build_system_prompt(project_context: Dict[str, Any], sections: Optional[List[str]] = None) -> str:
 	"""
 	Construct a rich system prompt so the underlying LLM behaves like a
 	project-focused ChatGPT assistant.
+
+	`sections` are the budgeted task/file listings and history summary
+	produced by context_builder.build_context().
 	"""
 	project_title = project_context.get("project_title") or "your project"
 	project_description = project_context.get("project_description") or ""
 	tasks = project_context.get("tasks") or []
 	team_members = project_context.get("team_members") or []
-	files = project_context.get("files") or []
 
 	lines: List[str] = []
 	lines.append(
@@ -60,10 +57,8 @@ def _build_system_prompt(project_context: Dict[str, Any]) -> str:
 			+ ", ".join(f"{m.get('user_id')}:{m.get('role') or 'unknown'}" for m in team_members)
 		)
 
-	if files:
-		lines.append(
-			"Recent project files: " + ", ".join(f.get("filename", "?") for f in files[:10])
-		)
+	for section in sections or []:
+		lines.append("\n" + section)
 
 	lines.append(
 		"\nWhen asked for code, return complete functions/components/routes, not just fragments. "
@@ -103,17 +98,26 @@ def generate_assistant_response(
 	via the OpenAI client. If not, it falls back to a simple, local heuristic reply.
 	"""
 	conversation_history = conversation_history or []
-	api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY_WORKEXPERIO")
+	api_key = llm_gateway.get_api_key()
 
 	# If an API key is available, call a real ChatGPT-like model.
 	if api_key:
-		client = OpenAI(api_key=api_key)
-		system_prompt = _build_system_prompt(project_context)
+		# Fit recent history, open tasks and files into the token budget; older
+		# turns are folded into a cached summary.
+		window = context_builder.build_context(
+			message,
+			conversation_history,
+			project_context.get("tasks"),
+			project_context.get("files"),
+			base_tokens=context_builder.count_tokens(_build_system_prompt(project_context)),
+			summary_key=project_context.get("context_key"),
+			summary=project_context.get("conversation_summary"),
+		)
+		system_prompt = _build_system_prompt(project_context, window.sections)
 
 		messages_payload: List[Dict[str, str]] = [{"role": "system", "content": system_prompt}]
 
-		# Include full conversation history for multi-turn dialogue
-		for item in conversation_history:
+		for item in window.history:
 			role = item.get("role") or "user"
 			if role not in {"user", "assistant", "system"}:
 				role = "user"
@@ -124,13 +128,14 @@ def generate_assistant_response(
 		messages_payload.append({"role": "user", "content": message})
 
 		try:
-			chat = client.chat.completions.create(
-				model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-				messages=messages_payload,
+			chat = llm_gateway.chat_completion(
+				messages_payload,
+				purpose="assistant_chat",
 				temperature=0.2,
 			)
+			context_builder.context_stats.record_latency(chat.latency_ms)
 
-			reply_text = chat.choices[0].message.content or ""
+			reply_text = chat.text
 			
 			return {
 				"response": reply_text.strip(),
@@ -1,44 +1,55 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional
-import os
-import zipfile
-import tempfile
-from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+import io
 import json
 
-from openai import OpenAI
+from . import llm_gateway, zip_ingest
+from .static_analysis import ProjectReport, analyze_files
+
+
+def _line_count(file_data: Dict[str, Any]) -> int:
+	# Ingested files carry their full line count; content may only be a preview.
+	if file_data.get("line_count") is not None:
+		return int(file_data["line_count"])
+	return len(file_data.get("content", "").splitlines())
 
 
 def analyze_code_comprehensive(
 	files_data: List[Dict[str, str]],  # List of {"filename": "...", "content": "..."}
 	analysis_type: str = "comprehensive",  # "individual", "team", "comprehensive"
+	static_report: Optional[ProjectReport] = None,
 ) -> Dict[str, Any]:
 	"""
 	Comprehensive code analysis using AI.
 	
 	Analyzes code quality, accuracy, performance, and provides detailed feedback.
+	`static_report` holds local metrics for every uploaded file; it is computed
+	from the file contents here when not given. It grounds the LLM prompt and
+	is the whole answer when the LLM is unavailable.
 	"""
-	api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY_WORKEXPERIO")
-	
-	if not api_key:
-		return _analyze_code_fallback(files_data)
+	if static_report is None:
+		static_report = analyze_files(
+			[(fd.get("filename", "unknown"), (fd.get("content") or "").encode("utf-8")) for fd in files_data]
+		)
+	if not llm_gateway.is_configured():
+		return _analyze_code_fallback(files_data, static_report)
 	
 	try:
-		client = OpenAI(api_key=api_key)
-		
 		# Prepare file contents for analysis
 		files_summary = []
 		for file_data in files_data[:20]:  # Limit to 20 files for token efficiency
 			filename = file_data.get("filename", "unknown")
-			content = file_data.get("content", "")
-			lines = len(content.splitlines())
+			lines = _line_count(file_data)
 			files_summary.append(f"{filename} ({lines} lines)")
 		
 		files_text = "\n".join([
 			f"=== {fd.get('filename', 'unknown')} ===\n{fd.get('content', '')[:2000]}"
 			for fd in files_data[:10]  # Include full content for first 10 files
 		])
+		# Only the measured metrics: run stats would make every prompt unique and defeat the response cache.
+		static_text = json.dumps(static_report.metrics())
 		
 		system_prompt = """You are an expert code reviewer and quality analyst. Analyze the provided code files and provide a comprehensive evaluation.
 
@@ -81,21 +92,25 @@ Return a JSON object with this structure:
 Files to analyze ({len(files_data)} total):
 {', '.join(files_summary)}
 
+Static analysis of all files (cyclomatic complexity, function length, nesting, duplication):
+{static_text}
+
 Code content:
 {files_text}
 
 Provide a comprehensive analysis focusing on code quality, accuracy, and performance."""
 		
-		response = client.chat.completions.create(
-			model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-			messages=[
+		response = llm_gateway.chat_completion(
+			[
 				{"role": "system", "content": system_prompt},
 				{"role": "user", "content": user_prompt}
 			],
+			purpose="code_analysis",
 			temperature=0.2,
+			cache=True,
 		)
 		
-		content = response.choices[0].message.content or "{}"
+		content = response.text or "{}"
 		
 		# Try to parse JSON response
 		try:
@@ -108,11 +123,12 @@ Provide a comprehensive analysis focusing on code quality, accuracy, and perform
 				analysis = json.loads(content)
 		except json.JSONDecodeError:
 			# Fallback to basic analysis
-			return _analyze_code_fallback(files_data)
+			return _analyze_code_fallback(files_data, static_report)
 		
 		# Ensure required fields
 		if "overall_score" not in analysis:
-			analysis["overall_score"] = 75.0
+			analysis["overall_score"] = round(static_report.score, 1)
+		analysis["static_analysis"] = static_report.summary()
 		
 		return analysis
 		
@@ -127,27 +143,78 @@ Provide a comprehensive analysis focusing on code quality, accuracy, and perform
 		else:
 			logger.error(f"Error in comprehensive code analysis: {error_msg}")
 		
-		return _analyze_code_fallback(files_data)
+		return _analyze_code_fallback(files_data, static_report)
 
 
-def _analyze_code_fallback(files_data: List[Dict[str, str]]) -> Dict[str, Any]:
-	"""Fallback analysis when AI is not available."""
-	total_lines = sum(len(fd.get("content", "").splitlines()) for fd in files_data)
-	avg_lines = total_lines / len(files_data) if files_data else 0
-	
-	# Simple heuristic scoring
-	score = 100.0
-	if avg_lines > 500:
-		score -= 20
-	if avg_lines > 1000:
-		score -= 20
-	
+def _analyze_code_fallback(
+	files_data: List[Dict[str, str]],
+	static_report: Optional[ProjectReport] = None,
+) -> Dict[str, Any]:
+	"""Deterministic analysis from local static metrics when AI is not available."""
+	if static_report is None:
+		static_report = analyze_files(
+			[(fd.get("filename", "unknown"), (fd.get("content") or "").encode("utf-8")) for fd in files_data]
+		)
+	total_lines = sum(_line_count(fd) for fd in files_data)
+	summary = static_report.summary()
+	by_name = {m.filename: m for m in static_report.files}
+
+	if static_report.files:
+		score = static_report.score
+	else:
+		# Nothing in a supported language; fall back to a size heuristic.
+		avg_lines = total_lines / len(files_data) if files_data else 0
+		score = 100.0
+		if avg_lines > 500:
+			score -= 20
+		if avg_lines > 1000:
+			score -= 20
+
+	issues = []
+	if summary["complex_functions"]:
+		issues.append(f"{summary['complex_functions']} functions have cyclomatic complexity above 10")
+	if summary["long_functions"]:
+		issues.append(f"{summary['long_functions']} functions are longer than 50 lines")
+	if summary["max_nesting"] > 4:
+		issues.append(f"Control flow nests up to {summary['max_nesting']} levels deep")
+	if summary["duplication_ratio"] >= 0.05:
+		issues.append(f"{summary['duplication_ratio']:.0%} of code lines are duplicated")
+	if summary["parse_errors"]:
+		issues.append(f"{summary['parse_errors']} files could not be parsed")
+	strengths = []
+	if static_report.files and summary["avg_complexity"] <= 4:
+		strengths.append("Functions are generally small and simple")
+	if static_report.files and summary["duplication_ratio"] < 0.02:
+		strengths.append("Little duplicated code")
+
+	individual_files = []
+	for fd in files_data:
+		filename = fd.get("filename", "unknown")
+		metrics = by_name.get(filename)
+		recommendations = []
+		if metrics is not None:
+			for fn in metrics.functions:
+				if fn.complexity > 10 or fn.length > 50:
+					recommendations.append(
+						f"Split {fn.name} (line {fn.line}: complexity {fn.complexity}, {fn.length} lines)"
+					)
+		individual_files.append(
+			{
+				"filename": filename,
+				"score": round(metrics.score, 1) if metrics is not None else 75.0,
+				"issues": ["Could not be parsed"] if metrics is not None and metrics.parse_error else [],
+				"recommendations": recommendations[:5],
+				"metrics": metrics.as_dict() if metrics is not None else None,
+			}
+		)
+
+	score = round(max(0, min(100, score)), 1)
 	return {
-		"overall_score": max(0, min(100, score)),
+		"overall_score": score,
 		"code_quality": {
 			"score": score,
-			"issues": ["Unable to perform detailed analysis without AI"],
-			"strengths": []
+			"issues": issues,
+			"strengths": strengths,
 		},
 		"accuracy": {
 			"score": 75.0,
@@ -159,49 +226,162 @@ def _analyze_code_fallback(files_data: List[Dict[str, str]]) -> Dict[str, Any]:
 			"bottlenecks": [],
 			"recommendations": []
 		},
-		"individual_files": [
-			{
-				"filename": fd.get("filename", "unknown"),
-				"score": 75.0,
+		"individual_files": individual_files,
+		"static_analysis": summary,
+		"summary": (
+			f"Analyzed {len(files_data)} files with {total_lines} total lines using local static analysis "
+			f"({summary['functions']} functions, average complexity {summary['avg_complexity']}). "
+			"Enable AI for a detailed review."
+		),
+	}
+
+
+MAX_MERGED_ITEMS = 10
+SECTION_LISTS = {
+	"code_quality": ("issues", "strengths"),
+	"accuracy": ("potential_bugs",),
+	"performance": ("bottlenecks", "recommendations"),
+}
+
+
+def content_hash(file_data: Dict[str, Any]) -> str:
+	if file_data.get("sha256"):
+		return str(file_data["sha256"])
+	return hashlib.sha256((file_data.get("content") or "").encode("utf-8")).hexdigest()
+
+
+def _section_scores(result: Dict[str, Any]) -> Dict[str, float]:
+	"""Section scores of one analysis run, stamped on the file entries it produced."""
+	scores = {section: (result.get(section) or {}).get("score") for section in SECTION_LISTS}
+	return {section: score for section, score in scores.items() if isinstance(score, (int, float))}
+
+
+def _project_scores(entries: Dict[str, Dict[str, Any]], lines: Dict[str, int]) -> Dict[str, float]:
+	"""
+	Line-weighted means over the given file entries: overall_score from each
+	file's own score, section scores from the run that analyzed the file.
+	"""
+	totals: Dict[str, float] = {}
+	weights: Dict[str, int] = {}
+	for path, entry in entries.items():
+		scores = {"overall_score": entry.get("score"), **(entry.get("section_scores") or {})}
+		weight = max(lines.get(path, 0), 1)
+		for key, value in scores.items():
+			if isinstance(value, (int, float)):
+				totals[key] = totals.get(key, 0.0) + value * weight
+				weights[key] = weights.get(key, 0) + weight
+	return {key: round(totals[key] / weights[key], 1) for key in totals}
+
+
+def _merge_lists(new: List[Any], previous: List[Any]) -> List[Any]:
+	merged: List[Any] = []
+	for item in list(new or []) + list(previous or []):
+		if item not in merged:
+			merged.append(item)
+	return merged[:MAX_MERGED_ITEMS]
+
+
+def analyze_code_incremental(
+	files_data: List[Dict[str, Any]],
+	analysis_type: str = "comprehensive",
+	static_report: Optional[ProjectReport] = None,
+	previous_files: Optional[Dict[str, Tuple[str, Dict[str, Any]]]] = None,
+	previous_report: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+	"""
+	Analyze only the files that changed since the previous upload and merge.
+
+	`previous_files` maps path -> (sha256, individual_files entry) from the
+	last analysis and `previous_report` is the last merged report. Files
+	whose hash is unchanged keep their stored entry; only new or changed
+	files go to analyze_code_comprehensive (and so to the LLM). Project-level
+	scores are recomputed from the entries of the files in this upload
+	(see _project_scores), so replaced versions and removed files stop
+	counting.
+
+	Returns the merged report and the per-file entries keyed by path, for
+	the caller to persist.
+	"""
+	previous_files = previous_files or {}
+	if previous_report is None:
+		previous_files = {}
+	if static_report is None:
+		static_report = analyze_files(
+			[(fd.get("filename", "unknown"), (fd.get("content") or "").encode("utf-8")) for fd in files_data]
+		)
+
+	changed: List[Dict[str, Any]] = []
+	reused: Dict[str, Dict[str, Any]] = {}
+	for fd in files_data:
+		path = fd.get("filename", "unknown")
+		stored = previous_files.get(path)
+		if stored is not None and stored[0] == content_hash(fd):
+			reused[path] = stored[1]
+		else:
+			changed.append(fd)
+	removed = [path for path in previous_files if path not in {fd.get("filename", "unknown") for fd in files_data}]
+
+	changed_lines = sum(_line_count(fd) for fd in changed)
+	lines = {fd.get("filename", "unknown"): _line_count(fd) for fd in files_data}
+
+	if previous_report is not None and not changed:
+		new_result: Dict[str, Any] = {}
+		report = dict(previous_report)
+	else:
+		new_result = analyze_code_comprehensive(changed, analysis_type, static_report)
+		if previous_report is None:
+			report = dict(new_result)
+		else:
+			report = dict(previous_report)
+			for section, lists in SECTION_LISTS.items():
+				previous_section = previous_report.get(section) or {}
+				new_section = new_result.get(section) or {}
+				merged = {**previous_section, **new_section}
+				for key in lists:
+					merged[key] = _merge_lists(new_section.get(key), previous_section.get(key))
+				report[section] = merged
+			report["summary"] = new_result.get("summary") or previous_report.get("summary", "")
+
+	# Per-file entries: fresh ones for changed files, stored ones otherwise.
+	static_scores = static_report.file_scores()
+	section_scores = _section_scores(new_result)
+	fresh = {entry.get("filename"): entry for entry in new_result.get("individual_files", []) if isinstance(entry, dict)}
+	entries: Dict[str, Dict[str, Any]] = {}
+	for fd in files_data:
+		path = fd.get("filename", "unknown")
+		if path in reused:
+			entries[path] = reused[path]
+		else:
+			entry = fresh.get(path) or {
+				"filename": path,
+				"score": static_scores.get(path, new_result.get("overall_score", 75.0)),
 				"issues": [],
-				"recommendations": []
+				"recommendations": [],
 			}
-			for fd in files_data
-		],
-		"summary": f"Analyzed {len(files_data)} files with {total_lines} total lines. Enable AI for detailed analysis."
+			entries[path] = {**entry, "section_scores": section_scores}
+
+	scores = _project_scores(entries, lines)
+	if "overall_score" in scores:
+		report["overall_score"] = scores["overall_score"]
+	for section in SECTION_LISTS:
+		if section in scores:
+			report[section] = {**(report.get(section) or {}), "score": scores[section]}
+	report["individual_files"] = list(entries.values())
+	report["static_analysis"] = static_report.summary()
+	report["incremental"] = {
+		"changed_files": len(changed),
+		"reused_files": len(reused),
+		"removed_files": len(removed),
+		"changed_lines": changed_lines,
 	}
+	return report, entries
 
 
-def extract_files_from_zip(zip_content: bytes) -> List[Dict[str, str]]:
-	"""Extract and read files from a zip archive."""
-	files_data = []
-	
-	with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-		tmp_file.write(zip_content)
-		tmp_path = tmp_file.name
-	
-	try:
-		with zipfile.ZipFile(tmp_path, 'r') as zip_ref:
-			for file_info in zip_ref.namelist():
-				# Skip directories and hidden files
-				if file_info.endswith('/') or file_info.startswith('.'):
-					continue
-				
-				try:
-					content = zip_ref.read(file_info).decode('utf-8', errors='ignore')
-					files_data.append({
-						"filename": file_info,
-						"content": content
-					})
-				except Exception:
-					# Skip binary files
-					continue
-	finally:
-		# Clean up temp file
-		try:
-			os.unlink(tmp_path)
-		except Exception:
-			pass
-	
-	return files_data
+def extract_files_from_zip(zip_content: bytes) -> List[Dict[str, Any]]:
+	"""
+	Extract text files from an in-memory zip archive.
 
+	Prefer zip_ingest.ingest_zip() with a file object; this wrapper is kept for
+	callers that already hold the bytes.
+	"""
+	return zip_ingest.to_files_data(zip_ingest.ingest_zip(io.BytesIO(zip_content)))
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import re
+from itertools import compress
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
+from .. import tracing
+
+# Complexity hints, matched against each stripped, lower-cased line. A line
+# counts once per token it contains, however often the token repeats.
+COMPLEX_TOKENS = (" if ", " for ", " while ", " try", " except", " catch", " case ", "switch", "&&", "||")
+
+# One pattern per token: a match runs from the token's first occurrence to
+# the end of its line, so the number of matches is the number of lines that
+# contain the token. The empty group makes findall return "" per match
+# instead of copying the rest of the line.
+_STR_PATTERNS = [(t, re.compile(re.escape(t) + "[^\n]*()")) for t in COMPLEX_TOKENS]
+_BYTES_PATTERNS = [(t.encode(), re.compile(re.escape(t.encode()) + b"[^\n]*()")) for t in COMPLEX_TOKENS]
+
+# ASCII control characters that str.splitlines()/str.strip() treat as line
+# breaks or whitespace but the bytes versions do not.
+_STR_ONLY_SEPARATORS = (b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\x1f")
+
+Source = Union[bytes, str]
+
+
+def _bytes_fast_path(data: bytes) -> bool:
+	return data.isascii() and not any(sep in data for sep in _STR_ONLY_SEPARATORS)
+
+
+def estimate_code_quality(source: Source) -> float:
+	"""
+	Very lightweight static "code quality" heuristic.
+
+	- Uses line count and rough complexity indicators (indentation and symbols)
+	  to produce a 0–100 score.
+	- Shorter, well-structured code with reasonable indentation scores higher.
+
+	There are no per-line Python loops: lines are stripped with map/compress
+	and each complexity token is counted with one compiled regex scan over the
+	joined, stripped text. Plain ASCII bytes are scored without decoding;
+	anything else is decoded once as UTF-8, ignoring errors.
+	"""
+	if isinstance(source, bytes):
+		if _bytes_fast_path(source):
+			text: Source = source
+		else:
+			text = source.decode("utf-8", errors="ignore")
+	else:
+		text = source
+	if not text:
+		return 50.0
+
+	if isinstance(text, bytes):
+		lstrip, rstrip, newline, patterns = bytes.lstrip, bytes.rstrip, b"\n", _BYTES_PATTERNS
+	else:
+		lstrip, rstrip, newline, patterns = str.lstrip, str.rstrip, "\n", _STR_PATTERNS
+
+	lines = text.splitlines()
+	left_stripped = list(map(lstrip, lines))
+	kept = list(compress(lines, left_stripped))
+	bodies = list(filter(None, left_stripped))
+	line_count = len(bodies)
+
+	total_len = sum(map(len, kept))
+	indent_chars = total_len - sum(map(len, bodies))
+	avg_len = total_len / max(1, line_count)
+	avg_indent = indent_chars / max(1, line_count)
+
+	# splitlines() never leaves a "\n" inside a line, so joining on it keeps
+	# every line separate for the scans below.
+	joined = newline.join(map(rstrip, bodies)).lower()
+	complexity_hits = sum(len(pattern.findall(joined)) for token, pattern in patterns if token in joined)
+
+	# Start from 100 and subtract penalties
+	score = 100.0
+
+	# Penalize extremely long files (rough proxy for complexity)
+	score -= min(40.0, max(0.0, (line_count - 80) * 0.3))
+
+	# Penalize excessive complexity tokens
+	score -= min(30.0, complexity_hits * 1.5)
+
+	# Penalize extremely long average line length (low readability)
+	if avg_len > 100:
+		score -= min(20.0, (avg_len - 100) * 0.2)
+
+	# Small bonus for some indentation (suggests structure)
+	if 1.0 <= avg_indent <= 8.0:
+		score += 5.0
+
+	return float(max(0.0, min(100.0, score)))
+
+
+def estimate_code_quality_batch(sources: Iterable[Source]) -> List[float]:
+	"""Score many files' contents in one call."""
+	return [estimate_code_quality(source) for source in sources]
+
+
+def score_files(paths: Iterable[Union[str, Path]]) -> List[Optional[float]]:
+	"""Read each file as bytes and score it; unreadable files score None."""
+	scores: List[Optional[float]] = []
+	with tracing.span("code.score_files") as span:
+		for path in paths:
+			try:
+				data = Path(path).read_bytes()
+			except OSError:
+				scores.append(None)
+				continue
+			scores.append(estimate_code_quality(data))
+		span.set(files=len(scores))
+	return scores
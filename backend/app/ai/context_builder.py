@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 6000
+DEFAULT_RESPONSE_RESERVE = 1000
+
+# Share of the budget left after the base prompt and the current message that
+# each section may claim, in priority order. Unused budget flows down.
+HISTORY_SHARE = 0.5
+SUMMARY_SHARE = 0.1
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+try:  # tiktoken is optional; fall back to a ~4 chars/token estimate.
+	import tiktoken
+
+	_encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # pragma: no cover - depends on the environment
+	_encoding = None
+
+
+def count_tokens(text: Optional[str]) -> int:
+	"""Token count for `text`, exact with tiktoken and estimated otherwise."""
+	if not text:
+		return 0
+	if _encoding is not None:
+		return len(_encoding.encode(text, disallowed_special=()))
+	return (len(text) + 3) // 4
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+	# Chat formats add a few tokens of framing per message.
+	return count_tokens(message.get("content")) + 4
+
+
+def token_budget() -> int:
+	return int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET)))
+
+
+def response_reserve() -> int:
+	return int(os.getenv("AI_CONTEXT_RESPONSE_RESERVE", str(DEFAULT_RESPONSE_RESERVE)))
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+	if not samples:
+		return 0.0
+	ordered = sorted(samples)
+	index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+	return float(ordered[index])
+
+
+class ContextStatsStore:
+	"""Bounded samples of assembled prompt sizes and assistant latency."""
+
+	def __init__(self, max_samples: int = 1000) -> None:
+		self._lock = Lock()
+		self._prompt_tokens: Deque[int] = deque(maxlen=max_samples)
+		self._latency_ms: Deque[float] = deque(maxlen=max_samples)
+		self._turns = 0
+		self._trimmed_turns = 0
+		self._summary_reuses = 0
+
+	def record_prompt(self, prompt_tokens: int, trimmed: bool, summary_reused: bool) -> None:
+		with self._lock:
+			self._turns += 1
+			self._prompt_tokens.append(prompt_tokens)
+			if trimmed:
+				self._trimmed_turns += 1
+			if summary_reused:
+				self._summary_reuses += 1
+
+	def record_latency(self, latency_ms: float) -> None:
+		with self._lock:
+			self._latency_ms.append(latency_ms)
+
+	def snapshot(self) -> Dict[str, Any]:
+		with self._lock:
+			tokens = list(self._prompt_tokens)
+			latency = list(self._latency_ms)
+			turns, trimmed, reuses = self._turns, self._trimmed_turns, self._summary_reuses
+		return {
+			"turns": turns,
+			"trimmed_turns": trimmed,
+			"summary_reuses": reuses,
+			"prompt_tokens_p50": _percentile(tokens, 50),
+			"prompt_tokens_p95": _percentile(tokens, 95),
+			"prompt_tokens_max": max(tokens) if tokens else 0,
+			"latency_ms_p50": round(_percentile(latency, 50), 2),
+			"latency_ms_p95": round(_percentile(latency, 95), 2),
+			"latency_ms_max": round(max(latency), 2) if latency else 0.0,
+		}
+
+	def reset(self) -> None:
+		with self._lock:
+			self._prompt_tokens.clear()
+			self._latency_ms.clear()
+			self._turns = self._trimmed_turns = self._summary_reuses = 0
+
+
+context_stats = ContextStatsStore()
+
+
+def _message_id(message: Dict[str, Any]) -> str:
+	if message.get("id"):
+		return str(message["id"])
+	raw = f"{message.get('role')}:{message.get('content')}"
+	return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def summarize_message(message: Dict[str, Any], max_chars: int = 160) -> str:
+	"""Extractive one-line summary: the first sentence of the message, clipped."""
+	text = _WHITESPACE_RE.sub(" ", message.get("content") or "").strip()
+	first = _SENTENCE_END_RE.split(text, maxsplit=1)[0]
+	if len(first) > max_chars:
+		first = first[: max_chars - 3].rstrip() + "..."
+	return f"{message.get('role') or 'user'}: {first}"
+
+
+@dataclass
+class _SummaryEntry:
+	ids: List[str]  # message id of each line
+	lines: List[str]
+
+
+class HistorySummaryCache:
+	"""
+	Per-conversation extractive summaries of history that no longer fits.
+
+	Each turn only the messages that scrolled out of the window since the
+	previous turn are summarized; earlier lines are reused from the cache.
+	"""
+
+	def __init__(self, max_conversations: int = 256, max_lines: int = 100) -> None:
+		self.max_conversations = max_conversations
+		self.max_lines = max_lines
+		self._lock = Lock()
+		self._entries: "OrderedDict[str, _SummaryEntry]" = OrderedDict()
+
+	def summarize(
+		self, key: Optional[str], older: List[Dict[str, Any]], window_only: bool = False
+	) -> Tuple[List[str], bool]:
+		"""
+		Return (summary lines, reused) for `older` messages, oldest first.
+
+		Cached lines of messages before `older` are included unless
+		`window_only` is set (a persisted summary already covers them).
+		"""
+		if not older:
+			return [], False
+		ids = [_message_id(m) for m in older]
+		reused = False
+		line_ids: List[str] = []
+		lines: List[str] = []
+		start = 0
+		if key:
+			with self._lock:
+				entry = self._entries.get(key)
+				if entry is not None:
+					self._entries.move_to_end(key)
+			if entry is not None and entry.ids and entry.ids[-1] in ids:
+				start = ids.index(entry.ids[-1]) + 1
+				line_ids, lines = list(entry.ids), list(entry.lines)
+				reused = True
+		line_ids.extend(ids[start:])
+		lines.extend(summarize_message(m) for m in older[start:])
+		line_ids, lines = line_ids[-self.max_lines:], lines[-self.max_lines:]
+		if key:
+			with self._lock:
+				self._entries[key] = _SummaryEntry(ids=line_ids, lines=lines)
+				self._entries.move_to_end(key)
+				while len(self._entries) > self.max_conversations:
+					self._entries.popitem(last=False)
+		if window_only:
+			window = set(ids)
+			lines = [line for line_id, line in zip(line_ids, lines) if line_id in window]
+		return lines, reused
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+
+summary_cache = HistorySummaryCache()
+
+
+@dataclass
+class ContextWindow:
+	sections: List[str]
+	history: List[Dict[str, str]]
+	prompt_tokens: int
+	dropped_messages: int = 0
+	dropped_tasks: int = 0
+	dropped_files: int = 0
+	summary_reused: bool = False
+	budget: int = 0
+	breakdown: Dict[str, int] = field(default_factory=dict)
+
+	@property
+	def trimmed(self) -> bool:
+		return bool(self.dropped_messages or self.dropped_tasks or self.dropped_files)
+
+
+def _task_line(task: Dict[str, Any]) -> str:
+	parts = [f"- [{task.get('status') or 'todo'}] {task.get('title') or 'Untitled'}"]
+	if task.get("due_date"):
+		parts.append(f"due {str(task['due_date'])[:10]}")
+	if task.get("assignee_id"):
+		parts.append(f"assignee {task['assignee_id']}")
+	return ", ".join(parts)
+
+
+def _task_priority(task: Dict[str, Any]) -> Tuple[int, str]:
+	# Tasks with a due date come first, earliest first.
+	due = task.get("due_date")
+	return (0, str(due)) if due else (1, "")
+
+
+def _take_lines(lines: List[str], budget: int) -> Tuple[List[str], int]:
+	taken: List[str] = []
+	used = 0
+	for line in lines:
+		cost = count_tokens(line) + 1
+		if used + cost > budget:
+			break
+		taken.append(line)
+		used += cost
+	return taken, used
+
+
+def build_context(
+	message: str,
+	history: List[Dict[str, Any]],
+	tasks: Optional[List[Dict[str, Any]]] = None,
+	files: Optional[List[Dict[str, Any]]] = None,
+	*,
+	base_tokens: int = 0,
+	summary_key: Optional[str] = None,
+	summary: Optional[str] = None,
+	budget: Optional[int] = None,
+) -> ContextWindow:
+	"""
+	Fit history, tasks and files into the token budget.
+
+	The base system prompt and the current message are always sent. What is
+	left is filled in priority order: the most recent history turns, a summary
+	of the turns that did not fit, open tasks (earliest due first), then files.
+	`summary` is an already-persisted summary of turns older than `history`.
+	"""
+	budget = budget if budget is not None else token_budget() - response_reserve()
+	tasks = tasks or []
+	files = files or []
+
+	# The caller may already have appended the current message to the history.
+	history = [m for m in history if (m.get("content") or "").strip()]
+	if history and history[-1].get("role") == "user" and (history[-1].get("content") or "").strip() == message.strip():
+		history = history[:-1]
+
+	fixed = base_tokens + message_tokens({"content": message})
+	remaining = max(0, budget - fixed)
+	breakdown: Dict[str, int] = {"base": base_tokens, "message": fixed - base_tokens}
+
+	# 1. Most recent history, newest first, up to HISTORY_SHARE of what is left.
+	history_budget = int(remaining * HISTORY_SHARE)
+	kept: List[Dict[str, Any]] = []
+	used = 0
+	for item in reversed(history):
+		cost = message_tokens(item)
+		if used + cost > history_budget:
+			break
+		kept.append(item)
+		used += cost
+	kept.reverse()
+	older = history[: len(history) - len(kept)]
+	remaining -= used
+	breakdown["history"] = used
+
+	# 2. Summary of the turns that scrolled out, newest lines preferred.
+	sections: List[str] = []
+	summary_lines, reused = summary_cache.summarize(summary_key, older, window_only=bool(summary))
+	if summary:
+		summary_lines = summary.splitlines() + summary_lines
+	if summary_lines:
+		summary_budget = int(max(0, budget - fixed) * SUMMARY_SHARE)
+		taken, cost = _take_lines(list(reversed(summary_lines)), summary_budget)
+		if taken:
+			header = "Summary of earlier conversation:"
+			sections.append("\n".join([header] + list(reversed(taken))))
+			cost += count_tokens(header) + 1
+			remaining -= cost
+			breakdown["summary"] = cost
+
+	# 3. Open tasks.
+	open_tasks = sorted((t for t in tasks if t.get("status") != "done"), key=_task_priority)
+	task_lines, cost = _take_lines([_task_line(t) for t in open_tasks], max(0, remaining))
+	if task_lines:
+		sections.append("Open tasks:\n" + "\n".join(task_lines))
+		remaining -= cost
+	breakdown["tasks"] = cost
+
+	# 4. Files.
+	file_lines, cost = _take_lines(
+		[f"- {f.get('filename') or '?'} ({f.get('file_type') or 'file'})" for f in files], max(0, remaining)
+	)
+	if file_lines:
+		sections.append("Project files:\n" + "\n".join(file_lines))
+		remaining -= cost
+	breakdown["files"] = cost
+
+	window = ContextWindow(
+		sections=sections,
+		history=[{"role": m.get("role") or "user", "content": m.get("content") or ""} for m in kept],
+		prompt_tokens=sum(breakdown.values()),
+		dropped_messages=len(older),
+		dropped_tasks=len(open_tasks) - len(task_lines),
+		dropped_files=len(files) - len(file_lines),
+		summary_reused=reused,
+		budget=budget,
+		breakdown=breakdown,
+	)
+	context_stats.record_prompt(window.prompt_tokens, window.trimmed, reused)
+	if window.trimmed:
+		logger.debug(
+			f"AI context trimmed to {window.prompt_tokens}/{budget} tokens: "
+			f"{window.dropped_messages} messages, {window.dropped_tasks} tasks, {window.dropped_files} files dropped"
+		)
+	return window
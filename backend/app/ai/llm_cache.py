@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_default_cache_path = os.path.join(tempfile.gettempdir(), "workexperio", "llm_cache.sqlite3")
+
+
+def _env_flag(name: str, default: str) -> bool:
+	return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def normalize_prompt(text: Optional[str]) -> str:
+	"""Collapse whitespace so cosmetic prompt differences share a cache entry."""
+	return _WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+def cache_key(
+	model: str,
+	system_prompt: str,
+	user_prompt: str,
+	temperature: float,
+	response_format: Optional[Dict[str, Any]] = None,
+) -> str:
+	payload = json.dumps(
+		[
+			model,
+			normalize_prompt(system_prompt),
+			normalize_prompt(user_prompt),
+			round(float(temperature), 2),
+			response_format,
+		],
+		ensure_ascii=False,
+		sort_keys=True,
+	)
+	return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def namespace_key(
+	model: str, system_prompt: str, temperature: float, response_format: Optional[Dict[str, Any]] = None
+) -> str:
+	"""Semantic lookups only compare prompts that share model, system prompt, temperature and format."""
+	return cache_key(model, system_prompt, "", temperature, response_format)
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+	dot = sum(x * y for x, y in zip(a, b))
+	norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+	return dot / norm if norm else 0.0
+
+
+@dataclass
+class CacheEntry:
+	text: str
+	expires_at: float
+	latency_ms: float
+
+
+class LLMResponseCache:
+	"""
+	Two-tier response cache for LLM completions.
+
+	- Memory tier: LRU OrderedDict bounded by max_entries, with per-entry TTL.
+	- Disk tier: a small SQLite file that survives restarts, bounded by
+	  max_disk_entries (least recently used rows are evicted).
+	- Optional semantic tier: when an embedding function is supplied, prompts
+	  whose embedding is within `similarity` of a cached prompt are served from
+	  that prompt's entry.
+	"""
+
+	def __init__(
+		self,
+		ttl_seconds: float = 3600.0,
+		max_entries: int = 512,
+		disk_path: Optional[str] = None,
+		max_disk_entries: int = 5000,
+		embed: Optional[Callable[[str], List[float]]] = None,
+		similarity: float = 0.95,
+		max_vectors: int = 256,
+	) -> None:
+		self.ttl_seconds = ttl_seconds
+		self.max_entries = max_entries
+		self.max_disk_entries = max_disk_entries
+		self.embed = embed
+		self.similarity = similarity
+		self.max_vectors = max_vectors
+		self._lock = Lock()
+		self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+		self._vectors: Dict[str, "OrderedDict[str, List[float]]"] = {}
+		self._stats: Dict[str, float] = {
+			"lookups": 0,
+			"hits": 0,
+			"semantic_hits": 0,
+			"misses": 0,
+			"stores": 0,
+			"evictions": 0,
+			"latency_saved_ms": 0.0,
+		}
+		self._conn: Optional[sqlite3.Connection] = None
+		if disk_path:
+			try:
+				os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+				self._conn = sqlite3.connect(disk_path, check_same_thread=False)
+				self._conn.execute(
+					"CREATE TABLE IF NOT EXISTS llm_cache ("
+					"key TEXT PRIMARY KEY, text TEXT NOT NULL, expires_at REAL NOT NULL, "
+					"latency_ms REAL NOT NULL, last_access REAL NOT NULL)"
+				)
+				self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+				self._conn.commit()
+			except sqlite3.Error as e:
+				logger.warning(f"LLM cache disk tier disabled: {e}")
+				self._conn = None
+
+	# --- internal helpers (caller holds the lock) ---
+
+	def _memory_get(self, key: str, now: float) -> Optional[CacheEntry]:
+		entry = self._memory.get(key)
+		if entry is None:
+			return None
+		if entry.expires_at < now:
+			del self._memory[key]
+			return None
+		self._memory.move_to_end(key)
+		return entry
+
+	def _memory_put(self, key: str, entry: CacheEntry) -> None:
+		self._memory[key] = entry
+		self._memory.move_to_end(key)
+		while len(self._memory) > self.max_entries:
+			self._memory.popitem(last=False)
+			self._stats["evictions"] += 1
+
+	def _disk_get(self, key: str, now: float) -> Optional[CacheEntry]:
+		if self._conn is None:
+			return None
+		try:
+			row = self._conn.execute(
+				"SELECT text, expires_at, latency_ms FROM llm_cache WHERE key = ?", (key,)
+			).fetchone()
+			if row is None:
+				return None
+			if row[1] < now:
+				self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+				self._conn.commit()
+				return None
+			self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+			self._conn.commit()
+			return CacheEntry(text=row[0], expires_at=row[1], latency_ms=row[2])
+		except sqlite3.Error as e:
+			logger.warning(f"LLM cache disk read failed: {e}")
+			return None
+
+	def _disk_put(self, key: str, entry: CacheEntry, now: float) -> None:
+		if self._conn is None:
+			return
+		try:
+			self._conn.execute(
+				"INSERT OR REPLACE INTO llm_cache (key, text, expires_at, latency_ms, last_access) VALUES (?, ?, ?, ?, ?)",
+				(key, entry.text, entry.expires_at, entry.latency_ms, now),
+			)
+			count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+			if count > self.max_disk_entries:
+				overflow = count - self.max_disk_entries
+				self._conn.execute(
+					"DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+					(overflow,),
+				)
+				self._stats["evictions"] += overflow
+			self._conn.commit()
+		except sqlite3.Error as e:
+			logger.warning(f"LLM cache disk write failed: {e}")
+
+	def _lookup(self, key: str, now: float) -> Optional[CacheEntry]:
+		entry = self._memory_get(key, now)
+		if entry is None:
+			entry = self._disk_get(key, now)
+			if entry is not None:
+				self._memory_put(key, entry)
+		return entry
+
+	def _embed(self, text: str) -> Optional[List[float]]:
+		if self.embed is None:
+			return None
+		try:
+			return self.embed(text)
+		except Exception as e:
+			logger.warning(f"LLM cache embedding failed: {e}")
+			return None
+
+	# --- public API ---
+
+	def get(
+		self,
+		model: str,
+		system_prompt: str,
+		user_prompt: str,
+		temperature: float,
+		response_format: Optional[Dict[str, Any]] = None,
+	) -> Optional[str]:
+		key = cache_key(model, system_prompt, user_prompt, temperature, response_format)
+		now = time.time()
+		with self._lock:
+			self._stats["lookups"] += 1
+			entry = self._lookup(key, now)
+			if entry is not None:
+				self._stats["hits"] += 1
+				self._stats["latency_saved_ms"] += entry.latency_ms
+				return entry.text
+			vectors = self._vectors.get(namespace_key(model, system_prompt, temperature, response_format))
+			if not vectors:
+				self._stats["misses"] += 1
+				return None
+
+		# Embedding happens outside the lock; it is a network call.
+		vector = self._embed(normalize_prompt(user_prompt))
+		with self._lock:
+			if vector is not None:
+				best_key, best_score = None, 0.0
+				for candidate_key, candidate in list(vectors.items()):
+					score = _cosine(vector, candidate)
+					if score > best_score:
+						best_key, best_score = candidate_key, score
+				if best_key is not None and best_score >= self.similarity:
+					entry = self._lookup(best_key, now)
+					if entry is not None:
+						self._stats["semantic_hits"] += 1
+						self._stats["latency_saved_ms"] += entry.latency_ms
+						return entry.text
+					vectors.pop(best_key, None)
+			self._stats["misses"] += 1
+			return None
+
+	def set(
+		self,
+		model: str,
+		system_prompt: str,
+		user_prompt: str,
+		temperature: float,
+		text: str,
+		latency_ms: float = 0.0,
+		response_format: Optional[Dict[str, Any]] = None,
+	) -> None:
+		key = cache_key(model, system_prompt, user_prompt, temperature, response_format)
+		now = time.time()
+		entry = CacheEntry(text=text, expires_at=now + self.ttl_seconds, latency_ms=latency_ms)
+		vector = self._embed(normalize_prompt(user_prompt))
+		with self._lock:
+			self._stats["stores"] += 1
+			self._memory_put(key, entry)
+			self._disk_put(key, entry, now)
+			if vector is not None:
+				vectors = self._vectors.setdefault(
+					namespace_key(model, system_prompt, temperature, response_format), OrderedDict()
+				)
+				vectors[key] = vector
+				while len(vectors) > self.max_vectors:
+					vectors.popitem(last=False)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._memory.clear()
+			self._vectors.clear()
+			if self._conn is not None:
+				try:
+					self._conn.execute("DELETE FROM llm_cache")
+					self._conn.commit()
+				except sqlite3.Error:
+					pass
+
+	def snapshot(self) -> Dict[str, Any]:
+		with self._lock:
+			stats = dict(self._stats)
+			stats["memory_entries"] = len(self._memory)
+		lookups = stats["lookups"]
+		hits = stats["hits"] + stats["semantic_hits"]
+		stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+		stats["latency_saved_ms"] = round(stats["latency_saved_ms"], 2)
+		for name in ("lookups", "hits", "semantic_hits", "misses", "stores", "evictions"):
+			stats[name] = int(stats[name])
+		return stats
+
+
+def _gateway_embed(text: str) -> List[float]:
+	# Imported lazily: llm_gateway imports this module.
+	from .llm_gateway import embed
+	return embed(text, purpose="cache_similarity")
+
+
+def _build_default_cache() -> Optional[LLMResponseCache]:
+	if not _env_flag("LLM_CACHE_ENABLED", "true"):
+		return None
+	disk_path: Optional[str] = os.getenv("LLM_CACHE_PATH", _default_cache_path)
+	if not _env_flag("LLM_CACHE_DISK", "false"):
+		disk_path = None
+	embed = _gateway_embed if _env_flag("LLM_CACHE_SEMANTIC", "false") else None
+	return LLMResponseCache(
+		ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+		max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512")),
+		disk_path=disk_path,
+		max_disk_entries=int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "5000")),
+		embed=embed,
+		similarity=float(os.getenv("LLM_CACHE_SIMILARITY", "0.95")),
+	)
+
+
+response_cache: Optional[LLMResponseCache] = _build_default_cache()
+
+
+def split_prompts(messages: List[Dict[str, str]]) -> Optional[Tuple[str, str]]:
+	"""Return (system, user) for a plain two-message prompt; other shapes are not cached."""
+	if len(messages) != 2:
+		return None
+	system, user = messages
+	if system.get("role") != "system" or user.get("role") != "user":
+		return None
+	return system.get("content") or "", user.get("content") or ""
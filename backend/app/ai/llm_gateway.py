@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+
+from . import llm_cache
+from .. import tracing
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def get_api_key() -> Optional[str]:
+	"""Return the configured OpenAI API key, if any."""
+	return os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY_WORKEXPERIO")
+
+
+def is_configured() -> bool:
+	return bool(get_api_key())
+
+
+def get_model(purpose: Optional[str] = None) -> str:
+	"""
+	Resolve the model for a call site.
+
+	A purpose-specific override such as OPENAI_MODEL_CODE_ANALYSIS wins over the
+	global OPENAI_MODEL, which in turn falls back to DEFAULT_MODEL.
+	"""
+	if purpose:
+		override = os.getenv(f"OPENAI_MODEL_{purpose.upper()}")
+		if override:
+			return override
+	return os.getenv("OPENAI_MODEL", DEFAULT_MODEL)
+
+
+def _timeout_seconds() -> float:
+	return float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+
+
+def _max_retries() -> int:
+	return int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+
+@dataclass
+class LLMResponse:
+	text: str
+	model: str
+	prompt_tokens: int
+	completion_tokens: int
+	latency_ms: float
+	cached: bool = False
+
+
+@dataclass
+class LLMCallStats:
+	calls: int = 0
+	errors: int = 0
+	total_latency_ms: float = 0.0
+	max_latency_ms: float = 0.0
+	prompt_tokens: int = 0
+	completion_tokens: int = 0
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"calls": self.calls,
+			"errors": self.errors,
+			"average_latency_ms": round(self.total_latency_ms / self.calls, 2) if self.calls else 0.0,
+			"max_latency_ms": round(self.max_latency_ms, 2),
+			"prompt_tokens": self.prompt_tokens,
+			"completion_tokens": self.completion_tokens,
+		}
+
+
+class LLMStatsStore:
+	"""Per-purpose call counters, guarded by a lock."""
+
+	def __init__(self) -> None:
+		self._lock = Lock()
+		self._by_purpose: Dict[str, LLMCallStats] = {}
+
+	def record(
+		self,
+		purpose: str,
+		latency_ms: float,
+		prompt_tokens: int = 0,
+		completion_tokens: int = 0,
+		error: bool = False,
+	) -> None:
+		with self._lock:
+			stats = self._by_purpose.setdefault(purpose, LLMCallStats())
+			stats.calls += 1
+			stats.total_latency_ms += latency_ms
+			stats.max_latency_ms = max(stats.max_latency_ms, latency_ms)
+			stats.prompt_tokens += prompt_tokens
+			stats.completion_tokens += completion_tokens
+			if error:
+				stats.errors += 1
+
+	def snapshot(self) -> Dict[str, Dict[str, Any]]:
+		with self._lock:
+			return {purpose: stats.as_dict() for purpose, stats in sorted(self._by_purpose.items())}
+
+	def reset(self) -> None:
+		with self._lock:
+			self._by_purpose.clear()
+
+
+llm_stats = LLMStatsStore()
+
+_clients_lock = Lock()
+_sync_clients: Dict[str, OpenAI] = {}
+_async_clients: Dict[str, AsyncOpenAI] = {}
+
+
+def get_client() -> OpenAI:
+	"""
+	Return the shared sync client for the current API key.
+
+	The client keeps its own HTTP connection pool, so reusing it across calls
+	avoids a fresh TCP/TLS handshake per request.
+	"""
+	api_key = get_api_key()
+	if not api_key:
+		raise RuntimeError("OPENAI_API_KEY is not configured")
+	client = _sync_clients.get(api_key)
+	if client is None:
+		with _clients_lock:
+			client = _sync_clients.get(api_key)
+			if client is None:
+				client = OpenAI(api_key=api_key, timeout=_timeout_seconds(), max_retries=_max_retries())
+				_sync_clients[api_key] = client
+	return client
+
+
+def get_async_client() -> AsyncOpenAI:
+	"""Async counterpart of get_client(), for use from async endpoints."""
+	api_key = get_api_key()
+	if not api_key:
+		raise RuntimeError("OPENAI_API_KEY is not configured")
+	client = _async_clients.get(api_key)
+	if client is None:
+		with _clients_lock:
+			client = _async_clients.get(api_key)
+			if client is None:
+				client = AsyncOpenAI(api_key=api_key, timeout=_timeout_seconds(), max_retries=_max_retries())
+				_async_clients[api_key] = client
+	return client
+
+
+def close_clients() -> None:
+	"""Close pooled clients (called on application shutdown)."""
+	with _clients_lock:
+		for client in _sync_clients.values():
+			try:
+				client.close()
+			except Exception:
+				pass
+		_sync_clients.clear()
+		# Async clients are closed by their event loop; just drop references.
+		_async_clients.clear()
+
+
+def _build_request(
+	messages: List[Dict[str, str]],
+	model: str,
+	temperature: float,
+	response_format: Optional[Dict[str, Any]],
+	extra: Dict[str, Any],
+) -> Dict[str, Any]:
+	request: Dict[str, Any] = {"model": model, "messages": messages, "temperature": temperature}
+	if response_format is not None:
+		request["response_format"] = response_format
+	request.update(extra)
+	return request
+
+
+def _to_response(completion: Any, model: str, latency_ms: float) -> LLMResponse:
+	usage = getattr(completion, "usage", None)
+	return LLMResponse(
+		text=completion.choices[0].message.content or "",
+		model=model,
+		prompt_tokens=int(getattr(usage, "prompt_tokens", 0) or 0),
+		completion_tokens=int(getattr(usage, "completion_tokens", 0) or 0),
+		latency_ms=latency_ms,
+	)
+
+
+def _cache_lookup(
+	cache: bool,
+	messages: List[Dict[str, str]],
+	model: str,
+	temperature: float,
+	response_format: Optional[Dict[str, Any]],
+) -> Tuple[Optional[Tuple[str, str]], Optional[LLMResponse]]:
+	prompts = llm_cache.split_prompts(messages) if cache and llm_cache.response_cache else None
+	if prompts is None:
+		return None, None
+	text = llm_cache.response_cache.get(model, prompts[0], prompts[1], temperature, response_format)
+	if text is None:
+		return prompts, None
+	return prompts, LLMResponse(text=text, model=model, prompt_tokens=0, completion_tokens=0, latency_ms=0.0, cached=True)
+
+
+def _cache_store(
+	prompts: Optional[Tuple[str, str]],
+	temperature: float,
+	response_format: Optional[Dict[str, Any]],
+	result: LLMResponse,
+) -> None:
+	if prompts is not None and llm_cache.response_cache and result.text:
+		llm_cache.response_cache.set(
+			result.model, prompts[0], prompts[1], temperature, result.text, result.latency_ms, response_format
+		)
+
+
+def chat_completion(
+	messages: List[Dict[str, str]],
+	*,
+	purpose: str,
+	temperature: float = 0.2,
+	model: Optional[str] = None,
+	response_format: Optional[Dict[str, Any]] = None,
+	cache: bool = False,
+	**extra: Any,
+) -> LLMResponse:
+	"""
+	Run a chat completion through the shared client.
+
+	With cache=True, plain system+user prompts are served from the response
+	cache when an identical (or, if enabled, near-identical) prompt was
+	answered before. Errors are recorded and re-raised so callers keep their
+	own fallback logic.
+	"""
+	model = model or get_model(purpose)
+	with tracing.span("llm.chat", purpose=purpose, model=model) as span:
+		prompts, cached = _cache_lookup(cache, messages, model, temperature, response_format)
+		if cached is not None:
+			span.set(cached=True)
+			return cached
+		request = _build_request(messages, model, temperature, response_format, extra)
+		start = time.perf_counter()
+		try:
+			completion = get_client().chat.completions.create(**request)
+		except Exception:
+			llm_stats.record(purpose, (time.perf_counter() - start) * 1000, error=True)
+			raise
+		result = _to_response(completion, model, (time.perf_counter() - start) * 1000)
+		llm_stats.record(purpose, result.latency_ms, result.prompt_tokens, result.completion_tokens)
+		span.set(cached=False, prompt_tokens=result.prompt_tokens, completion_tokens=result.completion_tokens)
+		_cache_store(prompts, temperature, response_format, result)
+		return result
+
+
+async def achat_completion(
+	messages: List[Dict[str, str]],
+	*,
+	purpose: str,
+	temperature: float = 0.2,
+	model: Optional[str] = None,
+	response_format: Optional[Dict[str, Any]] = None,
+	cache: bool = False,
+	**extra: Any,
+) -> LLMResponse:
+	"""Async variant of chat_completion() using the pooled AsyncOpenAI client."""
+	model = model or get_model(purpose)
+	with tracing.span("llm.chat", purpose=purpose, model=model) as span:
+		prompts, cached = _cache_lookup(cache, messages, model, temperature, response_format)
+		if cached is not None:
+			span.set(cached=True)
+			return cached
+		request = _build_request(messages, model, temperature, response_format, extra)
+		start = time.perf_counter()
+		try:
+			completion = await get_async_client().chat.completions.create(**request)
+		except Exception:
+			llm_stats.record(purpose, (time.perf_counter() - start) * 1000, error=True)
+			raise
+		result = _to_response(completion, model, (time.perf_counter() - start) * 1000)
+		llm_stats.record(purpose, result.latency_ms, result.prompt_tokens, result.completion_tokens)
+		span.set(cached=False, prompt_tokens=result.prompt_tokens, completion_tokens=result.completion_tokens)
+		_cache_store(prompts, temperature, response_format, result)
+		return result
+
+
+def embed(text: str, *, purpose: str = "embedding", model: Optional[str] = None) -> List[float]:
+	"""Return an embedding vector for `text` using the shared client."""
+	model = model or os.getenv("OPENAI_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+	start = time.perf_counter()
+	try:
+		with tracing.span("llm.embed", purpose=purpose, model=model):
+			response = get_client().embeddings.create(model=model, input=text)
+	except Exception:
+		llm_stats.record(purpose, (time.perf_counter() - start) * 1000, error=True)
+		raise
+	usage = getattr(response, "usage", None)
+	llm_stats.record(
+		purpose,
+		(time.perf_counter() - start) * 1000,
+		prompt_tokens=int(getattr(usage, "prompt_tokens", 0) or 0),
+	)
+	return list(response.data[0].embedding)
+
+
+def map_concurrent(
+	func: Callable[[T], R],
+	items: Sequence[T],
+	max_concurrency: Optional[int] = None,
+) -> List[Tuple[Optional[R], Optional[Exception]]]:
+	"""
+	Run `func` over `items` in parallel, at most `max_concurrency` at a time.
+
+	Returns (result, error) pairs in input order so callers can fall back per
+	item; one failing call does not affect the others. Wall time is close to
+	the slowest single call as long as len(items) <= max_concurrency.
+	"""
+	if not items:
+		return []
+	limit = max_concurrency or int(os.getenv("LLM_FANOUT_CONCURRENCY", "6"))
+
+	def run(item: T) -> Tuple[Optional[R], Optional[Exception]]:
+		try:
+			return func(item), None
+		except Exception as e:
+			return None, e
+
+	if len(items) == 1 or limit <= 1:
+		return [run(item) for item in items]
+	with ThreadPoolExecutor(max_workers=min(limit, len(items)), thread_name_prefix="llm-fanout") as pool:
+		# Each call runs in the caller's context, so its spans join the request's trace.
+		return list(pool.map(tracing.propagate(run), items))
@@ -5,6 +5,8 @@ from typing import Dict, Any, List
 import pdfplumber
 import re
 
+from .. import tracing
+
 
 def format_text(text: str) -> str:
 	"""
@@ -48,18 +50,22 @@ def split_skills(skill_text: str) -> List[str]:
 	return skills
 
 
+@tracing.traced("resume.parse")
 def parse_pdf_resume(file_bytes: bytes, filename: str) -> Dict[str, Any]:
 	"""
 	Simple resume parsing placeholder.
 	Extracts raw text and uses naive keyword spotting to build a structured payload.
 	"""
 	text_content = ""
-	try:
-		with pdfplumber.open(BytesIO(file_bytes)) as pdf:
-			pages = [page.extract_text() or "" for page in pdf.pages]
-			text_content = "\n".join(pages)
-	except Exception:
-		text_content = file_bytes.decode("utf-8", errors="ignore")
+	with tracing.span("resume.extract_text", bytes=len(file_bytes)) as span:
+		try:
+			with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+				pages = [page.extract_text() or "" for page in pdf.pages]
+				text_content = "\n".join(pages)
+			span.set(pages=len(pages))
+		except Exception:
+			text_content = file_bytes.decode("utf-8", errors="ignore")
+			span.set(fallback=True)
 
 	lines = [line.strip() for line in text_content.splitlines() if line.strip()]
 	keywords = {
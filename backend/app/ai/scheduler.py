@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import heapq
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+DEFAULT_TASK_HOURS = 2.0
+# Float tolerance when deciding whether a task has zero slack.
+EPSILON = 1e-6
+
+
+def hours_per_day() -> float:
+	return float(os.getenv("SCHEDULE_HOURS_PER_DAY", "4"))
+
+
+class CycleError(ValueError):
+	"""Raised when task dependencies form a cycle."""
+
+	def __init__(self, task_ids: Sequence[str]) -> None:
+		super().__init__(f"Task dependencies form a cycle through {len(task_ids)} tasks")
+		self.task_ids = list(task_ids)
+
+
+@dataclass
+class SchedTask:
+	id: str
+	hours: float = DEFAULT_TASK_HOURS
+	assignee_id: Optional[str] = None
+	# Finished tasks take no time and hold no place in anyone's queue.
+	done: bool = False
+
+	@property
+	def duration(self) -> float:
+		return 0.0 if self.done else max(0.0, float(self.hours or 0.0))
+
+
+@dataclass
+class Slot:
+	start: float
+	finish: float
+	slack: float = 0.0
+	critical: bool = False
+
+	def same_as(self, other: Optional["Slot"]) -> bool:
+		return (
+			other is not None
+			and abs(self.start - other.start) < EPSILON
+			and abs(self.finish - other.finish) < EPSILON
+			and abs(self.slack - other.slack) < EPSILON
+			and self.critical == other.critical
+		)
+
+
+@dataclass
+class Schedule:
+	"""Times are working hours from the plan start."""
+
+	slots: Dict[str, Slot] = field(default_factory=dict)
+	# Per assignee, task ids in the order they will be worked on.
+	sequences: Dict[str, List[str]] = field(default_factory=dict)
+	makespan: float = 0.0
+	critical_path: List[str] = field(default_factory=list)
+
+
+def to_datetime(origin: datetime, hours: float, per_day: Optional[float] = None) -> datetime:
+	"""Calendar time of a working-hour offset, at `per_day` focused hours a day."""
+	return origin + timedelta(days=hours / (per_day or hours_per_day()))
+
+
+def _dependency_graph(
+	tasks: Dict[str, SchedTask], dependencies: Iterable[Tuple[str, str]]
+) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+	"""(preds, succs) from (task_id, depends_on_id) pairs; unknown ids are ignored."""
+	preds: Dict[str, List[str]] = defaultdict(list)
+	succs: Dict[str, List[str]] = defaultdict(list)
+	for task_id, depends_on_id in dependencies:
+		if task_id in tasks and depends_on_id in tasks and task_id != depends_on_id:
+			preds[task_id].append(depends_on_id)
+			succs[depends_on_id].append(task_id)
+	return preds, succs
+
+
+def topological_order(ids: Sequence[str], succs: Dict[str, List[str]]) -> List[str]:
+	"""Kahn's algorithm, stable in the order of `ids`; raises CycleError."""
+	position = {task_id: i for i, task_id in enumerate(ids)}
+	indegree = {task_id: 0 for task_id in ids}
+	for task_id in ids:
+		for succ in succs.get(task_id, ()):
+			indegree[succ] += 1
+	ready = [position[task_id] for task_id in ids if indegree[task_id] == 0]
+	heapq.heapify(ready)
+	order: List[str] = []
+	while ready:
+		task_id = ids[heapq.heappop(ready)]
+		order.append(task_id)
+		for succ in succs.get(task_id, ()):
+			indegree[succ] -= 1
+			if indegree[succ] == 0:
+				heapq.heappush(ready, position[succ])
+	if len(order) != len(ids):
+		raise CycleError([task_id for task_id in ids if indegree[task_id] > 0])
+	return order
+
+
+def find_cycle(ids: Sequence[str], dependencies: Iterable[Tuple[str, str]]) -> Optional[List[str]]:
+	"""Task ids on a dependency cycle, or None if the graph is acyclic."""
+	tasks = {task_id: SchedTask(task_id) for task_id in ids}
+	_, succs = _dependency_graph(tasks, dependencies)
+	try:
+		topological_order(list(ids), succs)
+	except CycleError as e:
+		return e.task_ids
+	return None
+
+
+def _combined_edges(
+	preds: Dict[str, List[str]], sequences: Dict[str, List[str]]
+) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+	"""Dependency edges plus "next in the same member's queue" edges."""
+	all_preds: Dict[str, List[str]] = defaultdict(list)
+	all_succs: Dict[str, List[str]] = defaultdict(list)
+	for task_id, task_preds in preds.items():
+		for pred in task_preds:
+			all_preds[task_id].append(pred)
+			all_succs[pred].append(task_id)
+	for queue in sequences.values():
+		for before, after in zip(queue, queue[1:]):
+			all_preds[after].append(before)
+			all_succs[before].append(after)
+	return all_preds, all_succs
+
+
+def _analyze(schedule: Schedule, ids: Sequence[str], order: List[str], all_preds, all_succs) -> None:
+	"""Slack, critical flags and the critical chain, on the resource-aware graph."""
+	slots = schedule.slots
+	makespan = max((slots[t].finish for t in ids), default=0.0)
+	schedule.makespan = makespan
+	latest_finish: Dict[str, float] = {}
+	for task_id in reversed(order):
+		slot = slots[task_id]
+		successors = all_succs.get(task_id, ())
+		lf = min((latest_finish[s] - (slots[s].finish - slots[s].start) for s in successors), default=makespan)
+		latest_finish[task_id] = lf
+		slot.slack = max(0.0, lf - slot.finish)
+		slot.critical = slot.slack < EPSILON
+
+	# Walk back from the task that ends last along tight critical predecessors.
+	path: List[str] = []
+	position = {task_id: i for i, task_id in enumerate(order)}
+	current = max((t for t in order if slots[t].critical), key=lambda t: (slots[t].finish, -position[t]), default=None)
+	while current is not None:
+		path.append(current)
+		start = slots[current].start
+		current = next(
+			(p for p in all_preds.get(current, ()) if slots[p].critical and abs(slots[p].finish - start) < EPSILON),
+			None,
+		)
+	path.reverse()
+	schedule.critical_path = path
+
+
+def build_schedule(tasks: Sequence[SchedTask], dependencies: Iterable[Tuple[str, str]]) -> Schedule:
+	"""
+	Full plan: dependency-feasible and resource-constrained per member.
+
+	Priorities come from critical-path analysis of the dependency graph alone:
+	among tasks whose predecessors are scheduled, the one with the smallest
+	latest start goes first. Each is placed at the later of its predecessors'
+	finish and its assignee becoming free (serial schedule generation; each
+	member works on one task at a time; unassigned tasks are not
+	resource-bound). Slack and the critical chain are then computed on the
+	resulting graph of dependencies plus queue order.
+	"""
+	by_id = {t.id: t for t in tasks}
+	ids = list(by_id)
+	preds, succs = _dependency_graph(by_id, dependencies)
+	order = topological_order(ids, succs)
+
+	# CPM on dependencies only, for priorities.
+	earliest: Dict[str, float] = {}
+	for task_id in order:
+		earliest[task_id] = max((earliest[p] + by_id[p].duration for p in preds.get(task_id, ())), default=0.0)
+	horizon = max((earliest[t] + by_id[t].duration for t in ids), default=0.0)
+	latest: Dict[str, float] = {}
+	for task_id in reversed(order):
+		lf = min((latest[s] for s in succs.get(task_id, ())), default=horizon)
+		latest[task_id] = lf - by_id[task_id].duration
+
+	position = {task_id: i for i, task_id in enumerate(ids)}
+	remaining = {task_id: len(preds.get(task_id, ())) for task_id in ids}
+	ready = [(latest[t], earliest[t], position[t], t) for t in ids if remaining[t] == 0]
+	heapq.heapify(ready)
+	free_at: Dict[str, float] = defaultdict(float)
+	schedule = Schedule()
+	while ready:
+		_, _, _, task_id = heapq.heappop(ready)
+		task = by_id[task_id]
+		start = max((schedule.slots[p].finish for p in preds.get(task_id, ())), default=0.0)
+		if task.assignee_id and not task.done:
+			start = max(start, free_at[task.assignee_id])
+			free_at[task.assignee_id] = start + task.duration
+			schedule.sequences.setdefault(task.assignee_id, []).append(task_id)
+		schedule.slots[task_id] = Slot(start, start + task.duration)
+		for succ in succs.get(task_id, ()):
+			remaining[succ] -= 1
+			if remaining[succ] == 0:
+				heapq.heappush(ready, (latest[succ], earliest[succ], position[succ], succ))
+
+	all_preds, all_succs = _combined_edges(preds, schedule.sequences)
+	_analyze(schedule, ids, topological_order(ids, all_succs), all_preds, all_succs)
+	return schedule
+
+
+def reschedule(
+	previous: Schedule,
+	tasks: Sequence[SchedTask],
+	dependencies: Iterable[Tuple[str, str]],
+	changed: Iterable[str],
+) -> Tuple[Schedule, Set[str]]:
+	"""
+	Repair `previous` after the tasks in `changed` were edited.
+
+	Every member keeps their queue order; tasks that are new, reassigned or
+	finished are taken out of their old queue and inserted into the new one
+	where their dependencies allow. Only the changed tasks and everything
+	downstream of them (through dependencies or queue order) are re-timed,
+	so the rest of the plan stays put. Falls back to build_schedule() when
+	the edit makes the kept order infeasible.
+
+	Returns the new schedule and the ids whose slot differs from `previous`.
+	"""
+	dependencies = list(dependencies)
+	by_id = {t.id: t for t in tasks}
+	ids = list(by_id)
+	preds, succs = _dependency_graph(by_id, dependencies)
+	changed = {task_id for task_id in changed if task_id in by_id}
+
+	def rebuild() -> Tuple[Schedule, Set[str]]:
+		schedule = build_schedule(tasks, dependencies)
+		return schedule, {t for t in ids if not schedule.slots[t].same_as(previous.slots.get(t))}
+
+	if any(task_id not in previous.slots for task_id in ids if task_id not in changed):
+		return rebuild()
+
+	# Drop tasks that no longer belong in a queue; whoever followed them moves up.
+	seeds = set(changed)
+	sequences: Dict[str, List[str]] = {}
+	queued: Set[str] = set()
+	for assignee, queue in previous.sequences.items():
+		kept: List[str] = []
+		gap = False
+		for task_id in queue:
+			task = by_id.get(task_id)
+			if task is None or task.done or task.assignee_id != assignee:
+				gap = True
+				continue
+			if gap:
+				seeds.add(task_id)
+				gap = False
+			kept.append(task_id)
+		sequences[assignee] = kept
+		queued.update(kept)
+
+	slots = {t: Slot(s.start, s.finish, s.slack, s.critical) for t, s in previous.slots.items() if t in by_id}
+
+	# (Re)insert queued-to-be tasks by the time their dependencies are met.
+	for task_id in ids:
+		task = by_id[task_id]
+		if task.done or not task.assignee_id or task_id in queued:
+			continue
+		ready_at = max((slots[p].finish for p in preds.get(task_id, ()) if p in slots), default=0.0)
+		queue = sequences.setdefault(task.assignee_id, [])
+		index = next((i for i, other in enumerate(queue) if slots[other].start >= ready_at), len(queue))
+		queue.insert(index, task_id)
+		seeds.add(task_id)
+		# A provisional slot, so the next task inserted into this queue can place itself; re-timed below.
+		start = max(ready_at, slots[queue[index - 1]].finish if index else 0.0)
+		slots[task_id] = Slot(start, start + task.duration)
+
+	all_preds, all_succs = _combined_edges(preds, sequences)
+	try:
+		order = topological_order(ids, all_succs)
+	except CycleError:
+		return rebuild()
+
+	# Everything downstream of an edit.
+	affected: Set[str] = set()
+	stack = [t for t in seeds if t in by_id]
+	while stack:
+		task_id = stack.pop()
+		if task_id in affected:
+			continue
+		affected.add(task_id)
+		stack.extend(all_succs.get(task_id, ()))
+
+	for task_id in order:
+		if task_id not in affected:
+			continue
+		start = max((slots[p].finish for p in all_preds.get(task_id, ())), default=0.0)
+		slots[task_id] = Slot(start, start + by_id[task_id].duration)
+
+	schedule = Schedule(slots=slots, sequences={a: q for a, q in sequences.items() if q})
+	_analyze(schedule, ids, order, all_preds, all_succs)
+	return schedule, {t for t in ids if not slots[t].same_as(previous.slots.get(t))}
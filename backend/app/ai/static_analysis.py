@@ -0,0 +1,530 @@
+from __future__ import annotations
+
+import ast
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES: Dict[str, str] = {
+	".py": "python",
+	".js": "javascript", ".jsx": "javascript", ".mjs": "javascript", ".cjs": "javascript",
+	".ts": "typescript", ".tsx": "typescript",
+	".java": "java", ".kt": "kotlin", ".scala": "scala",
+	".c": "c", ".h": "c", ".cpp": "cpp", ".cc": "cpp", ".hpp": "cpp",
+	".cs": "csharp", ".go": "go", ".rs": "rust", ".php": "php", ".swift": "swift",
+}
+
+DUPLICATE_WINDOW = 6
+LONG_FUNCTION_LINES = 50
+COMPLEX_FUNCTION = 10
+DEEP_NESTING = 4
+
+
+def detect_language(filename: str) -> Optional[str]:
+	return LANGUAGES.get(os.path.splitext(filename)[1].lower())
+
+
+@dataclass
+class FunctionMetrics:
+	name: str
+	line: int
+	length: int
+	complexity: int
+	nesting: int
+
+
+@dataclass
+class FileMetrics:
+	filename: str
+	language: str
+	sha256: str
+	lines: int = 0
+	code_lines: int = 0
+	functions: List[FunctionMetrics] = field(default_factory=list)
+	max_nesting: int = 0
+	parse_error: bool = False
+	score: float = 100.0
+	# Hashes of DUPLICATE_WINDOW consecutive normalized lines, for duplication.
+	window_hashes: List[int] = field(default_factory=list)
+
+	def as_dict(self) -> Dict[str, Any]:
+		complexities = [f.complexity for f in self.functions]
+		lengths = [f.length for f in self.functions]
+		return {
+			"filename": self.filename,
+			"language": self.language,
+			"lines": self.lines,
+			"code_lines": self.code_lines,
+			"functions": len(self.functions),
+			"avg_complexity": round(sum(complexities) / len(complexities), 2) if complexities else 0.0,
+			"max_complexity": max(complexities, default=0),
+			"avg_function_length": round(sum(lengths) / len(lengths), 1) if lengths else 0.0,
+			"max_function_length": max(lengths, default=0),
+			"max_nesting": self.max_nesting,
+			"parse_error": self.parse_error,
+			"score": round(self.score, 1),
+		}
+
+
+# --- Python: ast ---
+
+_LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+_BLOCK_NODES = _LOOP_NODES + (ast.With, ast.AsyncWith, ast.Try) + (
+	(ast.Match,) if hasattr(ast, "Match") else ()
+) + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())
+_BRANCH_NODES = (ast.IfExp, ast.ExceptHandler, ast.Assert) + ((ast.match_case,) if hasattr(ast, "match_case") else ())
+
+
+class _Scope:
+	__slots__ = ("complexity", "nesting")
+
+	def __init__(self) -> None:
+		self.complexity = 1
+		self.nesting = 0
+
+
+class _PythonAnalyzer:
+	"""Cyclomatic complexity and nesting per function; nested functions are scored on their own."""
+
+	def __init__(self) -> None:
+		self.functions: List[FunctionMetrics] = []
+		self.max_nesting = 0
+
+	def run(self, tree: ast.Module) -> None:
+		module = _Scope()
+		for stmt in tree.body:
+			self._visit(stmt, 0, module, "")
+		self.max_nesting = max([module.nesting] + [f.nesting for f in self.functions])
+
+	def _function(self, node: ast.AST, prefix: str) -> None:
+		name = f"{prefix}{node.name}"
+		scope = _Scope()
+		for stmt in node.body:
+			self._visit(stmt, 0, scope, f"{name}.")
+		end = getattr(node, "end_lineno", None) or node.lineno
+		self.functions.append(FunctionMetrics(name, node.lineno, end - node.lineno + 1, scope.complexity, scope.nesting))
+
+	def _visit(self, node: ast.AST, depth: int, scope: _Scope, prefix: str) -> None:
+		if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+			self._function(node, prefix)
+			return
+		if isinstance(node, ast.ClassDef):
+			for stmt in node.body:
+				self._visit(stmt, depth, scope, f"{prefix}{node.name}.")
+			return
+		if isinstance(node, ast.If):
+			scope.complexity += 1
+			scope.nesting = max(scope.nesting, depth + 1)
+			self._visit(node.test, depth, scope, prefix)
+			for stmt in node.body:
+				self._visit(stmt, depth + 1, scope, prefix)
+			if len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If):
+				# elif: a sibling branch, not a deeper level
+				self._visit(node.orelse[0], depth, scope, prefix)
+			else:
+				for stmt in node.orelse:
+					self._visit(stmt, depth + 1, scope, prefix)
+			return
+		if isinstance(node, _BLOCK_NODES):
+			if isinstance(node, _LOOP_NODES):
+				scope.complexity += 1
+			scope.nesting = max(scope.nesting, depth + 1)
+			for child in ast.iter_child_nodes(node):
+				self._visit(child, depth + 1, scope, prefix)
+			return
+		if isinstance(node, _BRANCH_NODES):
+			scope.complexity += 1
+		elif isinstance(node, ast.BoolOp):
+			scope.complexity += len(node.values) - 1
+		elif isinstance(node, ast.comprehension):
+			scope.complexity += 1 + len(node.ifs)
+		for child in ast.iter_child_nodes(node):
+			self._visit(child, depth, scope, prefix)
+
+
+def _analyze_python(metrics: FileMetrics, text: str) -> str:
+	try:
+		tree = ast.parse(text)
+	except (SyntaxError, ValueError, RecursionError):
+		metrics.parse_error = True
+		return _strip_hash_comments(text)
+	analyzer = _PythonAnalyzer()
+	try:
+		analyzer.run(tree)
+	except RecursionError:
+		metrics.parse_error = True
+	metrics.functions = analyzer.functions
+	metrics.max_nesting = analyzer.max_nesting
+	return _strip_hash_comments(text)
+
+
+def _strip_hash_comments(text: str) -> str:
+	return "\n".join("" if ln.lstrip().startswith("#") else ln for ln in text.splitlines())
+
+
+# --- C-like languages: lightweight tokenizer ---
+
+_STRIP_RE = re.compile(
+	r"(?P<str>\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)|(?P<com>//[^\n]*|/\*.*?\*/)",
+	re.S,
+)
+_TOKEN_RE = re.compile(r"[{}]|\b(?:if|for|while|case|catch)\b|&&|\|\|")
+_FUNC_HEAD_RE = re.compile(r"(?:\bfunction\b[^;{}]*|\)\s*(?::[^;{}()]*|\bthrows\b[^;{}()]*|->[^;{}()]*)?|=>\s*)$")
+_CONTROL_HEAD_RE = re.compile(r"\b(?:if|for|while|switch|catch|with|foreach)\s*\((?:[^;{}]|;)*\)\s*$")
+_FUNC_NAME_RE = re.compile(r"([A-Za-z_$][\w$]*)\s*(?:=\s*(?:async\s*)?(?:function\b[^(]*)?)?\s*\(?[^(){};]*\)?\s*(?::[^;{}()]*)?(?:=>)?\s*$")
+
+
+def _strip_c_like(text: str) -> str:
+	"""Blank out strings and comments, keeping newlines so line numbers stay valid."""
+
+	def repl(match: "re.Match[str]") -> str:
+		if match.group("str") is not None:
+			return '""'
+		return "\n" * match.group("com").count("\n")
+
+	return _STRIP_RE.sub(repl, text)
+
+
+def _analyze_c_like(metrics: FileMetrics, text: str) -> str:
+	stripped = _strip_c_like(text)
+	newline_positions = [i for i, ch in enumerate(stripped) if ch == "\n"]
+
+	def line_of(pos: int) -> int:
+		return bisect.bisect_right(newline_positions, pos) + 1
+
+	# Frames: [is_function, start_line, complexity, depth_in_function, max_nesting, name]
+	frames: List[List[Any]] = []
+	module_nesting = 0
+	for match in _TOKEN_RE.finditer(stripped):
+		token = match.group()
+		pos = match.start()
+		function_frame = next((f for f in reversed(frames) if f[0]), None)
+		if token == "{":
+			head = stripped[max(0, pos - 300):pos]
+			is_function = bool(_FUNC_HEAD_RE.search(head)) and not _CONTROL_HEAD_RE.search(head)
+			if is_function:
+				name_match = _FUNC_NAME_RE.search(head.split("\n")[-1] if "\n" in head else head)
+				frames.append([True, line_of(pos), 1, 0, 0, name_match.group(1) if name_match else "<anonymous>"])
+			else:
+				# The top frame is the function itself (depth 0) or a block inside it.
+				depth = (frames[-1][3] + 1) if function_frame else 0
+				frames.append([False, line_of(pos), 0, depth, 0, ""])
+				if function_frame:
+					function_frame[4] = max(function_frame[4], depth)
+				else:
+					module_nesting = max(module_nesting, sum(1 for f in frames if not f[0]))
+		elif token == "}":
+			if not frames:
+				continue
+			frame = frames.pop()
+			if frame[0]:
+				metrics.functions.append(
+					FunctionMetrics(frame[5], frame[1], line_of(pos) - frame[1] + 1, frame[2], frame[4])
+				)
+		elif function_frame is not None:
+			function_frame[2] += 1
+	metrics.max_nesting = max([module_nesting] + [f.nesting for f in metrics.functions])
+	return stripped
+
+
+# --- per-file entry point ---
+
+_TRIVIAL_LINE_RE = re.compile(r"^(?:[{}()\[\];,]+|import\b.*|from\s+\S+\s+import\b.*|#include\b.*|using\b.*|package\b.*)$")
+
+
+def _window_hashes(code: str) -> Tuple[int, List[int]]:
+	normalized = []
+	for line in code.splitlines():
+		line = " ".join(line.split())
+		if len(line) < 4 or _TRIVIAL_LINE_RE.match(line):
+			continue
+		normalized.append(line)
+	hashes = []
+	for i in range(len(normalized) - DUPLICATE_WINDOW + 1):
+		window = "\n".join(normalized[i:i + DUPLICATE_WINDOW]).encode("utf-8")
+		hashes.append(int.from_bytes(hashlib.blake2b(window, digest_size=8).digest(), "big"))
+	return len(normalized), hashes
+
+
+def _score(metrics: FileMetrics) -> float:
+	score = 100.0
+	if metrics.functions:
+		complexities = [f.complexity for f in metrics.functions]
+		avg = sum(complexities) / len(complexities)
+		score -= min(25.0, max(0.0, avg - 4.0) * 3.0)
+		score -= min(15.0, 3.0 * sum(1 for c in complexities if c > COMPLEX_FUNCTION))
+		score -= min(15.0, 3.0 * sum(1 for f in metrics.functions if f.length > LONG_FUNCTION_LINES))
+	score -= min(15.0, max(0, metrics.max_nesting - DEEP_NESTING) * 4.0)
+	score -= min(15.0, max(0, metrics.code_lines - 500) * 0.02)
+	if metrics.parse_error:
+		score -= 20.0
+	return max(0.0, min(100.0, score))
+
+
+def analyze_source(filename: str, data: bytes, sha256: Optional[str] = None) -> Optional[FileMetrics]:
+	"""Metrics for one source file, or None if the language is not supported."""
+	language = detect_language(filename)
+	if language is None:
+		return None
+	text = data.decode("utf-8", errors="ignore")
+	metrics = FileMetrics(
+		filename=filename,
+		language=language,
+		sha256=sha256 or hashlib.sha256(data).hexdigest(),
+		lines=text.count("\n") + (1 if text and not text.endswith("\n") else 0),
+	)
+	code = _analyze_python(metrics, text) if language == "python" else _analyze_c_like(metrics, text)
+	metrics.code_lines, metrics.window_hashes = _window_hashes(code)
+	metrics.score = _score(metrics)
+	return metrics
+
+
+def _analyze_batch(batch: List[Tuple[str, bytes, str]]) -> List[Optional[FileMetrics]]:
+	# Runs in a worker process.
+	return [analyze_source(filename, data, sha) for filename, data, sha in batch]
+
+
+# --- caching and process pool ---
+
+
+class MetricsCache:
+	"""LRU of FileMetrics keyed by language and content hash."""
+
+	def __init__(self, max_entries: int = 4096) -> None:
+		self.max_entries = max_entries
+		self._lock = Lock()
+		self._entries: "OrderedDict[str, FileMetrics]" = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, language: str, sha256: str, filename: str) -> Optional[FileMetrics]:
+		key = f"{language}:{sha256}"
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+		return replace(entry, filename=filename)
+
+	def put(self, metrics: FileMetrics) -> None:
+		key = f"{metrics.language}:{metrics.sha256}"
+		with self._lock:
+			self._entries[key] = metrics
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+			self.hits = self.misses = 0
+
+
+metrics_cache = MetricsCache(int(os.getenv("STATIC_ANALYSIS_CACHE_SIZE", "4096")))
+
+_pool_lock = Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _workers() -> int:
+	# Per web worker process, so kept small by default.
+	return int(os.getenv("STATIC_ANALYSIS_WORKERS", "2"))
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+	global _pool
+	if _workers() <= 1:
+		return None
+	with _pool_lock:
+		if _pool is None:
+			# Spawned, not forked: the server process already runs threads (request
+			# pool, job heartbeat, metrics and trace writers) and forking those can deadlock.
+			_pool = ProcessPoolExecutor(max_workers=_workers(), mp_context=multiprocessing.get_context("spawn"))
+		return _pool
+
+
+def shutdown_pool() -> None:
+	global _pool
+	with _pool_lock:
+		pool, _pool = _pool, None
+	if pool is not None:
+		pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ProjectAnalyzer:
+	"""
+	Streaming front end: feed files one at a time with add(), then finish().
+
+	Cached files are resolved immediately. The rest are grouped into batches
+	of about `batch_bytes`; once more than one batch is needed they go to the
+	process pool, with at most two batches per worker in flight so memory
+	stays bounded. Small uploads never leave the calling thread.
+	"""
+
+	def __init__(self, batch_bytes: Optional[int] = None, cache: Optional[MetricsCache] = None) -> None:
+		self.batch_bytes = batch_bytes or int(os.getenv("STATIC_ANALYSIS_BATCH_BYTES", str(1024 * 1024)))
+		self.cache = cache if cache is not None else metrics_cache
+		self.files: List[FileMetrics] = []
+		self.cache_hits = 0
+		self._batch: List[Tuple[str, bytes, str]] = []
+		self._batch_size = 0
+		self._inflight: Deque[Tuple[Future, List[Tuple[str, bytes, str]]]] = deque()
+		self._started = time.perf_counter()
+
+	def add(self, filename: str, data: bytes, sha256: Optional[str] = None) -> None:
+		language = detect_language(filename)
+		if language is None:
+			return
+		sha256 = sha256 or hashlib.sha256(data).hexdigest()
+		cached = self.cache.get(language, sha256, filename)
+		if cached is not None:
+			self.cache_hits += 1
+			self.files.append(cached)
+			return
+		self._batch.append((filename, data, sha256))
+		self._batch_size += len(data)
+		if self._batch_size >= self.batch_bytes:
+			self._flush(parallel=True)
+
+	def _collect(self, results: List[Optional[FileMetrics]]) -> None:
+		for metrics in results:
+			if metrics is not None:
+				self.cache.put(metrics)
+				self.files.append(metrics)
+
+	def _flush(self, parallel: bool) -> None:
+		batch, self._batch, self._batch_size = self._batch, [], 0
+		if not batch:
+			return
+		pool = _get_pool() if parallel else None
+		if pool is None:
+			self._collect(_analyze_batch(batch))
+			return
+		try:
+			self._inflight.append((pool.submit(_analyze_batch, batch), batch))
+		except Exception as e:
+			logger.warning(f"Static analysis pool unavailable, analyzing inline: {e}")
+			self._collect(_analyze_batch(batch))
+			return
+		while len(self._inflight) > 2 * _workers():
+			self._drain_one()
+
+	def _drain_one(self) -> None:
+		future, batch = self._inflight.popleft()
+		try:
+			self._collect(future.result())
+		except Exception as e:
+			logger.warning(f"Static analysis worker failed, analyzing inline: {e}")
+			self._collect(_analyze_batch(batch))
+
+	def finish(self) -> "ProjectReport":
+		# Spans live in this process only: the pool workers are not traced, the wait for them is.
+		with tracing.span("code.analyze", inflight_batches=len(self._inflight)) as span:
+			# The last partial batch only goes to the pool if other batches already did.
+			self._flush(parallel=bool(self._inflight))
+			while self._inflight:
+				self._drain_one()
+			elapsed_ms = (time.perf_counter() - self._started) * 1000
+			report = build_report(self.files, cache_hits=self.cache_hits, elapsed_ms=elapsed_ms)
+			span.set(files=len(self.files), cache_hits=self.cache_hits, analyzer_elapsed_ms=round(elapsed_ms, 2))
+			return report
+
+
+# --- project report ---
+
+
+@dataclass
+class ProjectReport:
+	files: List[FileMetrics]
+	duplicated_lines: int
+	duplication_ratio: float
+	score: float
+	cache_hits: int = 0
+	elapsed_ms: float = 0.0
+
+	def file_scores(self) -> Dict[str, float]:
+		return {f.filename: round(f.score, 1) for f in self.files}
+
+	def metrics(self, hotspots: int = 5) -> Dict[str, Any]:
+		"""What the code measured: the same files always give the same dict (fit for prompts and cache keys)."""
+		functions = [(f.filename, fn) for f in self.files for fn in f.functions]
+		complexities = [fn.complexity for _, fn in functions]
+		lengths = [fn.length for _, fn in functions]
+		worst = sorted(functions, key=lambda item: (item[1].complexity, item[1].length), reverse=True)[:hotspots]
+		return {
+			"files_analyzed": len(self.files),
+			"languages": dict(Counter(f.language for f in self.files)),
+			"total_lines": sum(f.lines for f in self.files),
+			"code_lines": sum(f.code_lines for f in self.files),
+			"functions": len(functions),
+			"avg_complexity": round(sum(complexities) / len(complexities), 2) if complexities else 0.0,
+			"max_complexity": max(complexities, default=0),
+			"avg_function_length": round(sum(lengths) / len(lengths), 1) if lengths else 0.0,
+			"long_functions": sum(1 for n in lengths if n > LONG_FUNCTION_LINES),
+			"complex_functions": sum(1 for c in complexities if c > COMPLEX_FUNCTION),
+			"max_nesting": max((f.max_nesting for f in self.files), default=0),
+			"parse_errors": sum(1 for f in self.files if f.parse_error),
+			"duplicated_lines": self.duplicated_lines,
+			"duplication_ratio": round(self.duplication_ratio, 4),
+			"score": round(self.score, 1),
+			"hotspots": [
+				{"filename": filename, "function": fn.name, "line": fn.line, "complexity": fn.complexity, "length": fn.length}
+				for filename, fn in worst
+			],
+		}
+
+	def summary(self, hotspots: int = 5) -> Dict[str, Any]:
+		"""metrics() plus how this run went (cache hits, time taken)."""
+		return {**self.metrics(hotspots), "cache_hits": self.cache_hits, "elapsed_ms": round(self.elapsed_ms, 1)}
+
+
+def build_report(files: List[FileMetrics], cache_hits: int = 0, elapsed_ms: float = 0.0) -> ProjectReport:
+	"""Aggregate per-file metrics and measure duplication across all files."""
+	counts = Counter(h for f in files for h in f.window_hashes)
+	duplicated = 0
+	for f in files:
+		covered = set()
+		for i, h in enumerate(f.window_hashes):
+			if counts[h] > 1:
+				covered.update(range(i, i + DUPLICATE_WINDOW))
+		duplicated += len(covered)
+	code_lines = sum(f.code_lines for f in files)
+	ratio = duplicated / code_lines if code_lines else 0.0
+
+	if files:
+		weights = [max(1, f.code_lines) for f in files]
+		score = sum(f.score * w for f, w in zip(files, weights)) / sum(weights)
+	else:
+		score = 0.0
+	score = max(0.0, score - min(30.0, ratio * 60.0))
+	return ProjectReport(
+		files=files,
+		duplicated_lines=duplicated,
+		duplication_ratio=ratio,
+		score=score,
+		cache_hits=cache_hits,
+		elapsed_ms=elapsed_ms,
+	)
+
+
+def analyze_files(files: List[Tuple[str, bytes]]) -> ProjectReport:
+	"""Convenience wrapper for callers that already hold (filename, bytes) pairs."""
+	analyzer = ProjectAnalyzer()
+	for filename, data in files:
+		analyzer.add(filename, data)
+	return analyzer.finish()
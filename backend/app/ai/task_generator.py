@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 from typing import List, Dict, Any
-import os
 import json
 
-from openai import OpenAI
+from . import llm_gateway
 
 
 def generate_tasks_from_project(
@@ -19,15 +18,11 @@ def generate_tasks_from_project(
 	into smaller, actionable sub-tasks with dependencies and timeframes.
 	"""
 	existing_tasks = existing_tasks or []
-	api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY_WORKEXPERIO")
-	
-	if not api_key:
+	if not llm_gateway.is_configured():
 		# Fallback: generate basic tasks from keywords
 		return _generate_basic_tasks_fallback(project_title, project_description)
 	
 	try:
-		client = OpenAI(api_key=api_key)
-		
 		system_prompt = """You are an expert project manager. Your job is to break down software projects into actionable tasks.
 
 Given a project title and description, generate a comprehensive list of tasks that need to be completed.
@@ -37,7 +32,7 @@ Each task should be:
 - Include an estimated time in hours (2-40 hours per task)
 - Be ordered logically (dependencies should be considered)
 
-Return ONLY a valid JSON array of tasks, no other text. Each task should have:
+Return ONLY a valid JSON object with a "tasks" array, no other text. Each task should have:
 {
   "title": "Task title",
   "description": "Detailed description of what needs to be done",
@@ -46,10 +41,10 @@ Return ONLY a valid JSON array of tasks, no other text. Each task should have:
 }
 
 Example output:
-[
+{"tasks": [
   {"title": "Set up project structure", "description": "Create folder structure, initialize package.json, set up build tools", "estimated_hours": 4.0, "priority": "high"},
   {"title": "Design database schema", "description": "Create ER diagram and define all tables and relationships", "estimated_hours": 6.0, "priority": "high"}
-]"""
+]}"""
 		
 		user_prompt = f"""Project Title: {project_title}
 
@@ -61,17 +56,21 @@ Existing Tasks:
 
 Generate a comprehensive task breakdown for this project. If there are existing tasks, focus on filling gaps or adding missing steps."""
 		
-		response = client.chat.completions.create(
-			model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-			messages=[
+		model = llm_gateway.get_model("task_generation")
+		response = llm_gateway.chat_completion(
+			[
 				{"role": "system", "content": system_prompt},
 				{"role": "user", "content": user_prompt}
 			],
+			purpose="task_generation",
+			model=model,
+			cache=True,
 			temperature=0.3,
-			response_format={"type": "json_object"} if os.getenv("OPENAI_MODEL", "").startswith("gpt-4") else None,
+			# JSON mode returns an object, hence the {"tasks": [...]} shape asked for above.
+			response_format={"type": "json_object"} if model.startswith("gpt-4") else None,
 		)
 		
-		content = response.choices[0].message.content or "{}"
+		content = response.text or "{}"
 		
 		# Try to parse as JSON
 		try:
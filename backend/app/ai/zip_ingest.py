@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import zipfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+from .. import tracing
+
+CHUNK_SIZE = 64 * 1024
+# Bytes sniffed for a NUL byte to tell binary from text.
+SNIFF_BYTES = 8 * 1024
+
+SKIP_DIRS = {
+	".git", ".hg", ".svn", ".idea", ".vscode", "__pycache__", ".mypy_cache", ".pytest_cache",
+	"node_modules", "bower_components", "vendor", "venv", ".venv", "env", "site-packages",
+	"dist", "build", ".next", ".nuxt", "coverage", "target", "out", "__MACOSX",
+}
+
+BINARY_EXTENSIONS = {
+	".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tiff", ".psd",
+	".mp3", ".mp4", ".wav", ".ogg", ".mov", ".avi", ".mkv", ".webm",
+	".zip", ".tar", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".jar", ".war",
+	".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+	".woff", ".woff2", ".ttf", ".otf", ".eot",
+	".pyc", ".pyo", ".so", ".dll", ".dylib", ".exe", ".bin", ".o", ".a", ".class", ".wasm",
+	".db", ".sqlite", ".sqlite3", ".pkl", ".npy", ".npz", ".h5", ".onnx", ".pt",
+}
+
+# Generated or vendored text that says nothing about the author's code.
+SKIP_SUFFIXES = (".min.js", ".min.css", ".map", "package-lock.json", "yarn.lock", "poetry.lock", "pnpm-lock.yaml")
+
+
+class IngestError(ValueError):
+	"""Raised when an archive is malformed or exceeds an ingest limit."""
+
+
+@dataclass
+class IngestLimits:
+	max_members: int = int(os.getenv("CODE_INGEST_MAX_MEMBERS", "5000"))
+	max_total_bytes: int = int(os.getenv("CODE_INGEST_MAX_TOTAL_BYTES", str(500 * 1024 * 1024)))
+	# Larger text members are hashed and line-counted but not handed to visitors.
+	max_member_bytes: int = int(os.getenv("CODE_INGEST_MAX_MEMBER_BYTES", str(2 * 1024 * 1024)))
+	max_ratio: float = float(os.getenv("CODE_INGEST_MAX_RATIO", "100"))
+
+
+@dataclass
+class IngestedFile:
+	filename: str
+	size: int
+	line_count: int
+	sha256: str
+	# First `preview_chars` characters, which is all the LLM prompt uses.
+	preview: str
+
+
+@dataclass
+class IngestResult:
+	files: List[IngestedFile] = field(default_factory=list)
+	skipped: Dict[str, int] = field(default_factory=dict)
+	total_bytes: int = 0
+
+	def skip(self, reason: str) -> None:
+		self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+
+def should_skip(path: str) -> Optional[str]:
+	"""Return the reason a member path is skipped, or None to ingest it."""
+	parts = [p for p in path.replace("\\", "/").split("/") if p]
+	if not parts:
+		return "empty"
+	if any(p in SKIP_DIRS or p.startswith(".") for p in parts[:-1]) or parts[-1].startswith("."):
+		return "vendor"
+	lower = parts[-1].lower()
+	if lower.endswith(SKIP_SUFFIXES):
+		return "vendor"
+	if os.path.splitext(lower)[1] in BINARY_EXTENSIONS:
+		return "binary"
+	return None
+
+
+FileVisitor = Callable[[str, bytes], None]
+
+
+def _consume(
+	stream: BinaryIO,
+	filename: str,
+	result: IngestResult,
+	limits: IngestLimits,
+	preview_chars: int,
+	visitor: Optional[FileVisitor],
+	declared_size: Optional[int] = None,
+) -> None:
+	"""Read one member in chunks, keeping only a preview (and a bounded buffer for the visitor)."""
+	digest = hashlib.sha256()
+	head = b""
+	buffer: Optional[bytearray] = bytearray() if visitor is not None else None
+	size = 0
+	newlines = 0
+	last_byte = b""
+	while True:
+		chunk = stream.read(CHUNK_SIZE)
+		if not chunk:
+			break
+		if size == 0 and b"\x00" in chunk[:SNIFF_BYTES]:
+			result.skip("binary")
+			return
+		size += len(chunk)
+		if declared_size is not None and size > declared_size:
+			# The local header lied about the size; treat it as a bomb.
+			raise IngestError(f"{filename}: member is larger than declared")
+		if result.total_bytes + size > limits.max_total_bytes:
+			raise IngestError("Archive exceeds the maximum uncompressed size")
+		digest.update(chunk)
+		newlines += chunk.count(b"\n")
+		last_byte = chunk[-1:]
+		# UTF-8 needs at most 4 bytes per character.
+		if len(head) < preview_chars * 4:
+			head += chunk[: preview_chars * 4 - len(head)]
+		if buffer is not None:
+			if size <= limits.max_member_bytes:
+				buffer += chunk
+			else:
+				buffer = None
+
+	if size == 0:
+		result.skip("empty")
+		return
+	result.total_bytes += size
+	line_count = newlines + (1 if last_byte != b"\n" else 0)
+	result.files.append(
+		IngestedFile(
+			filename=filename,
+			size=size,
+			line_count=line_count,
+			sha256=digest.hexdigest(),
+			preview=head.decode("utf-8", errors="ignore")[:preview_chars],
+		)
+	)
+	if visitor is not None:
+		if buffer is None:
+			result.skip("too_large_for_analysis")
+		else:
+			visitor(filename, bytes(buffer))
+
+
+def ingest_zip(
+	source: BinaryIO,
+	*,
+	limits: Optional[IngestLimits] = None,
+	preview_chars: int = 2000,
+	visitor: Optional[FileVisitor] = None,
+) -> IngestResult:
+	"""
+	Stream text members out of a zip archive.
+
+	`source` must be seekable (an UploadFile's spooled file or an open file);
+	it is never read into memory as a whole. Members are decompressed in
+	64 KB chunks, so memory stays flat regardless of archive size. Binary and
+	vendored members are skipped by path, extension or a NUL byte in the first
+	chunk. The archive is rejected up front when it has too many members, a
+	declared size over the limit or a suspicious compression ratio.
+
+	`visitor(filename, data)` is called for each text member up to
+	max_member_bytes, one at a time, for consumers that need full contents.
+	"""
+	limits = limits or IngestLimits()
+	result = IngestResult()
+	try:
+		archive = zipfile.ZipFile(source)
+	except zipfile.BadZipFile as e:
+		raise IngestError(f"Invalid zip archive: {e}") from e
+
+	with archive:
+		members = [info for info in archive.infolist() if not info.is_dir()]
+		if len(members) > limits.max_members:
+			raise IngestError(f"Archive has {len(members)} files; the limit is {limits.max_members}")
+		declared_total = sum(info.file_size for info in members)
+		if declared_total > limits.max_total_bytes:
+			raise IngestError("Archive exceeds the maximum uncompressed size")
+		compressed_total = sum(info.compress_size for info in members) or 1
+		if declared_total / compressed_total > limits.max_ratio:
+			raise IngestError("Archive compression ratio is too high")
+
+		for info in members:
+			reason = should_skip(info.filename)
+			if reason:
+				result.skip(reason)
+				continue
+			if info.compress_size and info.file_size / info.compress_size > limits.max_ratio:
+				raise IngestError(f"{info.filename}: compression ratio is too high")
+			try:
+				with archive.open(info) as stream:
+					_consume(stream, info.filename, result, limits, preview_chars, visitor, info.file_size)
+			except (zipfile.BadZipFile, RuntimeError, NotImplementedError):
+				# Encrypted or unsupported compression; skip the member.
+				result.skip("unreadable")
+	return result
+
+
+def ingest_single(
+	source: BinaryIO,
+	filename: str,
+	*,
+	limits: Optional[IngestLimits] = None,
+	preview_chars: int = 2000,
+	visitor: Optional[FileVisitor] = None,
+) -> IngestResult:
+	"""Ingest a single uploaded file with the same limits and binary detection."""
+	limits = limits or IngestLimits()
+	result = IngestResult()
+	_consume(source, filename, result, limits, preview_chars, visitor)
+	return result
+
+
+def ingest_upload(
+	source: BinaryIO,
+	filename: str,
+	**kwargs,
+) -> IngestResult:
+	with tracing.span("zip.ingest", filename=filename) as span:
+		if filename.lower().endswith(".zip"):
+			result = ingest_zip(source, **kwargs)
+		else:
+			result = ingest_single(source, filename, **kwargs)
+		span.set(files=len(result.files), skipped=sum(result.skipped.values()), bytes=result.total_bytes)
+		return result
+
+
+def to_files_data(result: IngestResult) -> List[Dict[str, object]]:
+	"""Shape ingested files like the analyzer's files_data (content is the preview)."""
+	return [
+		{
+			"filename": f.filename,
+			"content": f.preview,
+			"line_count": f.line_count,
+			"size": f.size,
+			"sha256": f.sha256,
+		}
+		for f in result.files
+	]
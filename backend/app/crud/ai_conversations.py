@@ -0,0 +1,123 @@
+# crud/ai_conversations.py
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Query, Session
+
+from .. import models
+from ..ai.context_builder import summarize_message
+
+DEFAULT_HISTORY_LIMIT = 30
+# Upper bound on messages folded into a rolling summary in one turn, so a
+# long backlog never turns a single request into a full-history scan.
+MAX_FOLD_PER_TURN = 200
+MAX_SUMMARY_LINES = 50
+
+
+def history_limit() -> int:
+    return int(os.getenv("AI_CHAT_HISTORY_LIMIT", str(DEFAULT_HISTORY_LIMIT)))
+
+
+def rolling_summaries_enabled() -> bool:
+    return os.getenv("AI_CHAT_ROLLING_SUMMARY", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass
+class ConversationWindow:
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    # Rolling summary of the turns older than `messages`, if any.
+    summary: Optional[str] = None
+
+
+def project_chat_query(db: Session, project_id: str) -> Query:
+    return db.query(models.AIChatMessage).filter(models.AIChatMessage.project_id == project_id)
+
+
+def assistant_chat_query(db: Session, user_id: str, project_id: Optional[str]) -> Query:
+    query = db.query(models.AIConversation).filter(models.AIConversation.user_id == user_id)
+    if project_id:
+        return query.filter(models.AIConversation.project_id == project_id)
+    return query.filter(models.AIConversation.project_id.is_(None))
+
+
+def last_turns(query: Query, model, limit: int) -> List[Any]:
+    """
+    Most recent `limit` rows of a chat query, oldest first.
+
+    Ordering descending with a LIMIT lets the (…, created_at) index stop after
+    `limit` rows instead of reading the whole conversation.
+    """
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit).all()
+    rows.reverse()
+    return rows
+
+
+def _roll_summary(
+    db: Session, key: str, query: Query, model, window_start
+) -> Optional[str]:
+    summary = db.query(models.AIConversationSummary).filter(
+        models.AIConversationSummary.conversation_key == key
+    ).first()
+
+    scrolled_q = query.filter(model.created_at < window_start)
+    if summary is not None and summary.covered_until is not None:
+        scrolled_q = scrolled_q.filter(model.created_at > summary.covered_until)
+    scrolled = last_turns(scrolled_q, model, MAX_FOLD_PER_TURN)
+
+    if not scrolled:
+        return summary.summary if summary is not None and summary.summary else None
+
+    lines = summary.summary.splitlines() if summary is not None and summary.summary else []
+    lines.extend(summarize_message({"role": r.role, "content": r.content}) for r in scrolled)
+    lines = lines[-MAX_SUMMARY_LINES:]
+
+    if summary is None:
+        summary = models.AIConversationSummary(conversation_key=key, message_count=0)
+        db.add(summary)
+    summary.summary = "\n".join(lines)
+    summary.covered_until = scrolled[-1].created_at
+    summary.message_count = (summary.message_count or 0) + len(scrolled)
+    db.flush()
+    return summary.summary
+
+
+def load_window(
+    db: Session,
+    query: Query,
+    model,
+    key: str,
+    limit: Optional[int] = None,
+) -> ConversationWindow:
+    """
+    Load the last `limit` turns plus the rolling summary of everything older.
+
+    The summary row is extended only with the turns that scrolled out of the
+    window since it was last updated, so the work per request is bounded by
+    the window size rather than the conversation length.
+    """
+    limit = limit or history_limit()
+    rows = last_turns(query, model, limit)
+    window = ConversationWindow(
+        messages=[{"id": r.id, "role": r.role, "content": r.content} for r in rows]
+    )
+    if rows and len(rows) == limit and rolling_summaries_enabled():
+        window.summary = _roll_summary(db, key, query, model, rows[0].created_at)
+    return window
+
+
+def load_project_chat(db: Session, project_id: str, limit: Optional[int] = None) -> ConversationWindow:
+    return load_window(
+        db, project_chat_query(db, project_id), models.AIChatMessage, f"project:{project_id}", limit
+    )
+
+
+def load_assistant_chat(
+    db: Session, user_id: str, project_id: Optional[str], limit: Optional[int] = None
+) -> ConversationWindow:
+    key = f"assistant:{user_id}:{project_id}" if project_id else f"assistant:{user_id}"
+    return load_window(
+        db, assistant_chat_query(db, user_id, project_id), models.AIConversation, key, limit
+    )
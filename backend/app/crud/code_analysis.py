@@ -0,0 +1,82 @@
+# crud/code_analysis.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..ai.code_analyzer import content_hash
+
+
+def load_previous(
+    db: Session, project_id: str, user_id: str, analysis_type: str
+) -> Tuple[Dict[str, Tuple[str, Dict[str, Any]]], Optional[Dict[str, Any]]]:
+    """
+    Stored per-file results (path -> (sha256, entry)) and the last merged
+    report for a user's uploads to a project. A report from a different
+    analysis type is not reused.
+    """
+    report_row = (
+        db.query(models.CodeAnalysisReport)
+        .filter(
+            models.CodeAnalysisReport.project_id == project_id,
+            models.CodeAnalysisReport.user_id == user_id,
+        )
+        .first()
+    )
+    if report_row is None or report_row.analysis_type != analysis_type or not report_row.report:
+        return {}, None
+    rows = (
+        db.query(models.FileAnalysis)
+        .filter(models.FileAnalysis.project_id == project_id, models.FileAnalysis.user_id == user_id)
+        .all()
+    )
+    files = {row.path: (row.sha256, row.result or {}) for row in rows}
+    return files, report_row.report
+
+
+def save_analysis(
+    db: Session,
+    project_id: str,
+    user_id: str,
+    analysis_type: str,
+    files_data: List[Dict[str, Any]],
+    entries: Dict[str, Dict[str, Any]],
+    report: Dict[str, Any],
+) -> None:
+    """Upsert per-file rows for this upload, drop files no longer present and store the report."""
+    existing = {
+        row.path: row
+        for row in db.query(models.FileAnalysis).filter(
+            models.FileAnalysis.project_id == project_id, models.FileAnalysis.user_id == user_id
+        )
+    }
+    # Keyed by path so a name repeated inside an archive maps to one row.
+    by_path = {fd.get("filename", "unknown"): fd for fd in files_data}
+    for path, fd in by_path.items():
+        row = existing.pop(path, None)
+        if row is None:
+            row = models.FileAnalysis(project_id=project_id, user_id=user_id, path=path)
+            db.add(row)
+        sha256 = content_hash(fd)
+        if row.sha256 != sha256 or row.result != entries.get(path):
+            row.sha256 = sha256
+            row.line_count = int(fd.get("line_count") or 0)
+            row.result = entries.get(path)
+    for row in existing.values():
+        db.delete(row)
+
+    report_row = (
+        db.query(models.CodeAnalysisReport)
+        .filter(
+            models.CodeAnalysisReport.project_id == project_id,
+            models.CodeAnalysisReport.user_id == user_id,
+        )
+        .first()
+    )
+    if report_row is None:
+        report_row = models.CodeAnalysisReport(project_id=project_id, user_id=user_id)
+        db.add(report_row)
+    report_row.analysis_type = analysis_type
+    report_row.report = report
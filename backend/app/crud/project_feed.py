@@ -0,0 +1,142 @@
+# crud/project_feed.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from .tasks import decode_cursor, encode_cursor
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def visible_to(user_id: str):
+    """Projects the user owns or whose team they are on."""
+    member_teams = select(models.TeamMember.team_id).where(models.TeamMember.user_id == user_id)
+    return or_(models.Project.owner_id == user_id, models.Project.team_id.in_(member_teams))
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def feed_statement(user_id: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    The user's projects, newest first, with member count, task progress and
+    last activity, in one statement: each figure is a correlated subquery
+    answered from the per-project indexes. The first page also carries the
+    total, from a window count over the visible rows. Selects one row past
+    `limit` to tell whether there is a next page.
+    """
+    project, task = models.Project, models.Task
+
+    def per_project(column, *where):
+        return select(column).where(*where).correlate(project).scalar_subquery()
+
+    member_count = per_project(func.count(models.TeamMember.id), models.TeamMember.team_id == project.team_id)
+    task_total = per_project(func.count(task.id), task.project_id == project.id)
+    task_done = per_project(func.count(task.id), task.project_id == project.id, task.status == "done")
+    last_task = per_project(
+        func.max(func.coalesce(task.completed_at, task.created_at)), task.project_id == project.id
+    )
+    last_message = per_project(func.max(models.ChatMessage.created_at), models.ChatMessage.project_id == project.id)
+    last_upload = per_project(func.max(models.ProjectFile.uploaded_at), models.ProjectFile.project_id == project.id)
+
+    columns = [
+        project,
+        case((project.owner_id == user_id, "owner"), else_="member").label("role"),
+        member_count.label("member_count"),
+        task_total.label("task_total"),
+        task_done.label("task_done"),
+        last_task.label("last_task"),
+        last_message.label("last_message"),
+        last_upload.label("last_upload"),
+    ]
+    if not cursor:
+        # Count of all visible projects, computed alongside the first page.
+        columns.append(func.count().over().label("total"))
+    statement = select(*columns).where(visible_to(user_id))
+    if cursor:
+        before_time, before_id = decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                project.created_at < before_time,
+                and_(project.created_at == before_time, project.id < before_id),
+            )
+        )
+    return statement.order_by(project.created_at.desc(), project.id.desc()).limit(_page_size(limit) + 1)
+
+
+def _page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def feed_page(rows, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> schemas.ProjectFeedPage:
+    """Turn the rows of feed_statement() into a page."""
+    limit = _page_size(limit)
+    items: List[schemas.ProjectFeedItem] = []
+    for row in rows[:limit]:
+        p = row.Project
+        activity = [_utc(t) for t in (p.created_at, row.last_task, row.last_message, row.last_upload) if t is not None]
+        items.append(
+            schemas.ProjectFeedItem(
+                id=p.id,
+                title=p.title,
+                description=p.description,
+                owner_id=p.owner_id,
+                team_id=p.team_id,
+                team_type=p.team_type,
+                ai_generated=p.ai_generated,
+                created_at=p.created_at,
+                role=row.role,
+                # Solo projects have no team row; the owner still counts.
+                member_count=max(row.member_count or 0, 1),
+                task_total=row.task_total or 0,
+                task_done=row.task_done or 0,
+                progress=round(100.0 * (row.task_done or 0) / row.task_total, 1) if row.task_total else 0.0,
+                last_activity_at=max(activity) if activity else None,
+            )
+        )
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1].Project
+        next_cursor = encode_cursor(last.created_at, last.id)
+    total = None if cursor else (rows[0].total if rows else 0)
+    return schemas.ProjectFeedPage(items=items, next_cursor=next_cursor, total=total)
+
+
+def project_feed(
+    db: Session, user_id: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+) -> schemas.ProjectFeedPage:
+    rows = db.execute(feed_statement(user_id, cursor, limit)).all()
+    return feed_page(rows, cursor, limit)
+
+
+async def project_feed_async(
+    db, user_id: str, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+) -> schemas.ProjectFeedPage:
+    rows = (await db.execute(feed_statement(user_id, cursor, limit))).all()
+    return feed_page(rows, cursor, limit)
+
+
+def visible_projects_statement(user_id: str):
+    """Owned and team projects, newest first, in one query."""
+    return (
+        select(models.Project)
+        .where(visible_to(user_id))
+        .order_by(models.Project.created_at.desc(), models.Project.id.desc())
+    )
+
+
+def list_visible_projects(db: Session, user_id: str) -> List[models.Project]:
+    return list(db.scalars(visible_projects_statement(user_id)))
+
+
+async def list_visible_projects_async(db, user_id: str) -> List[models.Project]:
+    return list(await db.scalars(visible_projects_statement(user_id)))
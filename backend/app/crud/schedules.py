@@ -0,0 +1,221 @@
+# crud/schedules.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..ai.scheduler import (
+    CycleError,
+    SchedTask,
+    Schedule,
+    Slot,
+    build_schedule,
+    find_cycle,
+    hours_per_day,
+    reschedule,
+    to_datetime,
+)
+
+
+def dependency_pairs(db: Session, project_id: str) -> List[Tuple[str, str]]:
+    """(task_id, depends_on_id) for every dependency in a project."""
+    rows = (
+        db.query(models.TaskDependency.task_id, models.TaskDependency.depends_on_id)
+        .filter(models.TaskDependency.project_id == project_id)
+        .all()
+    )
+    return [(task_id, depends_on_id) for task_id, depends_on_id in rows]
+
+
+def _project_tasks(db: Session, project_id: str) -> List[models.Task]:
+    return (
+        db.query(models.Task)
+        .filter(models.Task.project_id == project_id)
+        .order_by(models.Task.created_at.asc(), models.Task.id.asc())
+        .all()
+    )
+
+
+def _sched_tasks(tasks: Iterable[models.Task]) -> List[SchedTask]:
+    return [
+        SchedTask(
+            id=t.id,
+            hours=float(t.estimated_hours) if t.estimated_hours is not None else 2.0,
+            assignee_id=t.assignee_id,
+            done=t.status == "done",
+        )
+        for t in tasks
+    ]
+
+
+def add_dependency(db: Session, project_id: str, task_id: str, depends_on_id: str) -> models.TaskDependency:
+    """Add an edge; raises CycleError if it would close a cycle, ValueError for a self-edge."""
+    if task_id == depends_on_id:
+        raise ValueError("A task cannot depend on itself")
+    existing = (
+        db.query(models.TaskDependency)
+        .filter(models.TaskDependency.task_id == task_id, models.TaskDependency.depends_on_id == depends_on_id)
+        .first()
+    )
+    if existing:
+        return existing
+    task_ids = [t.id for t in _project_tasks(db, project_id)]
+    cycle = find_cycle(task_ids, dependency_pairs(db, project_id) + [(task_id, depends_on_id)])
+    if cycle:
+        raise CycleError(cycle)
+    dependency = models.TaskDependency(project_id=project_id, task_id=task_id, depends_on_id=depends_on_id)
+    db.add(dependency)
+    db.flush()
+    return dependency
+
+
+def remove_dependency(db: Session, project_id: str, task_id: str, depends_on_id: str) -> bool:
+    deleted = (
+        db.query(models.TaskDependency)
+        .filter(
+            models.TaskDependency.project_id == project_id,
+            models.TaskDependency.task_id == task_id,
+            models.TaskDependency.depends_on_id == depends_on_id,
+        )
+        .delete(synchronize_session=False)
+    )
+    return bool(deleted)
+
+
+def _load_state(
+    db: Session, project_id: str
+) -> Optional[Tuple[models.ProjectSchedule, Schedule, Dict[str, models.TaskSchedule]]]:
+    plan = db.get(models.ProjectSchedule, project_id)
+    if plan is None:
+        return None
+    rows = db.query(models.TaskSchedule).filter(models.TaskSchedule.project_id == project_id).all()
+    schedule = Schedule(makespan=plan.makespan_hours, critical_path=list(plan.critical_path or []))
+    queues: Dict[str, List[models.TaskSchedule]] = {}
+    for row in rows:
+        schedule.slots[row.task_id] = Slot(row.start_hour, row.finish_hour, row.slack_hours, row.critical)
+        if row.assignee_id:
+            queues.setdefault(row.assignee_id, []).append(row)
+    schedule.sequences = {
+        assignee: [r.task_id for r in sorted(queue, key=lambda r: (r.position, r.start_hour))]
+        for assignee, queue in queues.items()
+    }
+    return plan, schedule, {row.task_id: row for row in rows}
+
+
+def _write(
+    db: Session,
+    plan: models.ProjectSchedule,
+    schedule: Schedule,
+    tasks: List[models.Task],
+    rows: Dict[str, models.TaskSchedule],
+    changed: Set[str],
+) -> int:
+    """Persist slots for `changed` tasks (and queue moves); returns rows written."""
+    placement: Dict[str, Tuple[Optional[str], int]] = {}
+    for assignee, queue in schedule.sequences.items():
+        for position, task_id in enumerate(queue):
+            placement[task_id] = (assignee, position)
+
+    written = 0
+    for task in tasks:
+        assignee, position = placement.get(task.id, (None, 0))
+        row = rows.pop(task.id, None)
+        moved = row is None or row.assignee_id != assignee or row.position != position
+        if task.id not in changed and not moved:
+            continue
+        slot = schedule.slots[task.id]
+        if row is None:
+            row = models.TaskSchedule(task_id=task.id, project_id=plan.project_id)
+            db.add(row)
+        row.assignee_id = assignee
+        row.position = position
+        row.start_hour = slot.start
+        row.finish_hour = slot.finish
+        row.slack_hours = slot.slack
+        row.critical = slot.critical
+        if task.status != "done":
+            task.due_date = to_datetime(plan.starts_at, slot.finish, plan.hours_per_day)
+        written += 1
+    # Tasks that no longer exist.
+    for row in rows.values():
+        db.delete(row)
+
+    plan.makespan_hours = schedule.makespan
+    plan.critical_path = schedule.critical_path
+    db.flush()
+    return written
+
+
+def replan(db: Session, project_id: str, starts_at: Optional[datetime] = None) -> models.ProjectSchedule:
+    """Schedule the whole project from scratch and set every open task's due date."""
+    tasks = _project_tasks(db, project_id)
+    schedule = build_schedule(_sched_tasks(tasks), dependency_pairs(db, project_id))
+    state = _load_state(db, project_id)
+    if state is None:
+        plan = models.ProjectSchedule(project_id=project_id, starts_at=starts_at or datetime.now(timezone.utc))
+        db.add(plan)
+        rows: Dict[str, models.TaskSchedule] = {}
+    else:
+        plan, _, rows = state
+        plan.starts_at = starts_at or datetime.now(timezone.utc)
+    plan.hours_per_day = hours_per_day()
+    _write(db, plan, schedule, tasks, rows, {t.id for t in tasks})
+    return plan
+
+
+def reschedule_tasks(db: Session, project_id: str, task_ids: Iterable[str]) -> Optional[int]:
+    """
+    Repair the stored schedule after `task_ids` changed; only tasks whose slot
+    moved are written. No-op (None) for projects that were never scheduled.
+    """
+    state = _load_state(db, project_id)
+    if state is None:
+        return None
+    plan, previous, rows = state
+    db.flush()
+    tasks = _project_tasks(db, project_id)
+    schedule, changed = reschedule(previous, _sched_tasks(tasks), dependency_pairs(db, project_id), task_ids)
+    return _write(db, plan, schedule, tasks, rows, changed)
+
+
+def schedule_read(db: Session, project_id: str) -> Optional[schemas.ProjectScheduleRead]:
+    state = _load_state(db, project_id)
+    if state is None:
+        return None
+    plan, schedule, _ = state
+    depends_on: Dict[str, List[str]] = {}
+    for task_id, depends_on_id in dependency_pairs(db, project_id):
+        depends_on.setdefault(task_id, []).append(depends_on_id)
+    placement = {t: a for a, queue in schedule.sequences.items() for t in queue}
+
+    items = []
+    for task in _project_tasks(db, project_id):
+        slot = schedule.slots.get(task.id)
+        if slot is None:
+            continue
+        items.append(
+            schemas.ScheduledTaskRead(
+                task_id=task.id,
+                title=task.title,
+                assignee_id=placement.get(task.id, task.assignee_id),
+                status=task.status,
+                start_at=to_datetime(plan.starts_at, slot.start, plan.hours_per_day),
+                finish_at=to_datetime(plan.starts_at, slot.finish, plan.hours_per_day),
+                slack_hours=round(slot.slack, 2),
+                critical=slot.critical,
+                depends_on=depends_on.get(task.id, []),
+            )
+        )
+    items.sort(key=lambda item: (item.start_at, item.finish_at))
+    return schemas.ProjectScheduleRead(
+        project_id=project_id,
+        starts_at=plan.starts_at,
+        finishes_at=to_datetime(plan.starts_at, plan.makespan_hours, plan.hours_per_day),
+        makespan_hours=round(plan.makespan_hours, 2),
+        hours_per_day=plan.hours_per_day,
+        critical_path=list(plan.critical_path or []),
+        tasks=items,
+    )
@@ -0,0 +1,294 @@
+# crud/tasks.py
+from __future__ import annotations
+
+import base64
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import and_, event, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+
+# Columns a CSV/JSON import may set; anything else is ignored.
+IMPORT_FIELDS = ("title", "description", "assignee_id", "estimated_hours", "status", "due_date")
+TITLE_MAX_LENGTH = 255
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Fields a task listing can project onto; id is always returned.
+TASK_FIELDS = tuple(schemas.TaskRead.model_fields)
+
+
+def import_max_rows() -> int:
+    return int(os.getenv("TASK_IMPORT_MAX_ROWS", "10000"))
+
+
+def normalize_title(title: str) -> str:
+    """Duplicate key for a task title: case- and whitespace-insensitive."""
+    return " ".join(title.split()).casefold()
+
+
+def existing_titles(db: Session, project_id: str) -> Set[str]:
+    """Normalized titles of every task in a project, in one query."""
+    rows = db.query(models.Task.title).filter(models.Task.project_id == project_id)
+    return {normalize_title(title) for (title,) in rows}
+
+
+def bulk_create_tasks(
+    db: Session,
+    project_id: str,
+    items: Iterable[Mapping[str, Any]],
+    titles: Optional[Set[str]] = None,
+) -> Tuple[List[models.Task], int]:
+    """
+    Insert tasks whose title is not already in the project (or earlier in
+    `items`) with one INSERT ... RETURNING. Returns (created, skipped).
+
+    `titles` is the project's normalized title set when the caller already
+    has it; otherwise it is loaded here.
+    """
+    seen = set(titles) if titles is not None else existing_titles(db, project_id)
+    values: List[Dict[str, Any]] = []
+    skipped = 0
+    for item in items:
+        title = " ".join(str(item.get("title") or "").split())[:TITLE_MAX_LENGTH]
+        key = normalize_title(title)
+        if not key or key in seen:
+            skipped += 1
+            continue
+        seen.add(key)
+        # Every row has the same keys so the driver can send them as one batch.
+        values.append(
+            {
+                "id": models.uuid_pk(),
+                "project_id": project_id,
+                "title": title,
+                "description": item.get("description"),
+                "assignee_id": item.get("assignee_id"),
+                "estimated_hours": item.get("estimated_hours"),
+                "status": item.get("status") or "todo",
+                "due_date": item.get("due_date"),
+            }
+        )
+    if not values:
+        return [], skipped
+
+    statement = insert(models.Task).returning(models.Task, sort_by_parameter_order=True)
+    created = list(db.scalars(statement, values))
+    # Bulk INSERT bypasses the flush hook below.
+    bump_version(db, project_id)
+    return created, skipped
+
+
+def list_statement(project_id: str, status: Optional[str] = None, assignee_id: Optional[str] = None):
+    """A project's tasks, oldest first, optionally filtered by status and assignee."""
+    statement = select(models.Task).where(models.Task.project_id == project_id)
+    if status:
+        statement = statement.where(models.Task.status == status)
+    if assignee_id:
+        statement = statement.where(models.Task.assignee_id == assignee_id)
+    return statement.order_by(models.Task.created_at.asc(), models.Task.id.asc())
+
+
+def tasks_version(db: Session, project_id: str) -> int:
+    """Current task version of a project (0 if its tasks never changed)."""
+    version = (
+        db.query(models.ProjectTaskVersion.version)
+        .filter(models.ProjectTaskVersion.project_id == project_id)
+        .scalar()
+    )
+    return version or 0
+
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE.
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def bump_version(db: Session, project_id: str) -> None:
+    """
+    Increment a project's task version in one statement, creating the row on
+    the first change, so concurrent first writers don't collide on the key.
+    """
+    table = models.ProjectTaskVersion.__table__
+    connection = db.connection()
+    now = datetime.utcnow()
+    upsert = UPSERT_INSERTS.get(connection.dialect.name)
+    if upsert is not None:
+        statement = upsert(table).values(project_id=project_id, version=1, updated_at=now)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.project_id],
+                set_={"version": table.c.version + 1, "updated_at": now},
+            )
+        )
+        return
+    bumped = connection.execute(
+        update(table).where(table.c.project_id == project_id).values(version=table.c.version + 1, updated_at=now)
+    ).rowcount
+    if not bumped:
+        connection.execute(insert(table).values(project_id=project_id, version=1, updated_at=now))
+
+
+# After the flush, so a project created in the same flush already exists.
+@event.listens_for(Session, "after_flush")
+def _bump_versions_on_task_changes(session: Session, flush_context) -> None:
+    """Any task added, edited or deleted through the ORM invalidates its project's listings."""
+    project_ids = set()
+    for obj in session.new:
+        if isinstance(obj, models.Task) and obj.project_id:
+            project_ids.add(obj.project_id)
+    for obj in session.dirty:
+        if isinstance(obj, models.Task) and session.is_modified(obj, include_collections=False):
+            project_ids.add(obj.project_id)
+    for obj in session.deleted:
+        if isinstance(obj, models.Task):
+            project_ids.add(obj.project_id)
+    project_ids -= {obj.id for obj in session.deleted if isinstance(obj, models.Project)}
+    for project_id in project_ids:
+        bump_version(session, project_id)
+
+
+def encode_cursor(created_at: datetime, task_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), task_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError for a cursor this module did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(task_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _time_bound(db: Session, value: datetime):
+    """
+    SQLite stores server-default timestamps as 'YYYY-MM-DD HH:MM:SS' text while
+    bound datetimes always carry microseconds, so equal instants would compare
+    unequal; bind the same text form there instead.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return value
+    text = value.strftime("%Y-%m-%d %H:%M:%S")
+    if value.microsecond:
+        text += value.strftime(".%f")
+    return literal(text)
+
+
+def parse_fields(fields: Optional[str]) -> Sequence[str]:
+    """Requested projection from "a,b,c"; all fields when empty. Raises ValueError."""
+    if not fields:
+        return TASK_FIELDS
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown task fields: {', '.join(unknown)}")
+    return ["id"] + [f for f in dict.fromkeys(names) if f != "id"]
+
+
+def task_page(
+    db: Session,
+    project_id: str,
+    fields: Sequence[str] = TASK_FIELDS,
+    statuses: Optional[Sequence[str]] = None,
+    assignee_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of a project's tasks in (created_at, id) order, selecting only
+    `fields` (plus the keyset columns). Returns (items, next_cursor).
+    """
+    task = models.Task
+    selected = list(dict.fromkeys(list(fields) + ["created_at", "id"]))
+    query = db.query(*(getattr(task, name) for name in selected)).filter(task.project_id == project_id)
+    if statuses:
+        query = query.filter(task.status.in_(list(statuses)) if len(statuses) > 1 else task.status == statuses[0])
+    if assignee_id:
+        query = query.filter(task.assignee_id == assignee_id)
+    if cursor:
+        after_time, after_id = decode_cursor(cursor)
+        bound = _time_bound(db, after_time)
+        query = query.filter(or_(task.created_at > bound, and_(task.created_at == bound, task.id > after_id)))
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = query.order_by(task.created_at.asc(), task.id.asc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [{name: getattr(row, name) for name in fields} for row in rows], next_cursor
+
+
+def _rows_from_json(data: bytes) -> List[Any]:
+    parsed = json.loads(data.decode("utf-8-sig"))
+    if isinstance(parsed, dict):
+        parsed = parsed.get("tasks")
+    if not isinstance(parsed, list):
+        raise ValueError("JSON import must be a list of tasks or an object with a 'tasks' list")
+    return parsed
+
+
+def _rows_from_csv(data: bytes) -> List[Any]:
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig"), newline=""))
+    if not reader.fieldnames or "title" not in [f.strip().lower() for f in reader.fieldnames]:
+        raise ValueError("CSV import needs a header row with a 'title' column")
+    rows = []
+    for row in reader:
+        cleaned = {}
+        for key, value in row.items():
+            if key is None:
+                continue
+            value = (value or "").strip()
+            cleaned[key.strip().lower()] = value or None
+        rows.append(cleaned)
+    return rows
+
+
+def parse_task_import(filename: str, data: bytes) -> List[Dict[str, Any]]:
+    """
+    Validated task dicts from a .json or .csv upload (other names are tried as
+    JSON, then CSV). Raises ValueError naming the first rows that are invalid.
+    """
+    name = (filename or "").lower()
+    try:
+        if name.endswith(".csv"):
+            raw = _rows_from_csv(data)
+        elif name.endswith(".json"):
+            raw = _rows_from_json(data)
+        else:
+            try:
+                raw = _rows_from_json(data)
+            except ValueError:
+                raw = _rows_from_csv(data)
+    except UnicodeDecodeError:
+        raise ValueError("Task import must be UTF-8 text")
+
+    if len(raw) > import_max_rows():
+        raise ValueError(f"Task import is limited to {import_max_rows()} rows")
+
+    tasks: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    for number, row in enumerate(raw, start=1):
+        if not isinstance(row, dict):
+            errors.append(f"row {number}: expected an object")
+            continue
+        try:
+            task = schemas.TaskCreate.model_validate({k: row[k] for k in IMPORT_FIELDS if row.get(k) is not None})
+        except ValidationError as e:
+            first = e.errors()[0]
+            errors.append(f"row {number}: {'.'.join(str(p) for p in first['loc'])} {first['msg']}")
+            continue
+        tasks.append(task.model_dump())
+    if errors:
+        more = f" (and {len(errors) - 5} more)" if len(errors) > 5 else ""
+        raise ValueError("Invalid task import: " + "; ".join(errors[:5]) + more)
+    return tasks
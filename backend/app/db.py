@@ -1,9 +1,15 @@
+from typing import Any, Dict, Optional
+import importlib.util
+
 from sqlalchemy import create_engine
 from sqlalchemy.engine import make_url
 from sqlalchemy.exc import ArgumentError
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from starlette.concurrency import run_in_threadpool
 import os
 
+from .db_pool import ObservedAsyncQueuePool, ObservedQueuePool, pool_settings, pool_status, workers
+
 
 def _normalize_database_url(raw_url: str) -> str:
 	"""
@@ -99,17 +105,80 @@ if _raw_database_url.startswith("postgresql"):
 
 DATABASE_URL = _normalize_database_url(_raw_database_url)
 
+# ---------------------------------------------------------------------------
+# Optional async engine
+#
+# Hot read paths are `async def` routes that take an AsyncSession from
+# get_async_db() and so never occupy a threadpool thread. The async engine
+# runs on the same database as the sync one: psycopg's async mode for
+# PostgreSQL (or asyncpg via ASYNC_DATABASE_URL), aiosqlite for SQLite.
+# Without an async driver, get_async_db() hands out a ThreadedSession that
+# runs the same statements on a sync session in the threadpool, so the
+# routes work either way.
+# ---------------------------------------------------------------------------
+
+def _async_database_url(url: str) -> Optional[str]:
+	"""The async engine URL for `url`: ASYNC_DATABASE_URL, else its async-driver form."""
+	return os.getenv("ASYNC_DATABASE_URL") or _async_driver_url(url)
+
+
+def _async_driver_url(url: str) -> Optional[str]:
+	"""The async-driver form of `url`, or None if it has no usable async driver."""
+	if url.startswith("sqlite"):
+		# A second connection to :memory: would be a different, empty database.
+		if ":memory:" in url or url.rstrip("/") == "sqlite:":
+			return None
+		if importlib.util.find_spec("aiosqlite") is None:
+			return None
+		return url.replace("sqlite://", "sqlite+aiosqlite://", 1).replace("sqlite+pysqlite://", "sqlite+aiosqlite://", 1)
+	if url.startswith("postgresql+psycopg://"):
+		# psycopg 3 is async-capable; SQLAlchemy picks its async dialect.
+		return url
+	if url.startswith("postgresql+asyncpg://"):
+		return url
+	return None
+
+
+def _enabled_async_url() -> Optional[str]:
+	"""The async engine's URL, or None when ASYNC_DATABASE is off or no driver fits."""
+	mode = os.getenv("ASYNC_DATABASE", "false").lower()
+	if mode in {"0", "false", "no", "off"}:
+		return None
+	url = _async_database_url(DATABASE_URL)
+	if url is None:
+		if mode in {"1", "true", "yes", "on"}:
+			import logging
+			logging.getLogger(__name__).warning("ASYNC_DATABASE is on but no async driver fits DATABASE_URL; using the threadpool")
+		return None
+	if importlib.util.find_spec("greenlet") is None:
+		return None
+	return url
+
+
+ASYNC_DATABASE_URL = _enabled_async_url()
+# Both engines draw on the same per-worker connection budget (see db_pool).
+_POOL = pool_settings(engines=2 if ASYNC_DATABASE_URL else 1)
+
+
 # SQLite parameters
 if DATABASE_URL.startswith("sqlite"):
-	engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+	if ":memory:" in DATABASE_URL:
+		engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+	else:
+		engine = create_engine(
+			DATABASE_URL,
+			connect_args={"check_same_thread": False},
+			poolclass=ObservedQueuePool,
+			**_POOL.as_kwargs(),
+		)
 else:
-	# PostgreSQL connection pool settings to prevent timeouts
+	# PostgreSQL connection pool: sizes from DB_POOL_SIZE / DB_MAX_OVERFLOW,
+	# capped by DB_MAX_CONNECTIONS across workers (see db_pool.pool_settings)
 	engine = create_engine(
 		DATABASE_URL,
 		pool_pre_ping=True,  # Verify connections before using
-		pool_size=5,  # Number of connections to maintain
-		max_overflow=10,  # Additional connections beyond pool_size
-		pool_recycle=3600,  # Recycle connections after 1 hour
+		poolclass=ObservedQueuePool,
+		**_POOL.as_kwargs(),
 		connect_args={
 			"connect_timeout": 10,  # Connection timeout in seconds
 			"application_name": "workexperio_backend",
@@ -131,6 +200,77 @@ def get_db():
 		db.close()
 
 
+def _create_async_engine():
+	if ASYNC_DATABASE_URL is None:
+		return None
+	from sqlalchemy.ext.asyncio import create_async_engine
+
+	kwargs: Dict[str, Any] = {"poolclass": ObservedAsyncQueuePool, **_POOL.as_kwargs()}
+	if not ASYNC_DATABASE_URL.startswith("sqlite"):
+		kwargs["pool_pre_ping"] = True
+	return create_async_engine(ASYNC_DATABASE_URL, **kwargs)
+
+
+async_engine = _create_async_engine()
+
+if async_engine is not None:
+	from sqlalchemy.ext.asyncio import async_sessionmaker
+
+	AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+else:
+	AsyncSessionLocal = None
+
+
+class ThreadedSession:
+	"""
+	The part of AsyncSession the async routes use, backed by a sync Session
+	whose calls run in the threadpool.
+	"""
+
+	def __init__(self, session):
+		self.sync_session = session
+
+	@property
+	def info(self) -> dict:
+		return self.sync_session.info
+
+	async def execute(self, statement, params=None):
+		return await run_in_threadpool(self.sync_session.execute, statement, params)
+
+	async def scalars(self, statement, params=None):
+		return await run_in_threadpool(self.sync_session.scalars, statement, params)
+
+	async def scalar(self, statement, params=None):
+		return await run_in_threadpool(self.sync_session.scalar, statement, params)
+
+	async def get(self, entity, ident):
+		return await run_in_threadpool(self.sync_session.get, entity, ident)
+
+	async def close(self) -> None:
+		await run_in_threadpool(self.sync_session.close)
+
+
+def pool_snapshot() -> Dict[str, Any]:
+	"""Connection pool state of this worker's engines, for /metrics."""
+	snapshot: Dict[str, Any] = {"workers": workers(), "sync": pool_status(engine.pool)}
+	if async_engine is not None:
+		snapshot["async"] = pool_status(async_engine.sync_engine.pool)
+	return snapshot
+
+
+def new_async_session():
+	"""An AsyncSession on the primary, or a ThreadedSession without an async engine."""
+	return AsyncSessionLocal() if AsyncSessionLocal is not None else ThreadedSession(SessionLocal())
+
+
+async def get_async_db():
+	db = new_async_session()
+	try:
+		yield db
+	finally:
+		await db.close()
+
+
 def create_all_tables():
 	"""
 	Import all models and create tables if they do not exist.
@@ -141,5 +281,33 @@ def create_all_tables():
 	# Local import to avoid circular
 	from . import models  # noqa: F401
 	Base.metadata.create_all(bind=engine)
+	create_missing_indexes(engine)
+
+
+def create_missing_indexes(bind) -> None:
+	"""
+	Create indexes declared on the models that an existing table lacks.
+
+	create_all() only emits indexes together with new tables, so indexes
+	added to tables that already exist would otherwise never be built.
+	"""
+	import logging
+	from sqlalchemy import inspect
+
+	logger = logging.getLogger(__name__)
+	inspector = inspect(bind)
+	existing_tables = set(inspector.get_table_names())
+	for table in Base.metadata.sorted_tables:
+		if table.name not in existing_tables or not table.indexes:
+			continue
+		existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+		for index in table.indexes:
+			if index.name in existing:
+				continue
+			try:
+				index.create(bind=bind, checkfirst=True)
+				logger.info(f"Created index {index.name} on {table.name}")
+			except Exception as e:
+				logger.warning(f"Could not create index {index.name} on {table.name}: {e}")
 
 
@@ -0,0 +1,153 @@
+"""
+Connection pool sizing and pool metrics for the engines in db.py.
+
+Pool limits come from the environment. DB_MAX_CONNECTIONS is the database's
+budget for this whole service: it is split across the WEB_CONCURRENCY worker
+processes (and across the sync and async engines of each) so that adding
+workers never lets the service open more connections than the server takes.
+
+The app's engines use ObservedQueuePool / ObservedAsyncQueuePool, which time
+every checkout. pool_status() combines those timings with the pool's own
+in-use and overflow counts for the /metrics endpoint.
+"""
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Deque, Dict, List
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def workers() -> int:
+	"""Worker processes sharing the database (gunicorn/uvicorn WEB_CONCURRENCY)."""
+	return max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+	pool_size: int
+	max_overflow: int
+	pool_timeout: float
+	pool_recycle: int
+
+	def as_kwargs(self) -> Dict[str, Any]:
+		return {
+			"pool_size": self.pool_size,
+			"max_overflow": self.max_overflow,
+			"pool_timeout": self.pool_timeout,
+			"pool_recycle": self.pool_recycle,
+		}
+
+
+def pool_settings(engines: int = 1) -> PoolSettings:
+	"""
+	Pool limits for one engine of one worker. With DB_MAX_CONNECTIONS set, the
+	pool plus its overflow is capped at that budget / (workers * engines).
+	"""
+	size = int(os.getenv("DB_POOL_SIZE", "5"))
+	overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+	budget = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+	if budget > 0:
+		share = max(1, budget // (workers() * max(1, engines)))
+		size = min(size, share)
+		overflow = max(0, min(overflow, share - size))
+	return PoolSettings(
+		pool_size=max(1, size),
+		max_overflow=max(0, overflow),
+		pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+		pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "3600")),
+	)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+	if not samples:
+		return 0.0
+	ordered = sorted(samples)
+	index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+	return float(ordered[index])
+
+
+class PoolStats:
+	"""Checkout counts and bounded samples of checkout wait time."""
+
+	def __init__(self, max_samples: int = 1000) -> None:
+		self._lock = Lock()
+		self._wait_ms: Deque[float] = deque(maxlen=max_samples)
+		self._checkouts = 0
+		self._timeouts = 0
+
+	def record_checkout(self, wait_ms: float) -> None:
+		with self._lock:
+			self._checkouts += 1
+			self._wait_ms.append(wait_ms)
+
+	def record_timeout(self) -> None:
+		with self._lock:
+			self._timeouts += 1
+
+	def snapshot(self) -> Dict[str, Any]:
+		with self._lock:
+			waits = list(self._wait_ms)
+			checkouts, timeouts = self._checkouts, self._timeouts
+		return {
+			"checkouts": checkouts,
+			"timeouts": timeouts,
+			"wait_ms_p50": round(_percentile(waits, 50), 3),
+			"wait_ms_p95": round(_percentile(waits, 95), 3),
+			"wait_ms_max": round(max(waits), 3) if waits else 0.0,
+		}
+
+	def reset(self) -> None:
+		with self._lock:
+			self._wait_ms.clear()
+			self._checkouts = self._timeouts = 0
+
+
+# One per pool class, so the stats survive engine.dispose() recreating the pool.
+sync_pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+
+class _TimedCheckout:
+	stats: PoolStats
+
+	def _do_get(self):
+		started = time.perf_counter()
+		try:
+			connection = super()._do_get()
+		except PoolTimeoutError:
+			self.stats.record_timeout()
+			raise
+		self.stats.record_checkout((time.perf_counter() - started) * 1000.0)
+		return connection
+
+
+class ObservedQueuePool(_TimedCheckout, QueuePool):
+	stats = sync_pool_stats
+
+
+class ObservedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+	stats = async_pool_stats
+
+
+def pool_status(pool) -> Dict[str, Any]:
+	"""In-use, idle and overflow connections of `pool`, plus its checkout timings."""
+	status: Dict[str, Any] = {"pool": type(pool).__name__}
+	if isinstance(pool, QueuePool):
+		status.update(
+			size=pool.size(),
+			max_overflow=pool._max_overflow,
+			in_use=pool.checkedout(),
+			idle=pool.checkedin(),
+			# overflow() starts at -size and counts up as connections open.
+			overflow=max(0, pool.overflow()),
+		)
+	stats = getattr(pool, "stats", None)
+	if stats is not None:
+		status.update(stats.snapshot())
+	return status
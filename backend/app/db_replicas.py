@@ -0,0 +1,387 @@
+"""
+Read-replica routing for heavy read endpoints.
+
+DATABASE_REPLICA_URLS lists replica databases (comma-separated). Routes that
+only read take get_read_db() / get_async_read_db() instead of get_db() /
+get_async_db() and are served by a replica when one is usable, else by the
+primary:
+
+- Replicas are picked round-robin among those that answered their last
+  check and lag the primary by at most REPLICA_MAX_LAG_SECONDS. Each replica
+  is re-checked at most once per REPLICA_CHECK_INTERVAL_SECONDS.
+- Read-your-writes: a request that commits a write fences its user onto the
+  primary for REPLICA_STICKY_SECONDS. The fence lives in this worker's
+  memory; set the sticky window at least as long as the allowed lag.
+- Replica sessions refuse to flush, so a write on a read route fails loudly
+  instead of landing on a replica.
+
+Without DATABASE_REPLICA_URLS the read dependencies are the primary ones.
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from . import db as primary
+from .db_pool import pool_settings, pool_status
+from .security import decode_access_token
+
+logger = logging.getLogger(__name__)
+
+_READ_ONLY = "read_only"
+_WROTE = "replica_fence_wrote"
+
+
+def replica_urls() -> List[str]:
+	raw = os.getenv("DATABASE_REPLICA_URLS", "")
+	return [primary._normalize_database_url(url.strip()) for url in raw.split(",") if url.strip()]
+
+
+def max_lag() -> float:
+	return float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+
+
+def check_interval() -> float:
+	return float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "5"))
+
+
+def sticky_seconds() -> float:
+	return float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+
+def replication_lag(conn: Connection) -> float:
+	"""
+	Seconds the replica behind `conn` trails its primary. PostgreSQL reports 0
+	once everything received is replayed (an idle primary is not lag); other
+	databases have no standard measure and report 0.
+	"""
+	if conn.dialect.name != "postgresql":
+		return 0.0
+	lag = conn.execute(
+		text(
+			"SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+			"THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+		)
+	).scalar()
+	return float(lag or 0.0)
+
+
+class Replica:
+	def __init__(self, name: str, engine: Engine, async_engine=None) -> None:
+		self.name = name
+		self.engine = engine
+		self.sessions = sessionmaker(bind=engine, autoflush=False, info={_READ_ONLY: True})
+		self.async_engine = async_engine
+		self.async_sessions = None
+		if async_engine is not None:
+			from sqlalchemy.ext.asyncio import async_sessionmaker
+
+			self.async_sessions = async_sessionmaker(
+				async_engine, autoflush=False, expire_on_commit=False, info={_READ_ONLY: True}
+			)
+		self.healthy = True
+		self.lag: Optional[float] = None
+		self.error: Optional[str] = None
+		self.checked_at = float("-inf")
+		self.reads = 0
+
+
+class ReplicaRouter:
+	"""Picks a fresh, healthy replica for a read, or None for the primary."""
+
+	def __init__(
+		self,
+		replicas: Sequence[Replica],
+		lag_limit: Optional[float] = None,
+		interval: Optional[float] = None,
+		lag_probe: Callable[[Connection], float] = replication_lag,
+	) -> None:
+		self.replicas = list(replicas)
+		self._lag_limit = lag_limit
+		self._interval = interval
+		self._lag_probe = lag_probe
+		self._lock = Lock()
+		self._turn = itertools.count()
+		self.primary_reads = 0
+
+	@property
+	def lag_limit(self) -> float:
+		return max_lag() if self._lag_limit is None else self._lag_limit
+
+	@property
+	def interval(self) -> float:
+		return check_interval() if self._interval is None else self._interval
+
+	def _stale(self) -> List[Replica]:
+		now = time.monotonic()
+		return [r for r in self.replicas if now - r.checked_at >= self.interval]
+
+	def needs_check(self) -> bool:
+		return bool(self._stale())
+
+	def check(self) -> None:
+		"""Re-measure lag on every replica whose last check is older than the interval."""
+		for replica in self._stale():
+			# Claim the check so concurrent requests do not all probe at once.
+			replica.checked_at = time.monotonic()
+			try:
+				with replica.engine.connect() as conn:
+					replica.lag = self._lag_probe(conn)
+				replica.healthy, replica.error = True, None
+			except Exception as e:
+				if replica.healthy:
+					logger.warning(f"Read replica {replica.name} unavailable: {e}")
+				replica.healthy, replica.error = False, str(e)[:200]
+
+	def usable(self, replica: Replica) -> bool:
+		return replica.healthy and (replica.lag or 0.0) <= self.lag_limit
+
+	def pick(self) -> Optional[Replica]:
+		candidates = [r for r in self.replicas if self.usable(r)]
+		with self._lock:
+			if not candidates:
+				self.primary_reads += 1
+				return None
+			replica = candidates[next(self._turn) % len(candidates)]
+			replica.reads += 1
+			return replica
+
+	def to_primary(self) -> None:
+		with self._lock:
+			self.primary_reads += 1
+
+	def snapshot(self) -> Dict[str, Any]:
+		return {
+			"primary_reads": self.primary_reads,
+			"max_lag_seconds": self.lag_limit,
+			"replicas": [
+				{
+					"name": r.name,
+					"healthy": r.healthy,
+					"usable": self.usable(r),
+					"lag_seconds": r.lag,
+					"error": r.error,
+					"reads": r.reads,
+					**pool_status(r.engine.pool),
+				}
+				for r in self.replicas
+			],
+		}
+
+
+class WriteFence:
+	"""Users who wrote recently, and until when their reads stay on the primary."""
+
+	def __init__(self, max_entries: int = 10000) -> None:
+		self._lock = Lock()
+		self._until: "OrderedDict[str, float]" = OrderedDict()
+		self.max_entries = max_entries
+
+	def mark(self, user_id: str, seconds: Optional[float] = None) -> None:
+		until = time.monotonic() + (sticky_seconds() if seconds is None else seconds)
+		with self._lock:
+			self._until[user_id] = until
+			self._until.move_to_end(user_id)
+			while len(self._until) > self.max_entries:
+				self._until.popitem(last=False)
+
+	def active(self, user_id: Optional[str]) -> bool:
+		if not user_id:
+			return False
+		with self._lock:
+			until = self._until.get(user_id)
+			if until is None:
+				return False
+			if until <= time.monotonic():
+				del self._until[user_id]
+				return False
+			return True
+
+	def clear(self) -> None:
+		with self._lock:
+			self._until.clear()
+
+
+write_fence = WriteFence()
+
+# Per-request record of whether the request committed a write (see middleware).
+_request_writes: ContextVar[Optional[Dict[str, bool]]] = ContextVar("request_writes", default=None)
+
+
+def _create_router() -> Optional[ReplicaRouter]:
+	urls = replica_urls()
+	if not urls:
+		return None
+	settings = pool_settings()
+	replicas = []
+	for index, url in enumerate(urls):
+		# A plain QueuePool: checkout timings in /metrics are the primary's.
+		kwargs: Dict[str, Any] = {"poolclass": QueuePool, **settings.as_kwargs()}
+		if url.startswith("sqlite"):
+			kwargs["connect_args"] = {"check_same_thread": False}
+		else:
+			kwargs["pool_pre_ping"] = True
+		async_engine = None
+		# Async routes get an async engine per replica when the primary has one.
+		async_url = primary._async_driver_url(url) if primary.async_engine is not None else None
+		if async_url:
+			from sqlalchemy.ext.asyncio import create_async_engine
+
+			async_engine = create_async_engine(
+				async_url, **settings.as_kwargs(), **({} if url.startswith("sqlite") else {"pool_pre_ping": True})
+			)
+		replicas.append(Replica(f"replica-{index}", create_engine(url, **kwargs), async_engine))
+	return ReplicaRouter(replicas)
+
+
+replica_router = _create_router()
+
+
+def _user_id(request: Request) -> Optional[str]:
+	"""Subject of the request's bearer token, if any (no database lookup)."""
+	auth = request.headers.get("authorization", "")
+	if not auth.lower().startswith("bearer "):
+		return None
+	try:
+		return decode_access_token(auth[7:]).get("sub")
+	except Exception:
+		return None
+
+
+def _fenced(request: Request) -> bool:
+	return write_fence.active(_user_id(request))
+
+
+def get_read_db(request: Request, db: Session = Depends(primary.get_db)):
+	"""
+	get_db() for read-only routes: a replica session when one is usable, else
+	the request's own primary session (the one get_current_user loaded the
+	caller on), so a read route holds one primary connection, not two.
+	"""
+	router = replica_router
+	replica = None
+	if router is not None:
+		if _fenced(request):
+			router.to_primary()
+		else:
+			if router.needs_check():
+				router.check()
+			replica = router.pick()
+	if replica is None:
+		yield db
+		return
+	replica_db = replica.sessions()
+	try:
+		yield replica_db
+	finally:
+		replica_db.close()
+
+
+async def get_async_read_db(request: Request, db=Depends(primary.get_async_db)):
+	"""get_async_db() for read-only routes: a replica session when one is usable, else the request's own."""
+	router = replica_router
+	replica = None
+	if router is not None:
+		if _fenced(request):
+			router.to_primary()
+		else:
+			if router.needs_check():
+				await run_in_threadpool(router.check)
+			replica = router.pick()
+	if replica is None:
+		yield db
+		return
+	if replica.async_sessions is not None:
+		replica_db = replica.async_sessions()
+	else:
+		replica_db = primary.ThreadedSession(replica.sessions())
+	try:
+		yield replica_db
+	finally:
+		await replica_db.close()
+
+
+class ReadYourWritesMiddleware:
+	"""Pure ASGI: fence the user onto the primary after a request that committed a write."""
+
+	def __init__(self, app) -> None:
+		self.app = app
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope["type"] != "http" or replica_router is None:
+			await self.app(scope, receive, send)
+			return
+		writes = {"wrote": False, "fenced": False}
+
+		def fence() -> None:
+			if writes["wrote"] and not writes["fenced"]:
+				writes["fenced"] = True
+				user_id = _user_id(Request(scope))
+				if user_id:
+					write_fence.mark(user_id)
+
+		async def send_fenced(message) -> None:
+			# Before the client sees the response, so its next read already goes to the primary.
+			if message["type"] == "http.response.start":
+				fence()
+			await send(message)
+
+		token = _request_writes.set(writes)
+		try:
+			await self.app(scope, receive, send_fenced)
+		finally:
+			_request_writes.reset(token)
+			fence()
+
+
+def snapshot() -> Dict[str, Any]:
+	return replica_router.snapshot() if replica_router is not None else {}
+
+
+# --- session hooks ---
+
+
+@event.listens_for(Session, "before_flush")
+def _refuse_replica_writes(session: Session, flush_context, instances) -> None:
+	if session.info.get(_READ_ONLY) and (session.new or session.dirty or session.deleted):
+		raise RuntimeError("Read-only session: this route reads from a replica and cannot write")
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed_writes(session: Session, flush_context) -> None:
+	if session.new or session.dirty or session.deleted:
+		session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk_writes(orm_execute_state) -> None:
+	if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+		if orm_execute_state.session.info.get(_READ_ONLY):
+			raise RuntimeError("Read-only session: this route reads from a replica and cannot write")
+		orm_execute_state.session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _fence_after_commit(session: Session) -> None:
+	if session.info.pop(_WROTE, False):
+		writes = _request_writes.get()
+		if writes is not None:
+			writes["wrote"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session: Session) -> None:
+	session.info.pop(_WROTE, None)
@@ -1,33 +1,61 @@
+import os
+from typing import Set
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from sqlalchemy.orm import Session
 
 from .config import settings, TokenData
-from .db import get_db
+from .db import get_async_db, get_db
 from .models import User
 from .security import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-	credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+	return HTTPException(
 		status_code=status.HTTP_401_UNAUTHORIZED,
 		detail="Could not validate credentials",
 		headers={"WWW-Authenticate": "Bearer"},
 	)
+
+
+def _token_subject(token: str) -> str:
 	try:
 		payload = decode_access_token(token)
 		sub: str = payload.get("sub")
 		if sub is None:
-			raise credentials_exception
+			raise _credentials_exception()
 		token_data = TokenData(sub=sub)
 	except JWTError:
-		raise credentials_exception
+		raise _credentials_exception()
+	return token_data.sub
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+	user = db.query(User).filter(User.id == _token_subject(token)).first()
+	if user is None:
+		raise _credentials_exception()
+	return user
+
+
+def admin_emails() -> Set[str]:
+	return {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+	"""The current user, if their email is listed in ADMIN_EMAILS."""
+	if (current_user.email or "").lower() not in admin_emails():
+		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+	return current_user
+
 
-	user = db.query(User).filter(User.id == token_data.sub).first()
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db=Depends(get_async_db)) -> User:
+	"""get_current_user() for async routes, on the request's async session."""
+	user = await db.get(User, _token_subject(token))
 	if user is None:
-		raise credentials_exception
+		raise _credentials_exception()
 	return user
 
@@ -0,0 +1,261 @@
+"""
+Index audit: EXPLAIN the application's hot queries and flag full table scans.
+
+Run against the configured DATABASE_URL:
+
+	python -m app.index_audit
+	python -m app.index_audit --min-rows 0 --json
+
+Also runs at startup when INDEX_AUDIT_ON_STARTUP is set, logging a warning
+per finding. A scan is only reported as a problem when the table holds at
+least INDEX_AUDIT_MIN_ROWS rows; below that a sequential scan is what the
+planner should pick anyway.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger(__name__)
+
+# Stand-in id for query parameters; plans do not depend on the value.
+_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def min_rows() -> int:
+	return int(os.getenv("INDEX_AUDIT_MIN_ROWS", "1000"))
+
+
+def audit_on_startup() -> bool:
+	return os.getenv("INDEX_AUDIT_ON_STARTUP", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass
+class Finding:
+	query: str
+	table: str
+	rows: int
+	detail: str
+	# True when the table is large enough for the scan to matter.
+	problem: bool
+
+
+@dataclass
+class AuditReport:
+	dialect: str
+	queries: int = 0
+	findings: List[Finding] = field(default_factory=list)
+	errors: Dict[str, str] = field(default_factory=dict)
+
+	@property
+	def problems(self) -> List[Finding]:
+		return [f for f in self.findings if f.problem]
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"dialect": self.dialect,
+			"queries": self.queries,
+			"problems": len(self.problems),
+			"findings": [asdict(f) for f in self.findings],
+			"errors": self.errors,
+		}
+
+
+def hot_queries() -> List[Tuple[str, Select]]:
+	"""The lookups routers run on nearly every request, as they run them."""
+	from .models import (
+		AIChatMessage,
+		AIConversation,
+		ChatMessage,
+		Project,
+		ProjectContribution,
+		ProjectFile,
+		ProjectWaitlist,
+		Skill,
+		Task,
+		TaskDependency,
+		TaskSchedule,
+		Team,
+		TeamMember,
+		TimeLog,
+	)
+
+	return [
+		("tasks by project", select(Task).where(Task.project_id == _ID).order_by(Task.created_at, Task.id)),
+		(
+			"tasks by project and status",
+			select(Task).where(Task.project_id == _ID, Task.status == "todo").order_by(Task.created_at),
+		),
+		("tasks by assignee and status", select(Task).where(Task.assignee_id == _ID, Task.status != "done")),
+		("projects by owner", select(Project).where(Project.owner_id == _ID)),
+		("projects by team", select(Project).where(Project.team_id == _ID)),
+		("team by project", select(Team).where(Team.project_id == _ID)),
+		("team members by team", select(TeamMember).where(TeamMember.team_id == _ID)),
+		("team membership check", select(TeamMember).where(TeamMember.team_id == _ID, TeamMember.user_id == _ID)),
+		("teams of a user", select(TeamMember.team_id).where(TeamMember.user_id == _ID)),
+		("waitlist by project", select(ProjectWaitlist).where(ProjectWaitlist.project_id == _ID)),
+		(
+			"chat history",
+			select(ChatMessage).where(ChatMessage.project_id == _ID).order_by(ChatMessage.created_at.desc()).limit(50),
+		),
+		(
+			"project AI chat history",
+			select(AIChatMessage)
+			.where(AIChatMessage.project_id == _ID)
+			.order_by(AIChatMessage.created_at.desc())
+			.limit(30),
+		),
+		("assistant history", select(AIConversation).where(AIConversation.user_id == _ID).limit(30)),
+		("project files", select(ProjectFile).where(ProjectFile.project_id == _ID)),
+		("running timer", select(TimeLog).where(TimeLog.task_id == _ID, TimeLog.user_id == _ID, TimeLog.end_time.is_(None))),
+		("user time totals", select(func.sum(TimeLog.duration_minutes)).where(TimeLog.user_id == _ID)),
+		(
+			"contribution row",
+			select(ProjectContribution).where(ProjectContribution.project_id == _ID, ProjectContribution.user_id == _ID),
+		),
+		("member skills", select(Skill.user_id, Skill.name).where(Skill.user_id.in_([_ID, _ID[:-1] + "1"]))),
+		("task dependencies", select(TaskDependency).where(TaskDependency.project_id == _ID)),
+		("task schedule", select(TaskSchedule).where(TaskSchedule.project_id == _ID)),
+	]
+
+
+def _compile(conn: Connection, statement: Select) -> Tuple[str, Any]:
+	compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+	if compiled.positional:
+		return str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)
+	return str(compiled), compiled.params
+
+
+# SQLite: "SCAN tasks" is a full scan; "SEARCH ..." and "SCAN t USING [COVERING] INDEX" are not.
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)\b(?! USING)")
+
+
+def _sqlite_scans(conn: Connection, sql: str, params: Any) -> List[Tuple[str, str]]:
+	rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+	scans = []
+	for row in rows:
+		detail = row[-1]
+		match = _SQLITE_SCAN.match(detail)
+		if match:
+			scans.append((match.group(1), detail))
+	return scans
+
+
+def _postgres_nodes(plan: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+	yield plan
+	for child in plan.get("Plans", ()):
+		yield from _postgres_nodes(child)
+
+
+def _postgres_scans(conn: Connection, sql: str, params: Any) -> List[Tuple[str, str]]:
+	document = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+	if isinstance(document, str):
+		document = json.loads(document)
+	scans = []
+	for node in _postgres_nodes(document[0]["Plan"]):
+		if node.get("Node Type") == "Seq Scan":
+			detail = f"Seq Scan on {node['Relation Name']} (est. {node.get('Plan Rows')} rows)"
+			if node.get("Filter"):
+				detail += f" Filter: {node['Filter']}"
+			scans.append((node["Relation Name"], detail))
+	return scans
+
+
+def _table_rows(conn: Connection, table: str, cache: Dict[str, int]) -> int:
+	if table not in cache:
+		if conn.dialect.name == "postgresql":
+			# Planner estimate; avoids counting large tables.
+			estimate = conn.exec_driver_sql(
+				"SELECT reltuples::bigint FROM pg_class WHERE relname = %(table)s", {"table": table}
+			).scalar()
+			cache[table] = max(int(estimate or 0), 0)
+		else:
+			cache[table] = int(conn.exec_driver_sql(f'SELECT COUNT(*) FROM "{table}"').scalar() or 0)
+	return cache[table]
+
+
+def run_audit(
+	bind: Engine,
+	threshold: Optional[int] = None,
+	queries: Optional[List[Tuple[str, Select]]] = None,
+) -> AuditReport:
+	"""EXPLAIN every hot query and report the full scans it plans."""
+	threshold = min_rows() if threshold is None else threshold
+	queries = hot_queries() if queries is None else queries
+	report = AuditReport(dialect=bind.dialect.name, queries=len(queries))
+	explain: Callable[[Connection, str, Any], List[Tuple[str, str]]]
+	if bind.dialect.name == "postgresql":
+		explain = _postgres_scans
+	elif bind.dialect.name == "sqlite":
+		explain = _sqlite_scans
+	else:
+		report.errors["*"] = f"EXPLAIN is not supported for {bind.dialect.name}"
+		return report
+
+	from .db import Base
+
+	sizes: Dict[str, int] = {}
+	with bind.connect() as conn:
+		for name, statement in queries:
+			try:
+				sql, params = _compile(conn, statement)
+				scans = explain(conn, sql, params)
+			except Exception as e:
+				report.errors[name] = str(e)
+				conn.rollback()
+				continue
+			for table, detail in scans:
+				if table not in Base.metadata.tables:
+					continue
+				rows = _table_rows(conn, table, sizes)
+				report.findings.append(Finding(name, table, rows, detail, rows >= threshold))
+	return report
+
+
+def log_report(report: AuditReport) -> None:
+	for finding in report.problems:
+		logger.warning(
+			f"Index audit: '{finding.query}' scans {finding.table} ({finding.rows} rows): {finding.detail}"
+		)
+	for name, error in report.errors.items():
+		logger.warning(f"Index audit: could not explain '{name}': {error}")
+	if not report.problems:
+		logger.info(f"Index audit: {report.queries} hot queries, no full scans on large tables")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="EXPLAIN the app's hot queries and flag full table scans.")
+	parser.add_argument("--min-rows", type=int, default=None, help="only flag scans on tables at least this large")
+	parser.add_argument("--create-missing", action="store_true", help="build indexes declared on the models first")
+	parser.add_argument("--json", action="store_true", help="print the report as JSON")
+	args = parser.parse_args(argv)
+
+	from .db import create_missing_indexes, engine
+
+	if args.create_missing:
+		create_missing_indexes(engine)
+	report = run_audit(engine, args.min_rows)
+	if args.json:
+		print(json.dumps(report.as_dict(), indent=2))
+	else:
+		for finding in report.findings:
+			flag = "PROBLEM" if finding.problem else "ok (small)"
+			print(f"{flag:10} {finding.query:32} {finding.table} ({finding.rows} rows): {finding.detail}")
+		for name, error in report.errors.items():
+			print(f"{'ERROR':10} {name:32} {error}")
+		print(f"{report.queries} queries, {len(report.problems)} problem scans")
+	return 1 if report.problems or report.errors else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import uuid
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+from .models import Job
+from .schemas import JobRead
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+JobHandler = Callable[[Session, Job], Optional[Dict[str, Any]]]
+
+
+def job_to_dict(job: Job) -> Dict[str, Any]:
+	return JobRead.model_validate(job).model_dump(mode="json")
+
+
+def spool_dir() -> str:
+	return os.getenv("JOBS_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "workexperio-jobs"))
+
+
+def spool_upload(source: BinaryIO) -> str:
+	"""Copy an uploaded file to the spool directory and return its path."""
+	directory = spool_dir()
+	os.makedirs(directory, exist_ok=True)
+	fd, path = tempfile.mkstemp(dir=directory, suffix=".upload")
+	with os.fdopen(fd, "wb") as target:
+		shutil.copyfileobj(source, target, 1024 * 1024)
+	return path
+
+
+class JobManager:
+	"""
+	Persistent background jobs run on a small worker pool.
+
+	Job rows live in the database so clients can poll them and so queued work
+	survives a restart. Dispatch is fair under load: a job only starts when
+	both its provider (e.g. "openai") and its user are below their concurrency
+	limits, otherwise it waits in the queue without holding a worker thread.
+
+	Several processes may share the table: a worker claims a job with a
+	conditional update before running it, and stamps a heartbeat on the jobs
+	it is running so the others can tell when it is gone. The concurrency
+	limits are counted per process, not across them.
+	"""
+
+	def __init__(
+		self,
+		session_factory: Callable[[], Session] = SessionLocal,
+		max_workers: Optional[int] = None,
+		user_limit: Optional[int] = None,
+		provider_limit: Optional[int] = None,
+	) -> None:
+		self.session_factory = session_factory
+		self.max_workers = max_workers or int(os.getenv("JOBS_MAX_WORKERS", "4"))
+		self.user_limit = user_limit or int(os.getenv("JOBS_PER_USER_CONCURRENCY", "2"))
+		self.default_provider_limit = provider_limit or int(os.getenv("JOBS_PROVIDER_CONCURRENCY", "4"))
+		self.heartbeat_interval = float(os.getenv("JOBS_HEARTBEAT_SECONDS", "15"))
+		self.stale_after = float(os.getenv("JOBS_STALE_SECONDS", "60"))
+		self.worker_id = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+		self._handlers: Dict[str, JobHandler] = {}
+		self._lock = Lock()
+		self._executor: Optional[ThreadPoolExecutor] = None
+		self._stopping = Event()
+		self._pending: Deque[Tuple[str, str, str]] = deque()  # (job_id, user_id, provider)
+		self._running_users: Counter = Counter()
+		self._running_providers: Counter = Counter()
+		self._done_events: Dict[str, Event] = {}
+		self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+	def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+		"""Register the function that runs jobs of `kind`."""
+
+		def decorator(func: JobHandler) -> JobHandler:
+			self._handlers[kind] = func
+			return func
+
+		return decorator
+
+	def provider_limit(self, provider: str) -> int:
+		override = os.getenv(f"JOBS_PROVIDER_CONCURRENCY_{provider.upper()}")
+		return int(override) if override else self.default_provider_limit
+
+	# --- submission / dispatch ---
+
+	def submit(
+		self,
+		db: Session,
+		kind: str,
+		user_id: str,
+		payload: Optional[Dict[str, Any]] = None,
+		project_id: Optional[str] = None,
+		provider: str = "openai",
+	) -> Job:
+		if kind not in self._handlers:
+			raise ValueError(f"Unknown job kind: {kind}")
+		job = Job(kind=kind, user_id=user_id, project_id=project_id, payload=payload or {}, provider=provider)
+		db.add(job)
+		db.commit()
+		db.refresh(job)
+		self._enqueue(job.id, user_id, provider)
+		return job
+
+	def _enqueue(self, job_id: str, user_id: str, provider: str) -> None:
+		with self._lock:
+			self._done_events.setdefault(job_id, Event())
+			self._pending.append((job_id, user_id, provider))
+			self._dispatch()
+
+	def _dispatch(self) -> None:
+		# Caller holds the lock.
+		if self._executor is None:
+			self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job-worker")
+			self._stopping = Event()
+			Thread(target=self._heartbeat, args=(self._stopping,), name="job-heartbeat", daemon=True).start()
+		waiting: Deque[Tuple[str, str, str]] = deque()
+		while self._pending:
+			item = self._pending.popleft()
+			_, user_id, provider = item
+			if (
+				self._running_users[user_id] >= self.user_limit
+				or self._running_providers[provider] >= self.provider_limit(provider)
+			):
+				waiting.append(item)
+				continue
+			self._running_users[user_id] += 1
+			self._running_providers[provider] += 1
+			self._executor.submit(self._run, *item)
+		self._pending = waiting
+
+	def _run(self, job_id: str, user_id: str, provider: str) -> None:
+		try:
+			self._execute(job_id)
+		finally:
+			with self._lock:
+				self._running_users[user_id] -= 1
+				self._running_providers[provider] -= 1
+				event = self._done_events.pop(job_id, None)
+				self._dispatch()
+			if event is not None:
+				event.set()
+
+	def _execute(self, job_id: str) -> None:
+		db = self.session_factory()
+		try:
+			now = datetime.utcnow()
+			claimed = db.execute(
+				update(Job)
+				.where(Job.id == job_id, Job.status == "queued")
+				.values(status="running", started_at=now, worker_id=self.worker_id, heartbeat_at=now)
+			).rowcount
+			db.commit()
+			if not claimed:
+				# Gone, or another worker got to it first.
+				return
+			job = db.get(Job, job_id)
+			self._notify(job)
+
+			handler = self._handlers.get(job.kind)
+			try:
+				if handler is None:
+					raise ValueError(f"No handler registered for job kind {job.kind}")
+				job.result = handler(db, job)
+				job.status = "succeeded"
+			except HTTPException as e:
+				db.rollback()
+				job.status = "failed"
+				job.error = str(e.detail)
+			except Exception as e:
+				logger.exception(f"Job {job_id} ({job.kind}) failed")
+				db.rollback()
+				job.status = "failed"
+				job.error = str(e)
+			job.finished_at = datetime.utcnow()
+			db.commit()
+			self._notify(job)
+		except Exception as e:
+			logger.error(f"Could not run job {job_id}: {e}")
+		finally:
+			db.close()
+
+	def _heartbeat(self, stopping: Event) -> None:
+		while not stopping.wait(self.heartbeat_interval):
+			db = self.session_factory()
+			try:
+				db.execute(
+					update(Job)
+					.where(Job.worker_id == self.worker_id, Job.status == "running")
+					.values(heartbeat_at=datetime.utcnow())
+				)
+				db.commit()
+				self._fail_abandoned(db)
+			except Exception as e:
+				logger.warning(f"Job heartbeat failed: {e}")
+			finally:
+				db.close()
+
+	def _fail_abandoned(self, db: Session) -> int:
+		"""Fail running jobs whose worker has stopped sending heartbeats."""
+		now = datetime.utcnow()
+		cutoff = now - timedelta(seconds=self.stale_after)
+		failed = db.execute(
+			update(Job)
+			.where(Job.status == "running", or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < cutoff))
+			.values(status="failed", error="Interrupted: the worker running it stopped", finished_at=now)
+		).rowcount
+		db.commit()
+		return failed
+
+	def resume_pending(self) -> None:
+		"""Queue the jobs waiting in the table and fail those abandoned by a worker that stopped."""
+		db = self.session_factory()
+		try:
+			interrupted = self._fail_abandoned(db)
+			# Other workers may queue the same rows; the claim in _execute runs each once.
+			queued = db.query(Job).filter(Job.status == "queued").order_by(Job.created_at.asc()).all()
+			for job in queued:
+				self._enqueue(job.id, job.user_id, job.provider)
+			if interrupted or queued:
+				logger.info(f"Jobs: requeued {len(queued)}, marked {interrupted} interrupted")
+		finally:
+			db.close()
+
+	def wait(self, job_id: str, timeout: Optional[float] = None) -> bool:
+		"""Block until `job_id` finishes; returns False on timeout."""
+		with self._lock:
+			event = self._done_events.get(job_id)
+		return True if event is None else event.wait(timeout)
+
+	def shutdown(self) -> None:
+		with self._lock:
+			executor, self._executor = self._executor, None
+			self._pending.clear()
+			self._stopping.set()
+		if executor is not None:
+			executor.shutdown(wait=False, cancel_futures=True)
+
+	def snapshot(self) -> Dict[str, Any]:
+		with self._lock:
+			return {
+				"queued": len(self._pending),
+				"running": sum(self._running_providers.values()),
+				"running_by_provider": {p: n for p, n in self._running_providers.items() if n},
+			}
+
+	# --- notifications ---
+
+	def subscribe(self, job_id: str) -> asyncio.Queue:
+		"""Return a queue that receives job updates; call from the event loop."""
+		queue: asyncio.Queue = asyncio.Queue()
+		with self._lock:
+			self._subscribers.setdefault(job_id, []).append((asyncio.get_running_loop(), queue))
+		return queue
+
+	def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+		with self._lock:
+			subscribers = [s for s in self._subscribers.get(job_id, []) if s[1] is not queue]
+			if subscribers:
+				self._subscribers[job_id] = subscribers
+			else:
+				self._subscribers.pop(job_id, None)
+
+	def _notify(self, job: Job) -> None:
+		with self._lock:
+			subscribers = list(self._subscribers.get(job.id, []))
+		if not subscribers:
+			return
+		message = job_to_dict(job)
+		for loop, queue in subscribers:
+			try:
+				loop.call_soon_threadsafe(queue.put_nowait, message)
+			except RuntimeError:
+				# Event loop already closed; the socket is gone.
+				pass
+
+
+job_manager = JobManager()
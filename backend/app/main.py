@@ -1,8 +1,6 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.websockets import WebSocketState
-from datetime import datetime
-import time
 
 from .routers import (
 	auth,
@@ -20,9 +18,15 @@ from .routers import (
 	domains,
 	projects_dashboard,
 	diagnostics,
+	health,
+	jobs,
 )
+from . import db_replicas, query_profiler, tracing
 from .db import create_all_tables
-from .metrics_store import metrics_store
+from .metrics_store import MetricsMiddleware, start_worker_files, stop_worker_files
+from .jobs import job_manager
+from .query_profiler import QueryProfilerMiddleware
+from .tracing import TracingMiddleware
 
 
 def create_app() -> FastAPI:
@@ -54,7 +58,7 @@ def create_app() -> FastAPI:
 		allow_headers=["*"],
 	)
 
-	# Root and health check endpoints
+	# Root endpoint (liveness and readiness probes: routers/health.py)
 	@app.get("/")
 	async def root():
 		return {
@@ -64,62 +68,6 @@ def create_app() -> FastAPI:
 			"docs": "/docs"
 		}
 	
-	@app.get("/health")
-	async def health_check():
-		"""Health check endpoint that verifies database connection"""
-		import os
-		from .db import engine, DATABASE_URL
-		from sqlalchemy import text
-		
-		db_status = "unknown"
-		database_url = os.getenv("DATABASE_URL", "")
-		db_type = "unknown"
-		table_count = 0
-		
-		try:
-			# Determine database type
-			if DATABASE_URL.startswith("sqlite"):
-				db_type = "SQLite (⚠️ Ephemeral - data will be lost on restart!)"
-			elif DATABASE_URL.startswith("postgresql"):
-				db_type = "PostgreSQL (✅ Persistent)"
-			else:
-				db_type = f"Unknown: {DATABASE_URL[:50]}"
-			
-			# Test database connection
-			with engine.connect() as conn:
-				conn.execute(text("SELECT 1"))
-				db_status = "connected"
-				
-				# Try to count tables to verify persistence
-				try:
-					if DATABASE_URL.startswith("postgresql"):
-						result = conn.execute(text("""
-							SELECT COUNT(*) FROM information_schema.tables 
-							WHERE table_schema = 'public'
-						"""))
-						table_count = result.scalar() or 0
-					elif DATABASE_URL.startswith("sqlite"):
-						result = conn.execute(text("""
-							SELECT COUNT(*) FROM sqlite_master 
-							WHERE type='table' AND name NOT LIKE 'sqlite_%'
-						"""))
-						table_count = result.scalar() or 0
-				except Exception:
-					table_count = -1
-		except Exception as e:
-			db_status = f"error: {str(e)[:100]}"
-		
-		return {
-			"status": "healthy" if db_status == "connected" else "degraded",
-			"database": db_status,
-			"database_type": db_type,
-			"database_url_set": bool(database_url),
-			"database_url_preview": database_url[:50] + "..." if len(database_url) > 50 else database_url if database_url else "NOT SET",
-			"tables_found": table_count,
-			"warning": "⚠️ Using SQLite - data will be lost on restart! Set DATABASE_URL to PostgreSQL." if DATABASE_URL.startswith("sqlite") else None,
-			"timestamp": datetime.utcnow().isoformat()
-		}
-
 	# Mount routers
 	app.include_router(auth.router, prefix="/auth", tags=["auth"])
 	app.include_router(resumes.router, prefix="/resumes", tags=["resumes"])
@@ -135,18 +83,24 @@ def create_app() -> FastAPI:
 	app.include_router(admin.router, prefix="/admin", tags=["admin"])
 	app.include_router(files.router, prefix="/files", tags=["files"])
 	app.include_router(domains.router, prefix="/domains", tags=["domains"])
+	app.include_router(jobs.router, tags=["jobs"])
 	app.include_router(diagnostics.router, tags=["diagnostics"])
 	app.include_router(diagnostics.router, tags=["diagnostics"])
+	app.include_router(health.router, tags=["health"])
+
+	# Keep users who just wrote on the primary (no-op without read replicas)
+	app.add_middleware(db_replicas.ReadYourWritesMiddleware)
 
-	# Simple middleware for request metrics (duration)
-	@app.middleware("http")
-	async def add_timing_header(request, call_next):
-		start_time = time.perf_counter()
-		response = await call_next(request)
-		duration_ms = int((time.perf_counter() - start_time) * 1000)
-		response.headers["X-Process-Time-ms"] = str(duration_ms)
-		metrics_store.record_request(duration_ms)
-		return response
+	# Opt-in per-request SQL profiling (QUERY_PROFILER=true)
+	if query_profiler.enabled():
+		app.add_middleware(QueryProfilerMiddleware)
+
+	# Opt-in span tracing, one root span per request (TRACING=true)
+	if tracing.enabled():
+		app.add_middleware(TracingMiddleware)
+
+	# Outermost: per-route request counts and latency histograms, X-Process-Time-ms
+	app.add_middleware(MetricsMiddleware)
 
 	@app.on_event("startup")
 	async def on_startup():
@@ -156,6 +110,8 @@ def create_app() -> FastAPI:
 		from .db import DATABASE_URL
 		
 		logger = logging.getLogger(__name__)
+		# Startup runs in each worker after the fork, so every worker gets its own file.
+		start_worker_files()
 		logger.info("Starting WorkExperio API...")
 		
 		# Check database configuration
@@ -205,6 +161,11 @@ def create_app() -> FastAPI:
 			# But we also call create_all_tables as a fallback for new tables
 			create_all_tables()
 			logger.info("✅ Database tables initialized successfully")
+			from . import index_audit
+			if index_audit.audit_on_startup():
+				from .db import engine
+				index_audit.log_report(index_audit.run_audit(engine))
+			job_manager.resume_pending()
 		except Exception as e:
 			logger.error(f"❌ Could not create database tables on startup: {e}")
 			logger.warning("⚠️  Server will start, but database operations may fail until DATABASE_URL is configured correctly.")
@@ -212,6 +173,19 @@ def create_app() -> FastAPI:
 			# Don't raise - allow server to start even if DB init fails
 		logger.info("✅ WorkExperio API started successfully")
 
+	@app.on_event("shutdown")
+	async def on_shutdown():
+		from .ai.llm_gateway import close_clients
+		from .ai.static_analysis import shutdown_pool
+		from .db import async_engine
+		close_clients()
+		shutdown_pool()
+		job_manager.shutdown()
+		stop_worker_files()
+		tracing.close_exporter()
+		if async_engine is not None:
+			await async_engine.dispose()
+
 	return app
 
 
@@ -1,7 +1,46 @@
+"""
+Request metrics: per-route request counters and latency histograms.
+
+Every (method, route template, status) series is a preallocated array of
+fixed latency-bucket counts plus a running sum. Writes go to a per-thread
+shard, so recording a request takes no lock: only the owning thread writes
+a shard and readers add the shards up. A scrape racing a write may see a
+request in a bucket before its duration is in the sum, never a lost update.
+
+MetricsMiddleware (pure ASGI, a few microseconds per request) feeds the
+registry; /metrics summarizes it and /metrics/prometheus renders it in the
+Prometheus text format.
+
+With several worker processes, set METRICS_MULTIPROC_DIR to a directory
+shared by the workers (emptied before each deploy). Every worker writes its
+series to its own file there every METRICS_FLUSH_INTERVAL_SECONDS, from a
+background thread, and whichever worker answers a scrape merges all the
+files. Files of exited workers are kept, so counters never go backwards.
+"""
 from __future__ import annotations
 
+import json
+import logging
+import os
+import threading
+import uuid
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass
-from threading import Lock
+from time import perf_counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds in seconds (Prometheus `le`); a +Inf bucket follows.
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Requests that matched no route share one label, so scanners cannot blow up the series count.
+UNMATCHED_ROUTE = "<unmatched>"
+OVERFLOW_ROUTE = "<other>"
+MAX_SERIES = 2000
+
+SeriesKey = Tuple[str, str, int]
 
 
 @dataclass
@@ -16,24 +55,352 @@ class MetricsSnapshot:
 		return self.total_duration_ms / self.total_requests
 
 
+@dataclass
+class SeriesData:
+	"""One series summed over all shards: per-bucket (non-cumulative) counts and the sum."""
+
+	counts: List[int]
+	total_seconds: float
+
+	@property
+	def count(self) -> int:
+		return sum(self.counts)
+
+
+class _Series:
+	__slots__ = ("counts", "total")
+
+	def __init__(self, n_buckets: int) -> None:
+		self.counts = array("Q", bytes(8 * (n_buckets + 1)))
+		self.total = 0.0
+
+
 class MetricsStore:
-	def __init__(self) -> None:
-		self._lock = Lock()
-		self._total_requests = 0
-		self._total_duration_ms = 0
+	def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, max_series: int = MAX_SERIES) -> None:
+		self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+		self.max_series = max_series
+		self._lock = threading.Lock()
+		self._local = threading.local()
+		self._shards: List[Dict[SeriesKey, _Series]] = []
+		self._keys: set = set()
+
+	def _shard(self) -> Dict[SeriesKey, _Series]:
+		shard: Dict[SeriesKey, _Series] = {}
+		with self._lock:
+			self._shards.append(shard)
+		self._local.shard = shard
+		return shard
+
+	def _series(self, shard: Dict[SeriesKey, _Series], key: SeriesKey) -> _Series:
+		# First request of a series on this thread: the only path that locks.
+		with self._lock:
+			if key not in self._keys and len(self._keys) >= self.max_series:
+				key = (key[0], OVERFLOW_ROUTE, key[2])
+			self._keys.add(key)
+		series = shard.get(key)
+		if series is None:
+			series = shard[key] = _Series(len(self.buckets))
+		return series
+
+	def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+		key = (method, route, status)
+		try:
+			shard = self._local.shard
+		except AttributeError:
+			shard = self._shard()
+		series = shard.get(key)
+		if series is None:
+			series = self._series(shard, key)
+		series.counts[bisect_left(self.buckets, seconds)] += 1
+		series.total += seconds
 
-	def record_request(self, duration_ms: int) -> None:
+	def collect(self) -> Dict[SeriesKey, SeriesData]:
+		"""All series, summed over the shards."""
 		with self._lock:
-			self._total_requests += 1
-			self._total_duration_ms += duration_ms
+			shards = list(self._shards)
+		merged: Dict[SeriesKey, SeriesData] = {}
+		for shard in shards:
+			for key, series in list(shard.items()):
+				_add(merged, key, series.counts, series.total)
+		return merged
 
 	def snapshot(self) -> MetricsSnapshot:
+		return totals(self.collect())
+
+	def reset(self) -> None:
 		with self._lock:
-			return MetricsSnapshot(
-				total_requests=self._total_requests,
-				total_duration_ms=self._total_duration_ms,
+			for shard in self._shards:
+				shard.clear()
+			self._keys.clear()
+
+
+def totals(series: Dict[SeriesKey, SeriesData]) -> MetricsSnapshot:
+	return MetricsSnapshot(
+		total_requests=sum(s.count for s in series.values()),
+		total_duration_ms=int(sum(s.total_seconds for s in series.values()) * 1000),
+	)
+
+
+def _add(merged: Dict[SeriesKey, SeriesData], key: SeriesKey, counts: Sequence[int], total: float) -> None:
+	data = merged.get(key)
+	if data is None:
+		merged[key] = SeriesData(list(counts), total)
+		return
+	for i, n in enumerate(counts):
+		data.counts[i] += n
+	data.total_seconds += total
+
+
+def histogram_quantile(q: float, counts: Sequence[int], buckets: Sequence[float]) -> float:
+	"""
+	Estimate the q-quantile (0..1) in seconds from per-bucket counts, by linear
+	interpolation inside the bucket, as Prometheus' histogram_quantile() does.
+	Observations in the +Inf bucket report the largest finite bound.
+	"""
+	total = sum(counts)
+	if total == 0:
+		return 0.0
+	rank = q * total
+	seen = 0
+	for i, n in enumerate(counts):
+		if n and seen + n >= rank:
+			if i >= len(buckets):
+				return float(buckets[-1])
+			lower = buckets[i - 1] if i else 0.0
+			return lower + (buckets[i] - lower) * ((rank - seen) / n)
+		seen += n
+	return float(buckets[-1])
+
+
+def _merge_counts(series: Iterable[SeriesData], width: int) -> List[int]:
+	counts = [0] * width
+	for s in series:
+		for i, n in enumerate(s.counts):
+			counts[i] += n
+	return counts
+
+
+def summarize(
+	series: Dict[SeriesKey, SeriesData], buckets: Sequence[float] = DEFAULT_BUCKETS, top: int = 20
+) -> Dict[str, Any]:
+	"""Overall and per-route p50/p95/p99 (ms) and 5xx error rates for /metrics."""
+	width = len(buckets) + 1
+
+	def stats(group: List[SeriesData], errors: int) -> Dict[str, Any]:
+		counts = _merge_counts(group, width)
+		total = sum(counts)
+		return {
+			"count": total,
+			"error_rate": round(errors / total, 4) if total else 0.0,
+			"p50_ms": round(histogram_quantile(0.50, counts, buckets) * 1000, 2),
+			"p95_ms": round(histogram_quantile(0.95, counts, buckets) * 1000, 2),
+			"p99_ms": round(histogram_quantile(0.99, counts, buckets) * 1000, 2),
+		}
+
+	by_route: Dict[Tuple[str, str], List[Tuple[int, SeriesData]]] = {}
+	for (method, route, status), data in series.items():
+		by_route.setdefault((method, route), []).append((status, data))
+
+	def errors_of(group: List[Tuple[int, SeriesData]]) -> int:
+		return sum(data.count for status, data in group if status >= 500)
+
+	routes = [
+		{"method": method, "route": route, **stats([d for _, d in group], errors_of(group))}
+		for (method, route), group in by_route.items()
+	]
+	routes.sort(key=lambda r: r["count"], reverse=True)
+	everything = [(status, data) for group in by_route.values() for status, data in group]
+	return {**stats([d for _, d in everything], errors_of(everything)), "routes": routes[:top]}
+
+
+def _label(value: Any) -> str:
+	return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+	return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_prometheus(series: Dict[SeriesKey, SeriesData], buckets: Sequence[float] = DEFAULT_BUCKETS) -> str:
+	"""Prometheus text exposition (format 0.0.4) of the request counters and histograms."""
+	lines = [
+		"# HELP http_requests_total HTTP requests by method, route template and status.",
+		"# TYPE http_requests_total counter",
+	]
+	ordered = sorted(series.items())
+	for (method, route, status), data in ordered:
+		lines.append(
+			f'http_requests_total{{method="{_label(method)}",route="{_label(route)}",status="{status}"}} {data.count}'
+		)
+	lines += [
+		"# HELP http_request_duration_seconds HTTP request latency.",
+		"# TYPE http_request_duration_seconds histogram",
+	]
+	bounds = [_number(b) for b in buckets] + ["+Inf"]
+	for (method, route, status), data in ordered:
+		labels = f'method="{_label(method)}",route="{_label(route)}",status="{status}"'
+		cumulative = 0
+		for bound, n in zip(bounds, data.counts):
+			cumulative += n
+			lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+		lines.append(f"http_request_duration_seconds_sum{{{labels}}} {data.total_seconds!r}")
+		lines.append(f"http_request_duration_seconds_count{{{labels}}} {cumulative}")
+	return "\n".join(lines) + "\n"
+
+
+def route_template(scope) -> str:
+	"""
+	The matched route's full path template ("/users/search/by-name"), or
+	UNMATCHED_ROUTE. FastAPI leaves the router's own APIRoute, whose path
+	lacks the include_router() prefix, in scope["route"]; the prefixed
+	template is on the effective route context it records next to it.
+	"""
+	context = scope.get("fastapi", {}).get("effective_route_context")
+	return getattr(context, "path_format", None) or getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+	"""
+	Pure ASGI middleware: times each HTTP request, labels it with its route
+	template (not the raw path) and status, and sets X-Process-Time-ms.
+	"""
+
+	def __init__(self, app, store: Optional[MetricsStore] = None) -> None:
+		self.app = app
+		self.store = store
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+		started = perf_counter()
+		status = 500
+
+		async def send_with_timing(message) -> None:
+			nonlocal status
+			if message["type"] == "http.response.start":
+				status = message["status"]
+				elapsed_ms = str(int((perf_counter() - started) * 1000)).encode()
+				message["headers"] = [*message.get("headers", ()), (b"x-process-time-ms", elapsed_ms)]
+			await send(message)
+
+		try:
+			await self.app(scope, receive, send_with_timing)
+		finally:
+			(self.store or metrics_store).observe(
+				scope["method"],
+				route_template(scope),
+				status,
+				perf_counter() - started,
 			)
 
 
 metrics_store = MetricsStore()
 
+
+def multiproc_dir() -> Optional[str]:
+	return os.getenv("METRICS_MULTIPROC_DIR") or None
+
+
+def flush_interval() -> float:
+	return float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "5"))
+
+
+class WorkerFiles:
+	"""This worker's snapshot file in a shared directory, and the merge of all of them."""
+
+	PREFIX = "requests-"
+
+	def __init__(self, store: MetricsStore, directory: str, interval: Optional[float] = None) -> None:
+		self.store = store
+		self.directory = Path(directory)
+		self._interval = interval
+		# pid plus a random suffix: a restarted worker that reuses a pid must not
+		# overwrite the counts its predecessor left behind.
+		self.path = self.directory / f"{self.PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	@property
+	def interval(self) -> float:
+		return flush_interval() if self._interval is None else self._interval
+
+	def flush(self) -> None:
+		"""Write this worker's series (atomically: readers never see half a file)."""
+		payload = {
+			"pid": os.getpid(),
+			"buckets": list(self.store.buckets),
+			"series": [[*key, data.counts, data.total_seconds] for key, data in self.store.collect().items()],
+		}
+		tmp = self.path.with_suffix(".tmp")
+		with self._lock:
+			tmp.write_text(json.dumps(payload), encoding="utf-8")
+			os.replace(tmp, self.path)
+
+	def _run(self) -> None:
+		while not self._stop.wait(self.interval):
+			try:
+				self.flush()
+			except OSError as e:
+				logger.warning(f"Could not write request metrics to {self.path}: {e}")
+
+	def start(self) -> None:
+		self.directory.mkdir(parents=True, exist_ok=True)
+		self.flush()
+		self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+		self._thread.start()
+
+	def stop(self) -> None:
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join(timeout=5)
+		self.flush()
+
+	def collect(self) -> Tuple[Dict[SeriesKey, SeriesData], int]:
+		"""Series summed over every worker's file, and how many files went in."""
+		try:
+			self.flush()
+		except OSError as e:
+			logger.warning(f"Could not write request metrics to {self.path}: {e}")
+		merged: Dict[SeriesKey, SeriesData] = {}
+		workers = 0
+		for path in sorted(self.directory.glob(f"{self.PREFIX}*.json")):
+			try:
+				payload = json.loads(path.read_text(encoding="utf-8"))
+			except (OSError, ValueError) as e:
+				logger.warning(f"Skipping unreadable metrics file {path}: {e}")
+				continue
+			if payload.get("buckets") != list(self.store.buckets):
+				logger.warning(f"Skipping metrics file {path}: written with different buckets")
+				continue
+			workers += 1
+			for method, route, status, counts, total in payload["series"]:
+				_add(merged, (method, route, status), counts, total)
+		return merged, workers
+
+
+worker_files: Optional[WorkerFiles] = None
+
+
+def start_worker_files() -> None:
+	"""Start sharing this worker's metrics when METRICS_MULTIPROC_DIR is set (call after fork)."""
+	global worker_files
+	directory = multiproc_dir()
+	if directory and worker_files is None:
+		worker_files = WorkerFiles(metrics_store, directory)
+		worker_files.start()
+
+
+def stop_worker_files() -> None:
+	global worker_files
+	if worker_files is not None:
+		worker_files.stop()
+		worker_files = None
+
+
+def collect_all() -> Tuple[Dict[SeriesKey, SeriesData], int]:
+	"""Request series across all workers (just this one without METRICS_MULTIPROC_DIR)."""
+	if worker_files is not None:
+		return worker_files.collect()
+	return metrics_store.collect(), 1
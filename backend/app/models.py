@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 
 import uuid
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import JSON
@@ -44,7 +44,7 @@ class Resume(Base):
 	__tablename__ = "resumes"
 
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
-	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), index=True)
 	filename: Mapped[str] = mapped_column(String(255))
 	uploaded_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 	parsed_json: Mapped[dict] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=dict)
@@ -56,7 +56,7 @@ class Education(Base):
 	__tablename__ = "educations"
 
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
-	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), index=True)
 	institution: Mapped[str] = mapped_column(String(255))
 	degree: Mapped[str] = mapped_column(String(255))
 	field: Mapped[str] = mapped_column(String(255))
@@ -70,7 +70,7 @@ class Experience(Base):
 	__tablename__ = "experiences"
 
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
-	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), index=True)
 	company: Mapped[str] = mapped_column(String(255))
 	role: Mapped[str] = mapped_column(String(255))
 	description: Mapped[Optional[str]] = mapped_column(Text)
@@ -84,7 +84,7 @@ class Skill(Base):
 	__tablename__ = "skills"
 
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
-	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), index=True)
 	name: Mapped[str] = mapped_column(String(255))
 	level: Mapped[Optional[str]] = mapped_column(String(50))
 
@@ -97,8 +97,8 @@ class Project(Base):
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
 	title: Mapped[str] = mapped_column(String(255))
 	description: Mapped[str] = mapped_column(Text)
-	owner_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
-	team_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("teams.id"), nullable=True)
+	owner_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), index=True)
+	team_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("teams.id"), nullable=True, index=True)
 	team_type: Mapped[str] = mapped_column(String(20), default="none")
 	ai_generated: Mapped[bool] = mapped_column(Boolean, default=False)
 	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -108,7 +108,7 @@ class Team(Base):
 	__tablename__ = "teams"
 
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
-	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id"))
+	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id"), index=True)
 	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 	members: Mapped[list["TeamMember"]] = relationship(back_populates="team", cascade="all, delete-orphan")
@@ -119,21 +119,25 @@ class TeamMember(Base):
 
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
 	team_id: Mapped[str] = mapped_column(String(36), ForeignKey("teams.id"))
-	user_id: Mapped[str] = mapped_column(String(36))
+	user_id: Mapped[str] = mapped_column(String(36), index=True)
 	role: Mapped[Optional[str]] = mapped_column(String(100))
 	task: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Assigned task for this team member
 	joined_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 	team: Mapped["Team"] = relationship(back_populates="members")
 
+	# Member lists and "is this user on the team" checks.
+	__table_args__ = (Index("ix_team_members_team_user", "team_id", "user_id"),)
+
 
 class ProjectWaitlist(Base):
 	__tablename__ = "project_waitlists"
 
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
-	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id"))
+	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id"), index=True)
 	user_id: Mapped[str] = mapped_column(String(36))
-	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+	# Expiry sweep filters on age.
+	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
 
 
 class ChatMessage(Base):
@@ -145,6 +149,8 @@ class ChatMessage(Base):
 	content: Mapped[str] = mapped_column(Text)
 	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+	__table_args__ = (Index("ix_chat_messages_project_created", "project_id", "created_at"),)
+
 
 class AIConversation(Base):
 	__tablename__ = "ai_conversations"
@@ -156,6 +162,9 @@ class AIConversation(Base):
 	content: Mapped[str] = mapped_column(Text)
 	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+	# Serves "last N turns for this user/project" without a scan.
+	__table_args__ = (Index("ix_ai_conversations_user_project_created", "user_id", "project_id", "created_at"),)
+
 
 class UserStats(Base):
 	__tablename__ = "user_stats"
@@ -176,7 +185,7 @@ class ModelPrediction(Base):
 	__tablename__ = "model_predictions"
 
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
-	project_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("projects.id"), nullable=True)
+	project_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("projects.id"), nullable=True, index=True)
 	model_name: Mapped[str] = mapped_column(String(255))
 	input_json: Mapped[dict] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=dict)
 	output_json: Mapped[dict] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=dict)
@@ -188,8 +197,8 @@ class ProjectFile(Base):
 	__tablename__ = "project_files"
 
 	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
-	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id"))
-	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id"), index=True)
+	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), index=True)
 	filename: Mapped[str] = mapped_column(String(255))
 	file_path: Mapped[str] = mapped_column(String(500))
 	file_size: Mapped[int] = mapped_column(Integer)  # Size in bytes
@@ -215,6 +224,23 @@ class Task(Base):
 	created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 	completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
+	__table_args__ = (
+		# Board listing: project, optionally narrowed by status, in creation order.
+		Index("ix_tasks_project_status_created", "project_id", "status", "created_at"),
+		Index("ix_tasks_project_created", "project_id", "created_at", "id"),
+		Index("ix_tasks_assignee_status", "assignee_id", "status"),
+	)
+
+
+class ProjectTaskVersion(Base):
+	"""Bumped on every change to a project's tasks; the basis of task listing ETags."""
+
+	__tablename__ = "project_task_versions"
+
+	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+	version: Mapped[int] = mapped_column(Integer, default=1)
+	updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 
 class TimeLog(Base):
 	"""Time tracking entries for tasks."""
@@ -229,6 +255,12 @@ class TimeLog(Base):
 	duration_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 	created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+	__table_args__ = (
+		# Running timer for (task, user); also serves per-task totals.
+		Index("ix_timelogs_task_user", "task_id", "user_id"),
+		Index("ix_timelogs_user", "user_id"),
+	)
+
 
 class ProjectContribution(Base):
 	"""Aggregate contribution metrics per user per project."""
@@ -245,6 +277,8 @@ class ProjectContribution(Base):
 		DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
 	)
 
+	__table_args__ = (Index("ix_project_contributions_project_user", "project_id", "user_id"),)
+
 
 class AIChatMessage(Base):
 	"""Lightweight chat history for per-project AI assistant."""
@@ -256,5 +290,128 @@ class AIChatMessage(Base):
 	user_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("users.id"), nullable=True)
 	role: Mapped[str] = mapped_column(String(10))  # user/assistant/system
 	content: Mapped[str] = mapped_column(Text)
-	created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+	# Python-side default keeps sub-second ordering between a question and its reply.
+	created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
+
+	__table_args__ = (Index("ix_ai_chat_messages_project_created", "project_id", "created_at"),)
+
+
+class AIConversationSummary(Base):
+	"""Rolling extractive summary of chat turns that fell out of the history window."""
+
+	__tablename__ = "ai_conversation_summaries"
+
+	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
+	conversation_key: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+	summary: Mapped[str] = mapped_column(Text, default="")
+	covered_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+	message_count: Mapped[int] = mapped_column(Integer, default=0)
+	updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class Job(Base):
+	"""Background job for long-running AI operations (see app/jobs.py)."""
+
+	__tablename__ = "jobs"
+
+	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
+	kind: Mapped[str] = mapped_column(String(50))
+	status: Mapped[str] = mapped_column(String(20), default="queued")  # queued/running/succeeded/failed
+	provider: Mapped[str] = mapped_column(String(30), default="openai")
+	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+	project_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("projects.id"), nullable=True)
+	payload: Mapped[Optional[dict]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
+	result: Mapped[Optional[dict]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
+	error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+	started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+	finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+	# Which worker process claimed the job, and when it last reported in while running it.
+	worker_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+	heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+	__table_args__ = (
+		Index("ix_jobs_user_created", "user_id", "created_at"),
+		Index("ix_jobs_status", "status"),
+	)
+
+
+class FileAnalysis(Base):
+	"""Last analysis of one uploaded file, reused while its content hash is unchanged."""
+
+	__tablename__ = "file_analyses"
+
+	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
+	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id", ondelete="CASCADE"))
+	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+	path: Mapped[str] = mapped_column(String(1024))
+	sha256: Mapped[str] = mapped_column(String(64))
+	line_count: Mapped[int] = mapped_column(Integer, default=0)
+	# Entry shaped like the analyzer's individual_files items.
+	result: Mapped[Optional[dict]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
+	updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+	__table_args__ = (Index("ix_file_analyses_project_user_path", "project_id", "user_id", "path", unique=True),)
+
+
+class CodeAnalysisReport(Base):
+	"""Latest merged project-level code analysis per user."""
+
+	__tablename__ = "code_analysis_reports"
+
+	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
+	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id", ondelete="CASCADE"))
+	user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+	analysis_type: Mapped[str] = mapped_column(String(30), default="comprehensive")
+	report: Mapped[Optional[dict]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
+	updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+	__table_args__ = (Index("ix_code_analysis_reports_project_user", "project_id", "user_id", unique=True),)
 
+
+class TaskDependency(Base):
+	"""task_id cannot start before depends_on_id is finished."""
+
+	__tablename__ = "task_dependencies"
+
+	id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid_pk()))
+	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id", ondelete="CASCADE"))
+	task_id: Mapped[str] = mapped_column(String(36), ForeignKey("tasks.id", ondelete="CASCADE"))
+	depends_on_id: Mapped[str] = mapped_column(String(36), ForeignKey("tasks.id", ondelete="CASCADE"))
+	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+	__table_args__ = (
+		Index("ix_task_dependencies_edge", "task_id", "depends_on_id", unique=True),
+		Index("ix_task_dependencies_project", "project_id"),
+	)
+
+
+class ProjectSchedule(Base):
+	"""Origin and summary of a project's current task schedule (see app/ai/scheduler.py)."""
+
+	__tablename__ = "project_schedules"
+
+	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+	starts_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+	hours_per_day: Mapped[float] = mapped_column(Float, default=4.0)
+	makespan_hours: Mapped[float] = mapped_column(Float, default=0.0)
+	critical_path: Mapped[Optional[list]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
+	updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TaskSchedule(Base):
+	"""Scheduled slot of one task, in working hours from ProjectSchedule.starts_at."""
+
+	__tablename__ = "task_schedules"
+
+	task_id: Mapped[str] = mapped_column(String(36), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+	project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id", ondelete="CASCADE"))
+	# Queue the task was placed in, and its place there.
+	assignee_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+	position: Mapped[int] = mapped_column(Integer, default=0)
+	start_hour: Mapped[float] = mapped_column(Float, default=0.0)
+	finish_hour: Mapped[float] = mapped_column(Float, default=0.0)
+	slack_hours: Mapped[float] = mapped_column(Float, default=0.0)
+	critical: Mapped[bool] = mapped_column(Boolean, default=False)
+
+	__table_args__ = (Index("ix_task_schedules_project", "project_id"),)
@@ -0,0 +1,244 @@
+"""
+Per-request SQL profiling, opt-in with QUERY_PROFILER=true.
+
+Engine events time every statement a request runs (sync, async and replica
+engines alike) and file it under a fingerprint: the statement with literals
+and bind parameters replaced by `?` and IN-lists collapsed.
+
+- QUERY_PROFILER_HEADERS=true (debug only) adds X-DB-Query-Count and
+  X-DB-Query-Time-ms to every response.
+- Requests slower than SLOW_REQUEST_MS are logged with their fingerprints.
+- A fingerprint repeated N_PLUS_ONE_THRESHOLD times in one request is a
+  likely N+1; those are aggregated per route at GET /admin/query-profile.
+
+Off, no listener is installed and requests pay nothing.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics_store import route_template
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|\$\d+|(?<!:):\w+|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def enabled() -> bool:
+	return os.getenv("QUERY_PROFILER", "false").lower() in ("1", "true", "yes")
+
+
+def headers_enabled() -> bool:
+	return os.getenv("QUERY_PROFILER_HEADERS", "false").lower() in ("1", "true", "yes")
+
+
+def slow_request_ms() -> float:
+	return float(os.getenv("SLOW_REQUEST_MS", "500"))
+
+
+def n_plus_one_threshold() -> int:
+	return int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+
+def fingerprint(statement: str) -> str:
+	"""The statement's shape: literals and parameters as `?`, IN-lists as `(...)`."""
+	shape = _STRING_RE.sub("?", statement)
+	shape = _PARAM_RE.sub("?", shape)
+	shape = _NUMBER_RE.sub("?", shape)
+	shape = _IN_LIST_RE.sub("(...)", shape)
+	return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryStats:
+	count: int = 0
+	total_ms: float = 0.0
+
+
+@dataclass
+class RequestProfile:
+	"""Statements run while profiling one request, by statement text."""
+
+	queries: int = 0
+	total_ms: float = 0.0
+	by_statement: Dict[str, QueryStats] = field(default_factory=dict)
+
+	def record(self, statement: str, elapsed_ms: float) -> None:
+		self.queries += 1
+		self.total_ms += elapsed_ms
+		stats = self.by_statement.get(statement)
+		if stats is None:
+			stats = self.by_statement[statement] = QueryStats()
+		stats.count += 1
+		stats.total_ms += elapsed_ms
+
+	def fingerprints(self) -> List[Tuple[str, QueryStats]]:
+		"""(fingerprint, stats), most expensive first. Fingerprinting happens here, off the hot path."""
+		merged: Dict[str, QueryStats] = {}
+		for statement, stats in self.by_statement.items():
+			key = fingerprint(statement)
+			total = merged.setdefault(key, QueryStats())
+			total.count += stats.count
+			total.total_ms += stats.total_ms
+		return sorted(merged.items(), key=lambda item: item[1].total_ms, reverse=True)
+
+	def repeated(self, threshold: int) -> List[Tuple[str, QueryStats]]:
+		return [(key, stats) for key, stats in self.fingerprints() if stats.count >= threshold]
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("query_profile", default=None)
+
+
+def current() -> Optional[RequestProfile]:
+	return _current.get()
+
+
+@contextmanager
+def profiled() -> Iterator[RequestProfile]:
+	"""Profile the statements run inside the block (installs the listeners if needed)."""
+	install()
+	profile = RequestProfile()
+	token = _current.set(profile)
+	try:
+		yield profile
+	finally:
+		_current.reset(token)
+
+
+# The start time rides on the statement's execution context, so a statement
+# that fails (and never reaches after_cursor_execute) leaves nothing behind.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+	if _current.get() is not None and context is not None:
+		context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+	profile = _current.get()
+	started = getattr(context, "_query_start", None)
+	if profile is None or started is None:
+		return
+	profile.record(statement, (time.perf_counter() - started) * 1000)
+
+
+_installed = False
+_install_lock = Lock()
+
+
+def install() -> None:
+	"""Listen on every Engine (AsyncEngine runs on one underneath). Idempotent."""
+	global _installed
+	with _install_lock:
+		if _installed:
+			return
+		event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+		event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+		_installed = True
+
+
+class NPlusOneRegistry:
+	"""Likely N+1 patterns seen per (method, route, fingerprint), least recently seen evicted."""
+
+	def __init__(self, max_entries: int = 500) -> None:
+		self._lock = Lock()
+		self._entries: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+		self.max_entries = max_entries
+
+	def record(self, method: str, route: str, key: str, repeats: int, total_ms: float) -> None:
+		with self._lock:
+			entry = self._entries.get((method, route, key))
+			if entry is None:
+				entry = self._entries[(method, route, key)] = {
+					"method": method,
+					"route": route,
+					"fingerprint": key,
+					"requests": 0,
+					"max_repeats": 0,
+					"total_ms": 0.0,
+				}
+			entry["requests"] += 1
+			entry["max_repeats"] = max(entry["max_repeats"], repeats)
+			entry["total_ms"] += total_ms
+			entry["last_seen"] = time.time()
+			self._entries.move_to_end((method, route, key))
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def snapshot(self) -> List[Dict[str, Any]]:
+		with self._lock:
+			entries = [dict(e) for e in self._entries.values()]
+		for e in entries:
+			e["total_ms"] = round(e["total_ms"], 2)
+		return sorted(entries, key=lambda e: (e["requests"], e["max_repeats"]), reverse=True)
+
+	def reset(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+
+n_plus_one = NPlusOneRegistry()
+
+
+def report(method: str, route: str, profile: RequestProfile, elapsed_ms: float) -> None:
+	"""After a request: record repeated statements and log the request if it was slow."""
+	repeated = profile.repeated(n_plus_one_threshold())
+	for key, stats in repeated:
+		n_plus_one.record(method, route, key, stats.count, stats.total_ms)
+	if elapsed_ms >= slow_request_ms():
+		top = "\n".join(
+			f"  {stats.count:4d}x {stats.total_ms:8.1f}ms  {key[:300]}" for key, stats in profile.fingerprints()[:10]
+		)
+		logger.warning(
+			f"Slow request {method} {route}: {elapsed_ms:.0f}ms, "
+			f"{profile.queries} queries in {profile.total_ms:.1f}ms\n{top}"
+		)
+
+
+class QueryProfilerMiddleware:
+	"""Pure ASGI: profiles each HTTP request's statements (added by create_app when enabled)."""
+
+	def __init__(self, app) -> None:
+		self.app = app
+		install()
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+		started = time.perf_counter()
+		profile = RequestProfile()
+		token = _current.set(profile)
+		add_headers = headers_enabled()
+
+		async def send_with_headers(message) -> None:
+			if add_headers and message["type"] == "http.response.start":
+				message["headers"] = [
+					*message.get("headers", ()),
+					(b"x-db-query-count", str(profile.queries).encode()),
+					(b"x-db-query-time-ms", f"{profile.total_ms:.1f}".encode()),
+				]
+			await send(message)
+
+		try:
+			await self.app(scope, receive, send_with_headers)
+		finally:
+			_current.reset(token)
+			try:
+				report(scope["method"], route_template(scope), profile, (time.perf_counter() - started) * 1000)
+			except Exception as e:  # profiling must never fail a request
+				logger.debug(f"Query profile report failed: {e}")
@@ -1,9 +1,11 @@
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from .. import query_profiler, tracing
 from ..db import get_db
+from ..dependencies import get_admin_user
 from ..models import Project, ProjectWaitlist
 
 router = APIRouter()
@@ -26,3 +28,50 @@ def process_waitlists(db: Session = Depends(get_db)):
 	db.commit()
 	return {"processed_projects": processed, "count": len(processed)}
 
+def _query_profiler_enabled() -> None:
+	if not query_profiler.enabled():
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Query profiler is disabled")
+
+
+def _tracing_enabled() -> None:
+	if not tracing.enabled():
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tracing is disabled")
+
+
+# These expose SQL and span attributes (file names, models): admins only, and only while switched on.
+profiler_access = [Depends(get_admin_user), Depends(_query_profiler_enabled)]
+tracing_access = [Depends(get_admin_user), Depends(_tracing_enabled)]
+
+
+@router.get("/query-profile", dependencies=profiler_access)
+def query_profile():
+	"""Likely N+1 statements per route (QUERY_PROFILER=true), most frequent first."""
+	return {
+		"enabled": query_profiler.enabled(),
+		"threshold": query_profiler.n_plus_one_threshold(),
+		"n_plus_one": query_profiler.n_plus_one.snapshot(),
+	}
+
+
+@router.delete("/query-profile", dependencies=profiler_access)
+def reset_query_profile():
+	query_profiler.n_plus_one.reset()
+	return {"ok": True}
+
+
+@router.get("/traces", dependencies=tracing_access)
+def recent_traces(limit: int = 50, min_ms: float = 0.0):
+	"""Most recent finished traces (TRACING=true), newest first."""
+	return {
+		"enabled": tracing.enabled(),
+		"traces": [t.summary() for t in tracing.buffer.recent(limit=limit, min_ms=min_ms)],
+	}
+
+
+@router.get("/traces/{trace_id}", dependencies=tracing_access)
+def trace_breakdown(trace_id: str):
+	"""Flame-style breakdown of one trace: span tree with total and self time."""
+	trace = tracing.buffer.get(trace_id)
+	if trace is None:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trace not found")
+	return tracing.flame(trace)
@@ -9,6 +9,7 @@ from ..models import Project, ChatMessage, UserStats, ModelPrediction, AIConvers
 from ..schemas import AssistantChatRequest, AssistantChatResponse, PerformanceAnalysisResponse, AIConversationRead
 from ..ai.assistant_chat_ai import generate_assistant_response
 from ..ai.performance_ai import analyze_performance
+from ..crud import ai_conversations
 
 router = APIRouter()
 
@@ -21,14 +22,8 @@ def get_conversation_history(
 	limit: int = 50,
 ):
 	"""Get AI conversation history for the current user and optional project"""
-	query = db.query(AIConversation).filter(AIConversation.user_id == current_user.id)
-	
-	if project_id:
-		query = query.filter(AIConversation.project_id == project_id)
-	else:
-		query = query.filter(AIConversation.project_id == None)
-	
-	conversations = query.order_by(AIConversation.created_at.asc()).limit(limit).all()
+	query = ai_conversations.assistant_chat_query(db, current_user.id, project_id)
+	conversations = ai_conversations.last_turns(query, AIConversation, limit)
 	return [AIConversationRead.model_validate(conv) for conv in conversations]
 
 
@@ -42,19 +37,12 @@ def assistant_chat(payload: AssistantChatRequest, current_user=Depends(get_curre
 	
 	# Get conversation history from database if not provided
 	conversation_history = payload.conversation_history or []
+	conversation_summary = None
 	if not conversation_history:
-		# Load from database
-		query = db.query(AIConversation).filter(AIConversation.user_id == current_user.id)
-		if payload.project_id:
-			query = query.filter(AIConversation.project_id == payload.project_id)
-		else:
-			query = query.filter(AIConversation.project_id == None)
-		
-		prev_conversations = query.order_by(AIConversation.created_at.desc()).limit(20).all()
-		conversation_history = [
-			{"role": conv.role, "content": conv.content}
-			for conv in reversed(prev_conversations)
-		]
+		# Last N turns from the database plus a rolling summary of older ones
+		history_window = ai_conversations.load_assistant_chat(db, current_user.id, payload.project_id)
+		conversation_history = history_window.messages
+		conversation_summary = history_window.summary
 	
 	# Add current user message to history
 	conversation_history.append({"role": "user", "content": payload.message})
@@ -79,7 +67,9 @@ def assistant_chat(payload: AssistantChatRequest, current_user=Depends(get_curre
 			.all()
 		)
 		context = {
+			"context_key": f"assistant:{current_user.id}:{payload.project_id}",
 			"conversation_history": conversation_history,
+			"conversation_summary": conversation_summary,
 			"recent_team_messages": [msg.content for msg in recent_team_messages],
 			"suggested_tasks": [
 				"Review current milestone progress",
@@ -89,7 +79,9 @@ def assistant_chat(payload: AssistantChatRequest, current_user=Depends(get_curre
 		}
 	else:
 		context = {
+			"context_key": f"assistant:{current_user.id}",
 			"conversation_history": conversation_history,
+			"conversation_summary": conversation_summary,
 			"recent_team_messages": [],
 			"suggested_tasks": [
 				"Start a new project",
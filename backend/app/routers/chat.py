@@ -1,9 +1,10 @@
 from typing import Dict, List, Set
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
-from ..db import get_db
+from ..db_replicas import get_async_read_db
 from ..models import ChatMessage
 
 router = APIRouter()
@@ -37,14 +38,15 @@ async def broadcast_to_others(project_id: str, exclude_user_id: str, message: di
 
 
 @router.get("/projects/{project_id}/messages")
-def get_messages(project_id: str, db: Session = Depends(get_db), limit: int = 100):
+async def get_messages(project_id: str, db: AsyncSession = Depends(get_async_read_db), limit: int = 100):
 	"""Fetch previous chat messages for a project"""
-	messages = (
-		db.query(ChatMessage)
-		.filter(ChatMessage.project_id == project_id)
-		.order_by(ChatMessage.created_at.desc())
-		.limit(limit)
-		.all()
+	messages = list(
+		await db.scalars(
+			select(ChatMessage)
+			.where(ChatMessage.project_id == project_id)
+			.order_by(ChatMessage.created_at.desc())
+			.limit(limit)
+		)
 	)
 	# Reverse to show oldest first (for proper chat history display)
 	messages = list(reversed(messages))
@@ -9,9 +9,10 @@ from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status,
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
+from .. import access, tracing
 from ..db import get_db
 from ..dependencies import get_current_user
-from ..models import Project, ProjectFile, Team, TeamMember, UserStats, User
+from ..models import ProjectFile, UserStats, User
 from ..schemas import ProjectFileRead, ProjectFileUploadResponse
 
 router = APIRouter()
@@ -87,26 +88,13 @@ async def upload_project_file(
 ):
 	"""Upload a file or folder (as zip) for a project"""
 	# Verify project exists and user has access
-	project = db.query(Project).filter(Project.id == project_id).first()
-	if not project:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-	
-	# Check if user is owner or team member
-	if project.owner_id != current_user.id:
-		if project.team_id:
-			team = db.query(Team).filter(Team.id == project.team_id).first()
-			if team:
-				member = db.query(TeamMember).filter(TeamMember.team_id == team.id, TeamMember.user_id == current_user.id).first()
-				if not member:
-					raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to upload files to this project")
-			else:
-				raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to upload files to this project")
-		else:
-			raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to upload files to this project")
+	access.require(db, project_id, current_user.id, detail="Not authorized to upload files to this project")
 	
 	# Read file content
-	contents = await file.read()
-	file_size = len(contents)
+	with tracing.span("files.read_upload") as span:
+		contents = await file.read()
+		file_size = len(contents)
+		span.set(bytes=file_size)
 	
 	# Check file size
 	if file_size > MAX_FILE_SIZE:
@@ -118,7 +106,8 @@ async def upload_project_file(
 	
 	# Save file
 	file_path = project_dir / file.filename
-	file_path.write_bytes(contents)
+	with tracing.span("files.save", bytes=file_size):
+		file_path.write_bytes(contents)
 	
 	# Determine file type and MIME type
 	file_type = get_file_type(file.filename)
@@ -128,7 +117,8 @@ async def upload_project_file(
 	if file_type == "folder" and file.filename.endswith(".zip"):
 		# Extract zip to a folder with the same name (without .zip)
 		extract_dir = project_dir / Path(file.filename).stem
-		with zipfile.ZipFile(file_path, 'r') as zip_ref:
+		with tracing.span("files.extract_zip") as span, zipfile.ZipFile(file_path, 'r') as zip_ref:
+			span.set(members=len(zip_ref.infolist()))
 			zip_ref.extractall(extract_dir)
 	
 	# Create database record
@@ -149,8 +139,9 @@ async def upload_project_file(
 	if user_stats:
 		user_stats.files_uploaded = (user_stats.files_uploaded or 0) + 1
 	
-	db.commit()
-	db.refresh(project_file)
+	with tracing.span("files.commit"):
+		db.commit()
+		db.refresh(project_file)
 	
 	return ProjectFileUploadResponse(
 		id=project_file.id,
@@ -169,22 +160,7 @@ def list_project_files(
 ):
 	"""List all files uploaded for a project"""
 	# Verify project exists and user has access
-	project = db.query(Project).filter(Project.id == project_id).first()
-	if not project:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-	
-	# Check if user is owner or team member
-	if project.owner_id != current_user.id:
-		if project.team_id:
-			team = db.query(Team).filter(Team.id == project.team_id).first()
-			if team:
-				member = db.query(TeamMember).filter(TeamMember.team_id == team.id, TeamMember.user_id == current_user.id).first()
-				if not member:
-					raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view files for this project")
-			else:
-				raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view files for this project")
-		else:
-			raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view files for this project")
+	access.require(db, project_id, current_user.id, detail="Not authorized to view files for this project")
 	
 	# Get all files for the project
 	files = db.query(ProjectFile).filter(ProjectFile.project_id == project_id).order_by(ProjectFile.uploaded_at.desc()).all()
@@ -205,22 +181,7 @@ def download_project_file(
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
 	
 	# Verify project access
-	project = db.query(Project).filter(Project.id == project_id).first()
-	if not project:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-	
-	# Check if user is owner or team member
-	if project.owner_id != current_user.id:
-		if project.team_id:
-			team = db.query(Team).filter(Team.id == project.team_id).first()
-			if team:
-				member = db.query(TeamMember).filter(TeamMember.team_id == team.id, TeamMember.user_id == current_user.id).first()
-				if not member:
-					raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to download files from this project")
-			else:
-				raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to download files from this project")
-		else:
-			raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to download files from this project")
+	access.require(db, project_id, current_user.id, detail="Not authorized to download files from this project")
 	
 	# Construct full file path
 	file_path = UPLOAD_DIR / project_file.file_path
@@ -249,12 +210,12 @@ def delete_project_file(
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
 	
 	# Verify project access
-	project = db.query(Project).filter(Project.id == project_id).first()
-	if not project:
+	project_access = access.resolve(db, project_id, current_user.id)
+	if not project_access.exists:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 	
 	# Only owner or file uploader can delete
-	if project.owner_id != current_user.id and project_file.user_id != current_user.id:
+	if not project_access.is_owner and project_file.user_id != current_user.id:
 		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this file")
 	
 	# Delete file from disk
@@ -0,0 +1,121 @@
+"""
+Liveness and readiness probes.
+
+/health is the liveness check: it answers from memory and never touches the
+database, so load balancers can poll it as often as they like.
+
+/health/ready is the readiness check: one `SELECT 1` through the pool, at
+most once per HEALTH_READY_INTERVAL_SECONDS. Probes in between, and probes
+that arrive while a check is running, get the last answer. Not ready is a
+503. Slower database checks live at /diagnostics/database.
+"""
+import os
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from ..db import DATABASE_URL, engine, pool_snapshot
+
+router = APIRouter()
+
+_started_at = time.time()
+_static: Optional[Dict[str, Any]] = None
+
+
+def ready_interval() -> float:
+	return float(os.getenv("HEALTH_READY_INTERVAL_SECONDS", "5"))
+
+
+def _ping_database() -> None:
+	with engine.connect() as conn:
+		conn.execute(text("SELECT 1"))
+
+
+class ReadinessProbe:
+	"""Runs `check` at most once per interval and caches the outcome."""
+
+	def __init__(self, check: Callable[[], None], interval: Optional[float] = None) -> None:
+		self._check = check
+		self._interval = interval
+		self._lock = Lock()
+		self._running = False
+		self._result: Optional[Dict[str, Any]] = None
+		self._checked_at = 0.0
+
+	@property
+	def interval(self) -> float:
+		return ready_interval() if self._interval is None else self._interval
+
+	def last(self) -> Optional[Dict[str, Any]]:
+		with self._lock:
+			return self._result
+
+	async def result(self) -> Dict[str, Any]:
+		with self._lock:
+			fresh = self._result is not None and time.monotonic() - self._checked_at < self.interval
+			if fresh or self._running:
+				return self._result or {"ready": False, "database": "checking"}
+			self._running = True
+		try:
+			await run_in_threadpool(self._check)
+			result = {"ready": True, "database": "connected"}
+		except Exception as e:
+			result = {"ready": False, "database": f"error: {str(e)[:100]}"}
+		result["checked_at"] = datetime.utcnow().isoformat()
+		with self._lock:
+			self._result, self._checked_at, self._running = result, time.monotonic(), False
+		return result
+
+	def reset(self) -> None:
+		with self._lock:
+			self._result, self._checked_at, self._running = None, 0.0, False
+
+
+readiness = ReadinessProbe(_ping_database)
+
+
+def _static_info() -> Dict[str, Any]:
+	"""The parts of /health that only change with a restart."""
+	global _static
+	if _static is None:
+		database_url = os.getenv("DATABASE_URL", "")
+		if DATABASE_URL.startswith("sqlite"):
+			db_type = "SQLite (⚠️ Ephemeral - data will be lost on restart!)"
+		elif DATABASE_URL.startswith("postgresql"):
+			db_type = "PostgreSQL (✅ Persistent)"
+		else:
+			db_type = f"Unknown: {DATABASE_URL[:50]}"
+		_static = {
+			"database_type": db_type,
+			"database_url_set": bool(database_url),
+			"database_url_preview": database_url[:50] + "..." if len(database_url) > 50 else database_url if database_url else "NOT SET",
+			"warning": "⚠️ Using SQLite - data will be lost on restart! Set DATABASE_URL to PostgreSQL." if DATABASE_URL.startswith("sqlite") else None,
+		}
+	return _static
+
+
+@router.get("/health")
+async def health_check():
+	"""Liveness: the process is up. Reports the last readiness result without probing."""
+	last = readiness.last()
+	return {
+		"status": "healthy",
+		"database": last["database"] if last else "unchecked",
+		**_static_info(),
+		"uptime_seconds": round(time.time() - _started_at, 1),
+		"timestamp": datetime.utcnow().isoformat(),
+	}
+
+
+@router.get("/health/ready")
+async def readiness_check():
+	"""Readiness: the database answers through the pool (rate-limited, cached)."""
+	result = await readiness.result()
+	body = {**result, "pool": pool_snapshot()}
+	return JSONResponse(body, status_code=200 if result["ready"] else 503)
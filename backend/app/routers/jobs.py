@@ -0,0 +1,104 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..dependencies import get_current_user
+from ..jobs import TERMINAL_STATUSES, job_manager, job_to_dict
+from ..models import Job, User
+from ..schemas import JobRead
+from ..security import decode_access_token
+
+router = APIRouter()
+
+
+def _get_own_job_or_404(db: Session, job_id: str, user_id: str) -> Job:
+	job = db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+	if not job:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+	return job
+
+
+def _load_own_job(job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+	db = job_manager.session_factory()
+	try:
+		job = db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+		return job_to_dict(job) if job else None
+	finally:
+		db.close()
+
+
+@router.get("/jobs", response_model=List[JobRead])
+def list_jobs(
+	status_filter: Optional[str] = Query(None, alias="status"),
+	limit: int = 20,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	query = db.query(Job).filter(Job.user_id == current_user.id)
+	if status_filter:
+		query = query.filter(Job.status == status_filter)
+	jobs = query.order_by(Job.created_at.desc()).limit(min(limit, 100)).all()
+	return [JobRead.model_validate(j) for j in jobs]
+
+
+@router.get("/jobs/{job_id}", response_model=JobRead)
+def get_job(
+	job_id: str,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	return JobRead.model_validate(_get_own_job_or_404(db, job_id, current_user.id))
+
+
+@router.websocket("/ws/jobs/{job_id}")
+async def job_updates(websocket: WebSocket, job_id: str, token: str = ""):
+	"""
+	Push job status changes to the client.
+
+	Authenticate with the access token as a `token` query parameter. The
+	current state is sent immediately; the socket closes once the job
+	succeeds or fails. Updates come from this process's job manager; when
+	another worker process runs the job, the row is re-read every
+	JOBS_WS_POLL_SECONDS instead.
+	"""
+	await websocket.accept()
+	try:
+		user_id = decode_access_token(token).get("sub")
+	except JWTError:
+		user_id = None
+	if not user_id:
+		await websocket.close(code=1008, reason="Invalid token")
+		return
+
+	# Subscribe before reading the row so no transition is missed in between.
+	queue = job_manager.subscribe(job_id)
+	try:
+		current = await run_in_threadpool(_load_own_job, job_id, user_id)
+		if current is None:
+			await websocket.close(code=1008, reason="Job not found")
+			return
+
+		await websocket.send_json(current)
+		poll_seconds = float(os.getenv("JOBS_WS_POLL_SECONDS", "5"))
+		while current["status"] not in TERMINAL_STATUSES:
+			try:
+				update = await asyncio.wait_for(queue.get(), poll_seconds)
+			except asyncio.TimeoutError:
+				update = await run_in_threadpool(_load_own_job, job_id, user_id)
+				if update is None:
+					break
+				if update == current:
+					continue
+			current = update
+			await websocket.send_json(current)
+		await websocket.close()
+	except WebSocketDisconnect:
+		pass
+	finally:
+		job_manager.unsubscribe(job_id, queue)
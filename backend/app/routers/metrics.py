@@ -1,6 +1,13 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
-from ..metrics_store import metrics_store
+from ..ai import llm_cache
+from ..ai.context_builder import context_stats
+from ..ai.llm_gateway import llm_stats
+from .. import db_replicas
+from ..db import pool_snapshot
+from ..jobs import job_manager
+from ..metrics_store import collect_all, metrics_store, render_prometheus, summarize, totals
 from ..schemas import MetricsResponse
 
 router = APIRouter()
@@ -8,9 +15,27 @@ router = APIRouter()
 
 @router.get("/metrics", response_model=MetricsResponse)
 def get_metrics():
-	snapshot = metrics_store.snapshot()
+	# Request metrics cover every worker; the rest describe the worker that answered.
+	series, workers = collect_all()
+	snapshot = totals(series)
 	return MetricsResponse(
 		total_requests=snapshot.total_requests,
 		average_duration_ms=round(snapshot.average_duration_ms, 2),
+		requests={**summarize(series, metrics_store.buckets), "workers": workers},
+		llm=llm_stats.snapshot(),
+		llm_cache=llm_cache.response_cache.snapshot() if llm_cache.response_cache else {},
+		ai_context=context_stats.snapshot(),
+		jobs=job_manager.snapshot(),
+		db_pool={**pool_snapshot(), "replicas": db_replicas.snapshot()},
 	)
 
+
+
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+def get_prometheus_metrics():
+	"""Request counters and latency histograms in the Prometheus text format."""
+	series, _ = collect_all()
+	return PlainTextResponse(
+		render_prometheus(series, metrics_store.buckets),
+		media_type="text/plain; version=0.0.4; charset=utf-8",
+	)
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from ..db import get_db
-from ..dependencies import get_current_user
+from .. import access
+from ..crud import project_feed
+from ..db import get_async_db, get_db
+from ..dependencies import get_current_user, get_current_user_async
 from ..models import Project, ModelPrediction
-from ..schemas import ProjectCreate, ProjectRead
+from ..schemas import ProjectCreate, ProjectRead, ProjectFeedPage
 from ..ai.project_generator import generate_project_idea
 from ..ai.team_selection import recommend_team
 from ..models import User, Skill
@@ -43,33 +46,10 @@ def create_project(
 
 
 @router.get("", response_model=list[ProjectRead])
-def list_projects(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-	from ..models import Team, TeamMember
-	
+async def list_projects(current_user: User = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
 	try:
-		# Get projects where user is owner
-		owned_projects = db.query(Project).filter(Project.owner_id == current_user.id).all()
-		
-		# Get projects where user is a team member
-		team_memberships = (
-			db.query(TeamMember)
-			.filter(TeamMember.user_id == current_user.id)
-			.all()
-		)
-		team_ids = [tm.team_id for tm in team_memberships]
-		
-		# Only query team projects if there are team memberships
-		team_projects = []
-		if team_ids:
-			team_projects = (
-				db.query(Project)
-				.filter(Project.team_id.in_(team_ids))
-				.all()
-			)
-		
-		# Combine and deduplicate
-		all_projects = {p.id: p for p in owned_projects + team_projects}
-		return sorted(all_projects.values(), key=lambda p: p.created_at, reverse=True)
+		# Owned and team projects, newest first, in one query
+		return await project_feed.list_visible_projects_async(db, current_user.id)
 	except Exception as e:
 		import logging
 		logger = logging.getLogger(__name__)
@@ -78,29 +58,29 @@ def list_projects(current_user: User = Depends(get_current_user), db: Session =
 		return []
 
 
+@router.get("/feed", response_model=ProjectFeedPage)
+async def get_project_feed(
+	cursor: Optional[str] = None,
+	limit: int = Query(project_feed.DEFAULT_PAGE_SIZE, ge=1, le=project_feed.MAX_PAGE_SIZE),
+	current_user: User = Depends(get_current_user_async),
+	db: AsyncSession = Depends(get_async_db),
+):
+	"""
+	Dashboard cards in one round trip: the user's projects, newest first, with
+	role, member count, task progress and last activity. Pass next_cursor back
+	as `cursor` for older projects.
+	"""
+	try:
+		return await project_feed.project_feed_async(db, current_user.id, cursor, limit)
+	except ValueError as e:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get("/{project_id}", response_model=ProjectRead)
 def get_project(project_id: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-	from ..models import Team, TeamMember
-	
 	try:
-		project = db.query(Project).filter(Project.id == project_id).first()
-		if not project:
-			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-		
 		# Allow access if user is owner or team member
-		if project.owner_id != current_user.id:
-			if project.team_id:
-				team = db.query(Team).filter(Team.id == project.team_id).first()
-				if team:
-					member = db.query(TeamMember).filter(TeamMember.team_id == team.id, TeamMember.user_id == current_user.id).first()
-					if not member:
-						raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this project")
-				else:
-					# Team ID exists but team not found - might be orphaned, allow owner access only
-					raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this project")
-			else:
-				raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this project")
-		
+		project, _ = access.require_project(db, project_id, current_user.id, detail="Not authorized to view this project")
 		return project
 	except HTTPException:
 		raise
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import hashlib
 from collections import defaultdict
-from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 
-from ..db import get_db
-from ..dependencies import get_current_user
+from .. import access
+from ..db import get_async_db, get_db
+from ..db_replicas import get_async_read_db, get_read_db
+from ..dependencies import get_current_user, get_current_user_async
 from ..models import (
 	Project,
 	User,
@@ -22,10 +27,15 @@ from ..models import (
 	TeamMember,
 	ProjectFile,
 	ChatMessage,
+	Job,
+	Skill,
+	ProjectSchedule,
 )
 from ..schemas import (
 	TaskCreate,
 	TaskRead,
+	TaskImportResult,
+	TaskPage,
 	TaskUpdate,
 	TimeLogRead,
 	ProjectAnalyticsOverview,
@@ -38,9 +48,20 @@ from ..schemas import (
 	CodeQualityAnalysisResponse,
 	AIAssignmentPlan,
 	AIAssignedTask,
+	JobRead,
+	TaskDependencyCreate,
+	TaskDependencyRead,
+	ProjectScheduleRead,
 )
 from ..ai.assistant_chat_ai import generate_assistant_response
 from ..ai.task_generator import generate_tasks_from_project
+from ..ai import llm_gateway, zip_ingest
+from ..ai.assignment_engine import AssignmentMember, AssignmentTask, assign_tasks
+from ..ai.code_quality import score_files
+from ..ai.scheduler import CycleError
+from ..ai.static_analysis import ProjectAnalyzer, ProjectReport
+from ..crud import ai_conversations, code_analysis, schedules, tasks as task_crud
+from ..jobs import job_manager, spool_upload
 from . import files as files_router
 
 
@@ -64,25 +85,11 @@ def _get_project_or_404(db: Session, project_id: str) -> Project:
 	return project
 
 
-def _ensure_project_access(project: Project, current_user: User, db: Session) -> None:
-	"""Allow access if user is owner or a team member."""
-	if project.owner_id == current_user.id:
-		return
-
-	if not project.team_id:
-		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this project")
-
-	team = db.query(Team).filter(Team.id == project.team_id).first()
-	if not team:
-		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this project")
-
-	member = (
-		db.query(TeamMember)
-		.filter(TeamMember.team_id == team.id, TeamMember.user_id == current_user.id)
-		.first()
-	)
-	if not member:
-		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this project")
+def _get_accessible_project(db: Session, project_id: str, current_user: User) -> Project:
+	"""The project, if the user is its owner or on its team (see app/access.py)."""
+	_validate_uuid(project_id, "project_id")
+	project, _ = access.require_project(db, project_id, current_user.id)
+	return project
 
 
 def _get_or_create_contribution(db: Session, project_id: str, user_id: str) -> ProjectContribution:
@@ -105,12 +112,7 @@ def _validate_task_completion(db: Session, task: Task, project: Project) -> Dict
 	The AI independently checks the corresponding files in the repository/workspace
 	and makes the final decision on whether the task meets requirements.
 	"""
-	import os
-	from ..ai.code_analyzer import analyze_code_comprehensive
-	
-	api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY_WORKEXPERIO")
-	
-	if not api_key:
+	if not llm_gateway.is_configured():
 		# Without AI, perform basic validation
 		# Check if there are any files uploaded for this task/project
 		project_files = db.query(ProjectFile).filter(ProjectFile.project_id == project.id).all()
@@ -122,9 +124,6 @@ def _validate_task_completion(db: Session, task: Task, project: Project) -> Dict
 		return {"is_valid": True, "feedback": "Basic validation passed"}
 	
 	try:
-		from openai import OpenAI
-		client = OpenAI(api_key=api_key)
-		
 		# Get project files related to this task
 		project_files = db.query(ProjectFile).filter(ProjectFile.project_id == project.id).all()
 		
@@ -161,16 +160,16 @@ Files in project ({len(files_data)} files):
 
 Determine if this task has been completed based on the requirements and the files provided."""
 		
-		response = client.chat.completions.create(
-			model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-			messages=[
+		response = llm_gateway.chat_completion(
+			[
 				{"role": "system", "content": system_prompt},
 				{"role": "user", "content": user_prompt}
 			],
+			purpose="task_validation",
 			temperature=0.2,
 		)
 		
-		content = response.choices[0].message.content or "{}"
+		content = response.text or "{}"
 		
 		# Parse JSON response
 		import json
@@ -202,60 +201,14 @@ Determine if this task has been completed based on the requirements and the file
 		}
 
 
-def _estimate_code_quality(text: str) -> float:
+def _code_quality_by_user(db: Session, project: Project) -> Dict[str, float]:
 	"""
-	Very lightweight static "code quality" heuristic.
-
-	- Uses line count and rough complexity indicators (indentation and symbols)
-	  to produce a 0–100 score.
-	- Shorter, well-structured code with reasonable indentation scores higher.
-	"""
-	if not text:
-		return 50.0
-
-	lines = [ln for ln in text.splitlines() if ln.strip()]
-	line_count = len(lines)
-
-	# Count some simple complexity hints: nesting and branches
-	complex_tokens = [" if ", " for ", " while ", " try", " except", " catch", " case ", "switch", "&&", "||"]
-	complexity_hits = 0
-	for ln in lines:
-		l = ln.strip().lower()
-		for tok in complex_tokens:
-			if tok in l:
-				complexity_hits += 1
-
-	avg_len = sum(len(ln) for ln in lines) / max(1, len(lines))
-	indent_chars = sum(len(ln) - len(ln.lstrip()) for ln in lines)
-	avg_indent = indent_chars / max(1, len(lines))
-
-	# Start from 100 and subtract penalties
-	score = 100.0
-
-	# Penalize extremely long files (rough proxy for complexity)
-	score -= min(40.0, max(0.0, (line_count - 80) * 0.3))
-
-	# Penalize excessive complexity tokens
-	score -= min(30.0, complexity_hits * 1.5)
-
-	# Penalize extremely long average line length (low readability)
-	if avg_len > 100:
-		score -= min(20.0, (avg_len - 100) * 0.2)
-
-	# Small bonus for some indentation (suggests structure)
-	if 1.0 <= avg_indent <= 8.0:
-		score += 5.0
-
-	return float(max(0.0, min(100.0, score)))
-
-
-def _refresh_project_code_quality_from_files(db: Session, project: Project) -> None:
-	"""
-	Recompute per-user code_quality_score based on uploaded project files.
+	Per-user code_quality_score based on uploaded project files.
 
 	For each ProjectFile marked as code (by file_type == 'code' or by extension),
 	we read the file contents (best-effort), compute a heuristic quality score,
-	and then average scores per user. The result is stored in ProjectContribution.code_quality_score.
+	and then average scores per user. Only reads, so analytics can be served
+	from a read replica.
 	"""
 
 	# Gather all files for the project
@@ -265,98 +218,26 @@ def _refresh_project_code_quality_from_files(db: Session, project: Project) -> N
 		.all()
 	)
 	if not files:
-		return
+		return {}
 
 	code_exts = {".py", ".js", ".jsx", ".ts", ".tsx", ".ts", ".tsx", ".java", ".cs", ".cpp", ".c", ".go"}
 	scores_by_user: Dict[str, List[float]] = defaultdict(list)
 
-	for f in files:
-		# Only consider code-like files (either explicitly marked or by extension)
-		is_code_type = (f.file_type or "").lower() == "code"
-		is_code_ext = Path(f.filename).suffix.lower() in code_exts
-		if not (is_code_type or is_code_ext):
-			continue
-
-		if not f.file_path:
-			continue
-
-		try:
-			path = Path(f.file_path)
-			if not path.is_file():
-				continue
-			text = path.read_text(encoding="utf-8", errors="ignore")
-		except Exception:
-			# If we can't read it as text, skip
-			continue
-
-		score = _estimate_code_quality(text)
-		if f.user_id:
+	# Only consider code-like files (either explicitly marked or by extension)
+	# that belong to someone; their scores are computed in one batch.
+	code_files = [
+		f for f in files
+		if f.user_id
+		and f.file_path
+		and ((f.file_type or "").lower() == "code" or Path(f.filename).suffix.lower() in code_exts)
+	]
+	scores = score_files(f.file_path for f in code_files)
+	for f, score in zip(code_files, scores):
+		# Unreadable files score None and are skipped
+		if score is not None:
 			scores_by_user[f.user_id].append(score)
 
-	# Apply averaged scores into ProjectContribution per user
-	for user_id, scores in scores_by_user.items():
-		if not scores:
-			continue
-		avg_score = float(sum(scores) / len(scores))
-		contrib = _get_or_create_contribution(db, project.id, user_id)
-		contrib.code_quality_score = avg_score
-
-	# Persist updates
-	db.flush()
-
-
-def _compute_member_skill_vector(db: Session, user_id: str) -> List[str]:
-	"""
-	Simple capability vector for a member derived from Skill rows.
-	We deliberately keep this deterministic and lightweight (no LLM call).
-	"""
-	from ..models import Skill  # local import to avoid circulars
-
-	skills = db.query(Skill).filter(Skill.user_id == user_id).all()
-	return [s.name.lower() for s in skills]
-
-
-def _task_fit_score(
-	task_title: str,
-	task_description: Optional[str],
-	member_skills: List[str],
-	current_load_hours: float,
-	estimated_hours: float,
-) -> Tuple[float, float, float, float]:
-	"""
-	Deterministic scoring function from the spec:
-
-	fit_score(member, task) = α * skill_match + β * availability + γ * past_performance
-
-	Here we approximate:
-	- skill_match in [0,100] from keyword overlap
-	- availability in [0,1] from current workload vs. estimated_hours
-	- past_performance is proxied via low current_load_hours
-	"""
-	text = f"{task_title} {task_description or ''}".lower()
-
-	# Skill match: fraction of member skills that appear as substrings in the task text
-	if member_skills:
-		match_count = sum(1 for s in member_skills if s and s in text)
-		skill_match = (match_count / len(member_skills)) * 100.0
-	else:
-		skill_match = 0.0
-
-	# Availability: prefer members with less current load; clamp to [0,1]
-	# Assume that up to 40h of assigned work is "full".
-	max_hours = 40.0
-	availability = max(0.0, 1.0 - min(current_load_hours, max_hours) / max_hours)
-
-	# Past performance proxy: again, lower current load gets higher score.
-	past_performance = max(0.0, 1.0 - min(current_load_hours, max_hours) / max_hours)
-
-	alpha, beta, gamma = 0.5, 0.3, 0.2
-	fit_score = alpha * skill_match + beta * availability * 100.0 + gamma * past_performance * 100.0
-
-	# Workload penalty (for debugging / UI only)
-	workload_penalty = (current_load_hours / max_hours) * 100.0
-
-	return fit_score, skill_match, availability, workload_penalty
+	return {user_id: float(sum(scores) / len(scores)) for user_id, scores in scores_by_user.items() if scores}
 
 
 @router.post("/projects/{project_id}/tasks", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
@@ -366,8 +247,7 @@ def create_task(
 	current_user: User = Depends(get_current_user),
 	db: Session = Depends(get_db),
 ):
-	project = _get_project_or_404(db, project_id)
-	_ensure_project_access(project, current_user, db)
+	project = _get_accessible_project(db, project_id, current_user)
 
 	task = Task(
 		project_id=project.id,
@@ -379,30 +259,96 @@ def create_task(
 		due_date=payload.due_date,
 	)
 	db.add(task)
+	db.flush()
+	schedules.reschedule_tasks(db, project.id, [task.id])
 	db.commit()
 	db.refresh(task)
 	return TaskRead.model_validate(task)
 
 
+@router.post("/projects/{project_id}/tasks/import", response_model=TaskImportResult, status_code=status.HTTP_201_CREATED)
+def import_tasks(
+	project_id: str,
+	file: UploadFile = File(...),
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	"""
+	Create tasks from a CSV (header row with a title column) or JSON (list of
+	task objects) upload. Titles already in the project are skipped; the rest
+	are inserted in one statement.
+	"""
+	project = _get_accessible_project(db, project_id, current_user)
+
+	try:
+		items = task_crud.parse_task_import(file.filename or "", file.file.read())
+	except ValueError as e:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+	created, skipped = task_crud.bulk_create_tasks(db, project.id, items)
+	if created:
+		schedules.reschedule_tasks(db, project.id, [t.id for t in created])
+	db.commit()
+	return TaskImportResult(created=[TaskRead.model_validate(t) for t in created], skipped=skipped)
+
+
 @router.get("/projects/{project_id}/tasks", response_model=List[TaskRead])
-def list_tasks(
+async def list_tasks(
 	project_id: str,
 	status_filter: Optional[str] = None,
 	assignee_id: Optional[str] = None,
+	current_user: User = Depends(get_current_user_async),
+	db: AsyncSession = Depends(get_async_db),
+):
+	_validate_uuid(project_id, "project_id")
+	await access.require_async(db, project_id, current_user.id)
+
+	tasks = await db.scalars(task_crud.list_statement(project_id, status_filter, assignee_id))
+	return [TaskRead.model_validate(t) for t in tasks]
+
+
+@router.get("/projects/{project_id}/tasks/query", response_model=TaskPage)
+def query_tasks(
+	project_id: str,
+	response: Response,
+	status_filter: Optional[List[str]] = Query(None, alias="status"),
+	assignee_id: Optional[str] = None,
+	fields: Optional[str] = Query(None, description="Comma-separated task fields to return; id is always included"),
+	cursor: Optional[str] = None,
+	limit: int = Query(task_crud.DEFAULT_PAGE_SIZE, ge=1, le=task_crud.MAX_PAGE_SIZE),
+	if_none_match: Optional[str] = Header(None),
 	current_user: User = Depends(get_current_user),
 	db: Session = Depends(get_db),
 ):
-	project = _get_project_or_404(db, project_id)
-	_ensure_project_access(project, current_user, db)
+	"""
+	Keyset-paginated task listing with field projection.
 
-	query = db.query(Task).filter(Task.project_id == project.id)
-	if status_filter:
-		query = query.filter(Task.status == status_filter)
-	if assignee_id:
-		query = query.filter(Task.assignee_id == assignee_id)
+	Follow next_cursor for further pages. The ETag changes whenever any task
+	of the project changes, so a client sending it back in If-None-Match gets
+	304 Not Modified without the listing being queried.
+	"""
+	project = _get_accessible_project(db, project_id, current_user)
+	try:
+		selected = task_crud.parse_fields(fields)
+	except ValueError as e:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+	version = task_crud.tasks_version(db, project.id)
+	request_key = "|".join([",".join(selected), ",".join(status_filter or []), assignee_id or "", cursor or "", str(limit)])
+	digest = hashlib.blake2b(request_key.encode(), digest_size=8).hexdigest()
+	etag = f'W/"{version}-{digest}"'
+	headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+	if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+		return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-	tasks = query.order_by(Task.created_at.asc()).all()
-	return [TaskRead.model_validate(t) for t in tasks]
+	try:
+		items, next_cursor = task_crud.task_page(
+			db, project.id, selected, status_filter, assignee_id, cursor, limit
+		)
+	except ValueError as e:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+	response.headers.update(headers)
+	return TaskPage(items=items, next_cursor=next_cursor)
 
 
 @router.patch("/projects/{project_id}/tasks/{task_id}", response_model=TaskRead)
@@ -413,8 +359,7 @@ def update_task(
 	current_user: User = Depends(get_current_user),
 	db: Session = Depends(get_db),
 ):
-	project = _get_project_or_404(db, project_id)
-	_ensure_project_access(project, current_user, db)
+	project = _get_accessible_project(db, project_id, current_user)
 	_validate_uuid(task_id, "task_id")
 
 	task = db.query(Task).filter(Task.id == task_id, Task.project_id == project.id).first()
@@ -422,38 +367,85 @@ def update_task(
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
 	previous_status = task.status
+	previous_plan = (task.estimated_hours, task.assignee_id, task.status)
 
 	for field, value in payload.model_dump(exclude_unset=True).items():
 		setattr(task, field, value)
 
 	# Track completion time and contribution when moving to done
 	if previous_status != "done" and task.status == "done":
-		task.completed_at = datetime.now(timezone.utc)
-		
-		# AI-based task validation
-		validation_result = _validate_task_completion(db, task, project)
-		
-		# If validation fails, revert status and provide feedback
-		if not validation_result.get("is_valid", False):
-			task.status = previous_status
-			task.completed_at = None
-			db.commit()
-			db.refresh(task)
-			feedback = validation_result.get("feedback", "Task does not meet completion criteria")
-			raise HTTPException(
-				status_code=status.HTTP_400_BAD_REQUEST,
-				detail=f"Task validation failed: {feedback}"
-			)
-		
-		if task.assignee_id:
-			contrib = _get_or_create_contribution(db, project.id, task.assignee_id)
-			contrib.tasks_completed += 1
+		_apply_task_completion(db, project, task, previous_status)
+
+	# Only the edited task and what is downstream of it moves in the schedule.
+	if (task.estimated_hours, task.assignee_id, task.status) != previous_plan:
+		schedules.reschedule_tasks(db, project.id, [task.id])
 
 	db.commit()
 	db.refresh(task)
 	return TaskRead.model_validate(task)
 
 
+def _apply_task_completion(db: Session, project: Project, task: Task, previous_status: str) -> None:
+	"""Validate a task moving to done; reverts the status and raises 400 if validation fails."""
+	task.completed_at = datetime.now(timezone.utc)
+
+	# AI-based task validation
+	validation_result = _validate_task_completion(db, task, project)
+
+	# If validation fails, revert status and provide feedback
+	if not validation_result.get("is_valid", False):
+		task.status = previous_status
+		task.completed_at = None
+		db.commit()
+		db.refresh(task)
+		feedback = validation_result.get("feedback", "Task does not meet completion criteria")
+		raise HTTPException(
+			status_code=status.HTTP_400_BAD_REQUEST,
+			detail=f"Task validation failed: {feedback}"
+		)
+
+	if task.assignee_id:
+		contrib = _get_or_create_contribution(db, project.id, task.assignee_id)
+		contrib.tasks_completed += 1
+
+
+@router.post(
+	"/projects/{project_id}/tasks/{task_id}/complete/async",
+	response_model=JobRead,
+	status_code=status.HTTP_202_ACCEPTED,
+)
+def complete_task_async(
+	project_id: str,
+	task_id: str,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	"""Queue AI validation of a task completion; poll /jobs/{id} for the outcome."""
+	project = _get_accessible_project(db, project_id, current_user)
+	_validate_uuid(task_id, "task_id")
+	task = db.query(Task).filter(Task.id == task_id, Task.project_id == project.id).first()
+	if not task:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+	job = job_manager.submit(db, "complete_task", current_user.id, {"task_id": task.id}, project_id=project.id)
+	return JobRead.model_validate(job)
+
+
+@job_manager.handler("complete_task")
+def _complete_task_job(db: Session, job: Job) -> Dict[str, Any]:
+	project = _get_project_or_404(db, job.project_id)
+	task = db.query(Task).filter(Task.id == job.payload["task_id"], Task.project_id == project.id).first()
+	if not task:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+	if task.status != "done":
+		previous_status = task.status
+		task.status = "done"
+		_apply_task_completion(db, project, task, previous_status)
+		schedules.reschedule_tasks(db, project.id, [task.id])
+		db.commit()
+		db.refresh(task)
+	return {"task": TaskRead.model_validate(task).model_dump(mode="json")}
+
+
 @router.post("/tasks/{task_id}/timelogs/start", response_model=TimeLogRead, status_code=status.HTTP_201_CREATED)
 def start_timelog(
 	task_id: str,
@@ -465,8 +457,7 @@ def start_timelog(
 	if not task:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-	project = _get_project_or_404(db, task.project_id)
-	_ensure_project_access(project, current_user, db)
+	project = _get_accessible_project(db, task.project_id, current_user)
 
 	# Prevent multiple open timers for the same user & task
 	open_log = (
@@ -502,8 +493,7 @@ def stop_timelog(
 	if not task:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-	project = _get_project_or_404(db, task.project_id)
-	_ensure_project_access(project, current_user, db)
+	project = _get_accessible_project(db, task.project_id, current_user)
 
 	log = (
 		db.query(TimeLog)
@@ -537,14 +527,14 @@ def stop_timelog(
 def project_analytics_overview(
 	project_id: str,
 	current_user: User = Depends(get_current_user),
-	db: Session = Depends(get_db),
+	db: Session = Depends(get_read_db),
 ):
-	project = _get_project_or_404(db, project_id)
-	_ensure_project_access(project, current_user, db)
+	project = _get_accessible_project(db, project_id, current_user)
 
-	# Ensure code quality metrics reflect the latest uploaded code files.
-	# This pass is lightweight (line/complexity-based) and runs per request.
-	_refresh_project_code_quality_from_files(db, project)
+	# Code quality reflects the latest uploaded code files. This pass is
+	# lightweight (line/complexity-based), runs per request and is applied to
+	# the contributions below in memory, never written.
+	quality_by_user = _code_quality_by_user(db, project)
 
 	# Task level metrics
 	tasks = db.query(Task).filter(Task.project_id == project.id).all()
@@ -576,17 +566,27 @@ def project_analytics_overview(
 
 	# Per-member contributions and raw activity
 	contribs = db.query(ProjectContribution).filter(ProjectContribution.project_id == project.id).all()
+	known = {c.user_id for c in contribs}
+	# Members with code files but no contribution row yet (transient, never added)
+	contribs += [
+		ProjectContribution(project_id=project.id, user_id=user_id, tasks_completed=0, total_hours=0.0, code_quality_score=0.0)
+		for user_id in quality_by_user
+		if user_id not in known
+	]
 	contrib_by_user = {c.user_id: c for c in contribs}
+	code_quality_by_user = {c.user_id: quality_by_user.get(c.user_id, c.code_quality_score) for c in contribs}
 
 	# Files per user
 	files_per_user: Dict[str, int] = defaultdict(int)
 	for f in db.query(ProjectFile).filter(ProjectFile.project_id == project.id).all():
 		files_per_user[f.user_id] += 1
 
-	# Messages per user
+	# Messages and message length per user
 	messages_per_user: Dict[str, int] = defaultdict(int)
-	for m in db.query(ChatMessage).filter(ChatMessage.project_id == project.id).all():
-		messages_per_user[m.user_id] += 1
+	message_chars_per_user: Dict[str, int] = defaultdict(int)
+	for user_id, content in db.query(ChatMessage.user_id, ChatMessage.content).filter(ChatMessage.project_id == project.id):
+		messages_per_user[user_id] += 1
+		message_chars_per_user[user_id] += len(content or "")
 
 	# AI interactions per user
 	ai_per_user: Dict[str, int] = defaultdict(int)
@@ -634,7 +634,7 @@ def project_analytics_overview(
 	for user_id, contrib in contrib_by_user.items():
 		tasks_done = contrib.tasks_completed
 		total_hours = contrib.total_hours
-		code_quality = contrib.code_quality_score
+		code_quality = code_quality_by_user[user_id]
 		files_uploaded = files_per_user.get(user_id, 0)
 		messages_sent = messages_per_user.get(user_id, 0)
 		ai_interactions = ai_per_user.get(user_id, 0)
@@ -671,10 +671,9 @@ def project_analytics_overview(
 		participation_score = sum(parts) / len(parts) if parts else 0.0
 
 		# Simple communication score heuristic: more, longer messages score higher
-		user_msgs = db.query(ChatMessage).filter(ChatMessage.project_id == project.id, ChatMessage.user_id == user_id).all()
-		if user_msgs:
-			avg_len = sum(len(m.content or "") for m in user_msgs) / len(user_msgs)
-			communication_score = min(100.0, (len(user_msgs) * 3.0) + (avg_len / 10.0))
+		if messages_sent:
+			avg_len = message_chars_per_user[user_id] / messages_sent
+			communication_score = min(100.0, (messages_sent * 3.0) + (avg_len / 10.0))
 		else:
 			communication_score = 0.0
 
@@ -716,7 +715,7 @@ def project_analytics_overview(
 
 	avg_code_quality = 0.0
 	if contribs:
-		avg_code_quality = sum(c.code_quality_score for c in contribs) / len(contribs)
+		avg_code_quality = sum(code_quality_by_user.values()) / len(contribs)
 
 	# --- Team Performance Score (0–100) ---
 	# team_score = 0.4*avg_code_quality + 0.35*on_time_rate*100 + 0.25*participation_score
@@ -750,16 +749,16 @@ def project_analytics_overview(
 
 
 @router.get("/users/{user_id}/analytics", response_model=UserAnalyticsResponse)
-def user_analytics(
+async def user_analytics(
 	user_id: str,
-	current_user: User = Depends(get_current_user),
-	db: Session = Depends(get_db),
+	current_user: User = Depends(get_current_user_async),
+	db: AsyncSession = Depends(get_async_read_db),
 ):
 	_validate_uuid(user_id, "user_id")
 	if current_user.id != user_id:
 		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
 
-	contribs = db.query(ProjectContribution).filter(ProjectContribution.user_id == user_id).all()
+	contribs = list(await db.scalars(select(ProjectContribution).where(ProjectContribution.user_id == user_id)))
 
 	per_project: List[MemberAnalytics] = []
 	for c in contribs:
@@ -774,11 +773,12 @@ def user_analytics(
 		)
 
 	# Global KPIs
-	all_logs = (
-		db.query(TimeLog)
-		.join(Task, Task.id == TimeLog.task_id)
-		.filter(TimeLog.user_id == user_id, TimeLog.duration_minutes.is_not(None))
-		.all()
+	all_logs = list(
+		await db.scalars(
+			select(TimeLog)
+			.join(Task, Task.id == TimeLog.task_id)
+			.where(TimeLog.user_id == user_id, TimeLog.duration_minutes.is_not(None))
+		)
 	)
 	if all_logs:
 		total_minutes = sum(l.duration_minutes or 0 for l in all_logs)
@@ -787,12 +787,13 @@ def user_analytics(
 		avg_completion_minutes = 0.0
 
 	# On-time completion: tasks with due_date and completed before due_date
-	task_q = (
-		db.query(Task)
-		.join(TimeLog, Task.id == TimeLog.task_id)
-		.filter(Task.assignee_id == user_id, Task.status == "done")
-	)
-	user_tasks = task_q.all()
+	user_tasks = (
+		await db.scalars(
+			select(Task)
+			.join(TimeLog, Task.id == TimeLog.task_id)
+			.where(Task.assignee_id == user_id, Task.status == "done")
+		)
+	).unique().all()
 	on_time = 0
 	on_time_denominator = 0
 	for t in user_tasks:
@@ -822,8 +823,11 @@ def project_ai_chat(
 	current_user: User = Depends(get_current_user),
 	db: Session = Depends(get_db),
 ):
-	project = _get_project_or_404(db, project_id)
-	_ensure_project_access(project, current_user, db)
+	project = _get_accessible_project(db, project_id, current_user)
+
+	# Last N turns (before this message) plus a rolling summary of older ones
+	history_window = ai_conversations.load_project_chat(db, project.id)
+	conversation_history = history_window.messages
 
 	# Persist user message
 	user_msg = AIChatMessage(
@@ -835,18 +839,6 @@ def project_ai_chat(
 	db.add(user_msg)
 	db.flush()
 
-	# Load recent history for context (increased limit for better multi-turn dialogue)
-	history_rows = (
-		db.query(AIChatMessage)
-		.filter(AIChatMessage.project_id == project.id)
-		.order_by(AIChatMessage.created_at.asc())  # Order ascending for proper conversation flow
-		.limit(30)  # Increased from 20 to support longer conversations
-		.all()
-	)
-	conversation_history = [
-		{"role": row.role, "content": row.content} for row in history_rows
-	]
-
 	# Build richer project context for higher quality answers
 	project_tasks = db.query(Task).filter(Task.project_id == project.id).all()
 	project_files = db.query(ProjectFile).filter(ProjectFile.project_id == project.id).all()
@@ -857,7 +849,9 @@ def project_ai_chat(
 	context: Dict[str, Any] = {
 		"project_title": project.title,
 		"project_description": project.description,
+		"context_key": f"project:{project.id}",
 		"conversation_history": conversation_history,
+		"conversation_summary": history_window.summary,
 		"tasks": [
 			{
 				"id": t.id,
@@ -914,15 +908,10 @@ def project_ai_history(
 	db: Session = Depends(get_db),
 	limit: int = 50,
 ):
-	project = _get_project_or_404(db, project_id)
-	_ensure_project_access(project, current_user, db)
+	project = _get_accessible_project(db, project_id, current_user)
 
-	messages = (
-		db.query(AIChatMessage)
-		.filter(AIChatMessage.project_id == project.id)
-		.order_by(AIChatMessage.created_at.asc())
-		.limit(limit)
-		.all()
+	messages = ai_conversations.last_turns(
+		ai_conversations.project_chat_query(db, project.id), AIChatMessage, limit
 	)
 	return [AIChatMessageRead.model_validate(m) for m in messages]
 
@@ -1001,8 +990,7 @@ def get_project_members(
 	current_user: User = Depends(get_current_user),
 	db: Session = Depends(get_db),
 ):
-	project = _get_project_or_404(db, project_id)
-	_ensure_project_access(project, current_user, db)
+	project = _get_accessible_project(db, project_id, current_user)
 
 	if not project.team_id:
 		return {"project_id": project_id, "members": []}
@@ -1167,39 +1155,59 @@ async def analyze_code_quality(
 	- Zip file uploads (extracts and analyzes all files)
 	- Individual, team, and comprehensive analysis modes
 	"""
-	from ..ai.code_analyzer import analyze_code_comprehensive, extract_files_from_zip
-	
-	project = _get_project_or_404(db, project_id)
-	_ensure_project_access(project, current_user, db)
+	project = _get_accessible_project(db, project_id, current_user)
+
+	# Zip extraction is blocking I/O and CPU; keep it off the event loop.
+	files_data, static_report = await run_in_threadpool(_files_from_upload, file.filename or "unknown", file.file)
+	return _run_code_analysis(db, project, current_user.id, files_data, analysis_type, static_report)
+
+
+def _files_from_upload(filename: str, source: BinaryIO) -> Tuple[List[Dict[str, Any]], ProjectReport]:
+	"""
+	Stream an upload (single file or zip) into the analyzer's files_data.
+
+	Full member contents go straight to the static analyzer as they are
+	decompressed, so the report covers every file while files_data only
+	keeps previews.
+	"""
+	analyzer = ProjectAnalyzer()
+	try:
+		files_data = zip_ingest.to_files_data(zip_ingest.ingest_upload(source, filename, visitor=analyzer.add))
+	except zip_ingest.IngestError as e:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-	content_bytes = await file.read()
-	filename = file.filename or "unknown"
-	
-	# Check if it's a zip file
-	files_data = []
-	if filename.endswith('.zip') or filename.endswith('.ZIP'):
-		files_data = extract_files_from_zip(content_bytes)
-	else:
-		# Single file
-		try:
-			text = content_bytes.decode("utf-8", errors="ignore")
-			files_data = [{"filename": filename, "content": text}]
-		except Exception:
-			text = ""
-			files_data = [{"filename": filename, "content": text}]
-	
 	if not files_data:
 		raise HTTPException(
 			status_code=status.HTTP_400_BAD_REQUEST,
 			detail="No valid files found to analyze"
 		)
-	
-	# Perform comprehensive analysis
+	return files_data, analyzer.finish()
+
+
+def _run_code_analysis(
+	db: Session,
+	project: Project,
+	user_id: str,
+	files_data: List[Dict[str, Any]],
+	analysis_type: Optional[str],
+	static_report: Optional[ProjectReport] = None,
+) -> CodeQualityAnalysisResponse:
+	from ..ai.code_analyzer import analyze_code_incremental
+
+	# Only files that changed since this user's last upload are re-analyzed.
 	analysis_type_final = analysis_type or "comprehensive"
-	analysis_result = analyze_code_comprehensive(files_data, analysis_type_final)
-	
+	previous_files, previous_report = code_analysis.load_previous(
+		db, project.id, user_id, analysis_type_final
+	)
+	analysis_result, file_entries = analyze_code_incremental(
+		files_data, analysis_type_final, static_report, previous_files, previous_report
+	)
+	code_analysis.save_analysis(
+		db, project.id, user_id, analysis_type_final, files_data, file_entries, analysis_result
+	)
+
 	# Update ProjectContribution for the current user
-	contrib = _get_or_create_contribution(db, project.id, current_user.id)
+	contrib = _get_or_create_contribution(db, project.id, user_id)
 	contrib.code_quality_score = analysis_result.get("overall_score", 75.0)
 	db.commit()
 
@@ -1213,12 +1221,59 @@ async def analyze_code_quality(
 			"performance": analysis_result.get("performance", {}),
 			"individual_files": analysis_result.get("individual_files", []),
 			"summary": analysis_result.get("summary", ""),
+			"static_analysis": analysis_result.get("static_analysis", {}),
+			"incremental": analysis_result.get("incremental", {}),
 			"project_id": project.id,
-			"user_id": current_user.id,
+			"user_id": user_id,
 		},
 	)
 
 
+@router.post(
+	"/projects/{project_id}/analyze-code/async",
+	response_model=JobRead,
+	status_code=status.HTTP_202_ACCEPTED,
+)
+async def analyze_code_quality_async(
+	project_id: str,
+	file: UploadFile = File(...),
+	analysis_type: Optional[str] = Form(None),
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	"""
+	Queue a code analysis and return immediately with a job id.
+
+	The upload is spooled to disk so the job row only carries its path.
+	"""
+	project = _get_accessible_project(db, project_id, current_user)
+
+	spool_path = await run_in_threadpool(spool_upload, file.file)
+	job = job_manager.submit(
+		db,
+		"analyze_code",
+		current_user.id,
+		{"path": spool_path, "filename": file.filename or "unknown", "analysis_type": analysis_type},
+		project_id=project.id,
+	)
+	return JobRead.model_validate(job)
+
+
+@job_manager.handler("analyze_code")
+def _analyze_code_job(db: Session, job: Job) -> Dict[str, Any]:
+	project = _get_project_or_404(db, job.project_id)
+	spool_path = Path(job.payload["path"])
+	try:
+		with spool_path.open("rb") as source:
+			files_data, static_report = _files_from_upload(job.payload.get("filename") or "unknown", source)
+	finally:
+		spool_path.unlink(missing_ok=True)
+	response = _run_code_analysis(
+		db, project, job.user_id, files_data, job.payload.get("analysis_type"), static_report
+	)
+	return response.model_dump(mode="json")
+
+
 @router.post("/projects/{project_id}/ai-assign", response_model=AIAssignmentPlan)
 def ai_assign_tasks_and_schedule(
 	project_id: str,
@@ -1236,8 +1291,13 @@ def ai_assign_tasks_and_schedule(
 	  - availability is based on current assigned workload (0–1)
 	  - past_performance is approximated by low current workload (0–1)
 
-	The endpoint updates Task.assignee_id, Task.estimated_hours, and Task.due_date,
-	and returns a structured plan that the UI can display.
+	Tasks are assigned jointly rather than one at a time: the assignment
+	maximizes total skill match with a rising cost for each extra task a
+	member takes, as a min-cost flow (see app/ai/assignment_engine.py).
+
+	The endpoint updates Task.assignee_id and Task.estimated_hours, replans the
+	project schedule (dependencies, one task at a time per member) to set
+	Task.due_date, and returns a structured plan that the UI can display.
 	"""
 	project = _get_project_or_404(db, project_id)
 	if project.owner_id != current_user.id:
@@ -1264,11 +1324,12 @@ def ai_assign_tasks_and_schedule(
 			detail="No team members available for assignment.",
 		)
 
-	# Precompute member skill vectors and current workload from existing tasks.
-	member_skills: Dict[str, List[str]] = {}
+	# All member skills in one query, and current workload from existing tasks.
+	member_ids = list(dict.fromkeys(m.user_id for m in members))
+	member_skills: Dict[str, List[str]] = defaultdict(list)
+	for user_id, name in db.query(Skill.user_id, Skill.name).filter(Skill.user_id.in_(member_ids)):
+		member_skills[user_id].append(name.lower())
 	member_hours: Dict[str, float] = defaultdict(float)
-	for m in members:
-		member_skills[m.user_id] = _compute_member_skill_vector(db, m.user_id)
 
 	existing_tasks = db.query(Task).filter(Task.project_id == project.id).all()
 	for t in existing_tasks:
@@ -1280,68 +1341,45 @@ def ai_assign_tasks_and_schedule(
 	if not open_tasks:
 		return AIAssignmentPlan(project_id=project.id, assignments=[], rationale=["No open tasks to assign."])
 
-	assignments: List[AIAssignedTask] = []
-	rationale: List[str] = []
-
-	# Start scheduling from "now", allocate due dates based on estimated_hours.
-	now = datetime.now(timezone.utc)
-	hours_per_day = 4.0  # simple heuristic: 4 focused hours per day
-
-	for task in open_tasks:
-		best_member_id: Optional[str] = None
-		best_fit: float = -1.0
-		best_components: Tuple[float, float, float, float] | None = None
-
-		est_hours = float(task.estimated_hours or 2.0)
-
-		for m in members:
-			user_id = m.user_id
-			skills = member_skills.get(user_id, [])
-			load_hours = member_hours.get(user_id, 0.0)
-
-			fit, skill_match, availability, workload_penalty = _task_fit_score(
-				task.title, task.description, skills, load_hours, est_hours
-			)
-
-			if fit > best_fit:
-				best_fit = fit
-				best_member_id = user_id
-				best_components = (skill_match, availability, workload_penalty, fit)
-
-		if not best_member_id or not best_components:
-			continue
-
-		skill_match, availability, workload_penalty, fit_score_val = best_components
+	# Solve all tasks at once: best total fit with load balanced across members.
+	plan = assign_tasks(
+		[AssignmentTask(t.id, t.title, t.description, t.estimated_hours) for t in open_tasks],
+		[AssignmentMember(uid, member_skills.get(uid, []), member_hours.get(uid, 0.0)) for uid in member_ids],
+	)
 
-		# Update task with chosen assignee and schedule
-		task.assignee_id = best_member_id
-		# Keep estimated_hours if already set; otherwise use est_hours
+	for item in plan:
+		task = open_tasks[item.task_index]
+		task.assignee_id = member_ids[item.member_index]
+		# Keep estimated_hours if already set; otherwise use the default
 		if task.estimated_hours is None:
-			task.estimated_hours = est_hours
-		# Simple due date: today + ceil(estimated_hours / hours_per_day) days
-		days_needed = max(1, int((float(task.estimated_hours) or est_hours) / hours_per_day + 0.5))
-		task.due_date = now + timedelta(days=days_needed)
+			task.estimated_hours = 2.0
 
-		# Update workload for future tasks
-		member_hours[best_member_id] += float(task.estimated_hours or est_hours)
+	# Due dates come from the dependency- and workload-aware schedule.
+	db.flush()
+	schedules.replan(db, project.id)
 
+	assignments: List[AIAssignedTask] = []
+	rationale: List[str] = []
+	for item in plan:
+		task = open_tasks[item.task_index]
+		best_member_id = task.assignee_id
 		assignments.append(
 			AIAssignedTask(
 				task_id=task.id,
 				task_title=task.title,
 				assignee_id=best_member_id,
-				assignee_score=fit_score_val,
-				skill_match=skill_match,
-				availability=availability,
-				workload_penalty=workload_penalty,
-				estimated_hours=float(task.estimated_hours or est_hours),
+				assignee_score=item.fit,
+				skill_match=item.skill_match,
+				availability=item.availability,
+				workload_penalty=item.workload_penalty,
+				estimated_hours=float(task.estimated_hours),
 				due_date=task.due_date,
 			)
 		)
 
 		rationale.append(
-			f"Assigned '{task.title}' to member {best_member_id} with fit score {fit_score_val:.1f} "
-			f"(skill_match={skill_match:.1f}, availability={availability:.2f}, workload_penalty={workload_penalty:.1f})."
+			f"Assigned '{task.title}' to member {best_member_id} with fit score {item.fit:.1f} "
+			f"(skill_match={item.skill_match:.1f}, availability={item.availability:.2f}, workload_penalty={item.workload_penalty:.1f})."
 		)
 
 	db.commit()
@@ -1349,6 +1387,94 @@ def ai_assign_tasks_and_schedule(
 	return AIAssignmentPlan(project_id=project.id, assignments=assignments, rationale=rationale)
 
 
+def _get_task_or_404(db: Session, project: Project, task_id: str) -> Task:
+	_validate_uuid(task_id, "task_id")
+	task = db.query(Task).filter(Task.id == task_id, Task.project_id == project.id).first()
+	if not task:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+	return task
+
+
+@router.post(
+	"/projects/{project_id}/tasks/{task_id}/dependencies",
+	response_model=TaskDependencyRead,
+	status_code=status.HTTP_201_CREATED,
+)
+def add_task_dependency(
+	project_id: str,
+	task_id: str,
+	payload: TaskDependencyCreate,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	"""Make task_id wait for depends_on_id; rejected with 400 if it would create a cycle."""
+	project = _get_accessible_project(db, project_id, current_user)
+	task = _get_task_or_404(db, project, task_id)
+	_get_task_or_404(db, project, payload.depends_on_id)
+
+	try:
+		dependency = schedules.add_dependency(db, project.id, task.id, payload.depends_on_id)
+	except ValueError as e:  # includes CycleError
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+	schedules.reschedule_tasks(db, project.id, [task.id])
+	db.commit()
+	return TaskDependencyRead.model_validate(dependency)
+
+
+@router.delete(
+	"/projects/{project_id}/tasks/{task_id}/dependencies/{depends_on_id}",
+	status_code=status.HTTP_204_NO_CONTENT,
+)
+def remove_task_dependency(
+	project_id: str,
+	task_id: str,
+	depends_on_id: str,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	project = _get_accessible_project(db, project_id, current_user)
+	task = _get_task_or_404(db, project, task_id)
+	if not schedules.remove_dependency(db, project.id, task.id, depends_on_id):
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dependency not found")
+	# Dropping an edge can only pull work earlier, which the incremental repair
+	# would leave in place; replan so the freed slack is used.
+	plan = db.get(ProjectSchedule, project.id)
+	if plan is not None:
+		schedules.replan(db, project.id, starts_at=plan.starts_at)
+	db.commit()
+	return None
+
+
+@router.get("/projects/{project_id}/schedule", response_model=ProjectScheduleRead)
+def get_project_schedule(
+	project_id: str,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	"""Current schedule with per-task start/finish, slack and the critical path."""
+	project = _get_accessible_project(db, project_id, current_user)
+	schedule = schedules.schedule_read(db, project.id)
+	if schedule is None:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project has not been scheduled yet")
+	return schedule
+
+
+@router.post("/projects/{project_id}/schedule", response_model=ProjectScheduleRead)
+def replan_project_schedule(
+	project_id: str,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	"""Rebuild the schedule from now, keeping assignments, and reset due dates."""
+	project = _get_accessible_project(db, project_id, current_user)
+	try:
+		schedules.replan(db, project.id)
+	except CycleError as e:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+	db.commit()
+	return schedules.schedule_read(db, project.id)
+
+
 @router.post("/projects/{project_id}/ai-generate-tasks", response_model=List[TaskRead])
 def ai_generate_tasks_from_project(
 	project_id: str,
@@ -1361,9 +1487,35 @@ def ai_generate_tasks_from_project(
 	The AI acts as an intelligent project manager, breaking down the main goal
 	into smaller, actionable sub-tasks with dependencies and timeframes.
 	"""
-	project = _get_project_or_404(db, project_id)
-	_ensure_project_access(project, current_user, db)
-	
+	project = _get_accessible_project(db, project_id, current_user)
+	created_tasks = _generate_project_tasks(db, project)
+	return [TaskRead.model_validate(t) for t in created_tasks]
+
+
+@router.post(
+	"/projects/{project_id}/ai-generate-tasks/async",
+	response_model=JobRead,
+	status_code=status.HTTP_202_ACCEPTED,
+)
+def ai_generate_tasks_from_project_async(
+	project_id: str,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	"""Queue task generation; the job result holds the created tasks."""
+	project = _get_accessible_project(db, project_id, current_user)
+	job = job_manager.submit(db, "generate_tasks", current_user.id, project_id=project.id)
+	return JobRead.model_validate(job)
+
+
+@job_manager.handler("generate_tasks")
+def _generate_tasks_job(db: Session, job: Job) -> Dict[str, Any]:
+	project = _get_project_or_404(db, job.project_id)
+	created_tasks = _generate_project_tasks(db, project)
+	return {"tasks": [TaskRead.model_validate(t).model_dump(mode="json") for t in created_tasks]}
+
+
+def _generate_project_tasks(db: Session, project: Project) -> List[Task]:
 	# Get existing tasks to avoid duplicates
 	existing_tasks = db.query(Task).filter(Task.project_id == project.id).all()
 	existing_tasks_data = [
@@ -1382,32 +1534,23 @@ def ai_generate_tasks_from_project(
 		existing_tasks_data if existing_tasks_data else None,
 	)
 	
-	# Create Task objects and save to database
-	created_tasks = []
-	for task_data in generated_tasks:
-		# Check if task with same title already exists
-		existing = db.query(Task).filter(
-			Task.project_id == project.id,
-			Task.title == task_data["title"]
-		).first()
-		
-		if not existing:
-			task = Task(
-				project_id=project.id,
-				title=task_data["title"],
-				description=task_data.get("description", ""),
-				estimated_hours=task_data.get("estimated_hours", 8.0),
-				status="todo",
-			)
-			db.add(task)
-			created_tasks.append(task)
-	
+	# Titles already in the project (or repeated by the model) are skipped; the
+	# rest go in with a single INSERT ... RETURNING.
+	created_tasks, _ = task_crud.bulk_create_tasks(
+		db,
+		project.id,
+		(
+			{
+				"title": task_data["title"],
+				"description": task_data.get("description", ""),
+				"estimated_hours": task_data.get("estimated_hours", 8.0),
+				"status": "todo",
+			}
+			for task_data in generated_tasks
+		),
+		titles={task_crud.normalize_title(t.title) for t in existing_tasks},
+	)
+	if created_tasks:
+		schedules.reschedule_tasks(db, project.id, [t.id for t in created_tasks])
 	db.commit()
-	
-	# Refresh all created tasks
-	for task in created_tasks:
-		db.refresh(task)
-	
-	return [TaskRead.model_validate(t) for t in created_tasks]
-
-
+	return created_tasks
@@ -4,9 +4,10 @@ from typing import Dict, Any, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from .. import access
 from ..db import get_db
 from ..dependencies import get_current_user
-from ..models import Project, Team, TeamMember, ProjectWaitlist, User, Skill
+from ..models import Project, Team, TeamMember, ProjectWaitlist, User, Skill, Job
 from ..ai.team_selection import recommend_team
 from ..ai.role_suggestions import suggest_roles_for_project
 from ..schemas import (
@@ -16,7 +17,9 @@ from ..schemas import (
 	TeamMemberRead,
 	WaitlistRequest,
 	WaitlistEntryRead,
+	JobRead,
 )
+from ..jobs import job_manager
 
 router = APIRouter()
 
@@ -110,6 +113,7 @@ def assign_team(
 		team = existing_team
 		# Remove existing members to reassign
 		db.query(TeamMember).filter(TeamMember.team_id == team.id).delete()
+		access.invalidate(db, team_id=team.id)
 	else:
 		team = Team(project_id=project_id)
 		db.add(team)
@@ -165,12 +169,15 @@ def suggest_roles(
 			members = db.query(TeamMember).filter(TeamMember.team_id == team.id).all()
 			team_size = len(members)
 			
-			# Get skills for each member
+			# Get skills for all members in one query
+			skills_by_user = {member.user_id: [] for member in members}
+			if skills_by_user:
+				for user_id, skill_name in db.query(Skill.user_id, Skill.name).filter(Skill.user_id.in_(list(skills_by_user))):
+					skills_by_user[user_id].append(skill_name)
 			for member in members:
-				skills = [skill.name for skill in db.query(Skill).filter(Skill.user_id == member.user_id)]
 				member_skills_list.append({
 					"user_id": member.user_id,
-					"skills": skills,
+					"skills": list(skills_by_user[member.user_id]),
 				})
 	
 	# Extract domain and problem from project (you may need to add these fields to Project model)
@@ -195,21 +202,8 @@ def suggest_roles(
 
 @router.get("/projects/{project_id}/team", response_model=dict[str, Any])
 def get_team(project_id: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-	project = db.query(Project).filter(Project.id == project_id).first()
-	if not project:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-	
 	# Allow access if user is owner or team member
-	if project.owner_id != current_user.id:
-		# Check if user is a team member
-		if project.team_id:
-			team = db.query(Team).filter(Team.id == project.team_id).first()
-			if team:
-				member = db.query(TeamMember).filter(TeamMember.team_id == team.id, TeamMember.user_id == current_user.id).first()
-				if not member:
-					raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view team")
-		else:
-			raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view team")
+	project, _ = access.require_project(db, project_id, current_user.id, detail="Not authorized to view team")
 	
 	if not project.team_id:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not assigned")
@@ -243,20 +237,8 @@ def join_waitlist(
 
 @router.get("/projects/{project_id}/waitlist-status")
 def waitlist_status(project_id: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-	project = db.query(Project).filter(Project.id == project_id).first()
-	if not project:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-	
 	# Allow access if user is owner or team member
-	if project.owner_id != current_user.id:
-		if project.team_id:
-			team = db.query(Team).filter(Team.id == project.team_id).first()
-			if team:
-				member = db.query(TeamMember).filter(TeamMember.team_id == team.id, TeamMember.user_id == current_user.id).first()
-				if not member:
-					raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view waitlist status")
-		else:
-			raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view waitlist status")
+	access.require(db, project_id, current_user.id, detail="Not authorized to view waitlist status")
 
 	entries = db.query(ProjectWaitlist).filter(ProjectWaitlist.project_id == project_id).all()
 	now = datetime.now(timezone.utc)
@@ -325,26 +307,10 @@ def update_member_role(
 	return {"message": "Role updated successfully", "member": TeamMemberRead.model_validate(member)}
 
 
-@router.post("/projects/{project_id}/assign-tasks")
-def assign_tasks_automatically(
-	project_id: str,
-	current_user: User = Depends(get_current_user),
-	db: Session = Depends(get_db),
-):
-	"""Automatically assign tasks to all team members based on their roles."""
-	project = db.query(Project).filter(Project.id == project_id).first()
-	if not project:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-	
+def _load_assignable_members(project_id: str, current_user: User, db: Session) -> tuple[Project, List[TeamMember]]:
+	"""Access and precondition checks shared by the sync and async assign-tasks endpoints."""
 	# Check if user is project owner or team member
-	if project.owner_id != current_user.id:
-		if not project.team_id:
-			raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-		team = db.query(Team).filter(Team.id == project.team_id).first()
-		if team:
-			member = db.query(TeamMember).filter(TeamMember.team_id == team.id, TeamMember.user_id == current_user.id).first()
-			if not member:
-				raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+	project, _ = access.require_project(db, project_id, current_user.id, detail="Not authorized")
 	
 	if not project.team_id:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not assigned")
@@ -361,40 +327,83 @@ def assign_tasks_automatically(
 			status_code=status.HTTP_400_BAD_REQUEST,
 			detail="All team members must have roles assigned before tasks can be assigned"
 		)
-	
-	# Assign tasks based on roles using AI
-	from ..ai.assistant_chat_ai import generate_assistant_response
-	
-	updated_members = []
-	for member in members:
-		if not member.task:  # Only assign if task is not already set
-			# Generate task based on role and project
-			task_prompt = f"Generate a specific, actionable task for a {member.role} working on project: {project.title}. Description: {project.description}. Provide a clear, actionable task description in one sentence."
-			
-			try:
-				response = generate_assistant_response(
-					task_prompt,
-					{
-						"project_title": project.title,
-						"project_description": project.description,
-						"member_role": member.role,
-					}
-				)
-				member.task = response.get("response", f"Work on {member.role} tasks for {project.title}")
-			except Exception as e:
-				# Fallback task
-				member.task = f"Work on {member.role} tasks for {project.title}"
-		
-		updated_members.append(member)
-	
-	db.commit()
-	
+	return project, members
+
+
+@router.post("/projects/{project_id}/assign-tasks")
+def assign_tasks_automatically(
+	project_id: str,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	"""Automatically assign tasks to all team members based on their roles."""
+	project, members = _load_assignable_members(project_id, current_user, db)
+	updated_members = _generate_member_tasks(db, project, members)
 	return {
 		"message": "Tasks assigned successfully",
 		"members": [TeamMemberRead.model_validate(m) for m in updated_members]
 	}
 
 
+@router.post(
+	"/projects/{project_id}/assign-tasks/async",
+	response_model=JobRead,
+	status_code=status.HTTP_202_ACCEPTED,
+)
+def assign_tasks_automatically_async(
+	project_id: str,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+):
+	"""Queue role-based task assignment; poll /jobs/{id} for the updated members."""
+	project, _ = _load_assignable_members(project_id, current_user, db)
+	job = job_manager.submit(db, "assign_member_tasks", current_user.id, project_id=project.id)
+	return JobRead.model_validate(job)
+
+
+@job_manager.handler("assign_member_tasks")
+def _assign_member_tasks_job(db: Session, job: Job) -> Dict[str, Any]:
+	project = db.query(Project).filter(Project.id == job.project_id).first()
+	if not project or not project.team_id:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not assigned")
+	members = db.query(TeamMember).filter(TeamMember.team_id == project.team_id).all()
+	updated_members = _generate_member_tasks(db, project, members)
+	return {"members": [TeamMemberRead.model_validate(m).model_dump(mode="json") for m in updated_members]}
+
+
+def _generate_member_tasks(db: Session, project: Project, members: List[TeamMember]) -> List[TeamMember]:
+	# Assign tasks based on roles using AI
+	from ..ai.assistant_chat_ai import generate_assistant_response
+	from ..ai.llm_gateway import map_concurrent
+
+	# Only assign if task is not already set
+	pending = [m for m in members if not m.task]
+	# Plain data only: the session must not be touched from worker threads.
+	requests = [
+		(
+			f"Generate a specific, actionable task for a {member.role} working on project: {project.title}. Description: {project.description}. Provide a clear, actionable task description in one sentence.",
+			{
+				"project_title": project.title,
+				"project_description": project.description,
+				"member_role": member.role,
+			},
+		)
+		for member in pending
+	]
+
+	# One LLM round trip per member, all in flight at once.
+	results = map_concurrent(lambda req: generate_assistant_response(req[0], req[1]), requests)
+	for member, (response, error) in zip(pending, results):
+		fallback = f"Work on {member.role} tasks for {project.title}"
+		if error is not None or not response:
+			member.task = fallback
+		else:
+			member.task = response.get("response") or fallback
+
+	db.commit()
+	return list(members)
+
+
 @router.post("/waitlist/process-expired")
 def process_expired_waitlists(db: Session = Depends(get_db)):
 	"""
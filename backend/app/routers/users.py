@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import distinct, func
 from sqlalchemy.orm import Session
 import re
 
 from ..db import get_db
+from ..db_replicas import get_read_db
 from ..dependencies import get_current_user
 from ..models import User, Resume, Education, Experience, Skill, UserStats
 from ..schemas import (
@@ -313,7 +315,7 @@ def get_stats(user_id: str, current_user: User = Depends(get_current_user), db:
 def search_users_by_skills(
 	skills: str,  # Comma-separated skills
 	current_user: User = Depends(get_current_user),
-	db: Session = Depends(get_db),
+	db: Session = Depends(get_read_db),
 	limit: int = 10,
 ):
 	"""
@@ -386,7 +388,7 @@ def search_users_by_skills(
 def search_users_by_interests(
 	interests: str,  # Comma-separated interests (using skills as proxy for now)
 	current_user: User = Depends(get_current_user),
-	db: Session = Depends(get_db),
+	db: Session = Depends(get_read_db),
 	limit: int = 10,
 ):
 	"""
@@ -402,7 +404,7 @@ def search_users_by_interests(
 def search_user_by_email(
 	email: str,
 	current_user: User = Depends(get_current_user),
-	db: Session = Depends(get_db),
+	db: Session = Depends(get_read_db),
 ):
 	"""
 	Search for a user by email address.
@@ -428,7 +430,7 @@ def search_user_by_email(
 def search_users_by_name(
 	name: str,
 	current_user: User = Depends(get_current_user),
-	db: Session = Depends(get_db),
+	db: Session = Depends(get_read_db),
 	limit: int = 10,
 ):
 	"""
@@ -444,14 +446,19 @@ def search_users_by_name(
 		.all()
 	)
 	
+	# All matches' skills in one query
+	skills_by_user = {user.id: [] for user in users}
+	if users:
+		for user_id, skill_name in db.query(Skill.user_id, Skill.name).filter(Skill.user_id.in_(list(skills_by_user))):
+			skills_by_user[user_id].append(skill_name)
+	
 	results = []
 	for user in users:
-		user_skills = [skill.name for skill in db.query(Skill).filter(Skill.user_id == user.id)]
 		results.append({
 			"user_id": user.id,
 			"name": user.name,
 			"email": user.email,
-			"skills": user_skills,
+			"skills": skills_by_user[user.id],
 			"profile_completed": user.profile_completed,
 		})
 	
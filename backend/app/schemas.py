@@ -131,6 +131,30 @@ class ProjectRead(BaseSchema, ProjectBase):
 	created_at: datetime
 
 
+class ProjectFeedItem(BaseModel):
+	id: str
+	title: str
+	description: Optional[str] = None
+	owner_id: str
+	team_id: Optional[str] = None
+	team_type: str
+	ai_generated: bool
+	created_at: datetime
+	role: str  # owner / member
+	member_count: int
+	task_total: int
+	task_done: int
+	progress: float  # percent of tasks done
+	last_activity_at: Optional[datetime] = None
+
+
+class ProjectFeedPage(BaseModel):
+	items: List[ProjectFeedItem] = []
+	next_cursor: Optional[str] = None
+	# Number of visible projects; only on the first page.
+	total: Optional[int] = None
+
+
 class CandidateProfile(BaseModel):
 	user_id: str
 	skills: List[str] = []
@@ -238,6 +262,20 @@ class ReviewRequest(BaseModel):
 class MetricsResponse(BaseModel):
 	total_requests: int
 	average_duration_ms: float
+	# Latency percentiles (ms, estimated from the histogram buckets) and 5xx rate,
+	# overall and for the busiest routes; full histograms at /metrics/prometheus
+	requests: Dict[str, Any] = {}
+	# Per-purpose LLM call stats (calls, errors, latency, tokens)
+	llm: Dict[str, Dict[str, Any]] = {}
+	# LLM response cache stats (hit rate, latency saved)
+	llm_cache: Dict[str, Any] = {}
+	# Assistant prompt size / latency distribution (p50, p95, max)
+	ai_context: Dict[str, Any] = {}
+	# Background job queue depth
+	jobs: Dict[str, Any] = {}
+	# Connection pools: in use, overflow, checkout wait (p50/p95/max ms), timeouts;
+	# read replicas: health, lag and reads routed to each
+	db_pool: Dict[str, Any] = {}
 
 
 class ProjectFileRead(BaseSchema):
@@ -293,6 +331,19 @@ class TaskRead(BaseSchema, TaskBase):
 	completed_at: Optional[datetime] = None
 
 
+class TaskImportResult(BaseModel):
+	created: List[TaskRead] = []
+	# Rows whose title duplicated an existing task or an earlier row.
+	skipped: int = 0
+
+
+class TaskPage(BaseModel):
+	# Only the requested fields of each task (always including id).
+	items: List[Dict[str, Any]] = []
+	# Pass back as `cursor` for the next page; None on the last page.
+	next_cursor: Optional[str] = None
+
+
 class TimeLogRead(BaseSchema):
 	id: str
 	task_id: str
@@ -399,3 +450,48 @@ class AIChatMessageRead(BaseSchema):
 class CodeQualityAnalysisResponse(BaseSchema):
 	score: float
 	details: Dict[str, Any]
+
+
+class JobRead(BaseSchema):
+	id: str
+	kind: str
+	status: str
+	project_id: Optional[str] = None
+	result: Optional[Dict[str, Any]] = None
+	error: Optional[str] = None
+	created_at: datetime
+	started_at: Optional[datetime] = None
+	finished_at: Optional[datetime] = None
+
+
+class TaskDependencyCreate(BaseModel):
+	depends_on_id: str
+
+
+class TaskDependencyRead(BaseSchema):
+	id: str
+	project_id: str
+	task_id: str
+	depends_on_id: str
+
+
+class ScheduledTaskRead(BaseModel):
+	task_id: str
+	title: str
+	assignee_id: Optional[str] = None
+	status: str
+	start_at: datetime
+	finish_at: datetime
+	slack_hours: float
+	critical: bool
+	depends_on: List[str] = []
+
+
+class ProjectScheduleRead(BaseModel):
+	project_id: str
+	starts_at: datetime
+	finishes_at: datetime
+	makespan_hours: float
+	hours_per_day: float
+	critical_path: List[str] = []
+	tasks: List[ScheduledTaskRead] = []
@@ -0,0 +1,507 @@
+"""
+Lightweight span tracing for the slow paths: LLM calls, PDF and zip
+extraction, code scoring and calls to the AI service.
+
+	with tracing.span("llm.chat", purpose=purpose) as s:
+		...
+		s.set(prompt_tokens=n)
+
+	@tracing.traced("resume.parse")
+	def parse_pdf_resume(...): ...
+
+The current span lives in a ContextVar, so spans nest across awaits and into
+run_in_threadpool; wrap work handed to other threads with propagate(). With
+TRACING=true, TracingMiddleware opens a root span per HTTP request (joining
+an incoming W3C `traceparent`) and returns its id as X-Trace-Id. A span
+opened outside any request starts a trace of its own.
+
+Finished traces go to an in-memory ring buffer (TRACE_BUFFER_SIZE), shown as
+a flame-style tree at GET /admin/traces/{trace_id}, and to the exporter
+selected by TRACE_EXPORTER: "json" (one trace per line) or "otlp-file"
+(OTLP/JSON, one ExportTraceServiceRequest per line) written to
+TRACE_EXPORT_PATH by a background thread, or any object with
+export(trace) passed to set_exporter(). Only traces of at least
+TRACE_MIN_DURATION_MS are kept.
+
+Off, span() yields a shared no-op span and records nothing.
+"""
+from __future__ import annotations
+
+import abc
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Protocol, Tuple, TypeVar
+
+from .metrics_store import UNMATCHED_ROUTE, route_template
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SERVICE_NAME = "workexperio-api"
+
+
+def enabled() -> bool:
+	return os.getenv("TRACING", "false").lower() in ("1", "true", "yes")
+
+
+def _buffer_size() -> int:
+	return int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+
+
+def _min_duration_ms() -> float:
+	return float(os.getenv("TRACE_MIN_DURATION_MS", "0"))
+
+
+def _new_id(bits: int) -> str:
+	return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+@dataclass
+class Span:
+	name: str
+	trace_id: str
+	span_id: str
+	parent_id: Optional[str]
+	start_ns: int
+	attributes: Dict[str, Any] = field(default_factory=dict)
+	duration_ms: float = 0.0
+	error: Optional[str] = None
+	_started: float = field(default=0.0, repr=False)
+
+	def set(self, **attributes: Any) -> None:
+		self.attributes.update(attributes)
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"name": self.name,
+			"span_id": self.span_id,
+			"parent_id": self.parent_id,
+			"start_ns": self.start_ns,
+			"duration_ms": round(self.duration_ms, 3),
+			"attributes": self.attributes,
+			"error": self.error,
+		}
+
+
+class _NoopSpan:
+	def set(self, **attributes: Any) -> None:
+		pass
+
+
+_NOOP = _NoopSpan()
+
+
+@dataclass
+class Trace:
+	trace_id: str
+	root: Span
+	spans: List[Span] = field(default_factory=list)
+
+	@property
+	def duration_ms(self) -> float:
+		return self.root.duration_ms
+
+	def summary(self) -> Dict[str, Any]:
+		return {
+			"trace_id": self.trace_id,
+			"name": self.root.name,
+			"start_ns": self.root.start_ns,
+			"duration_ms": round(self.duration_ms, 3),
+			"spans": len(self.spans),
+			"error": self.root.error,
+		}
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {**self.summary(), "spans": [s.as_dict() for s in self.spans]}
+
+
+# (trace, span) of the innermost open span.
+_current: ContextVar[Optional[Tuple[Trace, Span]]] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+	active = _current.get()
+	return active[1] if active else None
+
+
+def _open(name: str, attributes: Dict[str, Any], parent: Optional[Tuple[str, str]] = None) -> Tuple[Trace, Span, Any]:
+	active = _current.get()
+	if active is not None:
+		trace, parent_span = active
+		span = Span(name, trace.trace_id, _new_id(64), parent_span.span_id, time.time_ns(), dict(attributes))
+	else:
+		trace_id, parent_id = parent or (_new_id(128), None)
+		span = Span(name, trace_id, _new_id(64), parent_id, time.time_ns(), dict(attributes))
+		trace = Trace(trace_id, span)
+	span._started = time.perf_counter()
+	trace.spans.append(span)
+	return trace, span, _current.set((trace, span))
+
+
+def _close(trace: Trace, span: Span, token: Any, error: Optional[BaseException]) -> None:
+	span.duration_ms = (time.perf_counter() - span._started) * 1000
+	if error is not None:
+		span.error = f"{type(error).__name__}: {str(error)[:200]}"
+	_current.reset(token)
+	if span is trace.root:
+		_finish(trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+	"""Time the block as a child of the current span (or as a new trace)."""
+	if not enabled():
+		yield _NOOP
+		return
+	trace, opened, token = _open(name, attributes)
+	try:
+		yield opened
+	except BaseException as e:
+		_close(trace, opened, token, e)
+		raise
+	_close(trace, opened, token, None)
+
+
+def traced(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+	"""Decorator form of span() for sync and async functions."""
+
+	def decorate(func: Callable[..., T]) -> Callable[..., T]:
+		if inspect.iscoroutinefunction(func):
+
+			@functools.wraps(func)
+			async def async_wrapper(*args, **kwargs):
+				with span(name):
+					return await func(*args, **kwargs)
+
+			return async_wrapper  # type: ignore[return-value]
+
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+			with span(name):
+				return func(*args, **kwargs)
+
+		return wrapper
+
+	return decorate
+
+
+def record_span(name: str, started: float, **attributes: Any) -> None:
+	"""Add an already finished span that began at perf_counter() `started`, under the current span."""
+	active = _current.get()
+	if active is None or not enabled():
+		return
+	trace, parent = active
+	elapsed = time.perf_counter() - started
+	done = Span(
+		name, trace.trace_id, _new_id(64), parent.span_id, time.time_ns() - int(elapsed * 1e9), dict(attributes)
+	)
+	done.duration_ms = elapsed * 1000
+	trace.spans.append(done)
+
+
+def propagate(func: Callable[..., T]) -> Callable[..., T]:
+	"""Wrap `func` to run in a copy of the caller's context (for thread pools)."""
+	context = copy_context()
+
+	@functools.wraps(func)
+	def run(*args, **kwargs):
+		return context.copy().run(func, *args, **kwargs)
+
+	return run
+
+
+def traceparent() -> Optional[str]:
+	"""W3C traceparent header value for the current span, for outgoing calls."""
+	active = _current.get()
+	if active is None:
+		return None
+	trace, current = active
+	return f"00-{trace.trace_id}-{current.span_id}-01"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+	parts = (value or "").strip().split("-")
+	if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+		return None
+	try:
+		int(parts[1], 16), int(parts[2], 16)
+	except ValueError:
+		return None
+	return parts[1], parts[2]
+
+
+# --- flame view ---
+
+
+def flame(trace: Trace) -> Dict[str, Any]:
+	"""
+	The trace as a tree: each node's total and self time (total minus its
+	children's, floored at 0 when children ran in parallel), plus folded
+	stacks (`root;child;leaf self_ms`) for flamegraph tools.
+	"""
+	children: Dict[Optional[str], List[Span]] = {}
+	for s in trace.spans:
+		children.setdefault(s.parent_id, []).append(s)
+	folded: List[str] = []
+
+	def node(s: Span, stack: str) -> Dict[str, Any]:
+		path = f"{stack};{s.name}" if stack else s.name
+		kids = [node(c, path) for c in sorted(children.get(s.span_id, []), key=lambda c: c.start_ns)]
+		self_ms = max(0.0, s.duration_ms - sum(k["duration_ms"] for k in kids))
+		folded.append(f"{path} {self_ms:.3f}")
+		return {
+			"name": s.name,
+			"duration_ms": round(s.duration_ms, 3),
+			"self_ms": round(self_ms, 3),
+			"percent": round(s.duration_ms / trace.duration_ms * 100, 1) if trace.duration_ms else 0.0,
+			"attributes": s.attributes,
+			"error": s.error,
+			"children": kids,
+		}
+
+	return {**trace.summary(), "tree": node(trace.root, ""), "folded": folded}
+
+
+# --- exporters ---
+
+
+class Exporter(Protocol):
+	def export(self, trace: Trace) -> None: ...
+
+
+class _FileExporter(abc.ABC):
+	"""
+	Appends one JSON line per trace to `path`. export() only queues the trace
+	(a finishing request never waits on the disk); a writer thread drains the
+	queue in batches. When `max_pending` traces are waiting, new ones are
+	dropped and counted.
+	"""
+
+	def __init__(self, path: str, max_pending: int = 10000) -> None:
+		self.path = path
+		self.dropped = 0
+		self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+		self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+		self._thread.start()
+
+	@abc.abstractmethod
+	def _line(self, trace: Trace) -> Dict[str, Any]:
+		"""The JSON object written for `trace`."""
+
+	def export(self, trace: Trace) -> None:
+		try:
+			self._queue.put_nowait(trace)
+		except queue.Full:
+			self.dropped += 1
+
+	def flush(self, timeout: float = 5.0) -> bool:
+		"""Wait until the traces exported so far are written; False on timeout."""
+		written = threading.Event()
+		try:
+			self._queue.put(written, timeout=timeout)
+		except queue.Full:
+			return False
+		return written.wait(timeout)
+
+	def close(self) -> None:
+		"""Write what is queued and stop the writer thread."""
+		try:
+			self._queue.put(None, timeout=5)
+		except queue.Full:
+			logger.warning(f"Trace export queue for {self.path} did not drain; closing anyway")
+			return
+		self._thread.join(timeout=5)
+
+	def _run(self) -> None:
+		while True:
+			batch = [self._queue.get()]
+			while True:
+				try:
+					batch.append(self._queue.get_nowait())
+				except queue.Empty:
+					break
+			traces = [item for item in batch if isinstance(item, Trace)]
+			if traces:
+				try:
+					lines = "".join(json.dumps(self._line(t), default=str) + "\n" for t in traces)
+					with open(self.path, "a", encoding="utf-8") as f:
+						f.write(lines)
+				except Exception as e:
+					logger.warning(f"Trace export to {self.path} failed: {e}")
+			for item in batch:
+				if isinstance(item, threading.Event):
+					item.set()
+			if any(item is None for item in batch):
+				return
+
+
+class JsonFileExporter(_FileExporter):
+	"""One trace per line: the summary plus a flat list of spans."""
+
+	def _line(self, trace: Trace) -> Dict[str, Any]:
+		return trace.as_dict()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+	if isinstance(value, bool):
+		return {"boolValue": value}
+	if isinstance(value, int):
+		return {"intValue": str(value)}
+	if isinstance(value, float):
+		return {"doubleValue": value}
+	return {"stringValue": str(value)}
+
+
+class OtlpFileExporter(_FileExporter):
+	"""OTLP/JSON ExportTraceServiceRequest per line, as the collector's file receiver reads."""
+
+	def _line(self, trace: Trace) -> Dict[str, Any]:
+		spans = []
+		for s in trace.spans:
+			otlp = {
+				"traceId": trace.trace_id,
+				"spanId": s.span_id,
+				"name": s.name,
+				# SERVER for the request's root span, INTERNAL below it.
+				"kind": 2 if s is trace.root and "http.method" in s.attributes else 1,
+				"startTimeUnixNano": str(s.start_ns),
+				"endTimeUnixNano": str(s.start_ns + int(s.duration_ms * 1e6)),
+				"attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+				"status": {"code": 2, "message": s.error} if s.error else {"code": 0},
+			}
+			if s.parent_id:
+				otlp["parentSpanId"] = s.parent_id
+			spans.append(otlp)
+		return {
+			"resourceSpans": [
+				{
+					"resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+					"scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": spans}],
+				}
+			]
+		}
+
+
+EXPORTERS: Dict[str, Callable[[str], Exporter]] = {
+	"json": JsonFileExporter,
+	"otlp-file": OtlpFileExporter,
+}
+
+
+def _configured_exporter() -> Optional[Exporter]:
+	name = os.getenv("TRACE_EXPORTER", "none").lower()
+	if name in ("", "none"):
+		return None
+	factory = EXPORTERS.get(name)
+	if factory is None:
+		logger.warning(f"Unknown TRACE_EXPORTER {name!r}; traces stay in memory only")
+		return None
+	return factory(os.getenv("TRACE_EXPORT_PATH", f"traces-{name}.jsonl"))
+
+
+class TraceBuffer:
+	"""The most recent finished traces, for /admin/traces."""
+
+	def __init__(self, max_traces: int) -> None:
+		self._lock = threading.Lock()
+		self._traces: Deque[Trace] = deque(maxlen=max_traces)
+
+	def add(self, trace: Trace) -> None:
+		with self._lock:
+			self._traces.append(trace)
+
+	def recent(self, limit: int = 50, min_ms: float = 0.0) -> List[Trace]:
+		with self._lock:
+			traces = list(self._traces)
+		return [t for t in reversed(traces) if t.duration_ms >= min_ms][:limit]
+
+	def get(self, trace_id: str) -> Optional[Trace]:
+		with self._lock:
+			return next((t for t in self._traces if t.trace_id == trace_id), None)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._traces.clear()
+
+
+buffer = TraceBuffer(_buffer_size())
+_exporter: Optional[Exporter] = None
+_exporter_loaded = False
+
+
+def set_exporter(exporter: Optional[Exporter]) -> None:
+	"""Replace the exporter chosen by TRACE_EXPORTER (None: keep traces in memory only)."""
+	global _exporter, _exporter_loaded
+	previous, _exporter, _exporter_loaded = _exporter, exporter, True
+	if previous is not None and previous is not exporter and hasattr(previous, "close"):
+		previous.close()
+
+
+def close_exporter() -> None:
+	"""Write out queued traces and stop exporting (on shutdown)."""
+	set_exporter(None)
+
+
+def _finish(trace: Trace) -> None:
+	global _exporter, _exporter_loaded
+	if trace.duration_ms < _min_duration_ms():
+		return
+	buffer.add(trace)
+	if not _exporter_loaded:
+		_exporter, _exporter_loaded = _configured_exporter(), True
+	if _exporter is not None:
+		try:
+			_exporter.export(trace)
+		except Exception as e:  # exporting must never fail a request
+			logger.warning(f"Trace export failed: {e}")
+
+
+class TracingMiddleware:
+	"""Pure ASGI: one root span per HTTP request, named after its route template."""
+
+	def __init__(self, app) -> None:
+		self.app = app
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+		incoming = None
+		for key, value in scope.get("headers", ()):
+			if key == b"traceparent":
+				incoming = parse_traceparent(value.decode("latin-1"))
+				break
+		trace, root, token = _open(
+			f"{scope['method']} {scope['path']}", {"http.method": scope["method"]}, parent=incoming
+		)
+
+		async def send_with_trace_id(message) -> None:
+			if message["type"] == "http.response.start":
+				root.set(**{"http.status_code": message["status"]})
+				message["headers"] = [*message.get("headers", ()), (b"x-trace-id", trace.trace_id.encode())]
+			await send(message)
+
+		error: Optional[BaseException] = None
+		try:
+			await self.app(scope, receive, send_with_trace_id)
+		except BaseException as e:
+			error = e
+			raise
+		finally:
+			route = route_template(scope)
+			if route != UNMATCHED_ROUTE:
+				root.name = f"{scope['method']} {route}"
+				root.set(**{"http.route": route})
+			_close(trace, root, token, error)
@@ -2,28 +2,32 @@
 import os
 import requests
 
+from .. import tracing
+
 # Base URL for your AI service (update if deployed)
 AI_SERVICE_URL = os.getenv("AI_SERVICE_URL", "http://127.0.0.1:8081")
 
+def _post(endpoint: str, timeout: float, **kwargs):
+    """POST to the AI service inside a span, passing the trace on as `traceparent`."""
+    with tracing.span("ai_service.request", endpoint=endpoint) as span:
+        headers = {}
+        parent = tracing.traceparent()
+        if parent:
+            headers["traceparent"] = parent
+        r = requests.post(f"{AI_SERVICE_URL}{endpoint}", headers=headers, timeout=timeout, **kwargs)
+        span.set(status_code=r.status_code)
+        r.raise_for_status()
+        return r.json()
+
 def ai_generate_team(payload: dict):
     """Send team formation data to the AI microservice"""
-    r = requests.post(f"{AI_SERVICE_URL}/api/generate_team", json=payload, timeout=60)
-    r.raise_for_status()
-    return r.json().get("team")
+    return _post("/api/generate_team", 60, json=payload).get("team")
 
 def ai_predict_performance(payload: dict):
     """Send performance prediction data to the AI microservice"""
-    r = requests.post(f"{AI_SERVICE_URL}/api/predict_performance", json=payload, timeout=60)
-    r.raise_for_status()
-    return r.json().get("performance")
+    return _post("/api/predict_performance", 60, json=payload).get("performance")
 
 def ai_parse_resume(file_path: str):
     """Upload a resume to the AI microservice for parsing"""
     with open(file_path, "rb") as f:
-        r = requests.post(
-            f"{AI_SERVICE_URL}/api/parse_resume",
-            files={"file": f},
-            timeout=120
-        )
-    r.raise_for_status()
-    return r.json().get("parsed")
+        return _post("/api/parse_resume", 120, files={"file": f}).get("parsed")
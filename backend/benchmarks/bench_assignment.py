@@ -0,0 +1,133 @@
+"""
+Task assignment at scale: 1,000 tasks x 50 members by default.
+
+Compares the min-cost-flow engine with the greedy one-task-at-a-time loop
+it replaced, on wall time, total skill match and load spread.
+
+	python benchmarks/bench_assignment.py
+	python benchmarks/bench_assignment.py --tasks 2000 --members 80 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.ai.assignment_engine import (  # noqa: E402
+	AssignmentMember,
+	AssignmentTask,
+	assign_tasks,
+	fit_components,
+)
+
+VOCABULARY = [
+	"python", "react", "sql", "docker", "design", "testing", "api", "css", "ml", "go",
+	"java", "aws", "ui", "auth", "cache", "kafka", "redis", "graphql", "ios", "android",
+]
+
+
+def make_workload(n_tasks: int, n_members: int, seed: int = 0):
+	rnd = random.Random(seed)
+	tasks = [
+		AssignmentTask(
+			id=str(i),
+			title="Implement " + " ".join(rnd.sample(VOCABULARY, 3)),
+			description="Touches " + " ".join(rnd.sample(VOCABULARY, 2)),
+			estimated_hours=rnd.choice([1, 2, 4, 8]),
+		)
+		for i in range(n_tasks)
+	]
+	members = [
+		AssignmentMember(str(i), rnd.sample(VOCABULARY, rnd.randint(2, 6)), rnd.uniform(0, 20))
+		for i in range(n_members)
+	]
+	return tasks, members
+
+
+def legacy_greedy(tasks: List[AssignmentTask], members: List[AssignmentMember]) -> List[int]:
+	"""The previous loop: each task in order goes to the member with the best fit right now."""
+	load = [m.load_hours for m in members]
+	skills = [[s.lower() for s in m.skills] for m in members]
+	chosen = []
+	for task in tasks:
+		text = f"{task.title} {task.description or ''}".lower()
+		best, best_fit = 0, -1.0
+		for m in range(len(members)):
+			member_skills = skills[m]
+			match = (sum(1 for s in member_skills if s and s in text) / len(member_skills) * 100.0) if member_skills else 0.0
+			fit = fit_components(match, load[m])[0]
+			if fit > best_fit:
+				best, best_fit = m, fit
+		chosen.append(best)
+		load[best] += task.hours
+	return chosen
+
+
+def _quality(tasks, members, chosen: List[int]) -> Dict[str, float]:
+	hours = [m.load_hours for m in members]
+	match_total = 0.0
+	for task, m in zip(tasks, chosen):
+		text = f"{task.title} {task.description or ''}".lower()
+		skills = [s.lower() for s in members[m].skills]
+		match_total += (sum(1 for s in skills if s in text) / len(skills) * 100.0) if skills else 0.0
+		hours[m] += task.hours
+	return {
+		"avg_skill_match": round(match_total / len(tasks), 2),
+		"load_stdev_hours": round(statistics.pstdev(hours), 2),
+		"max_load_hours": round(max(hours), 1),
+	}
+
+
+def run(n_tasks: int = 1000, n_members: int = 50, seed: int = 0) -> Dict[str, Any]:
+	tasks, members = make_workload(n_tasks, n_members, seed)
+
+	started = time.perf_counter()
+	greedy = legacy_greedy(tasks, members)
+	greedy_s = time.perf_counter() - started
+
+	started = time.perf_counter()
+	plan = assign_tasks(tasks, members)
+	engine_s = time.perf_counter() - started
+
+	return {
+		"benchmark": "assignment",
+		"tasks": n_tasks,
+		"members": n_members,
+		"greedy_seconds": round(greedy_s, 3),
+		"engine_seconds": round(engine_s, 3),
+		"greedy": _quality(tasks, members, greedy),
+		"engine": _quality(tasks, members, [a.member_index for a in plan]),
+	}
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--tasks", type=int, default=1000)
+	parser.add_argument("--members", type=int, default=50)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--json", action="store_true", help="print the result as JSON")
+	args = parser.parse_args()
+
+	result = run(args.tasks, args.members, args.seed)
+	if args.json:
+		print(json.dumps(result))
+		return
+	print(f"{result['tasks']} tasks x {result['members']} members")
+	for name in ("greedy", "engine"):
+		q = result[name]
+		print(
+			f"{name:7} {result[name + '_seconds']:7.3f}s  avg skill match {q['avg_skill_match']:6.2f}  "
+			f"load stdev {q['load_stdev_hours']:6.2f}h  max load {q['max_load_hours']:6.1f}h"
+		)
+
+
+if __name__ == "__main__":
+	main()
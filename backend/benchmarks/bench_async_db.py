@@ -0,0 +1,201 @@
+"""
+Hot read endpoints under concurrent load: threadpool sessions vs. AsyncSession.
+
+Seeds a database, then drives the project list, project feed, task list,
+chat history and user analytics endpoints in-process (httpx over ASGI) with
+`--concurrency` clients, once with every statement run on a sync session in
+the threadpool (what the app falls back to without an async driver) and
+once on the async engine. Reports requests per second and p50/p99 latency.
+
+SQLite (the default, via aiosqlite) serializes on one file, so point
+--database-url at PostgreSQL for numbers that mean something in production.
+
+	python benchmarks/bench_async_db.py
+	python benchmarks/bench_async_db.py --requests 4000 --concurrency 200 --json
+	python benchmarks/bench_async_db.py --database-url postgresql+psycopg://user:pw@localhost/bench
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db import Base, ThreadedSession, _async_database_url, _normalize_database_url, get_async_db  # noqa: E402
+from app.dependencies import get_current_user_async  # noqa: E402
+from app.main import create_app  # noqa: E402
+from app.models import ChatMessage, Project, Task, Team, TeamMember, User  # noqa: E402
+
+
+def seed(engine, n_projects: int, n_tasks: int, n_messages: int) -> Dict[str, Any]:
+	with sessionmaker(bind=engine, expire_on_commit=False)() as db:
+		user = User(name="Bench", email=f"bench-{time.time_ns()}@example.com")
+		db.add(user)
+		db.flush()
+		projects = [Project(title=f"Project {i}", description="bench", owner_id=user.id) for i in range(n_projects)]
+		db.add_all(projects)
+		db.flush()
+		for project in projects:
+			team = Team(project_id=project.id)
+			db.add(team)
+			db.flush()
+			project.team_id = team.id
+			db.add(TeamMember(team_id=team.id, user_id=user.id))
+			db.add_all(
+				Task(project_id=project.id, title=f"task {j}", status="done" if j % 3 == 0 else "todo", assignee_id=user.id)
+				for j in range(n_tasks)
+			)
+			db.add_all(
+				ChatMessage(project_id=project.id, user_id=user.id, content=f"message {j}") for j in range(n_messages)
+			)
+		db.commit()
+		db.expunge_all()
+	return {"user": user, "project_ids": [p.id for p in projects]}
+
+
+def _paths(data: Dict[str, Any]) -> List[str]:
+	project_id = data["project_ids"][0]
+	return [
+		"/projects",
+		"/projects/feed",
+		f"/projects/{project_id}/tasks",
+		f"/projects/{project_id}/messages?limit=50",
+		f"/users/{data['user'].id}/analytics",
+	]
+
+
+async def _load(app, paths: List[str], n_requests: int, concurrency: int) -> Dict[str, Any]:
+	latencies: List[float] = []
+	errors = 0
+	remaining = iter(range(n_requests))
+	transport = httpx.ASGITransport(app=app)
+
+	async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+		async def worker() -> None:
+			nonlocal errors
+			for i in remaining:
+				started = time.perf_counter()
+				response = await client.get(paths[i % len(paths)])
+				latencies.append(time.perf_counter() - started)
+				if response.status_code != 200:
+					errors += 1
+
+		started = time.perf_counter()
+		await asyncio.gather(*(worker() for _ in range(concurrency)))
+		elapsed = time.perf_counter() - started
+
+	latencies.sort()
+	return {
+		"requests_per_second": round(n_requests / elapsed, 1),
+		"p50_ms": round(statistics.median(latencies) * 1000, 2),
+		"p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+		"errors": errors,
+	}
+
+
+def run(
+	n_requests: int = 2000,
+	concurrency: int = 100,
+	n_projects: int = 20,
+	n_tasks: int = 50,
+	n_messages: int = 100,
+	database_url: Optional[str] = None,
+) -> Dict[str, Any]:
+	tmp = None
+	if database_url is None:
+		tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+		tmp.close()
+		database_url = f"sqlite:///{tmp.name}"
+	database_url = _normalize_database_url(database_url)
+	os.environ.pop("ASYNC_DATABASE_URL", None)
+	async_url = _async_database_url(database_url)
+	if async_url is None:
+		raise SystemExit(f"No async driver for {database_url}")
+
+	sync_engine = create_engine(database_url, **({"connect_args": {"check_same_thread": False}} if database_url.startswith("sqlite") else {}))
+	Base.metadata.create_all(sync_engine)
+	data = seed(sync_engine, n_projects, n_tasks, n_messages)
+	sync_sessions = sessionmaker(bind=sync_engine, autoflush=False)
+
+	async def threaded_db():
+		db = ThreadedSession(sync_sessions())
+		try:
+			yield db
+		finally:
+			await db.close()
+
+	async def main(mode: str) -> Dict[str, Any]:
+		async_engine = create_async_engine(async_url)
+		async_sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+		async def async_db():
+			async with async_sessions() as db:
+				yield db
+
+		app = create_app()
+		app.dependency_overrides[get_current_user_async] = lambda: data["user"]
+		app.dependency_overrides[get_async_db] = threaded_db if mode == "threadpool" else async_db
+		try:
+			return await _load(app, _paths(data), n_requests, concurrency)
+		finally:
+			await async_engine.dispose()
+
+	try:
+		results = {mode: asyncio.run(main(mode)) for mode in ("threadpool", "async")}
+	finally:
+		sync_engine.dispose()
+		if tmp is not None:
+			os.unlink(tmp.name)
+	return {
+		"benchmark": "async_db",
+		"database": async_url.split(":", 1)[0],
+		"requests": n_requests,
+		"concurrency": concurrency,
+		**results,
+	}
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--requests", type=int, default=2000)
+	parser.add_argument("--concurrency", type=int, default=100)
+	parser.add_argument("--projects", type=int, default=20)
+	parser.add_argument("--tasks", type=int, default=50, help="tasks per project")
+	parser.add_argument("--messages", type=int, default=100, help="chat messages per project")
+	parser.add_argument("--database-url", help="sync DATABASE_URL to benchmark (default: a temporary SQLite file)")
+	parser.add_argument("--json", action="store_true", help="print the result as JSON")
+	args = parser.parse_args()
+
+	# httpx logs every request at INFO.
+	logging.getLogger("httpx").setLevel(logging.WARNING)
+	result = run(args.requests, args.concurrency, args.projects, args.tasks, args.messages, args.database_url)
+	if args.json:
+		print(json.dumps(result))
+		return
+	print(f"{result['requests']} requests, {result['concurrency']} concurrent, {result['database']}")
+	for mode in ("threadpool", "async"):
+		r = result[mode]
+		print(
+			f"{mode:10} {r['requests_per_second']:8.1f} req/s  p50 {r['p50_ms']:7.2f}ms  "
+			f"p99 {r['p99_ms']:7.2f}ms  errors {r['errors']}"
+		)
+
+
+if __name__ == "__main__":
+	main()
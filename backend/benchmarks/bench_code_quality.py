@@ -0,0 +1,107 @@
+"""
+Throughput of the code-quality heuristic, in MB/s.
+
+Scores a corpus with the current single-pass scorer and with the original
+multi-pass implementation for comparison. By default the corpus is this
+repository's backend sources repeated to about --megabytes; pass --path to
+score another tree.
+
+	python benchmarks/bench_code_quality.py
+	python benchmarks/bench_code_quality.py --path ../frontend/src --repeat 7
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.ai.code_quality import estimate_code_quality, estimate_code_quality_batch  # noqa: E402
+
+SOURCE_SUFFIXES = {".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".cs", ".cpp", ".c", ".go"}
+
+
+def legacy_estimate_code_quality(text: str) -> float:
+	"""The scorer as it was before the single-pass rewrite."""
+	if not text:
+		return 50.0
+	lines = [ln for ln in text.splitlines() if ln.strip()]
+	line_count = len(lines)
+	complex_tokens = [" if ", " for ", " while ", " try", " except", " catch", " case ", "switch", "&&", "||"]
+	complexity_hits = 0
+	for ln in lines:
+		l = ln.strip().lower()
+		for tok in complex_tokens:
+			if tok in l:
+				complexity_hits += 1
+	avg_len = sum(len(ln) for ln in lines) / max(1, len(lines))
+	indent_chars = sum(len(ln) - len(ln.lstrip()) for ln in lines)
+	avg_indent = indent_chars / max(1, len(lines))
+	score = 100.0
+	score -= min(40.0, max(0.0, (line_count - 80) * 0.3))
+	score -= min(30.0, complexity_hits * 1.5)
+	if avg_len > 100:
+		score -= min(20.0, (avg_len - 100) * 0.2)
+	if 1.0 <= avg_indent <= 8.0:
+		score += 5.0
+	return float(max(0.0, min(100.0, score)))
+
+
+def load_corpus(path: Path, megabytes: float) -> List[bytes]:
+	files = [p.read_bytes() for p in sorted(path.rglob("*")) if p.is_file() and p.suffix in SOURCE_SUFFIXES]
+	if not files:
+		raise SystemExit(f"No source files under {path}")
+	corpus: List[bytes] = []
+	size = 0
+	while size < megabytes * 1e6:
+		for data in files:
+			corpus.append(data)
+			size += len(data)
+	return corpus
+
+
+def run(path: Path = BACKEND_DIR / "app", megabytes: float = 5.0, repeat: int = 5) -> Dict[str, Any]:
+	corpus = load_corpus(path, megabytes)
+	texts = [data.decode("utf-8", errors="ignore") for data in corpus]
+	mb = sum(len(data) for data in corpus) / 1e6
+
+	mismatches = sum(1 for data, text in zip(corpus, texts) if estimate_code_quality(data) != legacy_estimate_code_quality(text))
+	legacy = min(timeit.repeat(lambda: [legacy_estimate_code_quality(t) for t in texts], number=1, repeat=repeat))
+	current = min(timeit.repeat(lambda: estimate_code_quality_batch(corpus), number=1, repeat=repeat))
+	return {
+		"benchmark": "code_quality",
+		"files": len(corpus),
+		"megabytes": round(mb, 2),
+		"legacy_mb_per_s": round(mb / legacy, 1),
+		"single_pass_mb_per_s": round(mb / current, 1),
+		"speedup": round(legacy / current, 2),
+		"mismatches": mismatches,
+	}
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--path", type=Path, default=BACKEND_DIR / "app")
+	parser.add_argument("--megabytes", type=float, default=5.0)
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--json", action="store_true", help="print the result as JSON")
+	args = parser.parse_args()
+
+	result = run(args.path, args.megabytes, args.repeat)
+	if args.json:
+		print(json.dumps(result))
+		return
+	print(f"{result['files']} files, {result['megabytes']} MB")
+	print(f"legacy       {result['legacy_mb_per_s']:8.1f} MB/s")
+	print(f"single-pass  {result['single_pass_mb_per_s']:8.1f} MB/s  ({result['speedup']}x)")
+	if result["mismatches"]:
+		print(f"WARNING: {result['mismatches']} files scored differently")
+
+
+if __name__ == "__main__":
+	main()
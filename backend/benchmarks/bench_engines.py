@@ -0,0 +1,109 @@
+"""
+Microbenchmarks for the heuristic engines the API calls inline.
+
+Each engine runs on inputs from datagen (same --seed, same inputs) sized like
+a large project: team recommendation over --users profiles, role suggestions,
+performance scoring, scheduling --tasks tasks with dependencies, chat context
+assembly and static analysis of generated modules. Reports the best of
+--repeat rounds per call, in microseconds.
+
+	python benchmarks/bench_engines.py
+	python benchmarks/bench_engines.py --users 2000 --tasks 1000 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.ai.context_builder import build_context  # noqa: E402
+from app.ai.performance_ai import analyze_performance  # noqa: E402
+from app.ai.role_suggestions import suggest_roles_for_project  # noqa: E402
+from app.ai.scheduler import SchedTask, build_schedule  # noqa: E402
+from app.ai.static_analysis import analyze_files  # noqa: E402
+from app.ai.team_selection import recommend_team  # noqa: E402
+from datagen import DOMAINS, SKILLS, source_file, user_profiles  # noqa: E402
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+	timer = timeit.Timer(fn)
+	number, _ = timer.autorange()
+	best = min(timer.repeat(repeat=repeat, number=number)) / number
+	return {"us_per_call": round(best * 1e6, 2), "calls_per_second": round(1 / best, 1)}
+
+
+def run(n_users: int = 500, n_tasks: int = 300, n_messages: int = 200, n_files: int = 20, repeat: int = 5, seed: int = 0) -> Dict[str, Any]:
+	rnd = random.Random(seed)
+	profiles = user_profiles(n_users, seed)
+	requirements = rnd.sample(SKILLS, 5)
+	member_skills = [{"user_id": p["user_id"], "skills": p["skills"]} for p in profiles[:6]]
+	reviews = [{"rating": rnd.randint(1, 5)} for _ in range(20)]
+
+	assignees = [p["user_id"] for p in profiles[:8]]
+	tasks = [
+		SchedTask(str(i), hours=rnd.choice([1, 2, 4, 8]), assignee_id=rnd.choice(assignees), done=rnd.random() < 0.2)
+		for i in range(n_tasks)
+	]
+	# Each task depends on up to two earlier ones: a DAG with long chains.
+	dependencies = [(str(j), str(i)) for i in range(1, n_tasks) for j in rnd.sample(range(i), min(i, rnd.randint(0, 2)))]
+
+	history = [
+		{"role": rnd.choice(["user", "assistant"]), "content": " ".join(rnd.choices(SKILLS, k=rnd.randint(5, 80)))}
+		for _ in range(n_messages)
+	]
+	open_tasks = [
+		{"title": f"Implement {s}", "status": rnd.choice(["todo", "in_progress", "done"]), "assignee_id": rnd.choice(assignees)}
+		for s in rnd.choices(SKILLS, k=50)
+	]
+	files = [{"filename": f"module_{i}.py", "file_type": "code"} for i in range(n_files)]
+	sources = [(f"pkg/module_{i}.py", source_file(rnd)) for i in range(n_files)]
+
+	engines = {
+		"recommend_team": lambda: recommend_team(profiles, requirements),
+		"suggest_roles": lambda: suggest_roles_for_project(DOMAINS[0], "Build an api with auth and ml", 5, member_skills),
+		"analyze_performance": lambda: analyze_performance(12, 40, reviews, 1500, 6),
+		"build_schedule": lambda: build_schedule(tasks, dependencies),
+		"build_context": lambda: build_context("what should I do next?", history, open_tasks, files, budget=4000),
+		"analyze_files": lambda: analyze_files(sources),
+	}
+	return {
+		"benchmark": "engines",
+		"users": n_users,
+		"tasks": n_tasks,
+		"dependencies": len(dependencies),
+		"messages": n_messages,
+		"files": n_files,
+		**{name: _time(fn, repeat) for name, fn in engines.items()},
+	}
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--users", type=int, default=500, help="profiles for team recommendation")
+	parser.add_argument("--tasks", type=int, default=300, help="tasks to schedule")
+	parser.add_argument("--messages", type=int, default=200, help="chat history turns for context assembly")
+	parser.add_argument("--files", type=int, default=20, help="modules for static analysis")
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--json", action="store_true", help="print the result as JSON")
+	args = parser.parse_args()
+
+	result = run(args.users, args.tasks, args.messages, args.files, args.repeat, args.seed)
+	if args.json:
+		print(json.dumps(result))
+		return
+	for name, r in result.items():
+		if isinstance(r, dict):
+			print(f"{name:20} {r['us_per_call']:12.2f} us/call  {r['calls_per_second']:12.1f} calls/s")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,145 @@
+"""
+Cost of request metrics: MetricsStore.observe() and the MetricsMiddleware hop.
+
+Times observe() on one thread and on `--threads` threads at once (each thread
+writes its own shard, so throughput should scale rather than contend), then
+calls a minimal ASGI app directly, with and without MetricsMiddleware in
+front, and reports the difference per request. No server or HTTP client is
+involved, so the middleware overhead is not hidden in transport noise; it
+should stay within a few microseconds.
+
+	python benchmarks/bench_metrics.py
+	python benchmarks/bench_metrics.py --iterations 500000 --threads 8 --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.metrics_store import MetricsMiddleware, MetricsStore  # noqa: E402
+
+ROUTES = ["/projects", "/projects/{project_id}/tasks", "/projects/feed", "/users/{user_id}/analytics", "/health"]
+
+
+class _Route:
+	def __init__(self, path: str) -> None:
+		self.path = path
+
+
+def _samples(n: int) -> List[tuple]:
+	rng = random.Random(7)
+	return [
+		("GET", ROUTES[i % len(ROUTES)], 200 if i % 50 else 500, rng.expovariate(1 / 0.03))
+		for i in range(n)
+	]
+
+
+def bench_observe(iterations: int, threads: int) -> Dict[str, Any]:
+	samples = _samples(min(iterations, 10000))
+	store = MetricsStore()
+
+	def work(n: int) -> None:
+		observe = store.observe
+		for i in range(n):
+			observe(*samples[i % len(samples)])
+
+	started = time.perf_counter()
+	work(iterations)
+	single = time.perf_counter() - started
+
+	per_thread = iterations // threads
+	workers = [threading.Thread(target=work, args=(per_thread,)) for _ in range(threads)]
+	started = time.perf_counter()
+	for t in workers:
+		t.start()
+	for t in workers:
+		t.join()
+	threaded = time.perf_counter() - started
+
+	recorded = store.snapshot().total_requests
+	assert recorded == iterations + per_thread * threads, recorded
+	return {
+		"single_thread_ns": round(single / iterations * 1e9, 1),
+		"threads": threads,
+		"multi_thread_ns": round(threaded / (per_thread * threads) * 1e9, 1),
+		"recorded": recorded,
+	}
+
+
+def bench_middleware(iterations: int) -> Dict[str, Any]:
+	routes = [_Route(path) for path in ROUTES]
+
+	async def endpoint(scope, receive, send) -> None:
+		scope["route"] = routes[len(scope["path"]) % len(routes)]
+		await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+		await send({"type": "http.response.body", "body": b"{}"})
+
+	async def receive():
+		return {"type": "http.request", "body": b"", "more_body": False}
+
+	async def send(message) -> None:
+		pass
+
+	async def drive(app) -> float:
+		started = time.perf_counter()
+		for i in range(iterations):
+			scope = {"type": "http", "method": "GET", "path": ROUTES[i % len(ROUTES)], "headers": []}
+			await app(scope, receive, send)
+		return time.perf_counter() - started
+
+	async def main() -> Dict[str, float]:
+		wrapped = MetricsMiddleware(endpoint, store=MetricsStore())
+		# Warm up, then alternate so neither side gets a cooler CPU.
+		await drive(endpoint)
+		await drive(wrapped)
+		bare = min([await drive(endpoint) for _ in range(3)])
+		timed = min([await drive(wrapped) for _ in range(3)])
+		return {"bare": bare, "wrapped": timed}
+
+	result = asyncio.run(main())
+	return {
+		"bare_us": round(result["bare"] / iterations * 1e6, 2),
+		"with_metrics_us": round(result["wrapped"] / iterations * 1e6, 2),
+		"overhead_us": round((result["wrapped"] - result["bare"]) / iterations * 1e6, 2),
+	}
+
+
+def run(iterations: int = 200000, threads: int = 4) -> Dict[str, Any]:
+	return {
+		"benchmark": "metrics",
+		"iterations": iterations,
+		"observe": bench_observe(iterations, threads),
+		"middleware": bench_middleware(max(iterations // 10, 1000)),
+	}
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--iterations", type=int, default=200000)
+	parser.add_argument("--threads", type=int, default=4)
+	parser.add_argument("--json", action="store_true", help="print the result as JSON")
+	args = parser.parse_args()
+
+	result = run(args.iterations, args.threads)
+	if args.json:
+		print(json.dumps(result))
+		return
+	observe, middleware = result["observe"], result["middleware"]
+	print(f"observe(): {observe['single_thread_ns']:.0f} ns/call, "
+		f"{observe['multi_thread_ns']:.0f} ns/call over {observe['threads']} threads")
+	print(f"middleware: {middleware['bare_us']:.2f} us bare, {middleware['with_metrics_us']:.2f} us with metrics, "
+		f"overhead {middleware['overhead_us']:.2f} us/request")
+
+
+if __name__ == "__main__":
+	main()
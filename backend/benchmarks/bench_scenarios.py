@@ -0,0 +1,362 @@
+"""
+Scenario load tests: login, dashboard, search, upload and chat WebSocket fan-out.
+
+Seeds a database with datagen, then drives the app in-process (httpx over
+ASGI, and a minimal ASGI WebSocket client for chat) as the seeded users, each
+request carrying a real bearer token. Reports requests per second, p50/p99
+latency and errors per scenario.
+
+- login: POST /auth/login with the seeded password (bcrypt-bound, so it gets
+  its own, smaller request count).
+- dashboard: project feed, analytics overview, task list, chat history and
+  user analytics for a project the caller belongs to.
+- search: users by name and by skills.
+- upload: a generated module to /files/projects/{id}/upload.
+- chat: --chat-clients sockets in one project; each message is timed until
+  every client has received it.
+
+Run once per database to compare them: the default is a temporary SQLite
+file; pass a local PostgreSQL with --database-url.
+
+	python benchmarks/bench_scenarios.py
+	python benchmarks/bench_scenarios.py --scenarios dashboard,chat --requests 2000 --json
+	python benchmarks/bench_scenarios.py --database-url postgresql+psycopg://user:pw@localhost/bench
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import db as app_db  # noqa: E402
+from app.db import ThreadedSession, _async_database_url, _normalize_database_url, get_async_db, get_db  # noqa: E402
+from app.db_pool import pool_settings  # noqa: E402
+from app.main import create_app  # noqa: E402
+from app.routers import files  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+from datagen import FIRST_NAMES, SKILLS, Dataset, generate, source_file  # noqa: E402
+
+SCENARIOS = ("login", "dashboard", "search", "upload", "chat")
+
+# (method, path, httpx keyword arguments) for the i-th request of a scenario.
+RequestFactory = Callable[[int], Tuple[str, str, Dict[str, Any]]]
+
+
+def _latency_stats(latencies: List[float], elapsed: float) -> Dict[str, Any]:
+	latencies = sorted(latencies)
+	return {
+		"requests_per_second": round(len(latencies) / elapsed, 1),
+		"p50_ms": round(statistics.median(latencies) * 1000, 2),
+		"p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+	}
+
+
+async def _load(client: httpx.AsyncClient, make_request: RequestFactory, n_requests: int, concurrency: int) -> Dict[str, Any]:
+	latencies: List[float] = []
+	errors = 0
+	remaining = iter(range(n_requests))
+
+	async def worker() -> None:
+		nonlocal errors
+		for i in remaining:
+			method, path, kwargs = make_request(i)
+			started = time.perf_counter()
+			response = await client.request(method, path, **kwargs)
+			latencies.append(time.perf_counter() - started)
+			if response.status_code >= 400:
+				errors += 1
+
+	started = time.perf_counter()
+	await asyncio.gather(*(worker() for _ in range(concurrency)))
+	return {"requests": n_requests, **_latency_stats(latencies, time.perf_counter() - started), "errors": errors}
+
+
+class _Callers:
+	"""Seeded users with a bearer token each, and a project they belong to."""
+
+	def __init__(self, data: Dataset, seed: int) -> None:
+		rnd = random.Random(seed)
+		self.members = [(user_id, project_id) for project_id, users in data.members.items() for user_id in users]
+		rnd.shuffle(self.members)
+		tokens: Dict[str, Dict[str, str]] = {}
+		for user_id, _ in self.members:
+			if user_id not in tokens:
+				tokens[user_id] = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+		self.headers = tokens
+
+	def __call__(self, i: int) -> Tuple[str, str, Dict[str, str]]:
+		user_id, project_id = self.members[i % len(self.members)]
+		return user_id, project_id, self.headers[user_id]
+
+
+def _request_factories(data: Dataset, callers: _Callers, seed: int) -> Dict[str, RequestFactory]:
+	rnd = random.Random(seed)
+	modules = [source_file(rnd) for _ in range(8)]
+
+	def login(i: int):
+		return "POST", "/auth/login", {"json": {"email": data.emails[i % len(data.emails)], "password": data.password}}
+
+	def dashboard(i: int):
+		user_id, project_id, headers = callers(i // 5)
+		path = (
+			"/projects/feed",
+			f"/projects/{project_id}/analytics/overview",
+			f"/projects/{project_id}/tasks",
+			f"/projects/{project_id}/messages?limit=50",
+			f"/users/{user_id}/analytics",
+		)[i % 5]
+		return "GET", path, {"headers": headers}
+
+	def search(i: int):
+		_, _, headers = callers(i)
+		if i % 2:
+			return "GET", "/users/search/by-skills", {"params": {"skills": ",".join(SKILLS[i % 7 : i % 7 + 2])}, "headers": headers}
+		return "GET", "/users/search/by-name", {"params": {"name": FIRST_NAMES[i % len(FIRST_NAMES)]}, "headers": headers}
+
+	def upload(i: int):
+		_, project_id, headers = callers(i)
+		upload = (f"upload_{i}.py", modules[i % len(modules)], "text/x-python")
+		return "POST", f"/files/projects/{project_id}/upload", {"files": {"file": upload}, "headers": headers}
+
+	return {"login": login, "dashboard": dashboard, "search": search, "upload": upload}
+
+
+class _WebSocketClient:
+	"""Just enough of an ASGI WebSocket client to drive the chat endpoint in-process."""
+
+	def __init__(self, app, path: str) -> None:
+		self.app = app
+		self.path = path
+		self._to_app: asyncio.Queue = asyncio.Queue()
+		self._from_app: asyncio.Queue = asyncio.Queue()
+		self._task: Optional[asyncio.Task] = None
+
+	async def connect(self, first_message: Dict[str, Any]) -> None:
+		scope = {
+			"type": "websocket",
+			"asgi": {"version": "3.0"},
+			"scheme": "ws",
+			"path": self.path,
+			"raw_path": self.path.encode(),
+			"root_path": "",
+			"query_string": b"",
+			"headers": [(b"host", b"bench")],
+			"client": ("127.0.0.1", 0),
+			"server": ("bench", 80),
+			"subprotocols": [],
+		}
+		self._task = asyncio.create_task(self.app(scope, self._to_app.get, self._from_app.put))
+		await self._to_app.put({"type": "websocket.connect"})
+		accepted = await self._from_app.get()
+		if accepted["type"] != "websocket.accept":
+			raise ConnectionError(f"WebSocket refused: {accepted}")
+		await self.send(first_message)
+
+	async def send(self, data: Dict[str, Any]) -> None:
+		await self._to_app.put({"type": "websocket.receive", "text": json.dumps(data)})
+
+	async def receive(self, message_type: str) -> Dict[str, Any]:
+		"""The next event of `message_type`, skipping presence and typing events."""
+		while True:
+			message = await self._from_app.get()
+			if message["type"] == "websocket.close":
+				raise ConnectionError(f"WebSocket closed: {message}")
+			data = json.loads(message["text"])
+			if data.get("type") == message_type:
+				return data
+
+	async def close(self) -> None:
+		await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+		if self._task is not None:
+			await self._task
+
+
+async def _chat_fan_out(app, data: Dataset, n_clients: int, n_messages: int) -> Dict[str, Any]:
+	project_id = data.project_ids[0]
+	clients = [_WebSocketClient(app, f"/ws/projects/{project_id}/chat") for _ in range(n_clients)]
+	for client, user_id in zip(clients, data.user_ids):
+		await client.connect({"user_id": user_id})
+	latencies: List[float] = []
+	started = time.perf_counter()
+	try:
+		for k in range(n_messages):
+			sent = time.perf_counter()
+			await clients[k % n_clients].send({"type": "message", "content": f"bench message {k}"})
+			for client in clients:
+				await client.receive("message")
+			latencies.append(time.perf_counter() - sent)
+		elapsed = time.perf_counter() - started
+	finally:
+		for client in clients:
+			await client.close()
+	stats = _latency_stats(latencies, elapsed)
+	return {
+		"clients": n_clients,
+		"messages": n_messages,
+		"messages_per_second": stats.pop("requests_per_second"),
+		**stats,
+		"deliveries_per_second": round(n_messages * n_clients / elapsed, 1),
+	}
+
+
+def run(
+	scenarios: Tuple[str, ...] = SCENARIOS,
+	n_requests: int = 1000,
+	concurrency: int = 50,
+	n_logins: int = 50,
+	chat_clients: int = 10,
+	chat_messages: int = 100,
+	n_users: int = 200,
+	n_projects: int = 40,
+	database_url: Optional[str] = None,
+	seed: int = 0,
+) -> Dict[str, Any]:
+	unknown = set(scenarios) - set(SCENARIOS)
+	if unknown:
+		raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+	tmp = None
+	if database_url is None:
+		tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+		tmp.close()
+		database_url = f"sqlite:///{tmp.name}"
+	database_url = _normalize_database_url(database_url)
+	os.environ.pop("ASYNC_DATABASE_URL", None)
+	async_url = _async_database_url(database_url)
+	upload_dir = tempfile.TemporaryDirectory(prefix="bench-uploads-")
+
+	# The app's pool settings: a scenario that holds more connections than a worker has shows up as errors.
+	pool = pool_settings(engines=2 if async_url else 1).as_kwargs()
+	connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+	sync_engine = create_engine(database_url, connect_args=connect_args, **pool)
+	data = generate(sync_engine, users=n_users, projects=n_projects, seed=seed, upload_dir=upload_dir.name)
+	sync_sessions = sessionmaker(bind=sync_engine, autoflush=False)
+	callers = _Callers(data, seed)
+	factories = _request_factories(data, callers, seed)
+
+	def sync_db():
+		db = sync_sessions()
+		try:
+			yield db
+		finally:
+			db.close()
+
+	async def main() -> Dict[str, Any]:
+		async_engine = None
+		if async_url is not None:
+			from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+			async_engine = create_async_engine(async_url, **pool)
+			async_sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+		async def async_db():
+			# Without an async driver the app falls back to threadpool sessions too.
+			db = async_sessions() if async_engine is not None else ThreadedSession(sync_sessions())
+			try:
+				yield db
+			finally:
+				await db.close()
+
+		app = create_app()
+		# The read dependencies hand out these same sessions when there is no replica.
+		app.dependency_overrides[get_db] = sync_db
+		app.dependency_overrides[get_async_db] = async_db
+
+		results: Dict[str, Any] = {}
+		try:
+			transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+			async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+				for name in scenarios:
+					if name == "chat":
+						results[name] = await _chat_fan_out(app, data, min(chat_clients, len(data.user_ids)), chat_messages)
+					else:
+						count = n_logins if name == "login" else n_requests
+						results[name] = await _load(client, factories[name], count, min(concurrency, count))
+		finally:
+			if async_engine is not None:
+				await async_engine.dispose()
+		return results
+
+	# The chat endpoint opens its own session and uploads land in UPLOAD_DIR.
+	saved = app_db.SessionLocal, files.UPLOAD_DIR
+	app_db.SessionLocal, files.UPLOAD_DIR = sync_sessions, Path(upload_dir.name)
+	try:
+		results = asyncio.run(main())
+	finally:
+		app_db.SessionLocal, files.UPLOAD_DIR = saved
+		sync_engine.dispose()
+		upload_dir.cleanup()
+		if tmp is not None:
+			os.unlink(tmp.name)
+	return {
+		"benchmark": "scenarios",
+		"database": database_url.split(":", 1)[0],
+		"async_driver": async_url.split(":", 1)[0] if async_url else None,
+		"concurrency": concurrency,
+		"dataset": data.counts,
+		**results,
+	}
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated subset of {','.join(SCENARIOS)}")
+	parser.add_argument("--requests", type=int, default=1000, help="requests per HTTP scenario")
+	parser.add_argument("--concurrency", type=int, default=50)
+	parser.add_argument("--logins", type=int, default=50, help="requests for the login scenario")
+	parser.add_argument("--chat-clients", type=int, default=10, help="WebSockets in the chat room")
+	parser.add_argument("--chat-messages", type=int, default=100)
+	parser.add_argument("--users", type=int, default=200)
+	parser.add_argument("--projects", type=int, default=40)
+	parser.add_argument("--database-url", help="sync DATABASE_URL to benchmark (default: a temporary SQLite file)")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--json", action="store_true", help="print the result as JSON")
+	args = parser.parse_args()
+
+	# httpx logs every request at INFO.
+	logging.getLogger("httpx").setLevel(logging.WARNING)
+	result = run(
+		tuple(s.strip() for s in args.scenarios.split(",") if s.strip()),
+		args.requests,
+		args.concurrency,
+		args.logins,
+		args.chat_clients,
+		args.chat_messages,
+		args.users,
+		args.projects,
+		args.database_url,
+		args.seed,
+	)
+	if args.json:
+		print(json.dumps(result))
+		return
+	print(f"{result['database']} (async: {result['async_driver'] or 'threadpool'}), {result['concurrency']} concurrent")
+	for name in SCENARIOS:
+		r = result.get(name)
+		if r is None:
+			continue
+		if name == "chat":
+			rate, tail = f"{r['messages_per_second']:8.1f} msg/s", f"{r['deliveries_per_second']:.1f} deliveries/s"
+		else:
+			rate, tail = f"{r['requests_per_second']:8.1f} req/s", f"errors {r['errors']}"
+		print(f"{name:10} {rate}  p50 {r['p50_ms']:7.2f}ms  p99 {r['p99_ms']:7.2f}ms  {tail}")
+
+
+if __name__ == "__main__":
+	main()
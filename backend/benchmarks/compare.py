@@ -0,0 +1,89 @@
+"""
+Compare two run_all.py result files and flag regressions.
+
+Timings (*_ms, *_us, *_ns, *_seconds, us_per_call) should go down and
+throughputs (*per_second, *_per_s, speedup) up; errors and mismatches are
+regressions as soon as they grow. Other numbers (sizes, counts) are inputs
+and are not compared. Exits 1 when any metric got worse by more than
+--threshold percent, so it can gate CI.
+
+	python benchmarks/compare.py benchmarks/results/BASE.json benchmarks/results/HEAD.json
+	python benchmarks/compare.py old.json new.json --threshold 5 --all
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+LOWER_IS_BETTER = ("_ms", "_us", "_ns", "_seconds", "us_per_call")
+HIGHER_IS_BETTER = ("per_second", "_per_s", "speedup")
+MUST_NOT_GROW = ("errors", "mismatches")
+
+
+def direction(metric: str) -> Optional[int]:
+	"""-1 if lower is better, 1 if higher is better, 0 for counts that must not grow, None to skip."""
+	name = metric.rsplit(".", 1)[-1]
+	if name in MUST_NOT_GROW:
+		return 0
+	if name.endswith(HIGHER_IS_BETTER):
+		return 1
+	if name.endswith(LOWER_IS_BETTER):
+		return -1
+	return None
+
+
+def flatten(value: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+	if isinstance(value, dict):
+		for key, item in value.items():
+			yield from flatten(item, f"{prefix}.{key}" if prefix else key)
+	elif isinstance(value, (int, float)) and not isinstance(value, bool):
+		yield prefix, float(value)
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+	"""One row per metric present in both runs: values, change in percent and whether it regressed."""
+	before = dict(flatten(base["results"]))
+	rows = []
+	for metric, new in flatten(head["results"]):
+		sense = direction(metric)
+		old = before.get(metric)
+		if sense is None or old is None:
+			continue
+		change = (new - old) / old * 100 if old else (0.0 if new == old else float("inf"))
+		if sense == 0:
+			regressed = new > old
+		else:
+			regressed = -sense * change > threshold
+		rows.append({"metric": metric, "base": old, "head": new, "change_pct": round(change, 1), "regressed": regressed})
+	return rows
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("base", type=Path)
+	parser.add_argument("head", type=Path)
+	parser.add_argument("--threshold", type=float, default=10.0, help="percent a metric may worsen before it counts")
+	parser.add_argument("--all", action="store_true", help="list every compared metric, not just regressions")
+	parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+	args = parser.parse_args()
+
+	base, head = json.loads(args.base.read_text()), json.loads(args.head.read_text())
+	rows = compare(base, head, args.threshold)
+	regressions = [r for r in rows if r["regressed"]]
+	if args.json:
+		print(json.dumps({"base": base.get("commit"), "head": head.get("commit"), "metrics": rows}))
+	else:
+		print(f"{base.get('commit')} -> {head.get('commit')}: {len(rows)} metrics, {len(regressions)} regressed (> {args.threshold:g}%)")
+		if base.get("platform") != head.get("platform") or base.get("quick") != head.get("quick"):
+			print("warning: the runs differ in platform or --quick; numbers may not be comparable")
+		for r in rows if args.all else regressions:
+			mark = "REGRESSED" if r["regressed"] else ""
+			print(f"{r['metric']:60} {r['base']:12.2f} -> {r['head']:12.2f}  {r['change_pct']:+7.1f}%  {mark}")
+	sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+	main()
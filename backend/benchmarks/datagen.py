@@ -0,0 +1,269 @@
+"""
+Reproducible benchmark data: users with skills, projects with teams, tasks,
+chat messages and code files.
+
+The same --seed gives the same names, skills, team layout, task statuses and
+file contents, so numbers from two commits are measured on the same data.
+Every user's password is PASSWORD (hashed once and shared, so seeding is not
+bcrypt-bound). Code files are written under --upload-dir and stored with
+absolute paths, which the analytics endpoints read as given.
+
+	python benchmarks/datagen.py --database-url sqlite:///bench.db --users 500 --projects 100
+	python benchmarks/datagen.py --database-url postgresql+psycopg://user:pw@localhost/bench --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, insert, update  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db import Base, _normalize_database_url  # noqa: E402
+from app.models import (  # noqa: E402
+	ChatMessage,
+	Project,
+	ProjectContribution,
+	ProjectFile,
+	Skill,
+	Task,
+	Team,
+	TeamMember,
+	User,
+	UserStats,
+	uuid_pk,
+)
+from app.security import hash_password  # noqa: E402
+
+PASSWORD = "bench-password"
+
+SKILLS = [
+	"python", "react", "sql", "docker", "design", "testing", "api", "css", "ml", "go",
+	"java", "aws", "ui", "auth", "cache", "kafka", "redis", "graphql", "ios", "android",
+]
+FIRST_NAMES = ["Ada", "Grace", "Alan", "Linus", "Barbara", "Ken", "Margaret", "Dennis", "Frances", "Edsger"]
+LAST_NAMES = ["Lovelace", "Hopper", "Turing", "Torvalds", "Liskov", "Thompson", "Hamilton", "Ritchie", "Allen", "Dijkstra"]
+DOMAINS = ["Web Development", "Data Science", "Mobile App", "AI/ML", "Full Stack", "E-commerce", "IoT"]
+TASK_STATUSES = ["todo", "in_progress", "done", "done"]
+ROLES = ["Frontend Developer", "Backend Developer", "Data Engineer", "UI/UX Designer", "QA Engineer"]
+BATCH = 1000
+
+
+@dataclass
+class Dataset:
+	"""Ids of what generate() wrote, for scenarios to pick callers and targets from."""
+
+	seed: int
+	password: str
+	user_ids: List[str] = field(default_factory=list)
+	emails: List[str] = field(default_factory=list)
+	project_ids: List[str] = field(default_factory=list)
+	# project id -> member user ids, owner first
+	members: Dict[str, List[str]] = field(default_factory=dict)
+	counts: Dict[str, int] = field(default_factory=dict)
+
+
+def source_file(rnd: random.Random, n_functions: int = 8) -> bytes:
+	"""A small Python module with a varying mix of docstrings, comments and long lines."""
+	lines = ['"""Generated module."""', "import os", ""]
+	for i in range(n_functions):
+		lines.append(f"def handler_{i}(request, limit={rnd.randint(1, 100)}):")
+		if rnd.random() < 0.6:
+			lines.append(f'\t"""Handle request {i}."""')
+		for j in range(rnd.randint(2, 12)):
+			if rnd.random() < 0.2:
+				lines.append(f"\t# step {j}")
+			width = rnd.choice([20, 40, 60, 140])
+			lines.append(f"\tvalue_{j} = os.environ.get('KEY_{j}', '{'x' * width}')")
+		lines.append(f"\treturn limit + {i}")
+		lines.append("")
+	return "\n".join(lines).encode()
+
+
+def user_profiles(n_users: int, seed: int = 0) -> List[Dict[str, Any]]:
+	"""In-memory users with skills, the same ones generate() writes for this seed."""
+	rnd = random.Random(seed)
+	return [
+		{
+			"user_id": f"user-{i}",
+			"name": f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)} {i}",
+			"skills": rnd.sample(SKILLS, rnd.randint(3, 6)),
+		}
+		for i in range(n_users)
+	]
+
+
+def _insert(db, model, rows: List[Dict[str, Any]]) -> None:
+	for start in range(0, len(rows), BATCH):
+		db.execute(insert(model), rows[start : start + BATCH])
+
+
+def generate(
+	engine,
+	users: int = 200,
+	projects: int = 40,
+	tasks_per_project: int = 30,
+	messages_per_project: int = 60,
+	files_per_project: int = 3,
+	seed: int = 0,
+	upload_dir: Optional[str] = None,
+) -> Dataset:
+	"""
+	Create the tables if needed and bulk-insert a dataset. Emails carry a
+	per-run suffix so several datasets can share one database.
+	"""
+	Base.metadata.create_all(engine)
+	rnd = random.Random(seed)
+	run_tag = f"{seed}-{time.time_ns()}"
+	password_hash = hash_password(PASSWORD)
+	now = datetime.now(timezone.utc)
+	data = Dataset(seed=seed, password=PASSWORD)
+	files_root = Path(upload_dir or tempfile.mkdtemp(prefix="bench-files-"))
+
+	user_rows, skill_rows, stats_rows = [], [], []
+	for profile in user_profiles(users, seed):
+		user_id = str(uuid_pk())
+		email = f"{profile['user_id']}-{run_tag}@bench.example.com"
+		data.user_ids.append(user_id)
+		data.emails.append(email)
+		user_rows.append(
+			{"id": user_id, "name": profile["name"], "email": email, "password_hash": password_hash, "profile_completed": True}
+		)
+		skill_rows.extend(
+			{"user_id": user_id, "name": name, "level": rnd.choice(["beginner", "intermediate", "expert"])}
+			for name in profile["skills"]
+		)
+		stats_rows.append({"user_id": user_id, "total_xp": rnd.randint(0, 5000), "tasks_completed": rnd.randint(0, 50)})
+
+	project_rows, team_rows, member_rows, contribution_rows = [], [], [], []
+	task_rows, message_rows, file_rows = [], [], []
+	for i in range(projects):
+		project_id, team_id = str(uuid_pk()), str(uuid_pk())
+		members = rnd.sample(data.user_ids, min(len(data.user_ids), rnd.randint(3, 6)))
+		data.project_ids.append(project_id)
+		data.members[project_id] = members
+		project_rows.append(
+			{
+				"id": project_id,
+				"title": f"{rnd.choice(DOMAINS)} project {i}",
+				"description": "Build " + " and ".join(rnd.sample(SKILLS, 3)),
+				"owner_id": members[0],
+				"team_type": "existing",
+			}
+		)
+		team_rows.append({"id": team_id, "project_id": project_id})
+		member_rows.extend({"team_id": team_id, "user_id": m, "role": rnd.choice(ROLES)} for m in members)
+		contribution_rows.extend(
+			{"project_id": project_id, "user_id": m, "tasks_completed": rnd.randint(0, 20), "total_hours": rnd.uniform(0, 80)}
+			for m in members
+		)
+		for j in range(tasks_per_project):
+			status = rnd.choice(TASK_STATUSES)
+			task_rows.append(
+				{
+					"project_id": project_id,
+					"title": f"Implement {' '.join(rnd.sample(SKILLS, 2))} #{j}",
+					"description": "Touches " + " ".join(rnd.sample(SKILLS, 2)),
+					"assignee_id": rnd.choice(members) if rnd.random() < 0.8 else None,
+					"estimated_hours": rnd.choice([1.0, 2.0, 4.0, 8.0]),
+					"status": status,
+					"due_date": now + timedelta(days=rnd.randint(-10, 30)),
+					"completed_at": now - timedelta(days=rnd.randint(0, 20)) if status == "done" else None,
+				}
+			)
+		message_rows.extend(
+			{
+				"project_id": project_id,
+				"user_id": rnd.choice(members),
+				"content": " ".join(rnd.choices(SKILLS, k=rnd.randint(3, 30))),
+				"created_at": now.replace(tzinfo=None) - timedelta(minutes=messages_per_project - j),
+			}
+			for j in range(messages_per_project)
+		)
+		project_dir = files_root / project_id
+		if files_per_project:
+			project_dir.mkdir(parents=True, exist_ok=True)
+		for j in range(files_per_project):
+			content = source_file(rnd)
+			path = project_dir / f"module_{j}.py"
+			path.write_bytes(content)
+			file_rows.append(
+				{
+					"project_id": project_id,
+					"user_id": rnd.choice(members),
+					"filename": path.name,
+					"file_path": str(path),
+					"file_size": len(content),
+					"file_type": "code",
+					"mime_type": "text/x-python",
+				}
+			)
+
+	with sessionmaker(bind=engine)() as db:
+		_insert(db, User, user_rows)
+		_insert(db, Skill, skill_rows)
+		_insert(db, UserStats, stats_rows)
+		_insert(db, Project, project_rows)
+		_insert(db, Team, team_rows)
+		# Teams point at their project, so projects get their team_id once both exist.
+		if team_rows:
+			db.execute(update(Project), [{"id": t["project_id"], "team_id": t["id"]} for t in team_rows])
+		_insert(db, TeamMember, member_rows)
+		_insert(db, ProjectContribution, contribution_rows)
+		_insert(db, Task, task_rows)
+		_insert(db, ChatMessage, message_rows)
+		_insert(db, ProjectFile, file_rows)
+		db.commit()
+
+	data.counts = {
+		"users": len(user_rows),
+		"skills": len(skill_rows),
+		"projects": len(project_rows),
+		"team_members": len(member_rows),
+		"tasks": len(task_rows),
+		"messages": len(message_rows),
+		"files": len(file_rows),
+	}
+	return data
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--database-url", required=True, help="sync DATABASE_URL to seed")
+	parser.add_argument("--users", type=int, default=200)
+	parser.add_argument("--projects", type=int, default=40)
+	parser.add_argument("--tasks", type=int, default=30, help="tasks per project")
+	parser.add_argument("--messages", type=int, default=60, help="chat messages per project")
+	parser.add_argument("--files", type=int, default=3, help="code files per project")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--upload-dir", help="where code files are written (default: a temporary directory)")
+	parser.add_argument("--json", action="store_true", help="print the dataset ids as JSON")
+	args = parser.parse_args()
+
+	engine = create_engine(_normalize_database_url(args.database_url))
+	started = time.perf_counter()
+	try:
+		data = generate(
+			engine, args.users, args.projects, args.tasks, args.messages, args.files, args.seed, args.upload_dir
+		)
+	finally:
+		engine.dispose()
+	if args.json:
+		print(json.dumps(asdict(data)))
+		return
+	print(", ".join(f"{n} {name}" for name, n in data.counts.items()) + f" in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+	main()
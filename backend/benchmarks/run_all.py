@@ -0,0 +1,123 @@
+"""
+Run the benchmark suite and save the results as JSON for compare.py.
+
+Every bench_*.py's run() is called in this process. The database-backed ones
+(async_db, scenarios) run once per --database-url; without one they use a
+temporary SQLite file. Results land in --out-dir as
+<UTC timestamp>-<commit>.json, together with the commit, whether the tree
+had local changes, and the Python and platform they were measured on.
+
+	python benchmarks/run_all.py
+	python benchmarks/run_all.py --quick --only engines,scenarios
+	python benchmarks/run_all.py --database-url sqlite:///bench.db --database-url postgresql+psycopg://user:pw@localhost/bench
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+import bench_assignment  # noqa: E402
+import bench_async_db  # noqa: E402
+import bench_code_quality  # noqa: E402
+import bench_engines  # noqa: E402
+import bench_metrics  # noqa: E402
+import bench_scenarios  # noqa: E402
+
+BENCHMARKS: Dict[str, Callable[..., Dict[str, Any]]] = {
+	"engines": bench_engines.run,
+	"assignment": bench_assignment.run,
+	"code_quality": bench_code_quality.run,
+	"metrics": bench_metrics.run,
+	"async_db": bench_async_db.run,
+	"scenarios": bench_scenarios.run,
+}
+DATABASE_BENCHMARKS = {"async_db", "scenarios"}
+# Smaller sizes for a smoke run or a quick before/after on a laptop.
+QUICK: Dict[str, Dict[str, Any]] = {
+	"engines": {"n_users": 200, "n_tasks": 100, "repeat": 3},
+	"assignment": {"n_tasks": 300, "n_members": 20},
+	"code_quality": {"megabytes": 1.0, "repeat": 3},
+	"metrics": {"iterations": 20000},
+	"async_db": {"n_requests": 300, "concurrency": 20},
+	"scenarios": {"n_requests": 200, "n_logins": 10, "chat_messages": 30, "n_users": 100, "n_projects": 20},
+}
+
+
+def _git(*args: str) -> Optional[str]:
+	try:
+		return subprocess.run(["git", *args], cwd=BENCH_DIR, capture_output=True, text=True, check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def environment() -> Dict[str, Any]:
+	return {
+		"commit": _git("rev-parse", "--short", "HEAD") or "unknown",
+		"dirty": bool(_git("status", "--porcelain", "--", str(BENCH_DIR.parent))),
+		"created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"cpus": os.cpu_count(),
+	}
+
+
+def run(only: List[str], database_urls: List[Optional[str]], quick: bool = False) -> Dict[str, Any]:
+	results: Dict[str, Any] = {}
+	for name in only:
+		kwargs = QUICK.get(name, {}) if quick else {}
+		for database_url in database_urls if name in DATABASE_BENCHMARKS else [None]:
+			started = time.perf_counter()
+			result = BENCHMARKS[name](database_url=database_url, **kwargs) if name in DATABASE_BENCHMARKS else BENCHMARKS[name](**kwargs)
+			key = f"{name}:{result['database']}" if name in DATABASE_BENCHMARKS else name
+			if key in results:
+				key = f"{key}#{sum(1 for k in results if k.startswith(key)) + 1}"
+			results[key] = result
+			print(f"{key}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+	return {**environment(), "quick": quick, "results": results}
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"comma-separated subset of {','.join(BENCHMARKS)}")
+	parser.add_argument(
+		"--database-url",
+		action="append",
+		help="sync DATABASE_URL for the database benchmarks; repeat to run each against several (default: temporary SQLite)",
+	)
+	parser.add_argument("--quick", action="store_true", help="smaller sizes for a smoke run")
+	parser.add_argument("--out-dir", default=str(BENCH_DIR / "results"))
+	parser.add_argument("--json", action="store_true", help="also print the results as JSON")
+	args = parser.parse_args()
+
+	only = [name.strip() for name in args.only.split(",") if name.strip()]
+	unknown = set(only) - set(BENCHMARKS)
+	if unknown:
+		raise SystemExit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+	# httpx logs every request at INFO.
+	logging.getLogger("httpx").setLevel(logging.WARNING)
+	report = run(only, args.database_url or [None], args.quick)
+
+	out_dir = Path(args.out_dir)
+	out_dir.mkdir(parents=True, exist_ok=True)
+	stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+	path = out_dir / f"{stamp}-{report['commit']}{'-dirty' if report['dirty'] else ''}.json"
+	path.write_text(json.dumps(report, indent=2) + "\n")
+	if args.json:
+		print(json.dumps(report))
+	print(f"Saved {path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
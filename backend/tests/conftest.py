@@ -3,11 +3,14 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ.setdefault("LLM_CACHE_DISK", "false")
 
 from app.main import create_app  # noqa: E402
-from app.db import Base  # noqa: E402
+from app.db import Base, ThreadedSession, get_async_db  # noqa: E402
+from app.db_replicas import get_async_read_db, get_read_db  # noqa: E402
 from app.dependencies import get_db  # noqa: E402
 from app.models import User, UserStats  # noqa: E402
 from app.security import hash_password  # noqa: E402
@@ -15,7 +18,8 @@ from app.security import hash_password  # noqa: E402
 
 @pytest.fixture(scope="session")
 def test_engine():
-	engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+	# StaticPool: every session shares the one in-memory database.
+	engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
 	Base.metadata.create_all(bind=engine)
 	return engine
 
@@ -27,6 +31,12 @@ def db_session(test_engine):
 	try:
 		yield session
 	finally:
+		session.rollback()
+		# The in-memory database is shared by the whole session; start each test clean.
+		# (SQLite does not enforce foreign keys here, so table order does not matter.)
+		for table in Base.metadata.tables.values():
+			session.execute(table.delete())
+		session.commit()
 		session.close()
 
 
@@ -41,6 +51,14 @@ def test_client(db_session):
 			pass
 
 	app.dependency_overrides[get_db] = override_get_db
+	app.dependency_overrides[get_read_db] = override_get_db
+
+	async def override_get_async_db():
+		# Async routes run their statements on the same test session.
+		yield ThreadedSession(db_session)
+
+	app.dependency_overrides[get_async_db] = override_get_async_db
+	app.dependency_overrides[get_async_read_db] = override_get_async_db
 
 	test_user = User(
 		name="Test User",
@@ -56,9 +74,10 @@ def test_client(db_session):
 	def override_current_user():
 		return test_user
 
-	from app.dependencies import get_current_user
+	from app.dependencies import get_current_user, get_current_user_async
 
 	app.dependency_overrides[get_current_user] = override_current_user
+	app.dependency_overrides[get_current_user_async] = override_current_user
 	return TestClient(app)
 
 
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app import access
+from app.models import Project, Team, TeamMember, User
+
+
+def _statements(engine):
+	statements = []
+
+	def before(conn, cursor, statement, parameters, context, executemany):
+		statements.append(statement)
+
+	event.listen(engine, "before_cursor_execute", before)
+	return statements, lambda: event.remove(engine, "before_cursor_execute", before)
+
+
+@pytest.fixture
+def team_project(test_client, current_user, db_session):
+	access.access_cache.clear()
+	member = User(name="Member", email="member@example.com")
+	outsider = User(name="Outsider", email="outsider@example.com")
+	project = Project(title="Shared", description="access", owner_id=current_user.id)
+	db_session.add_all([member, outsider, project])
+	db_session.flush()
+	team = Team(project_id=project.id)
+	db_session.add(team)
+	db_session.flush()
+	project.team_id = team.id
+	db_session.add(TeamMember(team_id=team.id, user_id=member.id, role="Backend"))
+	db_session.commit()
+	ids = project.id, team.id, current_user.id, member.id, outsider.id
+	db_session.info.pop("project_access", None)
+	return ids
+
+
+def test_one_query_then_memo_then_ttl_cache(db_session, team_project):
+	project_id, _, owner_id, member_id, outsider_id = team_project
+	statements, stop = _statements(db_session.get_bind())
+	try:
+		assert access.resolve(db_session, project_id, member_id).role == access.MEMBER
+		assert len(statements) == 1
+		# Same request: memoized on the session.
+		assert access.resolve(db_session, project_id, member_id).team_role == "Backend"
+		# Next request (fresh memo): served from the TTL cache.
+		db_session.info.pop("project_access", None)
+		assert access.resolve(db_session, project_id, member_id).allowed
+		assert len(statements) == 1
+
+		assert access.resolve(db_session, project_id, owner_id).is_owner
+		assert not access.resolve(db_session, project_id, outsider_id).allowed
+		assert not access.resolve(db_session, "0" * 36, owner_id).exists
+		assert len(statements) == 4
+	finally:
+		stop()
+
+
+def test_membership_changes_invalidate(test_client, db_session, team_project):
+	project_id, team_id, _, member_id, outsider_id = team_project
+	assert not access.resolve(db_session, project_id, outsider_id).allowed
+	with pytest.raises(HTTPException) as e:
+		access.require(db_session, project_id, outsider_id)
+	assert e.value.status_code == 403
+
+	db_session.add(TeamMember(team_id=team_id, user_id=outsider_id))
+	db_session.commit()
+	assert access.resolve(db_session, project_id, outsider_id).role == access.MEMBER
+
+	db_session.query(TeamMember).filter(TeamMember.user_id == member_id).delete()
+	access.invalidate(db_session, team_id=team_id)
+	db_session.commit()
+	assert not access.resolve(db_session, project_id, member_id).allowed
+
+
+def test_endpoint_checks_access_in_one_joined_query(test_client, db_session, team_project):
+	project_id = team_project[0]
+	statements, stop = _statements(db_session.get_bind())
+	try:
+		assert test_client.get(f"/projects/{project_id}/tasks").status_code == 200
+	finally:
+		stop()
+	# The joined access query (which also loads the project), then the tasks.
+	assert len(statements) == 2
+	assert "team_members" in statements[0] and "tasks" in statements[1]
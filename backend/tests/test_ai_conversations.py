@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from app.crud import ai_conversations
+from app.models import AIChatMessage, AIConversationSummary, Project
+
+
+def _project(db_session, current_user):
+	project = Project(title="Chat", description="history test", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.flush()
+	return project
+
+
+def _add_messages(db_session, project, start, count):
+	base = datetime(2026, 1, 1)
+	for i in range(start, start + count):
+		db_session.add(
+			AIChatMessage(
+				project_id=project.id,
+				role="user" if i % 2 == 0 else "assistant",
+				content=f"Turn {i}. More text.",
+				created_at=base + timedelta(seconds=i),
+			)
+		)
+	db_session.flush()
+
+
+def test_window_returns_latest_turns_in_order(test_client, current_user, db_session):
+	project = _project(db_session, current_user)
+	_add_messages(db_session, project, 0, 45)
+
+	window = ai_conversations.load_project_chat(db_session, project.id, limit=10)
+
+	assert [m["content"] for m in window.messages] == [f"Turn {i}. More text." for i in range(35, 45)]
+	assert window.summary.splitlines()[0] == "user: Turn 0."
+	assert window.summary.splitlines()[-1] == "user: Turn 34."
+
+
+def test_rolling_summary_only_folds_new_turns(test_client, current_user, db_session):
+	project = _project(db_session, current_user)
+	_add_messages(db_session, project, 0, 12)
+	ai_conversations.load_project_chat(db_session, project.id, limit=10)
+
+	_add_messages(db_session, project, 12, 2)
+	window = ai_conversations.load_project_chat(db_session, project.id, limit=10)
+
+	summary = db_session.query(AIConversationSummary).filter_by(conversation_key=f"project:{project.id}").one()
+	assert summary.message_count == 4
+	assert window.summary.splitlines() == [f"{'user' if i % 2 == 0 else 'assistant'}: Turn {i}." for i in range(4)]
+
+
+def test_history_endpoint_returns_most_recent(test_client, current_user, db_session):
+	project = _project(db_session, current_user)
+	_add_messages(db_session, project, 0, 60)
+	db_session.commit()
+
+	response = test_client.get(f"/projects/{project.id}/ai/history?limit=5")
+
+	assert response.status_code == 200
+	assert [m["content"] for m in response.json()] == [f"Turn {i}. More text." for i in range(55, 60)]
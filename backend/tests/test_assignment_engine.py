@@ -0,0 +1,61 @@
+import itertools
+import random
+
+from app.ai.assignment_engine import (
+	AssignmentMember,
+	AssignmentTask,
+	assign_tasks,
+	skill_match_matrix,
+	solve_assignment,
+)
+
+
+def _total_cost(costs, slot_costs, assignment):
+	load = [0] * len(slot_costs)
+	total = 0.0
+	for t, m in enumerate(assignment):
+		if load[m] >= len(slot_costs[m]):
+			return None
+		total += costs[t][m] + slot_costs[m][load[m]]
+		load[m] += 1
+	return total
+
+
+def test_solver_matches_brute_force():
+	rnd = random.Random(3)
+	for _ in range(200):
+		n_tasks, n_members = rnd.randint(1, 6), rnd.randint(1, 3)
+		costs = [[rnd.choice([0.0, -25.0, -50.0, rnd.uniform(-50, 0)]) for _ in range(n_members)] for _ in range(n_tasks)]
+		capacity = [rnd.randint(1, n_tasks) for _ in range(n_members)]
+		capacity[0] += max(0, n_tasks - sum(capacity))
+		slot_costs = [sorted(rnd.uniform(0, 30) for _ in range(c)) for c in capacity]
+
+		best = min(
+			cost
+			for cost in (_total_cost(costs, slot_costs, a) for a in itertools.product(range(n_members), repeat=n_tasks))
+			if cost is not None
+		)
+		got = _total_cost(costs, slot_costs, solve_assignment(costs, slot_costs))
+		assert got is not None
+		assert abs(got - best) < 1e-6
+
+
+def test_skill_match_counts_each_members_share():
+	matrix = skill_match_matrix(["build the react ui", "write sql"], [["react", "sql"], ["sql", "sql", "go"], []])
+
+	assert matrix[0] == [50.0, 0.0, 0.0]
+	assert matrix[1] == [50.0, 200.0 / 3, 0.0]
+
+
+def test_assignment_prefers_skills_and_balances_load():
+	tasks = [AssignmentTask(str(i), f"react page {i}", estimated_hours=4) for i in range(4)]
+	tasks.append(AssignmentTask("db", "sql migration", estimated_hours=4))
+	members = [AssignmentMember("frontend", ["react"]), AssignmentMember("backend", ["sql"])]
+
+	plan = assign_tasks(tasks, members, slack=1.0)
+
+	owners = [members[a.member_index].user_id for a in plan]
+	assert owners[4] == "backend"
+	# Capacity is ceil(5 / 2) = 3, so one react task spills over to backend.
+	assert owners.count("frontend") == 3
+	assert plan[0].fit > 0 and plan[0].availability == 1.0
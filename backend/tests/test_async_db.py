@@ -0,0 +1,78 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import db as app_db
+from app.db import Base, get_async_db
+from app.db_replicas import get_async_read_db
+from app.dependencies import get_current_user_async
+from app.main import create_app
+from app.models import ChatMessage, Project, Task, User
+
+
+def test_async_url_follows_the_sync_driver(monkeypatch):
+	monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+	assert app_db._async_database_url("sqlite:///:memory:") is None
+	assert app_db._async_database_url("postgresql+psycopg://u:p@db:5432/app?sslmode=require") == (
+		"postgresql+psycopg://u:p@db:5432/app?sslmode=require"
+	)
+	monkeypatch.setenv("ASYNC_DATABASE_URL", "postgresql+asyncpg://u:p@db/app")
+	assert app_db._async_database_url("postgresql+psycopg://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+
+def test_async_engine_is_opt_in(tmp_path, monkeypatch):
+	pytest.importorskip("aiosqlite")
+	monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+	monkeypatch.delenv("ASYNC_DATABASE", raising=False)
+	monkeypatch.setattr(app_db, "DATABASE_URL", f"sqlite:///{tmp_path / 'app.db'}")
+	assert app_db._enabled_async_url() is None
+	monkeypatch.setenv("ASYNC_DATABASE", "auto")
+	assert app_db._enabled_async_url() == f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+
+
+def test_hot_reads_on_a_real_async_session(tmp_path, monkeypatch):
+	pytest.importorskip("aiosqlite")
+	from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+	monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+	path = tmp_path / "async.db"
+	sync_engine = create_engine(f"sqlite:///{path}")
+	Base.metadata.create_all(sync_engine)
+	with sessionmaker(bind=sync_engine, expire_on_commit=False)() as session:
+		user = User(name="Async", email="async@example.com")
+		session.add(user)
+		session.flush()
+		project = Project(title="Async project", description="", owner_id=user.id)
+		session.add(project)
+		session.flush()
+		session.add_all([Task(project_id=project.id, title=f"t{i}", status="done" if i else "todo") for i in range(3)])
+		session.add(ChatMessage(project_id=project.id, user_id=user.id, content="hello"))
+		session.commit()
+		session.expunge_all()
+
+	url = app_db._async_database_url(f"sqlite:///{path}")
+	assert url.startswith("sqlite+aiosqlite://")
+	# NullPool: no connection outlives the TestClient event loop.
+	async_engine = create_async_engine(url, poolclass=NullPool)
+	factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+	async def override_get_async_db():
+		async with factory() as session:
+			yield session
+
+	app = create_app()
+	app.dependency_overrides[get_async_db] = override_get_async_db
+	app.dependency_overrides[get_async_read_db] = override_get_async_db
+	app.dependency_overrides[get_current_user_async] = lambda: user
+	with TestClient(app) as client:
+		feed = client.get("/projects/feed").json()
+		assert feed["total"] == 1 and feed["items"][0]["task_done"] == 2
+		assert [p["title"] for p in client.get("/projects").json()] == ["Async project"]
+		tasks = client.get(f"/projects/{project.id}/tasks", params={"status_filter": "done"}).json()
+		assert sorted(t["title"] for t in tasks) == ["t1", "t2"]
+		assert [m["content"] for m in client.get(f"/projects/{project.id}/messages").json()] == ["hello"]
+		assert client.get(f"/users/{user.id}/analytics").json()["user_id"] == user.id
+		assert client.get(f"/projects/{'0' * 36}/tasks").status_code == 404
+	sync_engine.dispose()
@@ -0,0 +1,106 @@
+import json
+from types import SimpleNamespace
+
+from app.ai import code_analyzer, llm_cache, llm_gateway
+from app.ai.llm_cache import LLMResponseCache
+from app.crud import code_analysis
+from app.models import FileAnalysis, Project
+
+
+def _file(name, body):
+	return {"filename": name, "content": body, "line_count": body.count("\n") + 1}
+
+
+def _run(db_session, project, user, files_data):
+	previous_files, previous_report = code_analysis.load_previous(db_session, project.id, user.id, "comprehensive")
+	report, entries = code_analyzer.analyze_code_incremental(
+		files_data, "comprehensive", None, previous_files, previous_report
+	)
+	code_analysis.save_analysis(db_session, project.id, user.id, "comprehensive", files_data, entries, report)
+	db_session.commit()
+	return report
+
+
+def test_reupload_only_analyzes_changed_files(test_client, current_user, db_session, monkeypatch):
+	project = Project(title="Code", description="incremental", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.commit()
+
+	analyzed = []
+	original = code_analyzer.analyze_code_comprehensive
+
+	def spy(files_data, analysis_type="comprehensive", static_report=None):
+		analyzed.append([fd["filename"] for fd in files_data])
+		return original(files_data, analysis_type, static_report)
+
+	monkeypatch.setattr(code_analyzer, "analyze_code_comprehensive", spy)
+
+	first = [_file("a.py", "def a():\n\treturn 1\n"), _file("b.py", "def b():\n\treturn 2\n"), _file("c.py", "x = 1\n")]
+	report = _run(db_session, project, current_user, first)
+	assert analyzed == [["a.py", "b.py", "c.py"]]
+	assert report["incremental"]["changed_files"] == 3
+
+	# b.py changes, c.py is removed, d.py is new.
+	second = [first[0], _file("b.py", "def b(x):\n\tif x:\n\t\treturn 2\n"), _file("d.py", "y = 2\n")]
+	report = _run(db_session, project, current_user, second)
+	assert analyzed[-1] == ["b.py", "d.py"]
+	assert report["incremental"] == {"changed_files": 2, "reused_files": 1, "removed_files": 1, "changed_lines": 6}
+	assert [f["filename"] for f in report["individual_files"]] == ["a.py", "b.py", "d.py"]
+	paths = {row.path for row in db_session.query(FileAnalysis).filter(FileAnalysis.project_id == project.id)}
+	assert paths == {"a.py", "b.py", "d.py"}
+
+	# Nothing changed: no analysis at all, the stored report is returned.
+	calls = len(analyzed)
+	again = _run(db_session, project, current_user, second)
+	assert len(analyzed) == calls
+	assert again["overall_score"] == report["overall_score"]
+	assert again["incremental"]["reused_files"] == 3
+
+
+def test_scores_follow_the_current_files(test_client, current_user, db_session):
+	project = Project(title="Code", description="scores", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.commit()
+	simple = _file("simple.py", "def a():\n\treturn 1\n")
+	nested = "def b(x):\n" + "".join("\t" * (i + 1) + f"if x > {i}:\n" for i in range(8)) + "\t" * 9 + "return x\n"
+	tangled = _file("tangled.py", nested)
+
+	both = _run(db_session, project, current_user, [simple, tangled])
+	alone = code_analyzer.analyze_code_incremental([simple])[0]
+	assert both["overall_score"] < alone["overall_score"]
+
+	# Removing the weak file is enough to lift the score, with nothing to re-analyze.
+	removed = _run(db_session, project, current_user, [simple])
+	assert removed["incremental"] == {"changed_files": 0, "reused_files": 1, "removed_files": 1, "changed_lines": 0}
+	assert removed["overall_score"] == alone["overall_score"]
+
+	# So is replacing it; its old version no longer counts.
+	_run(db_session, project, current_user, [simple, tangled])
+	fixed = _run(db_session, project, current_user, [simple, _file("tangled.py", "def b(x):\n\treturn x\n")])
+	assert fixed["overall_score"] == alone["overall_score"]
+
+
+def test_repeat_analysis_is_served_from_the_response_cache(monkeypatch):
+	requests = []
+	reply = json.dumps({"overall_score": 80.0, "summary": "fine"})
+
+	def create(**request):
+		requests.append(request)
+		return SimpleNamespace(
+			choices=[SimpleNamespace(message=SimpleNamespace(content=reply))],
+			usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+		)
+
+	client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+	monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+	monkeypatch.setattr(llm_gateway, "_sync_clients", {"sk-test": client})
+	cache = LLMResponseCache()
+	monkeypatch.setattr(llm_cache, "response_cache", cache)
+
+	files_data = [_file("a.py", "def a(x):\n\tif x:\n\t\treturn 1\n\treturn 2\n")]
+	first = code_analyzer.analyze_code_comprehensive(files_data)
+	second = code_analyzer.analyze_code_comprehensive(files_data)
+
+	assert len(requests) == 1
+	assert cache.snapshot()["hits"] == 1 and cache.snapshot()["misses"] == 1
+	assert first["overall_score"] == second["overall_score"] == 80.0
@@ -0,0 +1,61 @@
+import random
+from pathlib import Path
+
+from app.ai.code_quality import estimate_code_quality, estimate_code_quality_batch, score_files
+
+
+def _reference_score(text):
+	# The original multi-pass implementation, kept to pin the scores.
+	if not text:
+		return 50.0
+	lines = [ln for ln in text.splitlines() if ln.strip()]
+	line_count = len(lines)
+	complex_tokens = [" if ", " for ", " while ", " try", " except", " catch", " case ", "switch", "&&", "||"]
+	complexity_hits = 0
+	for ln in lines:
+		l = ln.strip().lower()
+		for tok in complex_tokens:
+			if tok in l:
+				complexity_hits += 1
+	avg_len = sum(len(ln) for ln in lines) / max(1, len(lines))
+	indent_chars = sum(len(ln) - len(ln.lstrip()) for ln in lines)
+	avg_indent = indent_chars / max(1, len(lines))
+	score = 100.0
+	score -= min(40.0, max(0.0, (line_count - 80) * 0.3))
+	score -= min(30.0, complexity_hits * 1.5)
+	if avg_len > 100:
+		score -= min(20.0, (avg_len - 100) * 0.2)
+	if 1.0 <= avg_indent <= 8.0:
+		score += 5.0
+	return float(max(0.0, min(100.0, score)))
+
+
+def test_matches_reference_on_repo_sources():
+	app_dir = Path(__file__).resolve().parent.parent / "app"
+	for path in sorted(app_dir.rglob("*.py")):
+		data = path.read_bytes()
+		expected = _reference_score(path.read_text(encoding="utf-8", errors="ignore"))
+		assert estimate_code_quality(data) == expected, path
+		assert estimate_code_quality(data.decode("utf-8", errors="ignore")) == expected, path
+
+
+def test_matches_reference_on_random_text():
+	pieces = [
+		" if ", " for ", " while ", " try", " except", " catch", " case ", "SWITCH", "&&", "||",
+		"x", "\t", "    ", "\n", "\r\n", "\r", "\x0c", "\x1f", "\x85", "é", "IF ",
+	]
+	rnd = random.Random(7)
+	for _ in range(2000):
+		text = "".join(rnd.choice(pieces) for _ in range(rnd.randint(0, 150)))
+		expected = _reference_score(text)
+		assert estimate_code_quality(text) == expected, repr(text)
+		assert estimate_code_quality(text.encode("utf-8")) == expected, repr(text)
+
+
+def test_batch_and_files(tmp_path):
+	good = tmp_path / "a.py"
+	good.write_bytes(b"def a(x):\n\tif x and y:\n\t\treturn 1\n")
+	sources = [good.read_bytes(), b"", "x = 1\n"]
+
+	assert estimate_code_quality_batch(sources) == [_reference_score(s.decode() if isinstance(s, bytes) else s) for s in sources]
+	assert score_files([good, tmp_path / "missing.py", tmp_path]) == [estimate_code_quality(sources[0]), None, None]
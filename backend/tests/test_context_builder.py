@@ -0,0 +1,60 @@
+from app.ai import context_builder
+from app.ai.context_builder import HistorySummaryCache, build_context
+
+
+def _history(n):
+	return [
+		{"id": str(i), "role": "user" if i % 2 == 0 else "assistant", "content": f"Message number {i}. " + "detail " * 40}
+		for i in range(n)
+	]
+
+
+def test_context_fits_budget_and_keeps_latest_turns():
+	history = _history(60)
+	tasks = [{"title": f"Task {i}", "status": "todo", "due_date": f"2026-01-{i % 28 + 1:02d}"} for i in range(200)]
+	files = [{"filename": f"file_{i}.py", "file_type": "code"} for i in range(200)]
+
+	window = build_context("What next?", history, tasks, files, base_tokens=300, budget=2000)
+
+	assert window.prompt_tokens <= 2000
+	assert window.history[-1]["content"] == history[-1]["content"]
+	assert window.dropped_messages > 0
+	assert window.dropped_tasks > 0
+	assert any(s.startswith("Summary of earlier conversation:") for s in window.sections)
+
+
+def test_current_message_is_not_duplicated_from_history():
+	history = _history(2) + [{"role": "user", "content": "What next?"}]
+	window = build_context("What next?", history, budget=4000)
+	assert [m["content"] for m in window.history] == [history[0]["content"], history[1]["content"]]
+
+
+def test_summary_is_extended_incrementally(monkeypatch):
+	cache = HistorySummaryCache()
+	calls = []
+	real = context_builder.summarize_message
+	monkeypatch.setattr(context_builder, "summarize_message", lambda m: calls.append(m["id"]) or real(m))
+
+	history = _history(10)
+	lines, reused = cache.summarize("project:1", history[:6])
+	assert len(lines) == 6 and not reused
+
+	calls.clear()
+	lines, reused = cache.summarize("project:1", history[:8])
+	assert reused
+	assert calls == ["6", "7"]
+	assert len(lines) == 8
+
+
+def test_persisted_summary_is_not_repeated_from_the_cache():
+	context_builder.summary_cache.clear()
+	history = _history(40)
+	# A 20-turn window sliding two turns at a time; turns before it are in the persisted summary.
+	for start in range(0, 8, 2):
+		window = history[start : start + 20]
+		persisted = "\n".join(context_builder.summarize_message(m) for m in history[:start])
+		built = build_context("What next?", window, summary_key="project:slide", summary=persisted or None, budget=1500)
+	[section] = [s for s in built.sections if s.startswith("Summary of earlier conversation:")]
+	lines = section.splitlines()[1:]
+	assert len(lines) == len(set(lines))
+	context_builder.summary_cache.clear()
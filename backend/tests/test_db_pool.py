@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app import db as app_db
+from app.db_pool import ObservedQueuePool, pool_settings, pool_status, sync_pool_stats
+from app.routers.health import ReadinessProbe, readiness
+
+
+def test_pool_budget_is_split_across_workers_and_engines(monkeypatch):
+	monkeypatch.setenv("DB_POOL_SIZE", "5")
+	monkeypatch.setenv("DB_MAX_OVERFLOW", "10")
+	monkeypatch.delenv("DB_MAX_CONNECTIONS", raising=False)
+	monkeypatch.setenv("WEB_CONCURRENCY", "4")
+	assert (pool_settings().pool_size, pool_settings().max_overflow) == (5, 10)
+
+	monkeypatch.setenv("DB_MAX_CONNECTIONS", "40")
+	assert (pool_settings().pool_size, pool_settings().max_overflow) == (5, 5)
+	both = pool_settings(engines=2)
+	assert (both.pool_size, both.max_overflow) == (5, 0)
+	monkeypatch.setenv("WEB_CONCURRENCY", "16")
+	tight = pool_settings(engines=2)
+	assert (tight.pool_size, tight.max_overflow) == (1, 0)
+
+
+def test_pool_reports_in_use_overflow_and_waits(tmp_path):
+	sync_pool_stats.reset()
+	engine = create_engine(
+		f"sqlite:///{tmp_path / 'pool.db'}",
+		poolclass=ObservedQueuePool,
+		pool_size=1,
+		max_overflow=1,
+		pool_timeout=0.05,
+	)
+	first, second = engine.connect(), engine.connect()
+	status = pool_status(engine.pool)
+	assert (status["size"], status["in_use"], status["overflow"]) == (1, 2, 1)
+	assert status["checkouts"] == 2
+
+	with pytest.raises(PoolTimeoutError):
+		engine.connect()
+	assert pool_status(engine.pool)["timeouts"] == 1
+
+	first.close()
+	second.close()
+	status = pool_status(engine.pool)
+	assert status["in_use"] == 0 and status["wait_ms_max"] >= 0
+	engine.dispose()
+
+
+def test_readiness_probe_is_rate_limited():
+	calls = []
+	probe = ReadinessProbe(lambda: calls.append(1), interval=60)
+	assert asyncio.run(probe.result())["ready"]
+	assert asyncio.run(probe.result())["ready"]
+	assert len(calls) == 1
+
+	def down():
+		raise RuntimeError("connection refused")
+
+	failing = ReadinessProbe(down, interval=0)
+	result = asyncio.run(failing.result())
+	assert not result["ready"] and "connection refused" in result["database"]
+
+
+def test_health_never_queries_and_ready_probes_once(test_client):
+	readiness.reset()
+	statements = []
+	listener = lambda conn, cursor, statement, *args: statements.append(statement)
+	event.listen(app_db.engine, "before_cursor_execute", listener)
+	try:
+		assert test_client.get("/health").json()["database"] == "unchecked"
+		assert statements == []
+		for _ in range(3):
+			response = test_client.get("/health/ready")
+			assert response.status_code == 200 and response.json()["ready"]
+		assert statements == ["SELECT 1"]
+		assert test_client.get("/health").json()["database"] == "connected"
+	finally:
+		event.remove(app_db.engine, "before_cursor_execute", listener)
+	assert "sync" in test_client.get("/metrics").json()["db_pool"]
@@ -0,0 +1,139 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import db as app_db
+from app import db_replicas
+from app.db import Base, get_db
+from app.db_replicas import Replica, ReplicaRouter
+from app.dependencies import get_current_user
+from app.main import create_app
+from app.models import User
+from app.security import create_access_token
+
+
+def _sqlite(path):
+	engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+	Base.metadata.create_all(engine)
+	return engine
+
+
+def test_router_skips_lagging_and_failed_replicas(tmp_path):
+	a = Replica("a", _sqlite(tmp_path / "a.db"))
+	b = Replica("b", _sqlite(tmp_path / "b.db"))
+	lag = {"a": 0.5, "b": 1.0}
+	probes = []
+
+	def probe(conn):
+		name = "a" if conn.engine is a.engine else "b"
+		probes.append(name)
+		if lag[name] is None:
+			raise RuntimeError("replica down")
+		return lag[name]
+
+	router = ReplicaRouter([a, b], lag_limit=2, interval=60, lag_probe=probe)
+	router.check()
+	assert [router.pick().name for _ in range(4)] == ["a", "b", "a", "b"]
+	# Checks are rate-limited to one per replica per interval.
+	router.check()
+	assert sorted(probes) == ["a", "b"]
+
+	lag["b"] = 30.0
+	router._interval = 0
+	router.check()
+	assert {router.pick().name for _ in range(3)} == {"a"}
+
+	lag["a"] = None
+	router.check()
+	assert router.pick() is None
+	snapshot = router.snapshot()
+	assert snapshot["primary_reads"] == 1
+	assert [(r["healthy"], r["usable"]) for r in snapshot["replicas"]] == [(False, False), (True, False)]
+
+
+def test_replica_sessions_refuse_writes(tmp_path):
+	replica = Replica("r", _sqlite(tmp_path / "r.db"))
+	with replica.sessions() as db:
+		db.add(User(name="Nope", email="nope@example.com"))
+		with pytest.raises(RuntimeError):
+			db.flush()
+
+
+def test_reads_go_to_replica_until_the_user_writes(tmp_path, monkeypatch):
+	primary_engine = _sqlite(tmp_path / "primary.db")
+	replica_engine = _sqlite(tmp_path / "replica.db")
+	primary_sessions = sessionmaker(bind=primary_engine, autoflush=False, expire_on_commit=False)
+
+	with primary_sessions() as db:
+		me = User(name="Me", email="me@example.com")
+		alice = User(name="Alice", email="alice@example.com", profile_completed=True)
+		db.add_all([me, alice])
+		db.commit()
+	# The replica has the caller but not yet Alice: it lags.
+	with sessionmaker(bind=replica_engine)() as db:
+		db.add(User(id=me.id, name="Me", email="me@example.com"))
+		db.commit()
+
+	router = ReplicaRouter([Replica("replica-0", replica_engine)], lag_limit=5, interval=60)
+	monkeypatch.setattr(db_replicas, "replica_router", router)
+	monkeypatch.setattr(app_db, "SessionLocal", primary_sessions)
+	db_replicas.write_fence.clear()
+
+	def primary_db():
+		db = primary_sessions()
+		try:
+			yield db
+		finally:
+			db.close()
+
+	app = create_app()
+	app.dependency_overrides[get_db] = primary_db
+	app.dependency_overrides[get_current_user] = lambda: me
+	client = TestClient(app, headers={"Authorization": f"Bearer {create_access_token(me.id)}"})
+
+	assert client.get("/users/search/by-name", params={"name": "Ali"}).json() == []
+	assert router.replicas[0].reads == 1
+
+	created = client.post("/projects", json={"title": "New", "description": "x"})
+	assert created.status_code == 200
+	# Read-your-writes: this user's reads now stay on the primary.
+	assert [u["name"] for u in client.get("/users/search/by-name", params={"name": "Ali"}).json()] == ["Alice"]
+	assert router.replicas[0].reads == 1 and router.primary_reads == 1
+
+	# Other users are unaffected by the fence.
+	assert not db_replicas.write_fence.active(alice.id)
+	db_replicas.write_fence.clear()
+	assert client.get("/users/search/by-name", params={"name": "Ali"}).json() == []
+	assert "replicas" in client.get("/metrics").json()["db_pool"]
+
+	primary_engine.dispose()
+	replica_engine.dispose()
+	for replica in router.replicas:
+		replica.engine.dispose()
+
+
+def test_without_replicas_reads_share_the_request_session(tmp_path, monkeypatch):
+	# One connection and no overflow: a read route that opened a second
+	# primary session next to get_current_user's would wait out the timeout.
+	engine = create_engine(
+		f"sqlite:///{tmp_path / 'primary.db'}",
+		connect_args={"check_same_thread": False},
+		pool_size=1,
+		max_overflow=0,
+		pool_timeout=1,
+	)
+	Base.metadata.create_all(engine)
+	sessions = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+	with sessions() as db:
+		me = User(name="Me", email="me@example.com")
+		db.add_all([me, User(name="Alice", email="alice@example.com", profile_completed=True)])
+		db.commit()
+	monkeypatch.setattr(db_replicas, "replica_router", None)
+	monkeypatch.setattr(app_db, "SessionLocal", sessions)
+
+	client = TestClient(create_app(), headers={"Authorization": f"Bearer {create_access_token(me.id)}"})
+	response = client.get("/users/search/by-name", params={"name": "Ali"})
+	assert response.status_code == 200 and [u["name"] for u in response.json()] == ["Alice"]
+	assert client.get(f"/users/{me.id}/analytics").status_code == 200
+	engine.dispose()
@@ -0,0 +1,23 @@
+from sqlalchemy import select
+
+from app.index_audit import hot_queries, run_audit
+from app.models import Task
+
+
+def test_hot_queries_use_indexes(test_engine):
+	report = run_audit(test_engine, threshold=0)
+
+	assert report.queries == len(hot_queries())
+	assert report.errors == {}
+	assert report.problems == []
+
+
+def test_unindexed_filter_is_flagged_by_size(test_engine):
+	queries = [("tasks by title", select(Task).where(Task.title == "x"))]
+
+	flagged = run_audit(test_engine, threshold=0, queries=queries)
+	assert [(f.query, f.table) for f in flagged.problems] == [("tasks by title", "tasks")]
+
+	# The same scan on a table below the threshold is reported but not a problem.
+	small = run_audit(test_engine, threshold=1000, queries=queries)
+	assert len(small.findings) == 1 and small.problems == []
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+from threading import Event
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.jobs import JobManager, job_manager
+from app.models import Job, Project
+from app.security import create_access_token
+
+
+@pytest.fixture
+def session_factory(test_engine):
+	return sessionmaker(bind=test_engine, autocommit=False, autoflush=False)
+
+
+def test_job_runs_and_records_result(test_client, current_user, db_session, session_factory):
+	manager = JobManager(session_factory=session_factory, max_workers=2)
+	manager.handler("echo")(lambda db, job: {"echo": job.payload["value"]})
+
+	job = manager.submit(db_session, "echo", current_user.id, {"value": 42})
+	assert manager.wait(job.id, timeout=5)
+
+	db_session.expire_all()
+	stored = db_session.get(Job, job.id)
+	assert stored.status == "succeeded"
+	assert stored.result == {"echo": 42}
+	assert stored.finished_at is not None
+	manager.shutdown()
+
+
+def test_per_user_limit_queues_extra_jobs(test_client, current_user, db_session, session_factory):
+	manager = JobManager(session_factory=session_factory, max_workers=4, user_limit=1)
+	release = Event()
+	manager.handler("slow")(lambda db, job: release.wait(5) and {})
+
+	first = manager.submit(db_session, "slow", current_user.id)
+	second = manager.submit(db_session, "slow", current_user.id)
+	snapshot = manager.snapshot()
+	assert snapshot["running"] == 1
+	assert snapshot["queued"] == 1
+
+	release.set()
+	assert manager.wait(first.id, timeout=5)
+	assert manager.wait(second.id, timeout=5)
+	assert manager.snapshot()["queued"] == 0
+	manager.shutdown()
+
+
+def test_failed_job_keeps_error(test_client, current_user, db_session, session_factory):
+	manager = JobManager(session_factory=session_factory)
+
+	def boom(db, job):
+		raise RuntimeError("provider down")
+
+	manager.handler("boom")(boom)
+	job = manager.submit(db_session, "boom", current_user.id)
+	assert manager.wait(job.id, timeout=5)
+
+	db_session.expire_all()
+	stored = db_session.get(Job, job.id)
+	assert stored.status == "failed"
+	assert stored.error == "provider down"
+	manager.shutdown()
+
+
+def test_each_job_runs_once_when_several_workers_queue_it(test_client, current_user, db_session, session_factory):
+	first, second = JobManager(session_factory=session_factory), JobManager(session_factory=session_factory)
+	started, release = Event(), Event()
+	runs = []
+
+	def slow(db, job):
+		runs.append(job.id)
+		started.set()
+		release.wait(5)
+		return {}
+
+	for manager in (first, second):
+		manager.handler("slow")(slow)
+	job = Job(kind="slow", user_id=current_user.id)
+	db_session.add(job)
+	db_session.commit()
+
+	first.resume_pending()
+	assert started.wait(5)
+	# The second worker read the row while it was still queued.
+	second._enqueue(job.id, job.user_id, job.provider)
+	assert second.wait(job.id, timeout=5)
+	release.set()
+	assert first.wait(job.id, timeout=5)
+
+	assert runs == [job.id]
+	db_session.expire_all()
+	assert db_session.get(Job, job.id).status == "succeeded"
+	first.shutdown()
+	second.shutdown()
+
+
+def test_resume_only_fails_jobs_of_stopped_workers(test_client, current_user, db_session, session_factory):
+	now = datetime.utcnow()
+	alive = Job(kind="count", user_id=current_user.id, status="running", worker_id="other:1", heartbeat_at=now)
+	stopped = Job(kind="count", user_id=current_user.id, status="running", worker_id="other:2", heartbeat_at=now - timedelta(hours=1))
+	db_session.add_all([alive, stopped])
+	db_session.commit()
+
+	manager = JobManager(session_factory=session_factory)
+	manager.resume_pending()
+
+	db_session.expire_all()
+	assert db_session.get(Job, alive.id).status == "running"
+	assert db_session.get(Job, stopped.id).status == "failed"
+	manager.shutdown()
+
+
+def test_async_generate_tasks_endpoint_returns_job(monkeypatch, test_client, current_user, db_session, session_factory):
+	monkeypatch.setattr(job_manager, "session_factory", session_factory)
+	monkeypatch.setattr(
+		"app.routers.projects_dashboard.generate_tasks_from_project",
+		lambda title, description, existing=None: [{"title": "Set up repo", "estimated_hours": 2.0}],
+	)
+	project = Project(title="Jobs", description="async", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.commit()
+
+	response = test_client.post(f"/projects/{project.id}/ai-generate-tasks/async")
+	assert response.status_code == 202
+	job_id = response.json()["id"]
+	assert job_manager.wait(job_id, timeout=5)
+
+	polled = test_client.get(f"/jobs/{job_id}").json()
+	assert polled["status"] == "succeeded"
+	assert [t["title"] for t in polled["result"]["tasks"]] == ["Set up repo"]
+
+
+def test_job_socket_follows_a_job_run_by_another_process(monkeypatch, test_client, current_user, db_session, session_factory):
+	monkeypatch.setattr(job_manager, "session_factory", session_factory)
+	monkeypatch.setenv("JOBS_WS_POLL_SECONDS", "0.05")
+	job = Job(kind="elsewhere", user_id=current_user.id, status="running", worker_id="other:1")
+	db_session.add(job)
+	db_session.commit()
+
+	with test_client.websocket_connect(f"/ws/jobs/{job.id}?token={create_access_token(current_user.id)}") as ws:
+		assert ws.receive_json()["status"] == "running"
+		job.status, job.result = "succeeded", {"done": True}
+		db_session.commit()
+		finished = ws.receive_json()
+	assert finished["status"] == "succeeded" and finished["result"] == {"done": True}
@@ -0,0 +1,55 @@
+from app.ai.llm_cache import LLMResponseCache
+
+
+def test_whitespace_normalized_prompts_share_entry(tmp_path):
+	cache = LLMResponseCache(disk_path=str(tmp_path / "cache.sqlite3"))
+	cache.set("gpt-4o-mini", "system", "Build  a\n todo app", 0.3, "[tasks]", latency_ms=1500)
+
+	assert cache.get("gpt-4o-mini", "system", "Build a todo app", 0.3) == "[tasks]"
+	assert cache.get("gpt-4o-mini", "system", "Build a todo app", 0.7) is None
+
+	stats = cache.snapshot()
+	assert stats["hits"] == 1
+	assert stats["misses"] == 1
+	assert stats["latency_saved_ms"] == 1500
+
+
+def test_disk_tier_survives_restart_and_ttl_expires(tmp_path):
+	path = str(tmp_path / "cache.sqlite3")
+	LLMResponseCache(disk_path=path).set("m", "s", "u", 0.2, "answer")
+	assert LLMResponseCache(disk_path=path).get("m", "s", "u", 0.2) == "answer"
+
+	expired = LLMResponseCache(ttl_seconds=-1, disk_path=str(tmp_path / "expired.sqlite3"))
+	expired.set("m", "s", "u", 0.2, "answer")
+	assert expired.get("m", "s", "u", 0.2) is None
+
+
+def test_response_format_is_part_of_the_key():
+	cache = LLMResponseCache()
+	cache.set("m", "s", "u", 0.2, '{"tasks": []}', response_format={"type": "json_object"})
+	assert cache.get("m", "s", "u", 0.2) is None
+	assert cache.get("m", "s", "u", 0.2, {"type": "json_object"}) == '{"tasks": []}'
+
+
+def test_memory_tier_is_size_bounded():
+	cache = LLMResponseCache(max_entries=2)
+	for i in range(3):
+		cache.set("m", "s", f"prompt {i}", 0.2, str(i))
+
+	assert cache.get("m", "s", "prompt 0", 0.2) is None
+	assert cache.get("m", "s", "prompt 2", 0.2) == "2"
+	assert cache.snapshot()["evictions"] == 1
+
+
+def test_semantic_tier_serves_near_duplicates():
+	vectors = {
+		"analyze my python repo": [1.0, 0.0, 0.1],
+		"analyze my python repository": [1.0, 0.0, 0.12],
+		"write a poem": [0.0, 1.0, 0.0],
+	}
+	cache = LLMResponseCache(embed=lambda text: vectors[text], similarity=0.99)
+	cache.set("m", "s", "analyze my python repo", 0.2, "report")
+
+	assert cache.get("m", "s", "analyze my python repository", 0.2) == "report"
+	assert cache.get("m", "s", "write a poem", 0.2) is None
+	assert cache.snapshot()["semantic_hits"] == 1
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai import llm_cache, llm_gateway
+from app.ai.llm_cache import LLMResponseCache
+from app.ai.task_generator import generate_tasks_from_project
+
+
+class FakeCompletions:
+	def __init__(self, fail=False):
+		self.fail = fail
+		self.content = "hello"
+		self.requests = []
+
+	def create(self, **request):
+		self.requests.append(request)
+		if self.fail:
+			raise RuntimeError("boom")
+		return SimpleNamespace(
+			choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+			usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3),
+		)
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+	completions = FakeCompletions()
+	client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+	monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+	monkeypatch.setattr(llm_gateway, "_sync_clients", {"sk-test": client})
+	llm_gateway.llm_stats.reset()
+	return completions
+
+
+def test_chat_completion_records_tokens_and_reuses_client(fake_client):
+	first = llm_gateway.chat_completion([{"role": "user", "content": "hi"}], purpose="unit")
+	llm_gateway.chat_completion([{"role": "user", "content": "again"}], purpose="unit")
+
+	assert first.text == "hello"
+	assert len(fake_client.requests) == 2
+	assert "response_format" not in fake_client.requests[0]
+	stats = llm_gateway.llm_stats.snapshot()["unit"]
+	assert stats["calls"] == 2
+	assert stats["errors"] == 0
+	assert stats["prompt_tokens"] == 24
+	assert stats["completion_tokens"] == 6
+
+
+def test_chat_completion_counts_errors(fake_client):
+	fake_client.fail = True
+	with pytest.raises(RuntimeError):
+		llm_gateway.chat_completion([{"role": "user", "content": "hi"}], purpose="unit")
+	assert llm_gateway.llm_stats.snapshot()["unit"]["errors"] == 1
+
+
+def test_model_override_per_purpose(monkeypatch):
+	monkeypatch.setenv("OPENAI_MODEL", "gpt-4o")
+	monkeypatch.setenv("OPENAI_MODEL_CODE_ANALYSIS", "gpt-4.1")
+	assert llm_gateway.get_model("code_analysis") == "gpt-4.1"
+	assert llm_gateway.get_model("assistant_chat") == "gpt-4o"
+
+
+def test_map_concurrent_runs_in_parallel_and_isolates_failures():
+	import time
+
+	def call(n):
+		time.sleep(0.2)
+		if n == 2:
+			raise RuntimeError("rate limited")
+		return n * 10
+
+	start = time.perf_counter()
+	results = llm_gateway.map_concurrent(call, [1, 2, 3, 4], max_concurrency=4)
+	elapsed = time.perf_counter() - start
+
+	assert [r for r, _ in results] == [10, None, 30, 40]
+	assert isinstance(results[1][1], RuntimeError)
+	assert elapsed < 0.6
+
+
+def test_task_generation_asks_json_mode_for_a_tasks_object(fake_client, monkeypatch):
+	monkeypatch.setattr(llm_cache, "response_cache", LLMResponseCache())
+	fake_client.content = '{"tasks": [{"title": "Set up repo", "estimated_hours": 2}, {"title": "Write API"}]}'
+	tasks = generate_tasks_from_project("Shop", "An online shop")
+
+	[request] = fake_client.requests
+	assert request["response_format"] == {"type": "json_object"}
+	assert '"tasks" array' in request["messages"][0]["content"]
+	assert [t["title"] for t in tasks] == ["Set up repo", "Write API"]
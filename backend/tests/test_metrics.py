@@ -0,0 +1,112 @@
+import json
+import threading
+
+from app.metrics_store import (
+	OVERFLOW_ROUTE,
+	UNMATCHED_ROUTE,
+	MetricsStore,
+	WorkerFiles,
+	histogram_quantile,
+	metrics_store,
+	render_prometheus,
+	summarize,
+)
+
+
+def test_observations_land_in_fixed_buckets():
+	store = MetricsStore(buckets=(0.01, 0.1, 1.0))
+	for seconds in (0.001, 0.01, 0.05, 0.5, 3.0):
+		store.observe("GET", "/projects", 200, seconds)
+	data = store.collect()[("GET", "/projects", 200)]
+	# `le` is inclusive: 0.01 counts in the 0.01 bucket.
+	assert data.counts == [2, 1, 1, 1]
+	assert abs(data.total_seconds - 3.561) < 1e-9
+	assert store.snapshot().total_requests == 5 and store.snapshot().total_duration_ms == 3561
+
+	assert abs(histogram_quantile(0.5, [0, 10, 0, 0], (0.01, 0.1, 1.0)) - 0.055) < 1e-9
+	assert histogram_quantile(0.99, [0, 0, 0, 4], (0.01, 0.1, 1.0)) == 1.0
+
+
+def test_threads_write_their_own_shards_and_reads_add_them_up():
+	store = MetricsStore()
+
+	def work():
+		for _ in range(1000):
+			store.observe("GET", "/health", 200, 0.002)
+
+	threads = [threading.Thread(target=work) for _ in range(8)]
+	for t in threads:
+		t.start()
+	for t in threads:
+		t.join()
+	assert len(store._shards) == 8
+	assert store.collect()[("GET", "/health", 200)].count == 8000
+
+
+def test_series_beyond_the_cap_share_one_label():
+	store = MetricsStore(max_series=2)
+	for path in ("/a", "/b", "/c", "/d"):
+		store.observe("GET", path, 200, 0.01)
+	store.observe("GET", "/a", 200, 0.01)
+	assert {route: s.count for (_, route, _), s in store.collect().items()} == {"/a": 2, "/b": 1, OVERFLOW_ROUTE: 2}
+
+
+def test_prometheus_exposition_is_cumulative_and_escaped():
+	store = MetricsStore(buckets=(0.1, 1.0))
+	store.observe("GET", '/odd"path', 200, 0.05)
+	store.observe("GET", '/odd"path', 200, 0.5)
+	text = render_prometheus(store.collect(), store.buckets)
+	labels = 'method="GET",route="/odd\\"path",status="200"'
+	assert "# TYPE http_request_duration_seconds histogram" in text
+	assert f"http_requests_total{{{labels}}} 2" in text
+	assert f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+	assert f'http_request_duration_seconds_bucket{{{labels},le="1"}} 2' in text
+	assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+	assert f"http_request_duration_seconds_count{{{labels}}} 2" in text
+
+
+def test_requests_are_labelled_by_route_template(test_client, current_user):
+	metrics_store.reset()
+	response = test_client.get(f"/users/{current_user.id}/analytics")
+	assert "X-Process-Time-ms" in response.headers
+	test_client.get("/no/such/path")
+	# Routes of prefixed routers keep their prefix.
+	test_client.get("/users/search/by-name", params={"name": "x"})
+
+	series = metrics_store.collect()
+	assert series[("GET", "/users/{user_id}/analytics", response.status_code)].count == 1
+	assert series[("GET", UNMATCHED_ROUTE, 404)].count == 1
+	assert series[("GET", "/users/search/by-name", 200)].count == 1
+
+	summary = test_client.get("/metrics").json()["requests"]
+	assert summary["count"] == 3 and summary["error_rate"] == 0.0
+	assert {r["route"] for r in summary["routes"]} == {"/users/{user_id}/analytics", "/users/search/by-name", UNMATCHED_ROUTE}
+
+	scrape = test_client.get("/metrics/prometheus")
+	assert scrape.headers["content-type"].startswith("text/plain; version=0.0.4")
+	assert 'route="/users/{user_id}/analytics"' in scrape.text
+	assert summarize({})["count"] == 0
+
+
+def test_worker_files_merge_every_worker_on_scrape(tmp_path):
+	first, second = MetricsStore(), MetricsStore()
+	a, b = WorkerFiles(first, str(tmp_path), interval=60), WorkerFiles(second, str(tmp_path), interval=60)
+	a.start()
+	b.start()
+	first.observe("GET", "/projects", 200, 0.01)
+	second.observe("GET", "/projects", 200, 0.02)
+	second.observe("POST", "/projects", 500, 0.2)
+
+	# b flushed at start only; its scrape flushes itself and reads a's last flush.
+	a.flush()
+	series, workers = b.collect()
+	assert workers == 2
+	assert series[("GET", "/projects", 200)].count == 2
+	assert series[("POST", "/projects", 500)].count == 1
+
+	# An exited worker's counts stay in the total; foreign bucket layouts are skipped.
+	a.stop()
+	(tmp_path / "requests-1-other.json").write_text(json.dumps({"buckets": [1.0], "series": []}))
+	series, workers = b.collect()
+	assert workers == 2 and series[("GET", "/projects", 200)].count == 2
+	b.stop()
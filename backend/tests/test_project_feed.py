@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models import ChatMessage, Project, Task, Team, TeamMember, User
+
+
+def test_feed_is_one_query_with_progress_and_keyset_pages(test_client, current_user, db_session):
+	other = User(name="Other", email="other@example.com")
+	db_session.add(other)
+	db_session.flush()
+	base = datetime(2025, 1, 1)
+	owned = [
+		Project(title=f"Mine {i}", description="", owner_id=current_user.id, created_at=base + timedelta(days=i))
+		for i in range(5)
+	]
+	joined = Project(title="Theirs", description="", owner_id=other.id, created_at=base + timedelta(days=10))
+	hidden = Project(title="Hidden", description="", owner_id=other.id, created_at=base + timedelta(days=11))
+	db_session.add_all(owned + [joined, hidden])
+	db_session.flush()
+	team = Team(project_id=joined.id)
+	db_session.add(team)
+	db_session.flush()
+	joined.team_id = team.id
+	db_session.add_all([TeamMember(team_id=team.id, user_id=other.id), TeamMember(team_id=team.id, user_id=current_user.id)])
+	db_session.add_all(
+		[Task(project_id=joined.id, title=f"t{i}", status="done" if i < 3 else "todo") for i in range(4)]
+	)
+	db_session.add(ChatMessage(project_id=owned[0].id, user_id=current_user.id, content="hi", created_at=base + timedelta(days=20)))
+	db_session.commit()
+
+	statements = []
+	listener = lambda conn, cursor, statement, *args: statements.append(statement)
+	event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+	try:
+		first = test_client.get("/projects/feed", params={"limit": 4}).json()
+	finally:
+		event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+	# Besides the auth lookup of the current user, one statement for the page.
+	assert len([s for s in statements if "FROM users" not in s.split("WHERE")[0]]) == 1
+
+	assert first["total"] == 6
+	assert [p["title"] for p in first["items"]] == ["Theirs", "Mine 4", "Mine 3", "Mine 2"]
+	card = first["items"][0]
+	assert card["role"] == "member" and card["member_count"] == 2
+	assert (card["task_total"], card["task_done"], card["progress"]) == (4, 3, 75.0)
+	assert first["items"][1]["role"] == "owner" and first["items"][1]["member_count"] == 1
+
+	second = test_client.get("/projects/feed", params={"limit": 4, "cursor": first["next_cursor"]}).json()
+	assert [p["title"] for p in second["items"]] == ["Mine 1", "Mine 0"]
+	assert second["next_cursor"] is None and second["total"] is None
+	assert second["items"][1]["last_activity_at"].startswith("2025-01-21")
+
+	listed = test_client.get("/projects").json()
+	assert [p["title"] for p in listed] == ["Theirs"] + [f"Mine {i}" for i in range(4, -1, -1)]
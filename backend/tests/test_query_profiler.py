@@ -0,0 +1,112 @@
+import copy
+
+import pytest
+
+from app import query_profiler
+from app.models import ChatMessage, Project, ProjectContribution, Skill, User
+from app.query_profiler import RequestProfile, fingerprint, profiled
+
+
+@pytest.fixture
+def profiler_env(monkeypatch):
+	# Listed before test_client so create_app() sees it.
+	monkeypatch.setenv("QUERY_PROFILER", "true")
+	monkeypatch.setenv("QUERY_PROFILER_HEADERS", "true")
+	monkeypatch.setenv("N_PLUS_ONE_THRESHOLD", "3")
+	monkeypatch.setenv("ADMIN_EMAILS", "test@example.com")
+	query_profiler.n_plus_one.reset()
+
+
+def _add_users(db_session, n, prefix):
+	users = [User(name=f"{prefix} {i}", email=f"{prefix.lower()}{i}@example.com", profile_completed=True) for i in range(n)]
+	db_session.add_all(users)
+	db_session.flush()
+	db_session.add_all([Skill(user_id=u.id, name=skill) for u in users for skill in ("python", "sql")])
+	db_session.commit()
+	return users
+
+
+def test_fingerprint_strips_literals_and_collapses_in_lists():
+	a = fingerprint("SELECT * FROM skills WHERE user_id IN (?, ?, ?) AND name = 'x'  LIMIT 10")
+	b = fingerprint("SELECT * FROM skills\n WHERE user_id IN (%(p_1)s, %(p_2)s) AND name = 'it''s' LIMIT 5")
+	assert a == b == "SELECT * FROM skills WHERE user_id IN (...) AND name = ? LIMIT ?"
+	assert fingerprint("SELECT CAST(x AS TEXT)::text FROM t2") == "SELECT CAST(x AS TEXT)::text FROM t2"
+
+
+def test_profiled_block_counts_statements_and_flags_repeats(db_session, monkeypatch):
+	user_ids = [u.id for u in _add_users(db_session, 4, "Loop")]
+	with profiled() as profile:
+		for user_id in user_ids:
+			db_session.query(Skill).filter(Skill.user_id == user_id).all()
+	assert profile.queries == 4
+	[(key, stats)] = profile.repeated(3)
+	assert stats.count == 4 and "FROM skills" in key
+	assert query_profiler.current() is None
+
+	monkeypatch.setenv("N_PLUS_ONE_THRESHOLD", "3")
+	query_profiler.n_plus_one.reset()
+	query_profiler.report("GET", "/loop", profile, elapsed_ms=1.0)
+	query_profiler.report("GET", "/loop", RequestProfile(), elapsed_ms=1.0)
+	[entry] = query_profiler.n_plus_one.snapshot()
+	assert (entry["route"], entry["requests"], entry["max_repeats"]) == ("/loop", 1, 4)
+
+
+def test_failing_statement_leaves_nothing_on_the_connection(db_session):
+	connection = db_session.connection()
+	info = copy.deepcopy(dict(connection.info))
+	with profiled() as profile:
+		for _ in range(3):
+			with pytest.raises(Exception):
+				connection.exec_driver_sql("SELECT * FROM no_such_table")
+		connection.exec_driver_sql("SELECT 1")
+	assert connection.info == info
+	assert profile.queries == 1
+
+
+def test_search_by_name_query_count_does_not_grow_with_matches(profiler_env, test_client, db_session):
+	_add_users(db_session, 2, "Ann")
+	_add_users(db_session, 6, "Bob")
+	# Warm up: the first request reloads the current user expired by the commit.
+	test_client.get("/users/search/by-name", params={"name": "Ann"})
+	few = test_client.get("/users/search/by-name", params={"name": "Ann"})
+	many = test_client.get("/users/search/by-name", params={"name": "Bob"})
+	assert len(few.json()) == 2 and len(many.json()) == 6
+	assert sorted(many.json()[0]["skills"]) == ["python", "sql"]
+	assert few.headers["X-DB-Query-Count"] == many.headers["X-DB-Query-Count"]
+	assert float(many.headers["X-DB-Query-Time-ms"]) >= 0
+
+	by_skills = test_client.get("/users/search/by-skills", params={"skills": "Python"})
+	assert by_skills.status_code == 200 and len(by_skills.json()) == 8
+	assert test_client.get("/admin/query-profile").json()["n_plus_one"] == []
+
+
+def test_analytics_overview_has_no_per_member_queries(profiler_env, test_client, current_user, db_session):
+	def overview_queries(n_members):
+		project = Project(title="P", description="", owner_id=current_user.id)
+		db_session.add(project)
+		db_session.flush()
+		members = _add_users(db_session, n_members, f"M{n_members}")
+		for m in members:
+			db_session.add(ProjectContribution(project_id=project.id, user_id=m.id, tasks_completed=1))
+			db_session.add_all([ChatMessage(project_id=project.id, user_id=m.id, content="x" * 20) for _ in range(2)])
+		db_session.commit()
+		response = test_client.get(f"/projects/{project.id}/analytics/overview")
+		assert response.status_code == 200
+		scores = {m["communication_score"] for m in response.json()["members"]}
+		assert scores == {2 * 3.0 + 20 / 10.0}
+		return int(response.headers["X-DB-Query-Count"])
+
+	assert overview_queries(1) == overview_queries(5)
+	assert test_client.get("/admin/query-profile").json()["n_plus_one"] == []
+
+
+def test_query_profile_is_for_admins_while_enabled(monkeypatch, test_client, current_user):
+	monkeypatch.setenv("ADMIN_EMAILS", "ops@example.com")
+	monkeypatch.setenv("QUERY_PROFILER", "true")
+	assert test_client.get("/admin/query-profile").status_code == 403
+	assert test_client.delete("/admin/query-profile").status_code == 403
+
+	monkeypatch.setenv("ADMIN_EMAILS", f"ops@example.com, {current_user.email.upper()}")
+	assert test_client.get("/admin/query-profile").status_code == 200
+	monkeypatch.setenv("QUERY_PROFILER", "false")
+	assert test_client.get("/admin/query-profile").status_code == 404
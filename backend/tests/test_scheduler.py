@@ -0,0 +1,158 @@
+import random
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.ai.scheduler import CycleError, SchedTask, build_schedule, reschedule
+from app.jobs import job_manager
+from app.models import Project, Task, TaskSchedule
+from app.routers import projects_dashboard
+
+
+def _check_feasible(schedule, tasks, deps):
+	by_id = {t.id: t for t in tasks}
+	for task_id, depends_on_id in deps:
+		assert schedule.slots[task_id].start >= schedule.slots[depends_on_id].finish - 1e-9
+	for assignee, queue in schedule.sequences.items():
+		assert all(by_id[t].assignee_id == assignee for t in queue)
+		for before, after in zip(queue, queue[1:]):
+			assert schedule.slots[after].start >= schedule.slots[before].finish - 1e-9
+
+
+def test_critical_path_and_member_conflicts():
+	tasks = [
+		SchedTask("design", 4, "ana"),
+		SchedTask("api", 8, "bo"),
+		SchedTask("ui", 6, "ana"),
+		SchedTask("docs", 1, "ana"),
+		SchedTask("release", 2, "bo"),
+	]
+	deps = [("api", "design"), ("ui", "design"), ("release", "api"), ("release", "ui")]
+
+	schedule = build_schedule(tasks, deps)
+
+	_check_feasible(schedule, tasks, deps)
+	assert schedule.makespan == 14
+	assert schedule.critical_path == ["design", "api", "release"]
+	# docs has no dependencies but waits its turn behind ana's more urgent work.
+	assert schedule.sequences["ana"] == ["design", "ui", "docs"]
+	assert schedule.slots["docs"].start == 10
+	assert schedule.slots["ui"].slack == 2
+
+
+def test_cycle_is_rejected():
+	with pytest.raises(CycleError) as e:
+		build_schedule([SchedTask("a"), SchedTask("b"), SchedTask("c")], [("a", "b"), ("b", "a")])
+	assert sorted(e.value.task_ids) == ["a", "b"]
+
+
+def test_incremental_matches_full_rebuild_for_duration_changes():
+	rnd = random.Random(7)
+	for _ in range(100):
+		n = rnd.randint(2, 12)
+		tasks = [SchedTask(str(i), rnd.choice([1, 2, 4, 8]), rnd.choice(["a", "b", None])) for i in range(n)]
+		deps = [(str(j), str(i)) for j in range(n) for i in range(j) if rnd.random() < 0.2]
+		previous = build_schedule(tasks, deps)
+
+		edited = rnd.choice(tasks)
+		edited.hours = rnd.choice([0.5, 3, 16])
+		repaired, changed = reschedule(previous, tasks, deps, [edited.id])
+
+		_check_feasible(repaired, tasks, deps)
+		assert repaired.sequences == {a: q for a, q in previous.sequences.items() if q}
+		# Same queues, so the repaired plan is the earliest-start plan for them.
+		for task in tasks:
+			slot = repaired.slots[task.id]
+			preds = [d for t, d in deps if t == task.id]
+			queue = repaired.sequences.get(task.assignee_id or "", [])
+			if task.id in queue and queue.index(task.id):
+				preds.append(queue[queue.index(task.id) - 1])
+			assert slot.start == max((repaired.slots[p].finish for p in preds), default=0.0)
+		assert changed == {t for t in repaired.slots if not repaired.slots[t].same_as(previous.slots[t])}
+
+
+def test_reassignment_moves_task_between_queues():
+	tasks = [SchedTask("a", 4, "x"), SchedTask("b", 4, "x"), SchedTask("c", 4, "y")]
+	previous = build_schedule(tasks, [])
+	assert previous.slots["b"].start == 4
+
+	tasks[1].assignee_id = "y"
+	repaired, changed = reschedule(previous, tasks, [], ["b"])
+
+	_check_feasible(repaired, tasks, [])
+	assert repaired.sequences == {"x": ["a"], "y": ["b", "c"]}
+	# a keeps its slot but gains slack now that x's queue ends early.
+	assert changed == {"a", "b", "c"}
+	assert repaired.slots["a"].slack == 4
+	assert repaired.makespan == 8
+
+
+def test_several_new_tasks_join_one_queue():
+	tasks = [SchedTask("a", 4, "x"), SchedTask("b", 2, "y")]
+	previous = build_schedule(tasks, [])
+
+	tasks += [SchedTask("n1", 3, "x"), SchedTask("n2", 1, "x"), SchedTask("n3", 2, "y")]
+	deps = [("n2", "b")]
+	repaired, changed = reschedule(previous, tasks, deps, ["n1", "n2", "n3"])
+
+	_check_feasible(repaired, tasks, deps)
+	assert sorted(repaired.sequences["x"]) == ["a", "n1", "n2"]
+	assert {"n1", "n2", "n3"} <= changed
+	assert repaired.makespan == 8
+
+
+def test_schedule_endpoints(test_client, current_user, db_session):
+	project = Project(title="Plan", description="schedule", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.flush()
+	tasks = [
+		Task(project_id=project.id, title=title, estimated_hours=hours, assignee_id=current_user.id)
+		for title, hours in (("schema", 4), ("api", 8), ("frontend", 4))
+	]
+	db_session.add_all(tasks)
+	db_session.commit()
+	schema, api, frontend = (t.id for t in tasks)
+
+	url = f"/projects/{project.id}"
+	assert test_client.post(f"{url}/tasks/{api}/dependencies", json={"depends_on_id": schema}).status_code == 201
+	assert test_client.post(f"{url}/tasks/{frontend}/dependencies", json={"depends_on_id": api}).status_code == 201
+	resp = test_client.post(f"{url}/tasks/{schema}/dependencies", json={"depends_on_id": frontend})
+	assert resp.status_code == 400
+
+	assert test_client.get(f"{url}/schedule").status_code == 404
+	plan = test_client.post(f"{url}/schedule").json()
+	assert plan["makespan_hours"] == 16
+	assert plan["critical_path"] == [schema, api, frontend]
+	assert [t["task_id"] for t in plan["tasks"]] == [schema, api, frontend]
+
+	# Shortening one task only rewrites it and what follows.
+	resp = test_client.patch(f"{url}/tasks/{api}", json={"estimated_hours": 2})
+	assert resp.status_code == 200
+	rows = {r.task_id: r for r in db_session.query(TaskSchedule).filter(TaskSchedule.project_id == project.id)}
+	assert (rows[api].start_hour, rows[api].finish_hour) == (4, 6)
+	assert (rows[frontend].start_hour, rows[frontend].finish_hour) == (6, 10)
+	assert test_client.get(f"{url}/schedule").json()["makespan_hours"] == 10
+
+	# Importing several tasks for one member slots them all into that member's queue.
+	csv_body = f"title,assignee_id,estimated_hours\ntests,{current_user.id},3\ndeploy,{current_user.id},1\n"
+	resp = test_client.post(f"{url}/tasks/import", files={"file": ("tasks.csv", csv_body, "text/csv")})
+	assert resp.status_code == 201
+	assert test_client.get(f"{url}/schedule").json()["makespan_hours"] == 14
+
+
+def test_completing_a_task_in_the_background_reschedules(monkeypatch, test_engine, test_client, current_user, db_session):
+	monkeypatch.setattr(job_manager, "session_factory", sessionmaker(bind=test_engine, autocommit=False, autoflush=False))
+	monkeypatch.setattr(projects_dashboard, "_validate_task_completion", lambda db, task, project: {"is_valid": True})
+	project = Project(title="Plan", description="complete", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.flush()
+	first, second = (Task(project_id=project.id, title=t, estimated_hours=4, assignee_id=current_user.id) for t in ("a", "b"))
+	db_session.add_all([first, second])
+	db_session.commit()
+	url = f"/projects/{project.id}"
+	assert test_client.post(f"{url}/schedule").json()["makespan_hours"] == 8
+
+	job = test_client.post(f"{url}/tasks/{first.id}/complete/async").json()
+	assert job_manager.wait(job["id"], timeout=5)
+	assert test_client.get(f"/jobs/{job['id']}").json()["status"] == "succeeded"
+	assert test_client.get(f"{url}/schedule").json()["makespan_hours"] == 4
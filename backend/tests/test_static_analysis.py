@@ -0,0 +1,84 @@
+from app.ai.code_analyzer import _analyze_code_fallback
+from app.ai.static_analysis import MetricsCache, ProjectAnalyzer, analyze_files, analyze_source
+
+PYTHON_SOURCE = b"""
+def branchy(x):
+	if x and x > 1:
+		for i in range(x):
+			if i:
+				pass
+	elif x:
+		pass
+	return [y for y in range(3) if y]
+
+
+class Thing:
+	def method(self):
+		while True:
+			break
+"""
+
+
+def test_python_complexity_and_nesting():
+	metrics = analyze_source("thing.py", PYTHON_SOURCE)
+
+	by_name = {f.name: f for f in metrics.functions}
+	# if, and, for, inner if, elif, comprehension and its filter
+	assert by_name["branchy"].complexity == 8
+	assert by_name["branchy"].nesting == 3
+	assert by_name["Thing.method"].complexity == 2
+	assert not metrics.parse_error
+
+
+def test_c_like_ignores_braces_in_strings_and_comments():
+	source = b"""
+// not a block {
+function foo(a) {
+	if (a && b) { for (;;) { s = "}{"; } }
+	return a;
+}
+const bar = (x) => {
+	switch (x) { case 1: return 1; case 2: return 2; }
+};
+"""
+	metrics = analyze_source("app.js", source)
+
+	by_name = {f.name: f for f in metrics.functions}
+	assert set(by_name) == {"foo", "bar"}
+	assert by_name["foo"].complexity == 4
+	assert by_name["foo"].nesting == 2
+	assert by_name["bar"].complexity == 3
+
+
+def test_duplication_across_files_lowers_score():
+	body = b"\n".join(b"\tvalue_%d = compute(item_%d)" % (i, i) for i in range(10))
+	unique = analyze_files([("a.py", b"def a():\n" + body)])
+	duplicated = analyze_files([("a.py", b"def a():\n" + body), ("b.py", b"def b():\n" + body)])
+
+	assert unique.duplicated_lines == 0
+	assert duplicated.duplication_ratio > 0.8
+	assert duplicated.score < unique.score
+
+
+def test_cache_reuses_metrics_by_content_hash():
+	cache = MetricsCache()
+	first = ProjectAnalyzer(cache=cache)
+	first.add("a.py", PYTHON_SOURCE)
+	first.finish()
+
+	second = ProjectAnalyzer(cache=cache)
+	second.add("renamed.py", PYTHON_SOURCE)
+	second.add("notes.txt", b"not code")
+	report = second.finish()
+
+	assert report.cache_hits == 1
+	assert [f.filename for f in report.files] == ["renamed.py"]
+
+
+def test_fallback_uses_static_scores():
+	files_data = [{"filename": "thing.py", "content": PYTHON_SOURCE.decode()}]
+	result = _analyze_code_fallback(files_data)
+
+	assert result["static_analysis"]["functions"] == 2
+	assert result["individual_files"][0]["metrics"]["max_complexity"] == 8
+	assert result["overall_score"] == result["static_analysis"]["score"]
@@ -0,0 +1,85 @@
+import json
+
+from sqlalchemy import event
+
+from app.crud import tasks as task_crud
+from app.models import Project, Task
+from app.routers import projects_dashboard
+
+
+def _count_statements(engine):
+	statements = []
+
+	def before(conn, cursor, statement, parameters, context, executemany):
+		statements.append(statement.split(None, 1)[0].upper())
+
+	event.listen(engine, "before_cursor_execute", before)
+	return statements, lambda: event.remove(engine, "before_cursor_execute", before)
+
+
+def test_bulk_create_dedupes_in_one_insert(test_client, current_user, db_session):
+	project = Project(title="Bulk", description="import", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.flush()
+	db_session.add(Task(project_id=project.id, title="Write  Docs"))
+	db_session.commit()
+	project_id = project.id
+
+	items = [{"title": f"Task {i}", "estimated_hours": i % 8} for i in range(1000)]
+	items += [{"title": "write docs"}, {"title": "TASK 7"}, {"title": "   "}]
+	statements, stop = _count_statements(db_session.get_bind())
+	try:
+		created, skipped = task_crud.bulk_create_tasks(db_session, project_id, items)
+	finally:
+		stop()
+
+	assert len(created) == 1000 and skipped == 3
+	assert [t.title for t in created[:3]] == ["Task 0", "Task 1", "Task 2"]
+	assert all(t.id and t.created_at for t in created)
+	# Title set, the insert, and the upsert of the project's task-version row.
+	assert statements == ["SELECT", "INSERT", "INSERT"]
+
+
+def test_import_csv_and_json(test_client, current_user, db_session):
+	project = Project(title="Import", description="tasks", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.commit()
+	url = f"/projects/{project.id}/tasks/import"
+
+	csv_body = "Title,Estimated_Hours,Status\nSet up CI,4,todo\nWrite API,8,\nset up ci,2,todo\n"
+	resp = test_client.post(url, files={"file": ("tasks.csv", csv_body, "text/csv")})
+	assert resp.status_code == 201
+	body = resp.json()
+	assert [t["title"] for t in body["created"]] == ["Set up CI", "Write API"]
+	assert body["created"][1]["estimated_hours"] == 8 and body["created"][1]["status"] == "todo"
+	assert body["skipped"] == 1
+
+	payload = json.dumps({"tasks": [{"title": "Write API"}, {"title": "Deploy", "description": "ship it"}]})
+	resp = test_client.post(url, files={"file": ("tasks.json", payload, "application/json")})
+	assert resp.json()["skipped"] == 1
+	assert [t["title"] for t in resp.json()["created"]] == ["Deploy"]
+
+	resp = test_client.post(url, files={"file": ("bad.json", json.dumps([{"title": "x", "estimated_hours": "lots"}]))})
+	assert resp.status_code == 400
+	assert "row 1" in resp.json()["detail"]
+	assert db_session.query(Task).filter(Task.project_id == project.id).count() == 3
+
+
+def test_generated_tasks_skip_existing_titles(test_client, current_user, db_session, monkeypatch):
+	project = Project(title="Gen", description="generate", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.flush()
+	db_session.add(Task(project_id=project.id, title="Design schema"))
+	db_session.commit()
+
+	generated = [
+		{"title": "design schema", "estimated_hours": 4},
+		{"title": "Build API", "description": "REST", "estimated_hours": 6},
+		{"title": "Build  API"},
+	]
+	monkeypatch.setattr(projects_dashboard, "generate_tasks_from_project", lambda *args: generated)
+
+	resp = test_client.post(f"/projects/{project.id}/ai-generate-tasks")
+	assert resp.status_code == 200
+	assert [t["title"] for t in resp.json()] == ["Build API"]
+	assert db_session.query(Task).filter(Task.project_id == project.id).count() == 2
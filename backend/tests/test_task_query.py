@@ -0,0 +1,64 @@
+from app.crud import tasks as task_crud
+from app.models import Project, Task
+
+
+def _project_with_tasks(db_session, user, n):
+	project = Project(title="Board", description="query", owner_id=user.id)
+	db_session.add(project)
+	db_session.flush()
+	# One bulk insert: every row shares the same created_at second.
+	task_crud.bulk_create_tasks(
+		db_session,
+		project.id,
+		[{"title": f"Task {i:03}", "status": "done" if i % 3 == 0 else "todo", "estimated_hours": i} for i in range(n)],
+	)
+	db_session.commit()
+	return project
+
+
+def test_keyset_pages_cover_every_task_once(test_client, current_user, db_session):
+	project = _project_with_tasks(db_session, current_user, 25)
+	url = f"/projects/{project.id}/tasks/query"
+
+	seen, cursor = [], None
+	while True:
+		params = {"limit": 10, "fields": "title"}
+		if cursor:
+			params["cursor"] = cursor
+		page = test_client.get(url, params=params).json()
+		assert all(set(item) == {"id", "title"} for item in page["items"])
+		seen.extend(item["id"] for item in page["items"])
+		cursor = page["next_cursor"]
+		if not cursor:
+			break
+	assert len(seen) == len(set(seen)) == 25
+
+	done = test_client.get(url, params={"status": "done", "fields": "status,estimated_hours"}).json()
+	assert len(done["items"]) == 9 and {item["status"] for item in done["items"]} == {"done"}
+	assert test_client.get(url, params={"status": ["done", "todo"]}).json()["next_cursor"] is None
+
+	assert test_client.get(url, params={"fields": "title,secret"}).status_code == 400
+	assert test_client.get(url, params={"cursor": "nonsense"}).status_code == 400
+
+
+def test_etag_changes_only_when_tasks_change(test_client, current_user, db_session):
+	project = _project_with_tasks(db_session, current_user, 3)
+	url = f"/projects/{project.id}/tasks/query"
+
+	first = test_client.get(url)
+	etag = first.headers["etag"]
+	assert test_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+	# A different projection is a different representation.
+	assert test_client.get(url, params={"fields": "title"}, headers={"If-None-Match": etag}).status_code == 200
+
+	task_id = first.json()["items"][0]["id"]
+	assert test_client.patch(f"/projects/{project.id}/tasks/{task_id}", json={"title": "Renamed"}).status_code == 200
+	changed = test_client.get(url, headers={"If-None-Match": etag})
+	assert changed.status_code == 200
+	assert changed.headers["etag"] != etag
+	assert changed.json()["items"][0]["title"] == "Renamed"
+
+	# Creating a task through the ORM bumps the version as well.
+	db_session.add(Task(project_id=project.id, title="Late addition"))
+	db_session.commit()
+	assert test_client.get(url, headers={"If-None-Match": changed.headers["etag"]}).status_code == 200
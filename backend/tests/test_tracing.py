@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+
+import pytest
+
+from app import tracing
+from app.ai.llm_gateway import map_concurrent
+from app.models import Project
+from app.utils import ai_client
+
+
+@pytest.fixture
+def tracing_on(monkeypatch):
+	# Listed before test_client so create_app() adds the middleware.
+	monkeypatch.setenv("TRACING", "true")
+	monkeypatch.setenv("ADMIN_EMAILS", "test@example.com")
+	tracing.buffer.clear()
+	tracing.set_exporter(None)
+	yield
+	tracing.set_exporter(None)
+
+
+def test_spans_nest_and_follow_work_into_thread_pools(tracing_on):
+	def work(n):
+		with tracing.span("item", n=n):
+			time.sleep(0.01)
+		return n
+
+	with tracing.span("job") as root:
+		with tracing.span("prepare"):
+			time.sleep(0.005)
+		assert [r for r, _ in map_concurrent(work, [1, 2, 3], max_concurrency=3)] == [1, 2, 3]
+		root.set(items=3)
+	assert tracing.current_span() is None
+
+	[trace] = tracing.buffer.recent()
+	assert trace.root.attributes == {"items": 3}
+	view = tracing.flame(trace)
+	tree = view["tree"]
+	assert [c["name"] for c in tree["children"]] == ["prepare", "item", "item", "item"]
+	# The items ran in parallel, so the children add up to more than the root's wall time.
+	assert tree["self_ms"] >= 0 and tree["duration_ms"] < sum(c["duration_ms"] for c in tree["children"])
+	assert any(line.startswith("job;item ") for line in view["folded"])
+
+
+def test_disabled_tracing_records_nothing(monkeypatch):
+	monkeypatch.delenv("TRACING", raising=False)
+	tracing.buffer.clear()
+	with tracing.span("ignored") as s:
+		s.set(anything=1)
+	assert tracing.current_span() is None and tracing.buffer.recent() == []
+
+
+def test_errors_are_recorded_and_exported(tracing_on, tmp_path):
+	exporter = tracing.OtlpFileExporter(str(tmp_path / "otlp.jsonl"))
+	tracing.set_exporter(exporter)
+	with pytest.raises(ValueError):
+		with tracing.span("outer", attempt=1):
+			with tracing.span("inner"):
+				raise ValueError("boom")
+	assert exporter.flush()
+	[line] = (tmp_path / "otlp.jsonl").read_text().splitlines()
+	spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+	outer, inner = spans
+	assert inner["parentSpanId"] == outer["spanId"] and "parentSpanId" not in outer
+	assert inner["status"] == {"code": 2, "message": "ValueError: boom"}
+	assert outer["attributes"] == [{"key": "attempt", "value": {"intValue": "1"}}]
+	assert int(outer["endTimeUnixNano"]) >= int(outer["startTimeUnixNano"])
+
+	exporter = tracing.JsonFileExporter(str(tmp_path / "traces.jsonl"))
+	tracing.set_exporter(exporter)
+	with tracing.span("plain"):
+		pass
+	assert exporter.flush()
+	exported = json.loads((tmp_path / "traces.jsonl").read_text())
+	assert exported["name"] == "plain" and exported["spans"][0]["name"] == "plain"
+
+
+def test_file_export_happens_off_the_request_thread(tracing_on, tmp_path):
+	release = threading.Event()
+
+	class SlowExporter(tracing.JsonFileExporter):
+		def _line(self, trace):
+			release.wait(5)
+			return super()._line(trace)
+
+	path = tmp_path / "slow.jsonl"
+	exporter = SlowExporter(str(path))
+	tracing.set_exporter(exporter)
+	started = time.perf_counter()
+	with tracing.span("quick"):
+		pass
+	assert time.perf_counter() - started < 1
+	assert not path.exists()
+
+	release.set()
+	assert exporter.flush()
+	assert json.loads(path.read_text())["name"] == "quick"
+
+
+def test_request_trace_breaks_down_an_upload(tracing_on, test_client, current_user, db_session, tmp_path, monkeypatch):
+	from app.routers import files
+
+	monkeypatch.setattr(files, "UPLOAD_DIR", tmp_path)
+	project = Project(title="P", description="", owner_id=current_user.id)
+	db_session.add(project)
+	db_session.commit()
+
+	caller = "0af7651916cd43dd8448eb211c80319c"
+	response = test_client.post(
+		f"/files/projects/{project.id}/upload",
+		files={"file": ("main.py", b"print('hi')\n", "text/x-python")},
+		headers={"traceparent": f"00-{caller}-b7ad6b7169203331-01"},
+	)
+	assert response.status_code == 200
+	assert response.headers["X-Trace-Id"] == caller
+
+	view = test_client.get(f"/admin/traces/{caller}").json()
+	assert view["tree"]["name"] == "POST /files/projects/{project_id}/upload"
+	assert view["tree"]["attributes"]["http.status_code"] == 200
+	names = [c["name"] for c in view["tree"]["children"]]
+	assert names == ["files.read_upload", "files.save", "files.commit"]
+	# Newest first: the breakdown request above, then the upload.
+	listed = test_client.get("/admin/traces").json()["traces"]
+	assert [t["trace_id"] for t in listed][1] == caller
+	assert test_client.get("/admin/traces/unknown").status_code == 404
+
+
+def test_ai_client_propagates_the_trace(tracing_on, monkeypatch):
+	sent = {}
+
+	class Reply:
+		status_code = 200
+
+		def raise_for_status(self):
+			pass
+
+		def json(self):
+			return {"team": ["a"]}
+
+	def post(url, headers=None, **kwargs):
+		sent.update(url=url, headers=headers)
+		return Reply()
+
+	monkeypatch.setattr(ai_client.requests, "post", post)
+	with tracing.span("caller"):
+		assert ai_client.ai_generate_team({}) == ["a"]
+	[trace] = tracing.buffer.recent()
+	request_span = trace.spans[1]
+	assert request_span.attributes == {"endpoint": "/api/generate_team", "status_code": 200}
+	assert sent["headers"]["traceparent"] == f"00-{trace.trace_id}-{request_span.span_id}-01"
+
+
+def test_traces_are_for_admins_while_enabled(monkeypatch, test_client):
+	monkeypatch.setenv("TRACING", "true")
+	monkeypatch.setenv("ADMIN_EMAILS", "ops@example.com")
+	assert test_client.get("/admin/traces").status_code == 403
+	assert test_client.get("/admin/traces/unknown").status_code == 403
+
+	monkeypatch.setenv("ADMIN_EMAILS", "test@example.com")
+	assert test_client.get("/admin/traces").status_code == 200
+	monkeypatch.setenv("TRACING", "false")
+	assert test_client.get("/admin/traces").status_code == 404
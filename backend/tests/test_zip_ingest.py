@@ -0,0 +1,64 @@
+import os
+import tracemalloc
+import zipfile
+
+import pytest
+
+from app.ai.zip_ingest import IngestError, IngestLimits, ingest_zip
+
+
+def _zip(path, members):
+	with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+		for name, data in members.items():
+			zf.writestr(name, data)
+	return path
+
+
+def test_skips_binary_and_vendor_members(tmp_path):
+	path = _zip(
+		tmp_path / "repo.zip",
+		{
+			"src/app.py": "import os\n\nprint(os.name)\n",
+			"node_modules/lib/index.js": "module.exports = {}\n",
+			"static/logo.png": b"\x89PNG\r\n",
+			"data/blob.dat": b"abc\x00def",
+			".git/HEAD": "ref: refs/heads/main\n",
+			"dist/bundle.min.js": "var a=1;",
+		},
+	)
+	seen = {}
+	with open(path, "rb") as source:
+		result = ingest_zip(source, visitor=lambda name, data: seen.setdefault(name, data))
+
+	assert [f.filename for f in result.files] == ["src/app.py"]
+	assert result.files[0].line_count == 3
+	assert seen == {"src/app.py": b"import os\n\nprint(os.name)\n"}
+	assert result.skipped == {"vendor": 3, "binary": 2}
+
+
+def test_rejects_zip_bomb_and_member_count(tmp_path):
+	bomb = _zip(tmp_path / "bomb.zip", {"a.txt": b"0" * (5 * 1024 * 1024)})
+	with open(bomb, "rb") as source, pytest.raises(IngestError):
+		ingest_zip(source)
+
+	many = _zip(tmp_path / "many.zip", {f"f{i}.py": "x = 1\n" for i in range(20)})
+	with open(many, "rb") as source, pytest.raises(IngestError):
+		ingest_zip(source, limits=IngestLimits(max_members=10))
+
+
+def test_memory_stays_flat_for_large_archives(tmp_path):
+	# ~16 MB of poorly compressible text.
+	members = {f"src/module_{i}.py": os.urandom(512 * 1024).hex() for i in range(16)}
+	path = _zip(tmp_path / "large.zip", members)
+	del members
+
+	tracemalloc.start()
+	with open(path, "rb") as source:
+		result = ingest_zip(source)
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	assert len(result.files) == 16
+	assert result.files[0].size == 1024 * 1024
+	assert len(result.files[0].preview) == 2000
+	assert peak < 2 * 1024 * 1024
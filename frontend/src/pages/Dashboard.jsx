@@ -9,7 +9,10 @@ import { Badge } from "../components/ui/badge";
 export default function Dashboard() {
   const { user, setCredentials, token } = useAuthStore();
   const [projects, setProjects] = useState([]);
+  const [total, setTotal] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchData = async () => {
@@ -28,8 +31,11 @@ export default function Dashboard() {
         if (me?.data) {
           setCredentials({ token: token || authStore.token || storedToken, user: me.data });
         }
-        const { data } = await apiClient.get("/projects").catch(handleApiError);
-        setProjects(data || []);
+        // One request: projects with member counts, task progress and last activity.
+        const { data } = await apiClient.get("/projects/feed").catch(handleApiError);
+        setProjects(data?.items || []);
+        setTotal(data?.total ?? null);
+        setNextCursor(data?.next_cursor || null);
       } catch (error) {
         console.error(error);
         // Don't set error state - let ProtectedRoute handle auth failures
@@ -40,6 +46,22 @@ export default function Dashboard() {
     fetchData();
   }, [setCredentials, token]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const { data } = await apiClient
+        .get("/projects/feed", { params: { cursor: nextCursor } })
+        .catch(handleApiError);
+      setProjects((current) => [...current, ...(data?.items || [])]);
+      setNextCursor(data?.next_cursor || null);
+    } catch (error) {
+      console.error(error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const xpLevel = user?.level ?? "bronze";
 
   return (
@@ -60,7 +82,7 @@ export default function Dashboard() {
             <CardDescription>Keep track of upcoming and active collaborations.</CardDescription>
           </CardHeader>
           <CardContent>
-            <p className="text-3xl font-semibold">{projects.length}</p>
+            <p className="text-3xl font-semibold">{total ?? projects.length}</p>
           </CardContent>
         </Card>
         <Card>
@@ -104,15 +126,30 @@ export default function Dashboard() {
             <div className="space-y-4">
               {projects.map((project) => (
                 <div key={project.id} className="flex items-center justify-between rounded-md border p-4">
-                  <div>
-                    <p className="font-medium">{project.title}</p>
+                  <div className="space-y-1">
+                    <div className="flex items-center gap-2">
+                      <p className="font-medium">{project.title}</p>
+                      <Badge variant="outline">{project.role === "owner" ? "Owner" : "Member"}</Badge>
+                    </div>
                     <p className="text-sm text-muted-foreground">{project.description}</p>
+                    <p className="text-xs text-muted-foreground">
+                      {project.task_done}/{project.task_total} tasks done ({project.progress}%) ·{" "}
+                      {project.member_count} {project.member_count === 1 ? "member" : "members"}
+                      {project.last_activity_at
+                        ? ` · active ${new Date(project.last_activity_at).toLocaleDateString()}`
+                        : ""}
+                    </p>
                   </div>
                   <Button variant="outline" asChild>
                     <Link to={`/projects/${project.id}`}>View</Link>
                   </Button>
                 </div>
               ))}
+              {nextCursor && (
+                <Button variant="outline" className="w-full" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? "Loading..." : "Load more"}
+                </Button>
+              )}
             </div>
           )}
         </CardContent>